@@ -0,0 +1,68 @@
+"""add per-staff load index
+
+Revision ID: 0028_staff_load_index
+Revises: 0027_agent_only_ai_routing
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0028_staff_load_index"
+down_revision: Union[str, None] = "0027_agent_only_ai_routing"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "api_staff_load",
+        sa.Column("staff_id", sa.UUID(), nullable=False, comment="Staff member"),
+        sa.Column("project_id", sa.UUID(), nullable=False, comment="Project of the staff member"),
+        sa.Column(
+            "open_sessions",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+            comment="Number of open sessions assigned to this staff member",
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.func.now(),
+            comment="Last update timestamp",
+        ),
+        sa.ForeignKeyConstraint(["staff_id"], ["api_staff.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["project_id"], ["api_projects.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("staff_id"),
+    )
+    op.create_index(
+        "ix_api_staff_load_project_id",
+        "api_staff_load",
+        ["project_id"],
+        unique=False,
+    )
+
+    # Backfill from the sessions that are open right now
+    op.execute(
+        """
+        INSERT INTO api_staff_load (staff_id, project_id, open_sessions, updated_at)
+        SELECT s.id, s.project_id, COUNT(vs.id), now()
+        FROM api_staff AS s
+        LEFT JOIN api_visitor_sessions AS vs
+            ON vs.staff_id = s.id AND vs.status = 'open'
+        WHERE s.deleted_at IS NULL
+        GROUP BY s.id, s.project_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_staff_load_project_id", table_name="api_staff_load")
+    op.drop_table("api_staff_load")
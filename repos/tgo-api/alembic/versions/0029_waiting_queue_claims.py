@@ -0,0 +1,56 @@
+"""add waiting queue processing claims
+
+Revision ID: 0029_waiting_queue_claims
+Revises: 0028_staff_load_index
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0029_waiting_queue_claims"
+down_revision: Union[str, None] = "0028_staff_load_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "api_visitor_waiting_queue",
+        sa.Column(
+            "claimed_by",
+            sa.String(length=100),
+            nullable=True,
+            comment="Token of the queue processor currently holding this entry",
+        ),
+    )
+    op.add_column(
+        "api_visitor_waiting_queue",
+        sa.Column(
+            "claimed_until",
+            sa.DateTime(),
+            nullable=True,
+            comment="Claim visibility timeout; the entry is claimable again after this time",
+        ),
+    )
+    op.create_index(
+        "ix_api_visitor_waiting_queue_waiting_order",
+        "api_visitor_waiting_queue",
+        ["project_id", sa.text("priority DESC"), "position"],
+        unique=False,
+        postgresql_where=sa.text("status = 'waiting'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_api_visitor_waiting_queue_waiting_order",
+        table_name="api_visitor_waiting_queue",
+    )
+    op.drop_column("api_visitor_waiting_queue", "claimed_until")
+    op.drop_column("api_visitor_waiting_queue", "claimed_by")
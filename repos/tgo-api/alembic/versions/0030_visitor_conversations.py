@@ -0,0 +1,113 @@
+"""add conversation list projection
+
+Revision ID: 0030_visitor_conversations
+Revises: 0029_waiting_queue_claims
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0030_visitor_conversations"
+down_revision: Union[str, None] = "0029_waiting_queue_claims"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are built lazily on first read, no backfill needed
+    op.create_table(
+        "api_visitor_conversations",
+        sa.Column("visitor_id", sa.UUID(), nullable=False, comment="Visitor of the conversation"),
+        sa.Column("project_id", sa.UUID(), nullable=False, comment="Project of the visitor"),
+        sa.Column(
+            "platform_id",
+            sa.UUID(),
+            nullable=True,
+            comment="Platform of the visitor (payload embeds its AI settings)",
+        ),
+        sa.Column(
+            "service_status",
+            sa.String(length=20),
+            nullable=True,
+            comment="Visitor service status at refresh time",
+        ),
+        sa.Column(
+            "assigned_staff_id",
+            sa.UUID(),
+            nullable=True,
+            comment="Staff of the visitor's latest open session",
+        ),
+        sa.Column(
+            "tag_ids",
+            postgresql.ARRAY(sa.String(length=255)),
+            nullable=False,
+            server_default="{}",
+            comment="Active tag IDs of the visitor",
+        ),
+        sa.Column(
+            "last_message_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Visitor's last message time at refresh time",
+        ),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+            comment="Language-neutral VisitorResponse JSON",
+        ),
+        sa.Column(
+            "version",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+            comment="Bumped by every write affecting the payload",
+        ),
+        sa.Column(
+            "stale",
+            sa.Boolean(),
+            nullable=False,
+            server_default="true",
+            comment="Payload must be rebuilt before use",
+        ),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="When the payload was last rebuilt",
+        ),
+        sa.ForeignKeyConstraint(["visitor_id"], ["api_visitors.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["project_id"], ["api_projects.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("visitor_id"),
+    )
+    op.create_index(
+        op.f("ix_api_visitor_conversations_project_id"),
+        "api_visitor_conversations",
+        ["project_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_api_visitor_conversations_platform_id"),
+        "api_visitor_conversations",
+        ["platform_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_api_visitor_conversations_platform_id"),
+        table_name="api_visitor_conversations",
+    )
+    op.drop_index(
+        op.f("ix_api_visitor_conversations_project_id"),
+        table_name="api_visitor_conversations",
+    )
+    op.drop_table("api_visitor_conversations")
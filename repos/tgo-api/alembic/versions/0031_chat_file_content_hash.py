@@ -0,0 +1,36 @@
+"""add content hash to chat files
+
+Revision ID: 0031_chat_file_content_hash
+Revises: 0030_visitor_conversations
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0031_chat_file_content_hash"
+down_revision: Union[str, None] = "0030_visitor_conversations"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing files keep a NULL hash and are served with a weak size/mtime ETag
+    op.add_column(
+        "api_chat_files",
+        sa.Column(
+            "content_hash",
+            sa.String(length=64),
+            nullable=True,
+            comment="SHA-256 of the file content (hex), used as ETag",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("api_chat_files", "content_hash")
@@ -0,0 +1,110 @@
+"""partition visitor activities by month
+
+Revision ID: 0032_partition_visitor_activities
+Revises: 0031_chat_file_content_hash
+Create Date: 2026-10-18
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0032_partition_visitor_activities"
+down_revision: Union[str, None] = "0031_chat_file_content_hash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "api_visitor_activities"
+LEGACY = "api_visitor_activities_legacy"
+COLUMNS = (
+    "id, project_id, visitor_id, activity_type, title, description, context, "
+    "duration_seconds, occurred_at, created_at, updated_at, deleted_at"
+)
+# Kept in step with VISITOR_ACTIVITY_PARTITION_MONTHS_AHEAD; the maintenance
+# task creates later months as time goes on
+MONTHS_AHEAD = 3
+
+
+def _columns() -> list:
+    return [
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("project_id", sa.Uuid(), nullable=False, comment="Associated project ID for multi-tenant isolation"),
+        sa.Column("visitor_id", sa.Uuid(), nullable=False, comment="Associated visitor ID"),
+        sa.Column("activity_type", sa.String(length=50), nullable=False, comment="Categorised type of activity"),
+        sa.Column("title", sa.String(length=255), nullable=False, comment="Short title or headline for the activity"),
+        sa.Column("description", sa.Text(), nullable=True, comment="Detailed description of the activity"),
+        sa.Column("context", postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment="Arbitrary structured context for the activity"),
+        sa.Column("duration_seconds", sa.Integer(), nullable=True, comment="Duration associated with the activity, in seconds"),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False, comment="When the activity occurred"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, comment="Record creation timestamp"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, comment="Record update timestamp"),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True, comment="Soft deletion timestamp"),
+        sa.ForeignKeyConstraint(["project_id"], ["api_projects.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["visitor_id"], ["api_visitors.id"], ondelete="CASCADE"),
+    ]
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.rename_table(TABLE, LEGACY)
+    op.execute(f"ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey")
+
+    # The partition key has to be part of the primary key
+    op.create_table(
+        TABLE,
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "occurred_at"),
+        postgresql_partition_by="RANGE (occurred_at)",
+    )
+    op.create_index(
+        "ix_api_visitor_activities_visitor_occurred",
+        TABLE,
+        ["visitor_id", "occurred_at"],
+    )
+
+    # One partition per month from the oldest activity through MONTHS_AHEAD
+    # months from now; rows outside that range go to the default partition
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    oldest = bind.execute(sa.text(f"SELECT MIN(occurred_at) FROM {LEGACY}")).scalar()
+    first = datetime((oldest or now).year, (oldest or now).month, 1)
+    if oldest is not None and oldest > now:
+        first = datetime(now.year, now.month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{month.year:04d}_{month.month:02d} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat(sep=' ')}') TO ('{upper.isoformat(sep=' ')}')"
+        )
+        month = upper
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    op.execute(f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY}")
+    op.drop_table(LEGACY)
+
+
+def downgrade() -> None:
+    op.rename_table(TABLE, LEGACY)
+    op.execute(f"ALTER INDEX {TABLE}_pkey RENAME TO {LEGACY}_pkey")
+    op.create_table(TABLE, *_columns(), sa.PrimaryKeyConstraint("id"))
+    op.execute(f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY}")
+    # Dropping the partitioned table drops all of its partitions (and the
+    # visitor index, whose name is free again afterwards)
+    op.drop_table(LEGACY)
+    op.create_index(
+        "ix_api_visitor_activities_visitor_occurred",
+        TABLE,
+        ["visitor_id", "occurred_at"],
+    )
@@ -0,0 +1,67 @@
+"""track pending direct chat file uploads
+
+Revision ID: 0033_chat_file_uploads
+Revises: 0032_partition_visitor_activities
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0033_chat_file_uploads"
+down_revision: Union[str, None] = "0032_partition_visitor_activities"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTENT_HASH_COMMENT = "SHA-256 of the file content (hex), used as ETag"
+CONTENT_HASH_COMMENT_V2 = (
+    "SHA-256 of the file content (hex), or the storage ETag of direct uploads; used as ETag"
+)
+
+
+def upgrade() -> None:
+    # Files completed from a presigned upload store the storage ETag instead
+    op.alter_column(
+        "api_chat_files",
+        "content_hash",
+        existing_type=sa.String(length=64),
+        existing_nullable=True,
+        comment=CONTENT_HASH_COMMENT_V2,
+        existing_comment=CONTENT_HASH_COMMENT,
+    )
+
+    op.create_table(
+        "api_chat_file_uploads",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("project_id", sa.Uuid(), nullable=False, comment="Associated project ID"),
+        sa.Column("file_path", sa.String(length=1024), nullable=False, comment="Storage path the upload URL was signed for"),
+        sa.Column("file_size", sa.Integer(), nullable=False, comment="Declared file size in bytes"),
+        sa.Column("expires_at", sa.DateTime(), nullable=False, comment="When the upload URL and token expire"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, comment="Creation time"),
+        sa.ForeignKeyConstraint(["project_id"], ["api_projects.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("file_path"),
+    )
+    op.create_index(
+        op.f("ix_api_chat_file_uploads_expires_at"),
+        "api_chat_file_uploads",
+        ["expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_api_chat_file_uploads_expires_at"), table_name="api_chat_file_uploads")
+    op.drop_table("api_chat_file_uploads")
+    op.alter_column(
+        "api_chat_files",
+        "content_hash",
+        existing_type=sa.String(length=64),
+        existing_nullable=True,
+        comment=CONTENT_HASH_COMMENT,
+        existing_comment=CONTENT_HASH_COMMENT_V2,
+    )
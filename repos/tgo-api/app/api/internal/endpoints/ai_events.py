@@ -36,7 +36,7 @@ from app.schemas.ai import (
     VisitorTagEvent,
 )
 from app.services.visitor_notifications import notify_visitor_profile_updated
-from app.services.transfer_service import transfer_to_staff
+from app.services.transfer_service import get_queue_entry_rank, transfer_to_staff
 from app.utils.intent import localize_intent
 from app.models.tag import TagCategory
 from app.utils.manual_service_tag import (
@@ -188,7 +188,7 @@ async def _handle_manual_service_request(event: AIServiceEvent, project: Project
             return {
                 "entry_id": str(existing_queue.id),
                 "status": existing_queue.status,
-                "position": existing_queue.position,
+                "position": get_queue_entry_rank(db, existing_queue),
                 "priority": existing_queue.priority,
                 "channel_id": existing_queue.channel_id,
                 "channel_type": existing_queue.channel_type,
@@ -241,7 +241,7 @@ async def _handle_manual_service_request(event: AIServiceEvent, project: Project
         return {
             "entry_id": str(q.id),
             "status": q.status,
-            "position": q.position,
+            "position": transfer_result.queue_position,
             "priority": q.priority,
             "channel_id": q.channel_id,
             "channel_type": q.channel_type,
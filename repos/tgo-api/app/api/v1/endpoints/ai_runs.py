@@ -9,8 +9,8 @@ from sqlalchemy.orm import Session
 
 from app.core.logging import get_logger
 from app.core.database import get_db
-from app.core.security import get_current_active_user
-from app.models import Platform, Staff
+from app.core.security import get_active_platform_by_api_key, get_current_active_user
+from app.models import Staff
 from app.services.ai_client import ai_client
 from app.services.run_registry import run_registry
 
@@ -45,15 +45,7 @@ async def cancel_by_client_no(
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
     # Authenticate via platform_api_key (visitor-facing)
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == req.platform_api_key,
-            Platform.is_active.is_(True),
-            Platform.deleted_at.is_(None),
-        )
-        .first()
-    )
+    platform = get_active_platform_by_api_key(db, req.platform_api_key)
     if not platform:
         raise HTTPException(status_code=401, detail="Invalid platform API key")
 
@@ -1,6 +1,6 @@
 """Channel information endpoints."""
 
-from typing import Any, Dict, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session, selectinload
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.database import get_db
-from app.core.security import verify_token, get_user_language, UserLanguage
+from app.core.security import verify_token, get_user_language, get_platform_by_api_key, UserLanguage
 from app.models import Staff, Visitor, VisitorTag, VisitorActivity, Platform, VisitorSession, SessionStatus
 from app.schemas.visitor import (
     VisitorResponse,
@@ -94,24 +94,6 @@ def _build_enriched_visitor_payload(
     user_language: UserLanguage = "en",
 ) -> VisitorResponse:
     """Build enriched visitor payload with tags, AI profile/insights, system info, and activities."""
-    active_tags = [
-        vt.tag
-        for vt in visitor.visitor_tags
-        if vt.deleted_at is None and vt.tag and vt.tag.deleted_at is None
-    ]
-    tag_responses = [TagResponse.model_validate(tag) for tag in active_tags]
-    set_tag_list_display_name(tag_responses, user_language)
-
-    ai_profile_response = (
-        VisitorAIProfileResponse.model_validate(visitor.ai_profile) if visitor.ai_profile else None
-    )
-    ai_insight_response = (
-        VisitorAIInsightResponse.model_validate(visitor.ai_insight) if visitor.ai_insight else None
-    )
-    system_info_response = (
-        VisitorSystemInfoResponse.model_validate(visitor.system_info) if visitor.system_info else None
-    )
-
     recent_activities = (
         db.query(VisitorActivity)
         .filter(
@@ -123,9 +105,6 @@ def _build_enriched_visitor_payload(
         .limit(10)
         .all()
     )
-    recent_activity_responses = [
-        VisitorActivityResponse.model_validate(activity) for activity in recent_activities
-    ]
 
     # Query the open session to get assigned staff_id
     open_session = (
@@ -140,6 +119,58 @@ def _build_enriched_visitor_payload(
     )
     assigned_staff_id = open_session.staff_id if open_session else None
 
+    return _compose_visitor_payload(
+        visitor=visitor,
+        recent_activities=recent_activities,
+        assigned_staff_id=assigned_staff_id,
+        accept_language=accept_language,
+        user_language=user_language,
+    )
+
+
+def _compose_visitor_payload(
+    visitor: Visitor,
+    recent_activities: List[VisitorActivity],
+    assigned_staff_id: Optional[UUID],
+    accept_language: Optional[str] = None,
+    user_language: UserLanguage = "en",
+) -> VisitorResponse:
+    """Build the enriched visitor payload from already loaded data (no queries).
+
+    ``visitor`` must have platform, visitor_tags.tag, ai_profile, ai_insight
+    and system_info loaded.
+    """
+    visitor_payload = _compose_base_visitor_payload(visitor, recent_activities, assigned_staff_id)
+    return _localize_visitor_payload(visitor_payload, accept_language, user_language)
+
+
+def _compose_base_visitor_payload(
+    visitor: Visitor,
+    recent_activities: List[VisitorActivity],
+    assigned_staff_id: Optional[UUID],
+) -> VisitorResponse:
+    """Language-neutral part of ``_compose_visitor_payload`` (cacheable)."""
+    active_tags = [
+        vt.tag
+        for vt in visitor.visitor_tags
+        if vt.deleted_at is None and vt.tag and vt.tag.deleted_at is None
+    ]
+    tag_responses = [TagResponse.model_validate(tag) for tag in active_tags]
+
+    ai_profile_response = (
+        VisitorAIProfileResponse.model_validate(visitor.ai_profile) if visitor.ai_profile else None
+    )
+    ai_insight_response = (
+        VisitorAIInsightResponse.model_validate(visitor.ai_insight) if visitor.ai_insight else None
+    )
+    system_info_response = (
+        VisitorSystemInfoResponse.model_validate(visitor.system_info) if visitor.system_info else None
+    )
+
+    recent_activity_responses = [
+        VisitorActivityResponse.model_validate(activity) for activity in recent_activities
+    ]
+
     visitor_payload = VisitorResponse.model_validate(visitor).model_copy(
         update={
             "tags": tag_responses,
@@ -151,8 +182,17 @@ def _build_enriched_visitor_payload(
         }
     )
     populate_visitor_ai_settings(visitor_payload, visitor.platform)
-    localize_visitor_response_intent(visitor_payload, accept_language)
+    return visitor_payload
 
+
+def _localize_visitor_payload(
+    visitor_payload: VisitorResponse,
+    accept_language: Optional[str] = None,
+    user_language: UserLanguage = "en",
+) -> VisitorResponse:
+    """Apply tag display names and intent localization in place."""
+    set_tag_list_display_name(visitor_payload.tags, user_language)
+    localize_visitor_response_intent(visitor_payload, accept_language)
     return visitor_payload
 
 
@@ -348,11 +388,7 @@ async def get_channel_info(
     if current_user is None:
         api_key = platform_api_key or x_platform_api_key
         if api_key:
-            platform = (
-                db.query(Platform)
-                .filter(Platform.api_key == api_key)
-                .first()
-            )
+            platform = get_platform_by_api_key(db, api_key)
             if not platform:
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform_api_key")
             if platform.deleted_at is not None:
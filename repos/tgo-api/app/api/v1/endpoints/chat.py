@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
 import json
 import mimetypes
 import os
@@ -17,17 +18,24 @@ from urllib.parse import quote
 from uuid import UUID, uuid4
 
 import httpx
-from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, UploadFile, status
-from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import get_current_active_user, verify_token, require_permission
+from app.core.security import (
+    create_purpose_token,
+    get_current_active_user,
+    require_permission,
+    verify_purpose_token,
+    verify_token,
+)
 from app.models import (
     ChannelMember,
     ChatFile,
+    ChatFileUpload,
     Platform,
     SessionStatus,
     Staff,
@@ -36,7 +44,13 @@ from app.models import (
     ChannelMemoryClearance,
     ClearanceUserType,
 )
-from app.schemas import ChatFileUploadResponse, StaffSendPlatformMessageRequest
+from app.schemas import (
+    ChatFileCompleteRequest,
+    ChatFilePresignRequest,
+    ChatFilePresignResponse,
+    ChatFileUploadResponse,
+    StaffSendPlatformMessageRequest,
+)
 from app.schemas.chat import (
     UIUserActionRequest,
     UIUserActionResponse,
@@ -52,7 +66,7 @@ from app.schemas.chat import (
     OpenAIChatCompletionUsage,
     OpenAIChatMessage,
 )
-from app.services import chat_service
+from app.services import chat_service, file_delivery
 from app.core.logging import get_logger
 logger = get_logger(__name__)
 from app.services.file_service import sanitize_filename, get_safe_ascii_filename
@@ -639,19 +653,18 @@ async def staff_send_platform_message(
     return Response(content=resp.content, status_code=resp.status_code, headers=passthrough_headers, media_type=media_type)
 
 
-@router.post("/upload", response_model=ChatFileUploadResponse, tags=["Chat"])
-async def chat_file_upload(
-    file: UploadFile = File(...),
-    channel_id: str = Form(...),
-    channel_type: int = Form(...),
-    platform_api_key: Optional[str] = Form(None),
-    x_platform_api_key: Optional[str] = Header(None, alias="X-Platform-API-Key"),
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db),
+def _authorize_channel_upload(
+    db: Session,
+    credentials: Optional[HTTPAuthorizationCredentials],
+    plat_key: Optional[str],
+    channel_id: str,
+    channel_type: int,
 ):
-    """Upload a file for a chat channel with dual authentication support."""
-    # 1) Authenticate: JWT staff or platform_api_key
-    plat_key = platform_api_key or x_platform_api_key
+    """Authenticate the uploader and check access to the target channel.
+
+    Returns ``(current_user, platform, project_id, uploaded_by)``.
+    """
+    # Authenticate: JWT staff or platform_api_key
     current_user, platform = chat_service.authenticate_staff_or_platform(db, credentials, plat_key)
 
     if not current_user and not platform:
@@ -666,7 +679,7 @@ async def chat_file_upload(
         project_id = platform.project_id
         uploaded_by = "visitor"
 
-    # 2) Access validation by channel
+    # Access validation by channel
     if channel_type == CHANNEL_TYPE_CUSTOMER_SERVICE:
         try:
             visitor_uuid = parse_visitor_channel_id(channel_id)
@@ -709,13 +722,20 @@ async def chat_file_upload(
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported channel_type")
 
-    # 3) Validate file type/size
+    return current_user, platform, project_id, uploaded_by
+
+
+def _validate_upload_file(file_name: Optional[str], content_type: Optional[str]):
+    """Check the file type against the upload allow-lists.
+
+    Returns ``(original_name, sanitized_name, mime)``.
+    """
     allowed_exts = set(settings.ALLOWED_UPLOAD_EXTENSIONS or [])
-    original_name = file.filename or "upload.bin"
+    original_name = file_name or "upload.bin"
     sanitized_name = sanitize_filename(original_name)
     ext = sanitized_name.rsplit(".", 1)[-1].lower() if "." in sanitized_name else ""
 
-    mime = file.content_type or mimetypes.guess_type(sanitized_name)[0] or "application/octet-stream"
+    mime = content_type or mimetypes.guess_type(sanitized_name)[0] or "application/octet-stream"
 
     if allowed_exts:
         if not ext or ext not in allowed_exts:
@@ -724,45 +744,97 @@ async def chat_file_upload(
         if settings.ALLOWED_FILE_TYPES and mime not in set(settings.ALLOWED_FILE_TYPES):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="MIME type not allowed")
 
-    max_bytes = int(settings.MAX_UPLOAD_SIZE_MB) * 1024 * 1024 if settings.MAX_UPLOAD_SIZE_MB else int(settings.MAX_FILE_SIZE)
+    return original_name, sanitized_name, mime
+
 
-    # 4) Build storage path
+def _max_upload_bytes() -> int:
+    return int(settings.MAX_UPLOAD_SIZE_MB) * 1024 * 1024 if settings.MAX_UPLOAD_SIZE_MB else int(settings.MAX_FILE_SIZE)
+
+
+def _chat_file_path(project_id: UUID, channel_type: int, channel_id: str, sanitized_name: str) -> str:
     ts_ms = int(time.time() * 1000)
     rand = secrets.token_hex(4)
     fname = f"{ts_ms}_{rand}_{sanitized_name}"
 
     date_dir = time.strftime("%Y-%m-%d")
-    rel_path = f"chat/{project_id}/{channel_type}/{channel_id}/{date_dir}/{fname}"
+    return f"chat/{project_id}/{channel_type}/{channel_id}/{date_dir}/{fname}"
+
+
+def _chat_file_response(chat_file: ChatFile, file_url: str, uploaded_by: Optional[str]) -> ChatFileUploadResponse:
+    # Use storage interface to get the appropriate access URL
+    from app.services.storage import get_storage
+    final_url = get_storage().get_file_access_url(str(chat_file.id), file_url)
+
+    return ChatFileUploadResponse(
+        file_id=str(chat_file.id),
+        file_name=chat_file.file_name,
+        file_size=chat_file.file_size,
+        file_type=chat_file.file_type,
+        file_url=final_url,
+        channel_id=chat_file.channel_id,
+        channel_type=chat_file.channel_type,
+        uploaded_at=chat_file.created_at,
+        uploaded_by=uploaded_by,
+    )
+
+
+@router.post("/upload", response_model=ChatFileUploadResponse, tags=["Chat"])
+async def chat_file_upload(
+    file: UploadFile = File(...),
+    channel_id: str = Form(...),
+    channel_type: int = Form(...),
+    platform_api_key: Optional[str] = Form(None),
+    x_platform_api_key: Optional[str] = Header(None, alias="X-Platform-API-Key"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db),
+):
+    """Upload a file for a chat channel with dual authentication support.
+
+    The body is streamed to storage chunk by chunk (hashed and size-checked
+    on the way) instead of being buffered in memory first.
+    """
+    # 1) Authenticate and validate channel access
+    plat_key = platform_api_key or x_platform_api_key
+    current_user, platform, project_id, uploaded_by = _authorize_channel_upload(
+        db, credentials, plat_key, channel_id, channel_type
+    )
 
-    # 5) Read file into memory buffer and validate size
-    from io import BytesIO
-    buffer = BytesIO()
+    # 2) Validate file type
+    original_name, sanitized_name, mime = _validate_upload_file(file.filename, file.content_type)
+    max_bytes = _max_upload_bytes()
+
+    # 3) Build storage path
+    rel_path = _chat_file_path(project_id, channel_type, channel_id, sanitized_name)
+
+    # 4) Stream to the storage backend, validating size as chunks arrive
+    digest = hashlib.sha256()
     total = 0
-    try:
+
+    async def chunks():
+        nonlocal total
         while True:
-            chunk = await file.read(1024 * 1024)
+            try:
+                chunk = await file.read(1024 * 1024)
+            except Exception as e:
+                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"File read failed: {e}")
             if not chunk:
                 break
             total += len(chunk)
             if total > max_bytes:
                 raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
-            buffer.write(chunk)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"File read failed: {e}")
-    
-    buffer.seek(0)
+            digest.update(chunk)
+            yield chunk
 
-    # 6) Upload via storage backend
     from app.services.storage import get_storage
     storage = get_storage()
     try:
-        file_url = await storage.upload(buffer, rel_path, mime)
+        file_url = await storage.upload_stream(chunks(), rel_path, mime)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"File storage failed: {e}")
 
-    # 7) Persist metadata
+    # 5) Persist metadata
     chat_file = ChatFile(
         project_id=project_id,
         channel_id=channel_id,
@@ -771,6 +843,7 @@ async def chat_file_upload(
         file_path=rel_path,
         file_size=total,
         file_type=mime,
+        content_hash=digest.hexdigest(),
         uploaded_by_staff_id=(current_user.id if current_user else None),
         uploaded_by_platform_id=(platform.id if platform else None),
     )
@@ -778,26 +851,184 @@ async def chat_file_upload(
     db.commit()
     db.refresh(chat_file)
 
-    # 8) Build response - use storage interface to get the appropriate access URL
-    final_url = storage.get_file_access_url(str(chat_file.id), file_url)
-    
-    return ChatFileUploadResponse(
-        file_id=str(chat_file.id),
-        file_name=original_name,
-        file_size=total,
-        file_type=mime,
-        file_url=final_url,
-        channel_id=channel_id,
-        channel_type=channel_type,
-        uploaded_at=chat_file.created_at,
-        uploaded_by=uploaded_by,
+    return _chat_file_response(chat_file, file_url, uploaded_by)
+
+
+_UPLOAD_TOKEN_PURPOSE = "chat_upload"
+
+
+@router.post("/upload/presign", response_model=ChatFilePresignResponse, tags=["Chat"])
+async def presign_chat_file_upload(
+    req: ChatFilePresignRequest,
+    x_platform_api_key: Optional[str] = Header(None, alias="X-Platform-API-Key"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db),
+):
+    """Get a presigned URL to upload a chat file directly to object storage.
+
+    The client sends the body to ``upload_url`` with ``method`` and
+    ``headers``, then calls ``/upload/complete`` with ``upload_token`` to
+    record the file. Only available with object storage (MinIO/S3).
+    """
+    plat_key = req.platform_api_key or x_platform_api_key
+    current_user, platform, project_id, _ = _authorize_channel_upload(
+        db, credentials, plat_key, req.channel_id, req.channel_type
+    )
+    original_name, sanitized_name, mime = _validate_upload_file(req.file_name, req.file_type)
+    if req.file_size > _max_upload_bytes():
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+
+    from app.services.storage import get_storage
+    expires_in = settings.STORAGE_PRESIGN_EXPIRES_SECONDS
+    rel_path = _chat_file_path(project_id, req.channel_type, req.channel_id, sanitized_name)
+    presigned = get_storage().presign_upload(rel_path, mime, req.file_size, expires_in)
+    if presigned is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Configured storage does not support direct uploads; use /chat/upload",
+        )
+
+    # Tracked until completed, so an abandoned upload's object gets swept
+    db.add(
+        ChatFileUpload(
+            project_id=project_id,
+            file_path=rel_path,
+            file_size=req.file_size,
+            expires_at=datetime.utcnow() + timedelta(seconds=expires_in),
+        )
+    )
+    db.commit()
+
+    upload_token = create_purpose_token(
+        _UPLOAD_TOKEN_PURPOSE,
+        {
+            "path": rel_path,
+            "project_id": str(project_id),
+            "channel_id": req.channel_id,
+            "channel_type": req.channel_type,
+            "file_name": original_name,
+            "file_type": mime,
+            "file_size": req.file_size,
+            "staff_id": str(current_user.id) if current_user else None,
+            "platform_id": str(platform.id) if platform else None,
+        },
+        timedelta(seconds=expires_in),
+    )
+    return ChatFilePresignResponse(
+        upload_url=presigned.url,
+        method=presigned.method,
+        headers=presigned.headers,
+        upload_token=upload_token,
+        expires_in=presigned.expires_in,
+    )
+
+
+@router.post("/upload/complete", response_model=ChatFileUploadResponse, tags=["Chat"])
+async def complete_chat_file_upload(
+    req: ChatFileCompleteRequest,
+    x_platform_api_key: Optional[str] = Header(None, alias="X-Platform-API-Key"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db),
+):
+    """Record a file uploaded through a presigned URL.
+
+    Must be called by the principal that requested the URL. The stored
+    object's size is checked against the declared size.
+    """
+    claims = verify_purpose_token(req.upload_token, _UPLOAD_TOKEN_PURPOSE)
+    if not claims:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired upload token")
+
+    plat_key = req.platform_api_key or x_platform_api_key
+    current_user, platform, _, uploaded_by = _authorize_channel_upload(
+        db, credentials, plat_key, claims["channel_id"], claims["channel_type"]
+    )
+    uploader_id = str(current_user.id) if current_user else None
+    platform_id = str(platform.id) if platform else None
+    if (uploader_id, platform_id) != (claims.get("staff_id"), claims.get("platform_id")):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Upload token belongs to another uploader")
+
+    rel_path = claims["path"]
+    existing = (
+        db.query(ChatFile)
+        .filter(ChatFile.file_path == rel_path, ChatFile.deleted_at.is_(None))
+        .first()
+    )
+    from app.services.storage import get_storage
+    storage = get_storage()
+    pending = db.query(ChatFileUpload).filter(ChatFileUpload.file_path == rel_path)
+    if existing is not None:
+        pending.delete(synchronize_session=False)
+        db.commit()
+        return _chat_file_response(existing, storage.get_public_url(rel_path), uploaded_by)
+
+    stored = await storage.stat(rel_path)
+    if stored is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File has not been uploaded")
+    if stored.size != claims["file_size"] or stored.size > _max_upload_bytes():
+        await storage.delete(rel_path)
+        pending.delete(synchronize_session=False)
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file size does not match")
+
+    chat_file = ChatFile(
+        project_id=UUID(claims["project_id"]),
+        channel_id=claims["channel_id"],
+        channel_type=claims["channel_type"],
+        file_name=claims["file_name"],
+        file_path=rel_path,
+        file_size=stored.size,
+        file_type=claims["file_type"],
+        # The body never passed through us; the storage ETag validates it instead
+        content_hash=stored.etag,
+        uploaded_by_staff_id=(current_user.id if current_user else None),
+        uploaded_by_platform_id=(platform.id if platform else None),
+    )
+    db.add(chat_file)
+    pending.delete(synchronize_session=False)
+    db.commit()
+    db.refresh(chat_file)
+
+    return _chat_file_response(chat_file, storage.get_public_url(rel_path), uploaded_by)
+
+
+async def _serve_stored_chat_file(
+    storage, chat_file: ChatFile, request: Request, headers: Dict[str, str]
+) -> Response:
+    etag = f'"{chat_file.content_hash}"' if chat_file.content_hash else None
+    if etag and file_delivery.is_not_modified(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    url = storage.presign_download(chat_file.file_path, settings.STORAGE_PRESIGN_EXPIRES_SECONDS)
+    if url:
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    # No presigned reads: proxy the object with the same conditional and range handling
+    stored = await storage.stat(chat_file.file_path)
+    if stored is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File missing from storage")
+    if etag is None and stored.etag:
+        etag = f'"{stored.etag}"'
+    return file_delivery.serve_stream(
+        lambda start, end: storage.open_stream(chat_file.file_path, start, end),
+        size=stored.size,
+        media_type=chat_file.file_type or "application/octet-stream",
+        etag=etag,
+        request_headers=request.headers,
+        headers=headers,
     )
 
 
 @router.get("/files/{file_id}", tags=["Chat"])
 async def get_chat_file(
     file_id: UUID,
+    request: Request,
     platform_api_key: Optional[str] = None,
+    thumbnail: Optional[int] = Query(
+        None,
+        gt=0,
+        description="Serve an image thumbnail fitting this size in px (rounded up to a configured size)",
+    ),
     x_platform_api_key: Optional[str] = Header(None, alias="X-Platform-API-Key"),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db),
@@ -806,6 +1037,11 @@ async def get_chat_file(
 
     - Public access allowed by default
     - If auth is provided (JWT or platform API key), validate access to the channel
+    - Responses carry an ETag and long-lived Cache-Control; conditional and
+      single-range requests are answered with 304/206
+    - ``thumbnail`` serves a cached derivative of locally stored images; other
+      files, or images that cannot be rendered, are served as-is
+    - With object storage the client is redirected to a presigned URL
     """
     # 1) Lookup file metadata
     chat_file = (
@@ -845,7 +1081,20 @@ async def get_chat_file(
     if plat_key and not platform and not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform_api_key")
 
-    # 3) Build path and return FileResponse
+    # Build headers
+    ascii_name = get_safe_ascii_filename(chat_file.file_name, str(chat_file.id))
+    quoted_safe_name = quote(chat_file.file_name or Path(chat_file.file_path).name, safe="")
+    headers = {
+        "Content-Disposition": f"inline; filename=\"{ascii_name}\"; filename*=UTF-8''{quoted_safe_name}",
+    }
+
+    # 3) Object storage: send the client to a presigned URL, or stream through
+    from app.services.storage import LocalStorageBackend, get_storage
+    storage = get_storage()
+    if not isinstance(storage, LocalStorageBackend):
+        return await _serve_stored_chat_file(storage, chat_file, request, headers)
+
+    # 4) Resolve the local file
     base_dir = Path(settings.UPLOAD_BASE_DIR).resolve()
     file_path = (base_dir / chat_file.file_path).resolve()
     try:
@@ -856,18 +1105,27 @@ async def get_chat_file(
     if not file_path.exists() or not file_path.is_file():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File missing from storage")
 
-    # Build headers
-    ascii_name = get_safe_ascii_filename(chat_file.file_name, str(chat_file.id))
-    quoted_safe_name = quote(chat_file.file_name or file_path.name, safe="")
-
-    headers = {
-        "Content-Disposition": f"inline; filename=\"{ascii_name}\"; filename*=UTF-8''{quoted_safe_name}",
-        "Content-Length": str(chat_file.file_size or file_path.stat().st_size),
-    }
-
-    return FileResponse(
-        path=str(file_path),
-        media_type=chat_file.file_type or "application/octet-stream",
+    media_type = chat_file.file_type or "application/octet-stream"
+    etag = file_delivery.file_etag(chat_file.content_hash, file_path)
+
+    # 5) Optional thumbnail, cached by content (identical uploads share one)
+    if thumbnail:
+        size = file_delivery.thumbnail_size(thumbnail)
+        derivative = await file_delivery.get_thumbnail(
+            file_path,
+            media_type=media_type,
+            cache_key=chat_file.content_hash or f"{chat_file.id.hex}-{file_path.stat().st_mtime_ns:x}",
+            size=size,
+        )
+        if derivative is not None:
+            file_path, media_type = derivative
+            etag = file_delivery.file_etag(chat_file.content_hash, file_path, variant=f"t{size}")
+
+    return file_delivery.serve_file(
+        file_path,
+        media_type=media_type,
+        etag=etag,
+        request_headers=request.headers,
         headers=headers,
     )
 
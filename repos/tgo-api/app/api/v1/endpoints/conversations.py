@@ -5,22 +5,22 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel, Field
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload, selectinload, aliased
+from sqlalchemy import distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.logging import get_logger
 from app.core.security import get_current_active_user, get_user_language, UserLanguage, require_permission
 from app.models import (
     Staff,
     StaffRole,
-    Visitor,
+    VisitorServiceStatus,
     VisitorTag,
     VisitorWaitingQueue,
     WaitingStatus,
     VisitorSession,
     SessionStatus,
-    VisitorServiceStatus,
     ChannelMemoryClearance,
     ClearanceUserType,
 )
@@ -38,7 +38,8 @@ from app.schemas.wukongim import (
     WuKongIMSetUnreadRequest,
 )
 from app.schemas.visitor import VisitorResponse, resolve_visitor_display_name, set_visitor_display_nickname
-from app.api.v1.endpoints.channels import _build_enriched_visitor_payload
+from app.api.v1.endpoints.channels import _localize_visitor_payload
+from app.services.conversation_projection import ConversationSummary, load_conversation_summaries
 from app.services.wukongim_client import wukongim_client
 from app.utils.encoding import build_visitor_channel_id, parse_visitor_channel_id
 from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
@@ -46,117 +47,73 @@ from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
 logger = get_logger("api.conversations")
 router = APIRouter()
 
+# Visitor conversations hidden from the inbox unless explicitly requested
+_HIDDEN_SERVICE_STATUSES = {VisitorServiceStatus.CLOSED.value, VisitorServiceStatus.QUEUED.value}
+
+
+def _conversation_visitor_ids(conversations: List[WuKongIMConversation]) -> Dict[str, UUID]:
+    """Map channel_id -> visitor_id for customer service (visitor) conversations."""
+    channel_id_to_visitor_id: Dict[str, UUID] = {}
+    for conv in conversations:
+        if conv.channel_type != CHANNEL_TYPE_CUSTOMER_SERVICE or not conv.channel_id:
+            continue
+        try:
+            channel_id_to_visitor_id[conv.channel_id] = parse_visitor_channel_id(conv.channel_id)
+        except ValueError:
+            # Invalid channel ID format, skip
+            continue
+    return channel_id_to_visitor_id
+
 
 async def _build_channels_for_conversations(
-    db: Session,
+    db: AsyncSession,
     conversations: List[WuKongIMConversation],
     project_id: UUID,
     user_language: UserLanguage = "en",
     accept_language: Optional[str] = None,
     include_closed_and_queued: bool = False,
+    summaries: Optional[Dict[UUID, ConversationSummary]] = None,
 ) -> List[ChannelInfo]:
     """
-    Build channel information list for conversations with batch query optimization.
+    Build channel information list for conversations from the conversation projection.
     
     Args:
         db: Database session
         conversations: List of WuKongIM conversations
         project_id: Current project ID
         user_language: User language preference
+        summaries: Already loaded projection rows (loaded here when omitted)
         
     Returns:
         List of ChannelInfo for each conversation
     """
-    if not conversations:
+    channel_id_to_visitor_id = _conversation_visitor_ids(conversations)
+    if not channel_id_to_visitor_id:
         return []
     
-    # Extract visitor IDs from customer service channels (channel_type=251)
-    visitor_ids: List[UUID] = []
-    channel_id_to_visitor_id: Dict[str, UUID] = {}
-    
-    for conv in conversations:
-        channel_type = conv.channel_type
-        channel_id = conv.channel_id
-        if channel_type == CHANNEL_TYPE_CUSTOMER_SERVICE and channel_id:
-            try:
-                visitor_id = parse_visitor_channel_id(channel_id)
-                visitor_ids.append(visitor_id)
-                channel_id_to_visitor_id[channel_id] = visitor_id
-            except ValueError:
-                # Invalid channel ID format, skip
-                continue
-    
-    if not visitor_ids:
-        return []
-    
-    # Batch query all visitors with relations (single query for performance)
-    visitor_query = (
-        db.query(Visitor)
-        .options(
-            selectinload(Visitor.platform),
-            selectinload(Visitor.visitor_tags).selectinload(VisitorTag.tag),
-            selectinload(Visitor.ai_profile),
-            selectinload(Visitor.ai_insight),
-            selectinload(Visitor.system_info),
-        )
-        .filter(
-            Visitor.id.in_(visitor_ids),
-            Visitor.project_id == project_id,
-            Visitor.deleted_at.is_(None),
+    if summaries is None:
+        summaries = await load_conversation_summaries(
+            db, channel_id_to_visitor_id.values(), project_id
         )
-    )
-    if not include_closed_and_queued:
-        visitor_query = visitor_query.filter(
-            Visitor.service_status.notin_([
-                VisitorServiceStatus.CLOSED.value,
-                VisitorServiceStatus.QUEUED.value,
-            ])
-        )
-    visitors = visitor_query.all()
-    
-    # Create visitor lookup map
-    visitor_map: Dict[UUID, Visitor] = {v.id: v for v in visitors}
-    
-    # Batch query open sessions for all visitors to get assigned_staff_id
-    open_sessions = (
-        db.query(VisitorSession)
-        .filter(
-            VisitorSession.visitor_id.in_(visitor_ids),
-            VisitorSession.project_id == project_id,
-            VisitorSession.status == SessionStatus.OPEN.value,
-        )
-        .all()
-    )
-    
-    # Create session lookup map (visitor_id -> staff_id)
-    visitor_to_staff: Dict[UUID, UUID] = {}
-    for session in open_sessions:
-        if session.staff_id:
-            visitor_to_staff[session.visitor_id] = session.staff_id
     
     # Build channel info list
     channels: List[ChannelInfo] = []
     
     for conv in conversations:
-        channel_type = conv.channel_type
         channel_id = conv.channel_id
-        
-        if channel_type != CHANNEL_TYPE_CUSTOMER_SERVICE:
-            continue
-            
         visitor_id = channel_id_to_visitor_id.get(channel_id)
         if not visitor_id:
             continue
             
-        visitor = visitor_map.get(visitor_id)
-        if not visitor:
+        summary = summaries.get(visitor_id)
+        if not summary:
+            continue
+        if not include_closed_and_queued and summary.service_status in _HIDDEN_SERVICE_STATUSES:
             continue
         
         # Build visitor response with enriched data (keep consistent with get_channel_info)
-        visitor_payload = _build_enriched_visitor_payload(
-            visitor=visitor,
-            db=db,
-            project_id=project_id,
+        visitor_payload = _localize_visitor_payload(
+            summary.visitor_response(),
             accept_language=accept_language,
             user_language=user_language,
         )
@@ -165,16 +122,15 @@ async def _build_channels_for_conversations(
         set_visitor_display_nickname(visitor_payload, user_language)
         
         # Add assigned_staff_id if exists
-        assigned_staff_id = visitor_to_staff.get(visitor_id)
         extra_data = visitor_payload.model_dump()
-        if assigned_staff_id:
-            extra_data["assigned_staff_id"] = str(assigned_staff_id)
+        if summary.assigned_staff_id:
+            extra_data["assigned_staff_id"] = str(summary.assigned_staff_id)
         
         # Resolve display name
         name = resolve_visitor_display_name(
-            name=visitor.name,
-            nickname=visitor.nickname,
-            nickname_zh=visitor.nickname_zh,
+            name=visitor_payload.name,
+            nickname=visitor_payload.nickname,
+            nickname_zh=visitor_payload.nickname_zh,
             language=user_language,
             fallback="Unknown Visitor",
         )
@@ -183,7 +139,7 @@ async def _build_channels_for_conversations(
             name=name,
             avatar=visitor_payload.avatar_url or "",
             channel_id=channel_id,
-            channel_type=channel_type,
+            channel_type=conv.channel_type,
             entity_type="visitor",
             extra=extra_data,
         )
@@ -233,7 +189,7 @@ async def sync_my_conversations(
         default=False,
         description="如果为 true，则仅返回 tags 中包含“转人工(Manual Service)”标签的访客会话（可与 tag_ids 组合，AND 关系）。",
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Staff = Depends(get_current_active_user),
     user_language: UserLanguage = Depends(get_user_language),
 ) -> WuKongIMConversationWithChannelsResponse:
@@ -263,56 +219,32 @@ async def sync_my_conversations(
 
         logger.info(f"Successfully synced {len(conversations)} conversations for staff {current_user.username}")
 
+        # One projection lookup serves both tag filtering and channel building
+        visitor_id_by_channel_id = _conversation_visitor_ids(conversations)
+        summaries = await load_conversation_summaries(
+            db, visitor_id_by_channel_id.values(), current_user.project_id
+        )
+
         # Optional tag filtering (visitor conversations only)
         tag_ids_resolved = [t for t in (tag_ids or []) if t]
         tag_filter_enabled = bool(tag_ids_resolved) or manual_service_contain
         if tag_filter_enabled:
-            visitor_id_by_channel_id: Dict[str, UUID] = {}
-            visitor_ids_in_convs: List[UUID] = []
-            for conv in conversations:
-                if conv.channel_type != CHANNEL_TYPE_CUSTOMER_SERVICE or not conv.channel_id:
-                    continue
-                try:
-                    v_id = parse_visitor_channel_id(conv.channel_id)
-                except Exception:
-                    continue
-                visitor_id_by_channel_id[conv.channel_id] = v_id
-                visitor_ids_in_convs.append(v_id)
-
-            if visitor_ids_in_convs:
-                rows = (
-                    db.query(VisitorTag.visitor_id, VisitorTag.tag_id)
-                    .filter(
-                        VisitorTag.project_id == current_user.project_id,
-                        VisitorTag.deleted_at.is_(None),
-                        VisitorTag.visitor_id.in_(visitor_ids_in_convs),
-                    )
-                    .all()
-                )
-                visitor_to_tags: Dict[UUID, set[str]] = {}
-                for v_id, t_id in rows:
-                    visitor_to_tags.setdefault(v_id, set()).add(t_id)
-
-                allowed_visitor_ids: set[UUID] = set()
-                for v_id in visitor_ids_in_convs:
-                    tags_set = visitor_to_tags.get(v_id, set())
-                    has_manual = MANUAL_SERVICE_TAG_ID in tags_set
-                    has_any = bool(tags_set.intersection(tag_ids_resolved)) if tag_ids_resolved else True
-                    if (not manual_service_contain or has_manual) and has_any:
-                        allowed_visitor_ids.add(v_id)
-
-                # When tag filter enabled, only return visitor conversations that match the tag filters
-                conversations = [
-                    conv
-                    for conv in conversations
-                    if conv.channel_type == CHANNEL_TYPE_CUSTOMER_SERVICE
-                    and conv.channel_id
-                    and visitor_id_by_channel_id.get(conv.channel_id) in allowed_visitor_ids
-                ]
-            else:
-                conversations = []
-
-        # Build channels list with batch query for performance
+            allowed_visitor_ids: set[UUID] = set()
+            for v_id, summary in summaries.items():
+                tags_set = set(summary.tag_ids)
+                has_manual = MANUAL_SERVICE_TAG_ID in tags_set
+                has_any = bool(tags_set.intersection(tag_ids_resolved)) if tag_ids_resolved else True
+                if (not manual_service_contain or has_manual) and has_any:
+                    allowed_visitor_ids.add(v_id)
+
+            # When tag filter enabled, only return visitor conversations that match the tag filters
+            conversations = [
+                conv
+                for conv in conversations
+                if visitor_id_by_channel_id.get(conv.channel_id) in allowed_visitor_ids
+            ]
+
+        # Build channels list from the projection
         # This filters out visitors with CLOSED or QUEUED status
         channels = await _build_channels_for_conversations(
             db=db,
@@ -320,6 +252,7 @@ async def sync_my_conversations(
             project_id=current_user.project_id,
             user_language=user_language,
             accept_language=http_request.headers.get("Accept-Language"),
+            summaries=summaries,
         )
         
         # Only filter visitor (customer service) conversations by valid channels.
@@ -359,7 +292,7 @@ async def sync_all_conversations(
     ),
     limit: int = Query(default=20, ge=1, le=100, description="每页返回的会话数量"),
     offset: int = Query(default=0, ge=0, description="跳过的会话数量"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Staff = Depends(get_current_active_user),
 ) -> WuKongIMConversationPaginatedResponse:
     """
@@ -376,24 +309,24 @@ async def sync_all_conversations(
     # 1) Build a subquery of each visitor's latest session time (overall latest)
     # Admin sees all sessions in the project, others see only their own sessions.
     # Note: when only_completed_recent=true, we require the visitor's *latest overall* session to be CLOSED.
-    subquery_base = db.query(
+    subquery_base = select(
         VisitorSession.visitor_id,
         func.max(VisitorSession.created_at).label("latest_created_at")
-    ).filter(
+    ).where(
         VisitorSession.visitor_id.isnot(None),
         VisitorSession.staff_id.isnot(None),
     )
     
     if is_admin:
-        subquery_base = subquery_base.filter(VisitorSession.project_id == current_user.project_id)
+        subquery_base = subquery_base.where(VisitorSession.project_id == current_user.project_id)
     else:
-        subquery_base = subquery_base.filter(VisitorSession.staff_id == current_user.id)
+        subquery_base = subquery_base.where(VisitorSession.staff_id == current_user.id)
     
     latest_session_subquery = subquery_base.group_by(VisitorSession.visitor_id).subquery()
 
     # 2) Join back to the latest session row so we can filter by its status
     latest_sessions_query = (
-        db.query(
+        select(
             latest_session_subquery.c.visitor_id,
             latest_session_subquery.c.latest_created_at,
         )
@@ -406,16 +339,19 @@ async def sync_all_conversations(
         )
     )
     if is_admin:
-        latest_sessions_query = latest_sessions_query.filter(VisitorSession.project_id == current_user.project_id)
+        latest_sessions_query = latest_sessions_query.where(VisitorSession.project_id == current_user.project_id)
     else:
-        latest_sessions_query = latest_sessions_query.filter(VisitorSession.staff_id == current_user.id)
+        latest_sessions_query = latest_sessions_query.where(VisitorSession.staff_id == current_user.id)
 
     if only_completed_recent:
         # A visitor is considered "completed" only when the visitor's latest session is CLOSED
-        latest_sessions_query = latest_sessions_query.filter(VisitorSession.status == SessionStatus.CLOSED.value)
+        latest_sessions_query = latest_sessions_query.where(VisitorSession.status == SessionStatus.CLOSED.value)
 
     # Total count of visitors after applying filters
-    total_count = latest_sessions_query.distinct(latest_session_subquery.c.visitor_id).count()
+    latest_sessions = latest_sessions_query.subquery()
+    total_count = await db.scalar(
+        select(func.count(distinct(latest_sessions.c.visitor_id)))
+    ) or 0
     if total_count == 0:
         logger.debug(f"No sessions found for staff {current_user.username}")
         return WuKongIMConversationPaginatedResponse(
@@ -431,12 +367,13 @@ async def sync_all_conversations(
     
     # 3) Get paginated visitor_ids ordered by latest session created time (newest first)
     paginated_visitor_ids = (
-        latest_sessions_query
-        .order_by(latest_session_subquery.c.latest_created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+        await db.execute(
+            latest_sessions_query
+            .order_by(latest_session_subquery.c.latest_created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
     
     visitor_ids = [row[0] for row in paginated_visitor_ids]
     
@@ -532,7 +469,7 @@ async def sync_waiting_conversations(
     msg_count: int = Query(default=20, ge=1, le=100, description="每个会话返回的最近消息数量"),
     limit: int = Query(default=20, ge=1, le=100, description="每页返回的会话数量"),
     offset: int = Query(default=0, ge=0, description="跳过的会话数量"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Staff = Depends(require_permission("visitors:read")),
 ) -> WuKongIMConversationPaginatedResponse:
     """
@@ -542,15 +479,14 @@ async def sync_waiting_conversations(
     包括最近的消息记录。用于客服人员查看待接入访客的对话内容。
     """
     # 1. Get total count of waiting entries
-    total_count = (
-        db.query(VisitorWaitingQueue)
-        .filter(
-            VisitorWaitingQueue.project_id == current_user.project_id,
-            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-            VisitorWaitingQueue.visitor_id.isnot(None),
-        )
-        .count()
+    waiting_filter = (
+        VisitorWaitingQueue.project_id == current_user.project_id,
+        VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+        VisitorWaitingQueue.visitor_id.isnot(None),
     )
+    total_count = await db.scalar(
+        select(func.count()).select_from(VisitorWaitingQueue).where(*waiting_filter)
+    ) or 0
     
     if total_count == 0:
         logger.debug("No waiting visitors found")
@@ -567,17 +503,14 @@ async def sync_waiting_conversations(
     
     # 2. Query paginated waiting visitors from queue (ordered by created_at desc, newest first)
     waiting_entries = (
-        db.query(VisitorWaitingQueue)
-        .filter(
-            VisitorWaitingQueue.project_id == current_user.project_id,
-            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-            VisitorWaitingQueue.visitor_id.isnot(None),
-        )
-        .order_by(VisitorWaitingQueue.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+        await db.execute(
+            select(VisitorWaitingQueue)
+            .where(*waiting_filter)
+            .order_by(VisitorWaitingQueue.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    ).scalars().all()
     
     if not waiting_entries:
         logger.debug("No waiting visitors found after pagination")
@@ -675,7 +608,7 @@ async def sync_recent_conversations_by_visitor_tags(
     msg_count: int = Query(default=1, ge=1, le=100, description="每个会话返回的最近消息数量（默认 1）"),
     limit: int = Query(default=20, ge=1, le=100, description="每页返回的会话数量"),
     offset: int = Query(default=0, ge=0, description="跳过的会话数量"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Staff = Depends(require_permission("visitors:read")),
     user_language: UserLanguage = Depends(get_user_language),
 ) -> WuKongIMConversationWithChannelsPaginatedResponse:
@@ -691,11 +624,11 @@ async def sync_recent_conversations_by_visitor_tags(
     vt_manual = aliased(VisitorTag)
 
     subquery_base = (
-        db.query(
+        select(
             VisitorSession.visitor_id,
             func.max(VisitorSession.created_at).label("latest_created_at"),
         )
-        .filter(
+        .where(
             VisitorSession.project_id == current_user.project_id,
             VisitorSession.visitor_id.isnot(None),
             VisitorSession.staff_id.isnot(None),
@@ -723,11 +656,13 @@ async def sync_recent_conversations_by_visitor_tags(
         )
 
     if not is_admin:
-        subquery_base = subquery_base.filter(VisitorSession.staff_id == current_user.id)
+        subquery_base = subquery_base.where(VisitorSession.staff_id == current_user.id)
 
     latest_session_subquery = subquery_base.group_by(VisitorSession.visitor_id).subquery()
 
-    total_count = db.query(latest_session_subquery.c.visitor_id).count()
+    total_count = await db.scalar(
+        select(func.count()).select_from(latest_session_subquery)
+    ) or 0
     if total_count == 0:
         return WuKongIMConversationWithChannelsPaginatedResponse(
             conversations=[],
@@ -742,12 +677,13 @@ async def sync_recent_conversations_by_visitor_tags(
         )
 
     paginated_visitor_ids = (
-        db.query(latest_session_subquery.c.visitor_id)
-        .order_by(latest_session_subquery.c.latest_created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+        await db.execute(
+            select(latest_session_subquery.c.visitor_id)
+            .order_by(latest_session_subquery.c.latest_created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
     visitor_ids = [row[0] for row in paginated_visitor_ids]
     if not visitor_ids:
         return WuKongIMConversationWithChannelsPaginatedResponse(
@@ -907,18 +843,22 @@ async def delete_conversation(
 async def sync_channel_messages(
     request: WuKongIMChannelMessageSyncRequest,
     current_user: Staff = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> WuKongIMChannelMessageSyncResponse:
     """同步指定频道的历史消息记录。"""
     staff_uid = f"{current_user.id}-staff"
 
     # 1) Check if there is a memory clearance record for this staff and channel
-    clearance = db.query(ChannelMemoryClearance).filter(
-        ChannelMemoryClearance.user_id == current_user.id,
-        ChannelMemoryClearance.user_type == ClearanceUserType.STAFF.value,
-        ChannelMemoryClearance.channel_id == request.channel_id,
-        ChannelMemoryClearance.channel_type == request.channel_type,
-    ).first()
+    clearance = (
+        await db.execute(
+            select(ChannelMemoryClearance).where(
+                ChannelMemoryClearance.user_id == current_user.id,
+                ChannelMemoryClearance.user_type == ClearanceUserType.STAFF.value,
+                ChannelMemoryClearance.channel_id == request.channel_id,
+                ChannelMemoryClearance.channel_type == request.channel_type,
+            )
+        )
+    ).scalars().first()
 
     # 2) If clearance record exists, adjust start_message_seq to filter out old messages
     effective_start_seq = request.start_message_seq
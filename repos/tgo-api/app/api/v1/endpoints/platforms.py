@@ -9,7 +9,13 @@ from sqlalchemy.orm import Session, joinedload, contains_eager
 
 from app.core.database import get_db
 from app.core.logging import get_logger
-from app.core.security import generate_api_key, get_current_active_user, require_permission
+from app.core.security import (
+    generate_api_key,
+    get_active_platform_by_api_key,
+    get_current_active_user,
+    get_platform_by_api_key,
+    require_permission,
+)
 from app.models import Platform, PlatformTypeDefinition, Staff
 from app.schemas import (
     PlatformAPIKeyResponse,
@@ -233,7 +239,7 @@ async def get_platform_info(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing platform_api_key")
 
     # Look up by api_key (without status/deleted filters) to distinguish 401 vs 403 as required
-    platform = db.query(Platform).filter(Platform.api_key == api_key).first()
+    platform = get_platform_by_api_key(db, api_key)
 
     # Log attempt with sanitized key hash prefix
     try:
@@ -882,17 +888,8 @@ async def wecom_callback_verify(
     Supports both 'wecom' (企业微信) and 'wecom_bot' (企业微信机器人) platform types.
     """
     # 1) Validate platform
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == platform_api_key,
-            Platform.deleted_at.is_(None),
-            Platform.is_active.is_(True),
-            Platform.type.in_(["wecom", "wecom_bot"]),
-        )
-        .first()
-    )
-    if not platform:
+    platform = get_active_platform_by_api_key(db, platform_api_key)
+    if not platform or platform.type not in ("wecom", "wecom_bot"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform_api_key")
 
     # 2) Extract required query params
@@ -976,15 +973,7 @@ async def platform_callback_forward(
     """
     print("platform_api_key: %s", platform_api_key)
     # Validate platform_api_key
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == platform_api_key,
-            Platform.deleted_at.is_(None),
-            Platform.is_active.is_(True),
-        )
-        .first()
-    )
+    platform = get_active_platform_by_api_key(db, platform_api_key)
     if not platform:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform_api_key")
 
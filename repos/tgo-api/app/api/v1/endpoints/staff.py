@@ -314,6 +314,9 @@ async def toggle_my_service_paused(
     """
     logger.info(f"Staff {current_user.username} setting service_paused to {paused}")
     
+    # The authenticated user is a detached (possibly cached) snapshot; load
+    # the current row in this session to update it
+    current_user = db.get(Staff, current_user.id)
     current_user.service_paused = paused
     current_user.updated_at = datetime.utcnow()
     
@@ -354,6 +357,9 @@ async def toggle_my_is_active(
     """
     logger.info(f"Staff {current_user.username} setting is_active to {active}")
     
+    # The authenticated user is a detached (possibly cached) snapshot; load
+    # the current row in this session to update it
+    current_user = db.get(Staff, current_user.id)
     current_user.is_active = active
     current_user.updated_at = datetime.utcnow()
     
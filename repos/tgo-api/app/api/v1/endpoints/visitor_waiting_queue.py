@@ -28,7 +28,11 @@ from app.schemas.visitor_waiting_queue import (
     QueueSourceEnum,
     QueueUrgencyEnum,
 )
-from app.services.transfer_service import transfer_to_staff
+from app.services.transfer_service import (
+    get_queue_entry_rank,
+    get_queue_entry_ranks,
+    transfer_to_staff,
+)
 from app.utils.encoding import build_visitor_channel_id
 from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
 
@@ -58,8 +62,10 @@ def _build_staff_brief(staff: Staff) -> StaffBriefResponse:
     )
 
 
-def _build_queue_detail_response(entry: VisitorWaitingQueue) -> WaitingQueueDetailResponse:
-    """Build detailed queue response from model."""
+def _build_queue_detail_response(
+    entry: VisitorWaitingQueue, position: Optional[int]
+) -> WaitingQueueDetailResponse:
+    """Build detailed queue response from model and its current queue rank."""
     visitor_brief = None
     staff_brief = None
     
@@ -76,7 +82,7 @@ def _build_queue_detail_response(entry: VisitorWaitingQueue) -> WaitingQueueDeta
         assigned_staff_id=entry.assigned_staff_id,
         source=entry.source,
         urgency=entry.urgency,
-        position=entry.position,
+        position=position,
         priority=entry.priority,
         status=entry.status,
         visitor_message=entry.visitor_message,
@@ -162,7 +168,8 @@ async def list_waiting_queue(
     )
     
     # Build response
-    items = [_build_queue_detail_response(entry) for entry in entries]
+    ranks = get_queue_entry_ranks(db, entries)
+    items = [_build_queue_detail_response(entry, ranks.get(entry.id)) for entry in entries]
     
     return WaitingQueueListResponse(
         items=items,
@@ -220,7 +227,8 @@ async def list_waiting_only(
         .all()
     )
     
-    items = [_build_queue_detail_response(entry) for entry in entries]
+    ranks = get_queue_entry_ranks(db, entries)
+    items = [_build_queue_detail_response(entry, ranks.get(entry.id)) for entry in entries]
     
     return WaitingQueueListResponse(
         items=items,
@@ -298,7 +306,7 @@ async def get_queue_entry(
             detail="Queue entry not found",
         )
     
-    return _build_queue_detail_response(entry)
+    return _build_queue_detail_response(entry, get_queue_entry_rank(db, entry))
 
 
 @router.post(
@@ -21,8 +21,13 @@ from sqlalchemy import case
 from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.core.config import settings
-from app.core.security import verify_token
+from app.core.security import get_active_platform_by_api_key, verify_token
 
+from app.services.activity_ingest import (
+    PendingActivity,
+    PendingActivityUpdate,
+    visitor_activity_ingestor,
+)
 from app.services.wukongim_client import wukongim_client
 from app.services.visitor_notifications import notify_visitor_profile_updated
 from app.utils.intent import localize_visitor_response_intent
@@ -358,15 +363,7 @@ async def register_visitor(
     - Returns channel info for messaging integration
     """
     # 1) Validate platform_api_key
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == req.platform_api_key,
-            Platform.is_active == True,
-            Platform.deleted_at.is_(None),
-        )
-        .first()
-    )
+    platform = get_active_platform_by_api_key(db, req.platform_api_key)
     if not platform:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform API key")
 
@@ -521,7 +518,11 @@ async def register_visitor(
     summary="Visitor: Record Activity",
     description=(
         "Record a visitor activity from the client-side integration. "
-        "Authenticate using the platform API key and supply the visitor ID."
+        "Authenticate using the platform API key and supply the visitor ID. "
+        "New activities are written to the database in batches shortly after "
+        "the response; the returned ID can be used for updates right away. "
+        "Updates of an activity that is not written yet are accepted and "
+        "applied once it is."
     ),
 )
 async def record_visitor_activity(
@@ -534,15 +535,7 @@ async def record_visitor_activity(
     if not api_key:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing platform API key")
 
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == api_key,
-            Platform.is_active == True,
-            Platform.deleted_at.is_(None),
-        )
-        .first()
-    )
+    platform = get_active_platform_by_api_key(db, api_key)
     if not platform:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform API key")
 
@@ -559,11 +552,6 @@ async def record_visitor_activity(
     if not visitor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Visitor not found")
 
-    # Update visitor's last visit time
-    visitor.last_visit_time = datetime.utcnow()
-    db.add(visitor)
-    # Don't commit yet, we'll commit with the activity
-
     # 1.5) Update platform website info if it's a website type and not yet marked as used
     if platform.type == PlatformType.WEBSITE.value and not getattr(platform, "is_used", False):
         website_url = None
@@ -592,28 +580,6 @@ async def record_visitor_activity(
             db.refresh(platform)
 
     data = req.model_dump(exclude_unset=True)
-
-    activity: Optional[VisitorActivity] = None
-    is_update = req.id is not None
-    if is_update:
-        activity = (
-            db.query(VisitorActivity)
-            .filter(
-                VisitorActivity.id == req.id,
-                VisitorActivity.project_id == platform.project_id,
-                VisitorActivity.visitor_id == visitor.id,
-                VisitorActivity.deleted_at.is_(None),
-            )
-            .first()
-        )
-        if not activity:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Visitor activity not found")
-
-    occurred_at = (
-        req.occurred_at
-        if "occurred_at" in data
-        else (activity.occurred_at if activity else datetime.utcnow())
-    )
     title = req.title.strip()
     if not title:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Activity title cannot be blank")
@@ -625,33 +591,98 @@ async def record_visitor_activity(
 
     duration_provided = "duration_seconds" in data
     description_provided = "description" in data
+    is_update = req.id is not None
 
-    if not activity:
-        activity = VisitorActivity(
+    # New activities (and updates of ones not written yet) go through the
+    # write-behind buffer and are acknowledged before they reach the database
+    activity = None
+    if is_update:
+        activity = await visitor_activity_ingestor.find_pending(req.id)
+        if activity is not None and (
+            activity.project_id != platform.project_id or activity.visitor_id != visitor.id
+        ):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Visitor activity not found")
+    if activity is None and not is_update:
+        activity = PendingActivity(
             project_id=platform.project_id,
             visitor_id=visitor.id,
             activity_type=req.activity_type.value,
             title=title,
-            occurred_at=occurred_at,
+            occurred_at=req.occurred_at if "occurred_at" in data else datetime.utcnow(),
+            description=req.description,
+            context=context_payload,
+            duration_seconds=req.duration_seconds,
         )
-        db.add(activity)
-
-    activity.activity_type = req.activity_type.value
-    activity.title = title
-    activity.occurred_at = occurred_at
-
-    if description_provided or not is_update:
-        activity.description = req.description
+        await visitor_activity_ingestor.submit(activity)
+    elif activity is not None:
+        # Still buffered: amend it in place (before any further await)
+        activity.activity_type = req.activity_type.value
+        activity.title = title
+        if "occurred_at" in data:
+            activity.occurred_at = req.occurred_at
+        if description_provided:
+            activity.description = req.description
+        if duration_provided:
+            activity.duration_seconds = req.duration_seconds
+        if context_provided:
+            activity.context = context_payload
+        activity.received_at = datetime.utcnow()
+    else:
+        activity = (
+            db.query(VisitorActivity)
+            .filter(
+                VisitorActivity.id == req.id,
+                VisitorActivity.project_id == platform.project_id,
+                VisitorActivity.visitor_id == visitor.id,
+                VisitorActivity.deleted_at.is_(None),
+            )
+            .first()
+        )
+        values = {"activity_type": req.activity_type.value, "title": title}
+        if "occurred_at" in data:
+            values["occurred_at"] = req.occurred_at
+        if description_provided:
+            values["description"] = req.description
+        if duration_provided:
+            values["duration_seconds"] = req.duration_seconds
+        if context_provided:
+            values["context"] = context_payload
 
-    if duration_provided or not is_update:
-        activity.duration_seconds = req.duration_seconds
+        if not activity:
+            # Most likely still buffered on the replica that accepted it:
+            # queue the update until that replica has written the row
+            visitor_activity_ingestor.defer_update(
+                PendingActivityUpdate(
+                    id=req.id,
+                    project_id=platform.project_id,
+                    visitor_id=visitor.id,
+                    values=values,
+                )
+            )
+            logger.info(
+                "Deferred visitor activity update",
+                extra={"visitor_id": str(visitor.id), "activity_id": str(req.id)},
+            )
+            return VisitorActivityCreateResponse(
+                id=req.id,
+                activity_type=values["activity_type"],
+                title=title,
+                description=req.description,
+                occurred_at=values.get("occurred_at") or datetime.utcnow(),
+                duration_seconds=req.duration_seconds,
+                context=context_payload,
+            )
 
-    if context_provided:
-        activity.context = context_payload
-    elif not is_update:
-        activity.context = None
-    db.commit()
-    db.refresh(activity)
+        # An older update queued while the row was not written must not
+        # overwrite this one later
+        queued = visitor_activity_ingestor.take_update(activity.id)
+        if queued is not None:
+            values = {**queued.values, **values}
+        for column, value in values.items():
+            setattr(activity, column, value)
+        visitor.last_visit_time = datetime.utcnow()
+        db.commit()
+        db.refresh(activity)
 
     logger.info(
         "Recorded visitor activity",
@@ -1329,15 +1360,7 @@ async def sync_visitor_channel_messages(
     if not api_key:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing platform_api_key")
 
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == api_key,
-            Platform.is_active.is_(True),
-            Platform.deleted_at.is_(None),
-        )
-        .first()
-    )
+    platform = get_active_platform_by_api_key(db, api_key)
     if not platform:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid platform_api_key")
 
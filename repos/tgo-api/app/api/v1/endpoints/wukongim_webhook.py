@@ -7,14 +7,16 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Request, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal
 from app.models import Platform, Staff, Visitor, ChannelMember
 from app.models.staff import StaffStatus
 from app.services.ai_client import AIServiceClient
+from app.services.message_stats import VisitorMessageDelta, message_stats_aggregator
 from app.services.wukongim_client import WuKongIMClient
 from app.services.visitor_notifications import notify_visitor_profile_updated
 from app.utils.const import MEMBER_TYPE_VISITOR, CHANNEL_TYPE_CUSTOMER_SERVICE
@@ -130,61 +132,51 @@ def _parse_online_flag(entry: Dict[str, Any]) -> Optional[bool]:
 
 async def _process_user_online_status(status_payload: Any) -> None:
     """Entry point for handling user.onlinestatus events."""
-    db: Session = SessionLocal()
-    try:
-        await _handle_user_online_status(status_payload, db)
-    except Exception as exc:  # pragma: no cover - defensive logging
-        logger.error("Failed to process WuKongIM user.onlinestatus event: %s", exc)
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        try:
+            await _handle_user_online_status(status_payload, db)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.error("Failed to process WuKongIM user.onlinestatus event: %s", exc)
 
 
 async def _process_msg_notify(messages: Any) -> None:
-    """Entry point for handling msg.notify events (batch processing)."""
-    db: Session = SessionLocal()
-    try:
-        await _handle_msg_notify_batch(messages, db)
-    except Exception as exc:
-        logger.error("Failed to process WuKongIM msg.notify event: %s", exc)
-    finally:
-        db.close()
+    """Entry point for handling msg.notify events (batch processing).
+
+    Returns once the resulting visitor stats are committed.
+
+    Raises:
+        Exception: The stats could not be written; the webhook must not be
+            acknowledged so that WuKongIM redelivers it
+    """
+    deltas = _aggregate_msg_notify(messages)
+    if not deltas:
+        return
+    await message_stats_aggregator.submit(deltas)
+
 
+def _aggregate_msg_notify(messages: Any) -> Dict[UUID, VisitorMessageDelta]:
+    """Fold msg.notify messages into one stats delta per visitor.
 
-async def _handle_msg_notify_batch(messages: Any, db: Session) -> None:
-    """Handle msg.notify events to update visitor message stats in batch.
-    
-    Uses raw SQL UPDATE statements to avoid long-running transactions and
-    potential deadlocks with other operations (e.g., staff assignment).
-    
     Args:
         messages: List of message notification objects from WuKongIM
-        db: Database session
     """
-    from sqlalchemy import text
-    
     # Normalize input to list
     if not isinstance(messages, list):
         messages = [messages] if isinstance(messages, dict) else []
-    
-    if not messages:
-        return
-    
-    # Group messages by visitor_id for efficient batch processing
-    # Structure: {visitor_id: {"max_seq": int, "client_msg_no": str, "send_count": int, "is_last_from_visitor": bool}}
-    visitor_stats: Dict[UUID, Dict[str, Any]] = {}
-    
+
+    visitor_stats: Dict[UUID, VisitorMessageDelta] = {}
     for msg in messages:
         if not isinstance(msg, dict):
             continue
-        
+
         from_uid = msg.get("from_uid")
         channel_id = msg.get("channel_id")
         channel_type = msg.get("channel_type")
-        
+
         # Only process messages in customer service channels
         if channel_type != CHANNEL_TYPE_CUSTOMER_SERVICE or not channel_id:
             continue
-        
+
         try:
             visitor_id = parse_visitor_channel_id(channel_id)
         except Exception:
@@ -193,114 +185,18 @@ async def _handle_msg_notify_batch(messages: Any, db: Session) -> None:
                 extra={"channel_id": channel_id}
             )
             continue
-        
-        message_seq = msg.get("message_seq", 0)
-        client_msg_no = msg.get("client_msg_no")
+
         is_from_visitor = bool(from_uid and from_uid.endswith(VISITOR_UID_SUFFIX))
-        
-        # Initialize or update aggregated stats for this visitor
-        if visitor_id not in visitor_stats:
-            visitor_stats[visitor_id] = {
-                "max_seq": 0,
-                "client_msg_no": None,
-                "send_count": 0,
-                "is_last_from_visitor": False,
-            }
-        
-        stats = visitor_stats[visitor_id]
-        
-        # Track the message with highest sequence number for last_message fields
-        if message_seq > stats["max_seq"]:
-            stats["max_seq"] = message_seq
-            stats["client_msg_no"] = client_msg_no
-            stats["is_last_from_visitor"] = is_from_visitor
-        
-        # Count messages sent by visitor
-        if is_from_visitor:
-            stats["send_count"] += 1
-    
-    if not visitor_stats:
-        return
-    
-    now = datetime.utcnow()
-    updated_count = 0
-    
-    # Use individual UPDATE statements to minimize lock duration and avoid deadlocks
-    # Each UPDATE is a short transaction that releases the lock immediately
-    # Uses SKIP LOCKED to avoid waiting for rows locked by other transactions
-    skipped_count = 0
-    for visitor_id, stats in visitor_stats.items():
-        try:
-            # Build dynamic UPDATE statement based on which fields need updating
-            update_parts = [
-                "last_message_at = :last_message_at",
-                "is_last_message_from_visitor = :is_last_from_visitor",
-                "updated_at = now()",
-            ]
-            params: Dict[str, Any] = {
-                "visitor_id": str(visitor_id),
-                "last_message_at": now,
-                "is_last_from_visitor": stats["is_last_from_visitor"],
-            }
-            
-            if stats["max_seq"] > 0:
-                update_parts.append("last_message_seq = :last_message_seq")
-                params["last_message_seq"] = stats["max_seq"]
-            
-            if stats["client_msg_no"]:
-                update_parts.append("last_client_msg_no = :last_client_msg_no")
-                params["last_client_msg_no"] = stats["client_msg_no"]
-            
-            if stats["send_count"] > 0:
-                update_parts.append("visitor_send_count = visitor_send_count + :send_count")
-                params["send_count"] = stats["send_count"]
-            
-            # Use SKIP LOCKED to avoid waiting for rows locked by other transactions
-            # (e.g., transfer_to_staff with FOR UPDATE). If the row is locked, the
-            # subquery returns empty and the UPDATE is skipped. This prevents deadlocks
-            # while the next message will trigger another update attempt.
-            update_sql = text(f"""
-                UPDATE api_visitors 
-                SET {", ".join(update_parts)}
-                WHERE id IN (
-                    SELECT id FROM api_visitors 
-                    WHERE id = :visitor_id 
-                      AND deleted_at IS NULL
-                    FOR UPDATE SKIP LOCKED
-                )
-            """)
-            
-            # visitor_id is already a UUID object from stats grouping, 
-            # SQLAlchemy will handle the conversion
-            result = db.execute(update_sql, params)
-            db.commit()
-            
-            if result.rowcount > 0:
-                updated_count += 1
-            else:
-                # Row was either not found or locked by another transaction
-                skipped_count += 1
-                
-        except Exception as e:
-            # Rollback and log error for this visitor, continue with others
-            db.rollback()
-            logger.error(
-                f"Failed to update visitor message stats",
-                extra={"visitor_id": str(visitor_id), "error": str(e)}
-            )
-    
-    if updated_count > 0 or skipped_count > 0:
-        logger.info(
-            f"Updated {updated_count} visitors message stats",
-            extra={
-                "total_visitors": len(visitor_stats),
-                "updated_count": updated_count,
-                "skipped_count": skipped_count,
-            }
+        visitor_stats.setdefault(visitor_id, VisitorMessageDelta()).add_message(
+            message_seq=msg.get("message_seq") or 0,
+            client_msg_no=msg.get("client_msg_no"),
+            is_from_visitor=is_from_visitor,
         )
 
+    return visitor_stats
 
-async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
+
+async def _handle_user_online_status(events_payload: Any, db: AsyncSession) -> None:
     if not settings.WUKONGIM_ENABLED:
         logger.debug("WuKongIM integration disabled; ignoring online status event")
         return
@@ -346,6 +242,8 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
     channel_events: List[Dict[str, Any]] = []
     visitors_to_notify: Dict[str, Visitor] = {}
 
+    # (uid, is_staff, is_online, entry) in payload order
+    updates: List[Tuple[UUID, bool, bool, Dict[str, Any]]] = []
     for entry in events:
         uid_raw = _extract_uid(entry)
         if not uid_raw:
@@ -376,14 +274,49 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
             )
             continue
 
-        if is_staff:
-            staff = (
-                db.query(Staff)
-                .filter(Staff.id == uid, Staff.deleted_at.is_(None))
-                .first()
+        if is_staff or is_visitor:
+            updates.append((uid, is_staff, is_online, entry))
+
+    # Load every staff member, visitor and visitor channel of the batch up front
+    staff_ids = {uid for uid, is_staff, _, _ in updates if is_staff}
+    visitor_ids = {uid for uid, is_staff, _, _ in updates if not is_staff}
+    staff_by_id: Dict[UUID, Staff] = {}
+    if staff_ids:
+        staff_by_id = {
+            staff.id: staff
+            for staff in (
+                await db.execute(
+                    select(Staff).where(Staff.id.in_(staff_ids), Staff.deleted_at.is_(None))
+                )
+            ).scalars()
+        }
+    visitors_by_id: Dict[UUID, Visitor] = {}
+    memberships: Dict[UUID, List[Tuple[str, int]]] = {}
+    if visitor_ids:
+        visitors_by_id = {
+            visitor.id: visitor
+            for visitor in (
+                await db.execute(
+                    select(Visitor).where(Visitor.id.in_(visitor_ids), Visitor.deleted_at.is_(None))
+                )
+            ).scalars()
+        }
+    if visitors_by_id:
+        membership_rows = await db.execute(
+            select(ChannelMember.member_id, ChannelMember.channel_id, ChannelMember.channel_type).where(
+                ChannelMember.member_id.in_(list(visitors_by_id)),
+                ChannelMember.member_type == MEMBER_TYPE_VISITOR,
+                ChannelMember.deleted_at.is_(None),
             )
+        )
+        for member_id, channel_id, channel_type in membership_rows:
+            memberships.setdefault(member_id, []).append((channel_id, channel_type))
+
+    for uid, is_staff, is_online, entry in updates:
+        if is_staff:
+            staff = staff_by_id.get(uid)
             if not staff:
-                logger.debug("Staff not found for online status update", extra={"staff_id": uid_str})
+                logger.debug("Staff not found for online status update", extra={"staff_id": str(uid)})
                 continue
 
             desired_status = StaffStatus.ONLINE.value if is_online else StaffStatus.OFFLINE.value
@@ -391,14 +324,10 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
                 staff.status = desired_status
                 dirty = True
                 staff_updates += 1
-        elif is_visitor:
-            visitor = (
-                db.query(Visitor)
-                .filter(Visitor.id == uid, Visitor.deleted_at.is_(None))
-                .first()
-            )
+        else:
+            visitor = visitors_by_id.get(uid)
             if not visitor:
-                logger.debug("Visitor not found for online status update", extra={"visitor_id": uid_str})
+                logger.debug("Visitor not found for online status update", extra={"visitor_id": str(uid)})
                 continue
 
             record_changed = False
@@ -417,17 +346,9 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
                 dirty = True
                 visitor_updates += 1
                 visitors_to_notify[str(visitor.id)] = visitor
-                memberships = (
-                    db.query(ChannelMember.channel_id, ChannelMember.channel_type)
-                    .filter(
-                        ChannelMember.member_id == visitor.id,
-                        ChannelMember.member_type == MEMBER_TYPE_VISITOR,
-                        ChannelMember.deleted_at.is_(None),
-                    )
-                    .all()
-                )
+                visitor_channels = memberships.get(visitor.id, [])
 
-                if memberships:
+                if visitor_channels:
                     event_type = "visitor.online" if is_online else "visitor.offline"
                     event_payload = {
                         "visitor_id": str(visitor.id),
@@ -439,7 +360,7 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
                         "device_online_count": entry.get("device_online_count"),
                         "user_total_online_devices": entry.get("user_total_online_devices"),
                     }
-                    for channel_id, channel_type in memberships:
+                    for channel_id, channel_type in visitor_channels:
                         payload_with_channel = {
                             **event_payload,
                             "channel_id": channel_id,
@@ -462,9 +383,9 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
         return
 
     try:
-        db.commit()
+        await db.commit()
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.error("Failed to commit WuKongIM user.onlinestatus updates: %s", exc)
         return
 
@@ -530,6 +451,14 @@ async def wukongim_webhook(request: Request, background_tasks: BackgroundTasks)
         except Exception as exc:
             logger.error("Failed to parse WuKongIM msg.notify payload: %s", exc)
             return {"code": 400, "message": "invalid payload"}
-        await _process_msg_notify(body)
+        try:
+            await _process_msg_notify(body)
+        except Exception as exc:
+            # Not acknowledged, so WuKongIM redelivers and no update is lost
+            logger.error("Failed to process WuKongIM msg.notify event: %s", exc)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="msg.notify not persisted",
+            )
 
     return {"code": 0, "message": "ok"}
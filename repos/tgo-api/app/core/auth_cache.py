@@ -0,0 +1,578 @@
+"""Short-lived cache of authenticated principals and role permissions.
+
+Authentication used to load the ``Staff`` (with its project) and query
+``RolePermission``/``ProjectRolePermission`` on every request. This module
+keeps both in a bounded in-process TTL LRU, optionally backed by Redis
+(``REDIS_URL``) so replicas share warm entries:
+
+- principals are cached per username as column snapshots; every lookup builds
+  a fresh detached ``Staff`` from the snapshot, so requests never share ORM
+  instances. Only the staff part is shared through Redis: the project carries
+  the downstream ``api_key``, so project snapshots stay in-process, and a
+  shared principal is used only once this replica has its project cached
+- permissions are cached per (role, project) as a frozenset of
+  ``resource:action`` codes, so permission checks are set lookups
+- platforms are cached per SHA-256 of their API key (in-process only, so
+  platform secrets stay out of Redis), including short-lived negative entries
+  for unknown keys so brute-force traffic does not reach the database
+
+Entries are invalidated explicitly after commits that change staff, projects,
+platforms, roles or permissions (see the ORM listeners at the bottom); with Redis the
+invalidation is also published to the other replicas. The TTL bounds
+staleness for writes that bypass the ORM.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple, Type
+from uuid import UUID
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models import Permission, Platform, Project, ProjectRolePermission, RolePermission, Staff
+
+logger = get_logger("auth_cache")
+
+# v2: staff snapshots only (v1 entries also held the project and its API key)
+REDIS_PRINCIPALS_KEY = "tgo:auth:principals:v2"
+REDIS_PERMISSIONS_KEY = "tgo:auth:permissions"
+REDIS_INVALIDATE_CHANNEL = "tgo:auth:invalidate"
+
+_INVALIDATIONS_KEY = "auth_cache_invalidations"
+
+
+class TTLCache:
+    """Thread-safe LRU with a per-entry time to live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Never copied into the cache (left unloaded on cached principals)
+_EXCLUDED_COLUMNS = frozenset({"password_hash"})
+
+
+def _snapshot(obj: Any) -> Dict[str, Any]:
+    """Loaded column values of an ORM instance."""
+    state = sa_inspect(obj)
+    unloaded = state.unloaded
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key not in _EXCLUDED_COLUMNS and attr.key not in unloaded
+    }
+
+
+def _detached(model: Type[Any], values: Dict[str, Any]) -> Any:
+    """Build a detached (persistent-looking) instance from a column snapshot."""
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_snapshot(model: Type[Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore Python types of a JSON-decoded column snapshot."""
+    decoded: Dict[str, Any] = {}
+    for attr in sa_inspect(model).column_attrs:
+        if attr.key not in values:
+            continue
+        value = values[attr.key]
+        if value is not None:
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                python_type = None
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif python_type is UUID:
+                value = UUID(value)
+        decoded[attr.key] = value
+    return decoded
+
+
+class AuthCache:
+    """Principal and permission cache (in-process LRU plus optional Redis).
+
+    Args:
+        ttl_seconds: Lifetime of in-process entries
+        redis_ttl_seconds: Lifetime of shared Redis entries
+        max_entries: Maximum in-process entries per kind
+        redis_url: Redis URL; ``None`` keeps the cache process-local
+        negative_ttl_seconds: Lifetime of "unknown API key" entries
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        redis_ttl_seconds: float,
+        max_entries: int,
+        redis_url: Optional[str] = None,
+        enabled: bool = True,
+        negative_ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.enabled = enabled
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._principals = TTLCache(max_entries, ttl_seconds)
+        self._projects = TTLCache(max_entries, ttl_seconds)
+        self._permissions = TTLCache(max_entries, ttl_seconds)
+        self._platforms = TTLCache(max_entries, ttl_seconds)
+        self._unknown_keys = TTLCache(
+            max_entries,
+            ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds,
+        )
+        self._redis_url = redis_url
+        self._redis: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        # Bumped by every invalidation; a value loaded before an invalidation
+        # must not be cached after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Principals
+    # ------------------------------------------------------------------
+
+    async def get_principal(self, username: str) -> Optional[Staff]:
+        """Cached staff (detached, with ``project``) or None on a miss."""
+        if not self.enabled:
+            return None
+        entry = self._principals.get(username)
+        if entry is None:
+            entry = await self._shared_principal(username)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        staff = _detached(Staff, entry["staff"])
+        project = _detached(Project, entry["project"]) if entry["project"] else None
+        set_committed_value(staff, "project", project)
+        return staff
+
+    async def _shared_principal(self, username: str) -> Optional[Dict[str, Any]]:
+        """Principal entry from Redis, completed with the locally cached project."""
+        staff = await self._redis_get(REDIS_PRINCIPALS_KEY, username)
+        if staff is None:
+            return None
+        staff = _decode_snapshot(Staff, staff)
+        project = None
+        if staff.get("project_id") is not None:
+            project = self._projects.get(staff["project_id"])
+            if project is None:
+                # Loading the principal also caches its project here
+                return None
+        entry = {"staff": staff, "project": project}
+        self._principals.set(username, entry)
+        return entry
+
+    async def set_principal(self, staff: Staff, generation: int) -> None:
+        """Cache a staff member (and its project) loaded at ``generation``."""
+        if not self.enabled or generation != self.generation:
+            return
+        entry = {
+            "staff": _snapshot(staff),
+            "project": _snapshot(staff.project) if staff.project is not None else None,
+        }
+        self._principals.set(staff.username, entry)
+        if entry["project"] is not None:
+            self._projects.set(staff.project.id, entry["project"])
+        # The project snapshot (with its API key) never leaves the process
+        await self._redis_set(
+            REDIS_PRINCIPALS_KEY,
+            staff.username,
+            {k: _encode(v) for k, v in entry["staff"].items()},
+        )
+
+    # ------------------------------------------------------------------
+    # Permissions
+    # ------------------------------------------------------------------
+
+    async def get_permissions(self, role: str, project_id: Optional[UUID]) -> Optional[FrozenSet[str]]:
+        """Cached permission codes of a role in a project, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = f"{role}:{project_id}"
+        permissions = self._permissions.get(key)
+        if permissions is None:
+            codes = await self._redis_get(REDIS_PERMISSIONS_KEY, key)
+            if codes is not None:
+                permissions = frozenset(codes)
+                self._permissions.set(key, permissions)
+        if permissions is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return permissions
+
+    async def set_permissions(
+        self,
+        role: str,
+        project_id: Optional[UUID],
+        permissions: FrozenSet[str],
+        generation: int,
+    ) -> None:
+        """Cache the permission codes of a role loaded at ``generation``."""
+        if not self.enabled or generation != self.generation:
+            return
+        key = f"{role}:{project_id}"
+        self._permissions.set(key, permissions)
+        await self._redis_set(REDIS_PERMISSIONS_KEY, key, sorted(permissions))
+
+    # ------------------------------------------------------------------
+    # Platform API keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def hash_api_key(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def get_platform(self, key_hash: str) -> Tuple[bool, Optional[Platform]]:
+        """Look up a platform by API key hash.
+
+        Returns:
+            ``(hit, platform)``; a hit with ``None`` is a cached unknown key.
+            The platform is detached, with ``project`` loaded.
+        """
+        if not self.enabled:
+            return False, None
+        if self._unknown_keys.get(key_hash) is not None:
+            self.hits += 1
+            return True, None
+        entry = self._platforms.get(key_hash)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        # Deep copy so requests cannot mutate the cached ``config`` dict
+        platform = _detached(Platform, copy.deepcopy(entry["platform"]))
+        project = _detached(Project, entry["project"]) if entry["project"] else None
+        set_committed_value(platform, "project", project)
+        return True, platform
+
+    def set_platform(self, key_hash: str, platform: Optional[Platform], generation: int) -> None:
+        """Cache the platform (or ``None`` for an unknown key) loaded at ``generation``."""
+        if not self.enabled or generation != self.generation:
+            return
+        if platform is None:
+            self._unknown_keys.set(key_hash, True)
+            return
+        self._platforms.set(key_hash, {
+            "platform": _snapshot(platform),
+            "project": _snapshot(platform.project) if platform.project is not None else None,
+        })
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(
+        self,
+        usernames: Iterable[str] = (),
+        principals: bool = False,
+        permissions: bool = False,
+        platform_keys: Iterable[str] = (),
+        platforms: bool = False,
+    ) -> None:
+        """Drop entries locally and (with Redis) on every replica.
+
+        Args:
+            usernames: Principals to drop
+            principals: Drop all principals
+            permissions: Drop all role permissions
+            platform_keys: API key hashes to drop (cached platform or unknown key)
+            platforms: Drop all cached platforms
+        """
+        change = {
+            "usernames": sorted(set(usernames)),
+            "principals": principals,
+            "permissions": permissions,
+            "platform_keys": sorted(set(platform_keys)),
+            "platforms": platforms,
+        }
+        self._invalidate_local(change)
+        if self._redis_url:
+            self._schedule(self._invalidate_shared(change))
+
+    def _invalidate_local(self, change: Dict[str, Any]) -> None:
+        self.generation += 1
+        if change.get("principals"):
+            self._principals.clear()
+            self._projects.clear()
+        else:
+            for username in change.get("usernames") or ():
+                self._principals.delete(username)
+        if change.get("permissions"):
+            self._permissions.clear()
+        if change.get("platforms"):
+            self._platforms.clear()
+            self._unknown_keys.clear()
+        else:
+            for key_hash in change.get("platform_keys") or ():
+                self._platforms.delete(key_hash)
+                self._unknown_keys.delete(key_hash)
+
+    async def _invalidate_shared(self, change: Dict[str, Any]) -> None:
+        try:
+            redis = await self._get_redis()
+            pipe = redis.pipeline()
+            if change["principals"]:
+                pipe.delete(REDIS_PRINCIPALS_KEY)
+            elif change["usernames"]:
+                pipe.hdel(REDIS_PRINCIPALS_KEY, *change["usernames"])
+            if change["permissions"]:
+                pipe.delete(REDIS_PERMISSIONS_KEY)
+            pipe.publish(REDIS_INVALIDATE_CHANNEL, json.dumps(change))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish auth cache invalidation: {e}")
+
+    def _schedule(self, coro) -> None:
+        """Run a coroutine on the app loop from any thread (ORM events may run in the threadpool)."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None:
+            running.create_task(coro)
+        elif self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        else:
+            coro.close()
+
+    # ------------------------------------------------------------------
+    # Redis
+    # ------------------------------------------------------------------
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(
+                self._redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis
+
+    async def _redis_get(self, key: str, field: str) -> Any:
+        if not self._redis_url:
+            return None
+        try:
+            redis = await self._get_redis()
+            raw = await redis.hget(key, field)
+            if raw is None:
+                return None
+            item = json.loads(raw)
+            if item["at"] + self.redis_ttl_seconds < time.time():
+                return None
+            return item["value"]
+        except Exception as e:
+            logger.debug(f"Auth cache Redis get failed: {e}")
+            return None
+
+    async def _redis_set(self, key: str, field: str, value: Any) -> None:
+        if not self._redis_url:
+            return
+        try:
+            redis = await self._get_redis()
+            pipe = redis.pipeline()
+            pipe.hset(key, field, json.dumps({"at": time.time(), "value": value}))
+            pipe.expire(key, int(self.redis_ttl_seconds) + 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Auth cache Redis set failed: {e}")
+
+    async def start(self) -> None:
+        """Remember the app loop and subscribe to invalidations from other replicas."""
+        self._loop = asyncio.get_running_loop()
+        if not self.enabled or not self._redis_url:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                redis = await self._get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(REDIS_INVALIDATE_CHANNEL)
+                # Anything cached while we were not subscribed may be stale
+                self._invalidate_local({"principals": True, "permissions": True, "platforms": True})
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self._invalidate_local(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Auth cache invalidation listener error: {e}")
+                await asyncio.sleep(1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "shared": bool(self._redis_url),
+            "principals": len(self._principals),
+            "projects": len(self._projects),
+            "permissions": len(self._permissions),
+            "platforms": len(self._platforms),
+            "unknown_keys": len(self._unknown_keys),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+auth_cache = AuthCache(
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    redis_ttl_seconds=settings.AUTH_CACHE_REDIS_TTL_SECONDS,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    redis_url=settings.REDIS_URL,
+    enabled=settings.AUTH_CACHE_ENABLED,
+    negative_ttl_seconds=settings.AUTH_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+# --- SQLAlchemy event listeners to invalidate after commit ---
+
+def _pending(target: Any) -> Optional[Dict[str, Any]]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(
+        _INVALIDATIONS_KEY,
+        {
+            "usernames": set(),
+            "principals": False,
+            "permissions": False,
+            "platform_keys": set(),
+            "platforms": False,
+        },
+    )
+
+
+def _staff_changed(mapper, connection, target: Staff) -> None:
+    pending = _pending(target)
+    if pending is None:
+        return
+    history = sa_inspect(target).attrs.username.history
+    pending["usernames"].update(
+        name for name in (*history.deleted, *history.unchanged, *history.added) if name
+    )
+
+
+def _platform_changed(mapper, connection, target: Platform) -> None:
+    pending = _pending(target)
+    if pending is None:
+        return
+    # Old and new key: covers rotation, deletion and a new key that was cached as unknown
+    history = sa_inspect(target).attrs.api_key.history
+    pending["platform_keys"].update(
+        AuthCache.hash_api_key(key)
+        for key in (*history.deleted, *history.unchanged, *history.added)
+        if key
+    )
+
+
+def _project_changed(mapper, connection, target: Project) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending["principals"] = True
+        pending["platforms"] = True
+
+
+def _permissions_changed(mapper, connection, target: Any) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending["permissions"] = True
+
+
+for _event in ("after_update", "after_delete"):
+    event.listen(Staff, _event, _staff_changed)
+    event.listen(Project, _event, _project_changed)
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Platform, _event, _platform_changed)
+for _model in (Permission, RolePermission, ProjectRolePermission):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _permissions_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(_INVALIDATIONS_KEY, None)
+    if pending:
+        auth_cache.invalidate(**pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_INVALIDATIONS_KEY, None)
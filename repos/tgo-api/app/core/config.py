@@ -1,6 +1,6 @@
 """Application configuration using Pydantic Settings."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -55,6 +55,30 @@ class Settings(BaseSettings):
         default="HS256",
         description="JWT algorithm"
     )
+    AUTH_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Cache authenticated staff and role permissions between requests",
+    )
+    AUTH_CACHE_TTL_SECONDS: int = Field(
+        default=30,
+        description="Lifetime of in-process auth cache entries in seconds",
+        gt=0,
+    )
+    AUTH_CACHE_REDIS_TTL_SECONDS: int = Field(
+        default=300,
+        description="Lifetime of auth cache entries shared through Redis (when REDIS_URL is set)",
+        gt=0,
+    )
+    AUTH_CACHE_MAX_ENTRIES: int = Field(
+        default=10000,
+        description="Maximum in-process auth cache entries per kind",
+        gt=0,
+    )
+    AUTH_CACHE_NEGATIVE_TTL_SECONDS: int = Field(
+        default=10,
+        description="Lifetime of cached unknown platform API keys in seconds",
+        gt=0,
+    )
 
     # Database
     DATABASE_URL: PostgresDsn = Field(
@@ -81,6 +105,13 @@ class Settings(BaseSettings):
         description="Database connection pool recycle time in seconds",
         gt=0
     )
+    DATABASE_BLOCKING_CALL_CHECK: str = Field(
+        default="off",
+        description=(
+            "Detect synchronous Session queries issued on the event loop thread: "
+            "'off', 'warn' (log with call site) or 'raise'"
+        )
+    )
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = Field(
@@ -149,6 +180,62 @@ class Settings(BaseSettings):
         description="API key for Workflow service authentication (if required)"
     )
 
+    # Upstream client settings (AI, RAG, Workflow and Platform services)
+    UPSTREAM_CONNECT_TIMEOUT: float = Field(
+        default=5.0,
+        description="Timeout for opening a new upstream connection in seconds",
+        gt=0,
+    )
+    UPSTREAM_MAX_CONNECTIONS: int = Field(
+        default=100,
+        description="Maximum pooled connections per upstream service",
+        gt=0,
+    )
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=20,
+        description="Idle keep-alive connections kept per upstream service",
+        ge=0,
+    )
+    UPSTREAM_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0,
+        description="Seconds an idle upstream keep-alive connection is kept",
+        gt=0,
+    )
+    UPSTREAM_CONCURRENCY_LIMITS: Dict[str, int] = Field(
+        default_factory=lambda: {"ai": 64, "rag": 32, "workflow": 32, "platform": 16},
+        description="Maximum in-flight non-streaming requests per upstream (0 = unlimited)",
+    )
+    UPSTREAM_ACQUIRE_TIMEOUT: float = Field(
+        default=5.0,
+        description="Seconds to wait for a free upstream request slot before failing fast",
+        gt=0,
+    )
+    UPSTREAM_MAX_RETRIES: int = Field(
+        default=2,
+        description="Retries for idempotent upstream requests on connection errors and 502/503/504/429",
+        ge=0,
+    )
+    UPSTREAM_RETRY_BACKOFF_BASE: float = Field(
+        default=0.2,
+        description="Base delay in seconds for jittered exponential retry backoff",
+        gt=0,
+    )
+    UPSTREAM_RETRY_BACKOFF_MAX: float = Field(
+        default=2.0,
+        description="Maximum retry backoff delay in seconds",
+        gt=0,
+    )
+    UPSTREAM_BREAKER_FAILURE_THRESHOLD: int = Field(
+        default=5,
+        description="Consecutive upstream failures that open the circuit breaker (0 disables)",
+        ge=0,
+    )
+    UPSTREAM_BREAKER_RESET_SECONDS: float = Field(
+        default=30.0,
+        description="Seconds an open circuit waits before letting a probe request through",
+        gt=0,
+    )
+
 
     # AI Provider sync settings
     AI_PROVIDER_SYNC_RETRY_COUNT: int = Field(
@@ -222,6 +309,11 @@ class Settings(BaseSettings):
         description="Maximum number of concurrent workers for queue processing",
         gt=0,
     )
+    QUEUE_CLAIM_VISIBILITY_TIMEOUT_SECONDS: int = Field(
+        default=120,
+        description="Seconds a claimed queue entry stays invisible to other processors before it can be reclaimed",
+        gt=0,
+    )
 
     # Session timeout settings
     SESSION_TIMEOUT_CHECK_ENABLED: bool = Field(
@@ -244,6 +336,82 @@ class Settings(BaseSettings):
         gt=0,
     )
 
+    # Staff load index reconciliation
+    STAFF_LOAD_RECONCILE_ENABLED: bool = Field(
+        default=True,
+        description="Enable periodic recomputation of per-staff open session counts",
+    )
+    STAFF_LOAD_RECONCILE_INTERVAL_SECONDS: int = Field(
+        default=600,
+        description="Interval in seconds between staff load reconciliations (default 10 minutes)",
+        gt=0,
+    )
+    STAFF_LOAD_RECONCILE_BATCH_SIZE: int = Field(
+        default=200,
+        description="Staff members recounted (and load rows locked) per staff load reconciliation transaction",
+        gt=0,
+    )
+
+    # Visitor activity ingestion and partitioning
+    VISITOR_ACTIVITY_FLUSH_INTERVAL_MS: int = Field(
+        default=500,
+        description="Interval at which recorded visitor activities are written in one multi-row insert",
+        ge=0,
+    )
+    VISITOR_ACTIVITY_MAX_BATCH: int = Field(
+        default=500,
+        description="Flush buffered visitor activities early once this many are pending (and rows per insert)",
+        gt=0,
+    )
+    VISITOR_ACTIVITY_MAX_PENDING: int = Field(
+        default=10000,
+        description="Buffered visitor activities above which recording waits for a flush (backpressure)",
+        gt=0,
+    )
+    VISITOR_ACTIVITY_FLUSH_ATTEMPTS: int = Field(
+        default=3,
+        description="Write attempts per visitor activity flush before the batch is dropped",
+        gt=0,
+    )
+    VISITOR_ACTIVITY_UPDATE_TTL_SECONDS: int = Field(
+        default=30,
+        description="Seconds an update of a not yet written visitor activity (e.g. one buffered on another replica) is retried",
+        ge=0,
+    )
+    VISITOR_ACTIVITY_PARTITION_MONTHS_AHEAD: int = Field(
+        default=3,
+        description="Monthly partitions of api_visitor_activities kept created ahead of the current month",
+        ge=1,
+    )
+    VISITOR_ACTIVITY_RETENTION_MONTHS: int = Field(
+        default=13,
+        description="Drop activity partitions older than this many months (0 keeps all history)",
+        ge=0,
+    )
+    VISITOR_ACTIVITY_PARTITION_INTERVAL_SECONDS: int = Field(
+        default=3600,
+        description="Interval in seconds between activity partition maintenance runs",
+        gt=0,
+    )
+
+    # Leader election for singleton background jobs
+    LEADER_ELECTION_ENABLED: bool = Field(
+        default=True,
+        description="Run singleton background jobs on one replica only (Postgres advisory locks)",
+    )
+    LEADER_ELECTION_RENEW_INTERVAL_SECONDS: int = Field(
+        default=10,
+        description="Interval in seconds between lease checks and takeover attempts",
+        gt=0,
+    )
+
+    # Conversation list projection
+    CONVERSATION_PROJECTION_MAX_AGE_SECONDS: int = Field(
+        default=300,
+        description="Rebuild conversation projection rows older than this many seconds",
+        gt=0,
+    )
+
     # Visitor Assignment Rule defaults
     ASSIGNMENT_RULE_DEFAULT_TIMEZONE: str = Field(
         default="Asia/Shanghai",
@@ -323,6 +491,60 @@ class Settings(BaseSettings):
         default=10,
         description="Timeout for WuKongIM service requests in seconds"
     )
+    WUKONGIM_CONNECT_TIMEOUT: float = Field(
+        default=3.0,
+        description="Timeout for opening a new WuKongIM connection in seconds"
+    )
+    WUKONGIM_POOL_TIMEOUT: float = Field(
+        default=5.0,
+        description="Timeout for waiting on a free pooled WuKongIM connection in seconds"
+    )
+    WUKONGIM_ENDPOINT_TIMEOUTS: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "/message/event": 5.0,
+            "/user/onlinestatus": 5.0,
+            "/conversation/sync": 20.0,
+            "/channel/messagesync": 20.0,
+            "/plugins/wk.plugin.search/usersearch": 20.0,
+        },
+        description="Per-endpoint read timeouts in seconds (others use WUKONGIM_SERVICE_TIMEOUT)"
+    )
+    WUKONGIM_MAX_CONNECTIONS: int = Field(
+        default=100,
+        description="Maximum concurrent connections to WuKongIM per process"
+    )
+    WUKONGIM_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=20,
+        description="Idle keep-alive connections kept open to WuKongIM per process"
+    )
+    WUKONGIM_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0,
+        description="Seconds an idle WuKongIM keep-alive connection is kept"
+    )
+    WUKONGIM_STREAM_FLUSH_INTERVAL_MS: int = Field(
+        default=50,
+        description="How long a pending AI stream delta waits for more text before it is sent to WuKongIM"
+    )
+    WUKONGIM_STREAM_FLUSH_CHARS: int = Field(
+        default=512,
+        description="Send a coalesced AI stream delta once it holds this many characters"
+    )
+    WUKONGIM_STREAM_MAX_PENDING: int = Field(
+        default=64,
+        description="Maximum queued WuKongIM stream calls per AI run before deltas are merged regardless of size"
+    )
+    WUKONGIM_MSG_STATS_FLUSH_INTERVAL_MS: int = Field(
+        default=200,
+        description="Interval at which msg.notify visitor stats are aggregated into one database write"
+    )
+    WUKONGIM_MSG_STATS_MAX_BATCH: int = Field(
+        default=500,
+        description="Flush msg.notify visitor stats early once this many visitors are pending"
+    )
+    WUKONGIM_MSG_STATS_FLUSH_ATTEMPTS: int = Field(
+        default=3,
+        description="Write attempts per msg.notify stats flush before the webhook is failed for redelivery"
+    )
     WUKONGIM_ENABLED: bool = Field(
         default=True,
         description="Enable WuKongIM integration for instant messaging"
@@ -366,6 +588,18 @@ class Settings(BaseSettings):
         default=True,
         description="Enable IP geolocation lookup (requires GEOIP_DATABASE_PATH)"
     )
+    GEOIP_LOAD_MODE: str = Field(
+        default="memory",
+        description=(
+            "How GeoIP databases are loaded: 'memory' (whole file in RAM, no I/O per lookup), "
+            "'mmap' (memory-mapped / ip2region vector index only) or 'file' (read per lookup)"
+        ),
+    )
+    GEOIP_CACHE_MAX_ENTRIES: int = Field(
+        default=65536,
+        description="Maximum IP addresses kept in the GeoIP lookup cache (0 disables it)",
+        ge=0,
+    )
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = Field(
@@ -406,6 +640,11 @@ class Settings(BaseSettings):
         description="Number of visitors to check per batch in online status sync",
         gt=0,
     )
+    VISITOR_ONLINE_SYNC_CONCURRENCY: int = Field(
+        default=4,
+        description="Maximum concurrent WuKongIM online status requests per sync page",
+        gt=0,
+    )
 
     # Unknown Platform Fallback
     UNKNOWN_PLATFORM_ID: str = Field(
@@ -454,6 +693,34 @@ class Settings(BaseSettings):
         default_factory=lambda: [],
         description="Allowed file extensions for uploads",
     )
+    CHAT_FILE_CACHE_MAX_AGE_SECONDS: int = Field(
+        default=7 * 24 * 3600,
+        description="Browser cache lifetime of served chat files (files never change once uploaded)",
+        ge=0,
+    )
+    CHAT_FILE_THUMBNAIL_DIR: str = Field(
+        default="./uploads/.thumbnails",
+        description="Disk cache of generated chat image thumbnails",
+    )
+    CHAT_FILE_THUMBNAIL_SIZES: List[int] = Field(
+        default_factory=lambda: [160, 320, 640, 1280],
+        description="Thumbnail bounding boxes in px; requested sizes are rounded up to one of these",
+    )
+    CHAT_FILE_THUMBNAIL_WORKERS: int = Field(
+        default=2,
+        description="Threads rendering thumbnails (bounds CPU spent on image decoding)",
+        gt=0,
+    )
+    CHAT_FILE_THUMBNAIL_MAX_PENDING: int = Field(
+        default=16,
+        description="Distinct thumbnails rendering or queued at once; beyond it originals are served",
+        gt=0,
+    )
+    CHAT_FILE_THUMBNAIL_MAX_PIXELS: int = Field(
+        default=40_000_000,
+        description="Largest source image (width x height) decoded for a thumbnail",
+        gt=0,
+    )
 
 
     # Platform Logo Upload Settings
@@ -482,6 +749,16 @@ class Settings(BaseSettings):
         default="local",
         description="Storage type: local, oss, minio",
     )
+    STORAGE_PRESIGN_EXPIRES_SECONDS: int = Field(
+        default=900,
+        description="Lifetime of presigned direct upload/download URLs and upload tokens",
+        gt=0,
+    )
+    CHAT_FILE_UPLOAD_SWEEP_INTERVAL_SECONDS: int = Field(
+        default=900,
+        description="Interval in seconds between sweeps of expired, never completed direct chat file uploads",
+        gt=0,
+    )
     
     # Aliyun OSS Settings
     OSS_ENDPOINT: Optional[str] = Field(
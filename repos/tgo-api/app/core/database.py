@@ -1,6 +1,9 @@
 """Database connection and session management."""
 
-from typing import AsyncGenerator, Generator
+import asyncio
+import traceback
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Generator
 
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -50,6 +53,53 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+class BlockingDatabaseCallError(RuntimeError):
+    """A synchronous Session query was issued on the event loop thread."""
+
+
+def _running_on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def install_blocking_call_guard(session_factory: sessionmaker, mode: str) -> None:
+    """
+    Report synchronous ORM queries issued from the event loop thread.
+
+    A sync ``Session`` used inside ``async def`` code blocks the whole worker
+    for the duration of the query. Sync endpoints (plain ``def``) run in the
+    threadpool and are not affected.
+
+    Args:
+        session_factory: Sync ``sessionmaker`` to watch
+        mode: ``"warn"`` logs the call site, ``"raise"`` raises
+            ``BlockingDatabaseCallError``; anything else disables the guard
+    """
+    mode = (mode or "off").lower()
+    if mode not in {"warn", "raise"}:
+        return
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _check_blocking_call(orm_execute_state) -> None:
+        if not _running_on_event_loop():
+            return
+        statement = str(orm_execute_state.statement).split("\n", 1)[0][:120]
+        if mode == "raise":
+            raise BlockingDatabaseCallError(
+                f"Synchronous database call on the event loop: {statement}"
+            )
+        caller = "".join(traceback.format_stack(limit=8)[:-1])
+        logger.warning(
+            f"Synchronous database call on the event loop: {statement}\n{caller}"
+        )
+
+
+install_blocking_call_guard(SessionLocal, settings.DATABASE_BLOCKING_CALL_CHECK)
+
+
 # Database event listeners for logging
 @event.listens_for(sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
@@ -110,6 +160,23 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Short-lived async session for work outside a request-scoped session.
+
+    Commits on success and rolls back on error. Instances stay usable after
+    the scope ends (``expire_on_commit=False``) but are detached.
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     logger.info("Initializing database tables")
@@ -0,0 +1,275 @@
+"""Leader election for singleton background jobs.
+
+Periodic jobs (platform sync retries, AI provider sync, queue fallback,
+session timeouts, online-status sync, ...) used to start in every API replica,
+multiplying their database and WuKongIM load by the number of replicas.
+
+Each job is guarded by a Postgres session-level advisory lock held on one
+dedicated connection per replica. The replica that takes a job's lock runs the
+job; the others retry every ``LEADER_ELECTION_RENEW_INTERVAL_SECONDS``. The
+lease is renewed by pinging the connection: if the ping fails the replica
+stops its jobs, and if the replica dies Postgres drops the connection and
+releases the locks, so a standby takes over on its next attempt.
+
+The lock-holding connection is tagged with ``application_name`` so
+``ownership()`` can report which replica owns each job from any replica.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import os
+import socket
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("leader_election")
+
+REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}"
+_APPLICATION_NAME_PREFIX = "tgo-api-leader:"
+
+_OWNERS_SQL = text(
+    """
+    SELECT l.classid, l.objid, a.application_name
+    FROM pg_locks AS l
+    JOIN pg_stat_activity AS a ON a.pid = l.pid
+    WHERE l.locktype = 'advisory' AND l.granted AND l.objsubid = 1
+    """
+)
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a job name."""
+    digest = hashlib.blake2b(f"tgo-api:{name}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _lock_ids(key: int) -> tuple[int, int]:
+    """(classid, objid) under which ``pg_locks`` shows a bigint advisory lock."""
+    unsigned = key & 0xFFFFFFFFFFFFFFFF
+    return unsigned >> 32, unsigned & 0xFFFFFFFF
+
+
+@dataclass
+class SingletonJob:
+    """A background job that must run on exactly one replica.
+
+    Args:
+        name: Unique job name (also the advisory lock name)
+        start: Starts the job; may be sync or async
+        stop: Stops the job; must be safe to call when not running
+    """
+
+    name: str
+    start: Callable[[], Any]
+    stop: Callable[[], Awaitable[Any]]
+    key: int = field(init=False)
+    running: bool = field(default=False, init=False)
+    since: Optional[datetime] = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        self.key = lock_key(self.name)
+
+
+class LeaderElector:
+    """Runs each registered job on the replica that holds its advisory lock.
+
+    Args:
+        jobs: Singleton jobs to elect
+        engine: Async engine for the lock connection (defaults to the app engine)
+        renew_interval: Seconds between lease renewals and takeover attempts
+        enabled: When disabled every job runs locally (single-replica deployments)
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[List[SingletonJob]] = None,
+        engine: Optional[AsyncEngine] = None,
+        renew_interval: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self.jobs: List[SingletonJob] = list(jobs or [])
+        self.renew_interval = (
+            settings.LEADER_ELECTION_RENEW_INTERVAL_SECONDS if renew_interval is None else renew_interval
+        )
+        self.enabled = settings.LEADER_ELECTION_ENABLED if enabled is None else enabled
+        self._engine = engine
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, job: SingletonJob) -> None:
+        """Add a job (replacing a registered job of the same name)."""
+        self.jobs = [existing for existing in self.jobs if existing.name != job.name]
+        self.jobs.append(job)
+
+    async def start(self) -> None:
+        """Start electing (or, when disabled, start every job locally)."""
+        if not self.enabled:
+            for job in self.jobs:
+                await self._start_job(job)
+            logger.info("Leader election disabled; singleton jobs run locally")
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Leader election started",
+            extra={"replica": REPLICA_ID, "jobs": [job.name for job in self.jobs]},
+        )
+
+    async def aclose(self) -> None:
+        """Stop owned jobs and release their locks."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._stop_jobs([job for job in self.jobs if job.running])
+        await self._drop_connection()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.elect_once()
+            except Exception as e:
+                logger.exception(f"Leader election round failed: {e}")
+            await asyncio.sleep(self.renew_interval)
+
+    async def elect_once(self) -> None:
+        """Renew held leases, then try to take the jobs no one is running here."""
+        if not await self._renew():
+            return
+        for job in self.jobs:
+            if job.running:
+                continue
+            try:
+                acquired = (
+                    await self._conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": job.key})
+                ).scalar()
+            except Exception as e:
+                logger.warning(f"Leader election lock attempt failed: {e}", extra={"job": job.name})
+                await self._lose_leadership()
+                return
+            if acquired:
+                logger.info("Acquired singleton job", extra={"job": job.name, "replica": REPLICA_ID})
+                await self._start_job(job)
+
+    async def _renew(self) -> bool:
+        """Ensure the lock connection is alive; on failure give up every held job."""
+        try:
+            if self._conn is None:
+                self._conn = await self._connect()
+            else:
+                await self._conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"Leader election connection lost: {e}")
+            await self._lose_leadership()
+            return False
+
+    async def _connect(self) -> AsyncConnection:
+        engine = self._engine
+        if engine is None:
+            from app.core.database import async_engine
+
+            engine = async_engine
+        # Autocommit: session-level locks must not keep a transaction open
+        conn = await engine.connect()
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(
+            text("SELECT set_config('application_name', :name, false)"),
+            {"name": f"{_APPLICATION_NAME_PREFIX}{REPLICA_ID}"[:63]},
+        )
+        return conn
+
+    async def _lose_leadership(self) -> None:
+        owned = [job for job in self.jobs if job.running]
+        if owned:
+            logger.warning(
+                "Lost singleton job leases",
+                extra={"jobs": [job.name for job in owned], "replica": REPLICA_ID},
+            )
+        await self._stop_jobs(owned)
+        await self._drop_connection()
+
+    async def _drop_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            # Discard rather than return to the pool: closing the session
+            # releases the advisory locks immediately
+            await conn.invalidate()
+        except Exception:
+            pass
+
+    async def _start_job(self, job: SingletonJob) -> None:
+        try:
+            result = job.start()
+            if inspect.isawaitable(result):
+                await result
+            job.running = True
+            job.since = datetime.utcnow()
+        except Exception as e:
+            logger.warning(f"Failed to start singleton job: {e}", extra={"job": job.name})
+
+    async def _stop_jobs(self, jobs: List[SingletonJob]) -> None:
+        for job in jobs:
+            try:
+                await job.stop()
+            except Exception as e:
+                logger.warning(f"Failed to stop singleton job: {e}", extra={"job": job.name})
+            job.running = False
+            job.since = None
+
+    def status(self) -> Dict[str, Any]:
+        """Jobs owned by this replica."""
+        return {
+            "replica": REPLICA_ID,
+            "enabled": self.enabled,
+            "jobs": {
+                job.name: {
+                    "owned": job.running,
+                    "since": job.since.isoformat() if job.since else None,
+                }
+                for job in self.jobs
+            },
+        }
+
+    async def ownership(self) -> Dict[str, Any]:
+        """Local status plus the replica currently holding each job's lock."""
+        result = self.status()
+        if not self.enabled:
+            return result
+        try:
+            from app.core.database import async_session_scope
+
+            async with async_session_scope() as db:
+                rows = (await db.execute(_OWNERS_SQL)).all()
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+        owners = {
+            (int(row.classid), int(row.objid)): row.application_name or ""
+            for row in rows
+        }
+        for job in self.jobs:
+            owner = owners.get(_lock_ids(job.key))
+            if owner is not None and owner.startswith(_APPLICATION_NAME_PREFIX):
+                owner = owner[len(_APPLICATION_NAME_PREFIX):]
+            result["jobs"][job.name]["owner"] = owner
+        return result
+
+
+leader_elector = LeaderElector()
@@ -1,19 +1,22 @@
 """Security utilities for authentication and authorization."""
 
 from datetime import datetime, timedelta
-from typing import Any, Dict, Literal, Optional, Union
+from typing import Any, Dict, FrozenSet, Literal, Optional, Union
 from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.auth_cache import auth_cache
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import async_session_scope
 from app.core.logging import get_logger
-from app.models import Project, Staff, Permission, RolePermission, ProjectRolePermission
+from app.models import Platform, Project, Staff, Permission, RolePermission, ProjectRolePermission
 
 logger = get_logger("security")
 
@@ -91,23 +94,89 @@ def get_password_hash(password: str) -> str:
 
 
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
-    """Verify JWT token and return payload."""
+    """Verify an access token and return its payload.
+
+    Purpose tokens (see ``create_purpose_token``) are rejected: they carry
+    ``aud``, which fails decoding without an audience, and ``typ``.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError as e:
         # Downgrade to debug to avoid noisy logs on unauthenticated endpoints
         logger.debug(f"Token verification failed: {e}")
         return None
+    if "typ" in payload:
+        logger.debug(f"Token verification failed: {payload['typ']} token is not an access token")
+        return None
+    return payload
+
+
+def create_purpose_token(purpose: str, claims: Dict[str, Any], expires_delta: timedelta) -> str:
+    """Create a JWT usable only for ``purpose`` (e.g. completing a presigned upload).
+
+    The token carries ``typ`` and ``aud`` set to ``purpose``, so it is never
+    accepted as an access token and only ``verify_purpose_token`` with the
+    same purpose accepts it.
+    """
+    to_encode = {
+        **claims,
+        "typ": purpose,
+        "aud": purpose,
+        "exp": datetime.utcnow() + expires_delta,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def verify_purpose_token(token: str, purpose: str) -> Optional[Dict[str, Any]]:
+    """Verify a token created by ``create_purpose_token`` for ``purpose``."""
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], audience=purpose
+        )
+    except JWTError as e:
+        logger.debug(f"{purpose} token verification failed: {e}")
+        return None
+    if payload.get("typ") != purpose:
+        logger.debug(f"{purpose} token verification failed: wrong token type")
+        return None
+    return payload
+
+
+async def _load_active_staff(db: AsyncSession, username: str) -> Optional[Staff]:
+    """Load a non-deleted staff member with its project eagerly loaded."""
+    result = await db.execute(
+        select(Staff)
+        .options(joinedload(Staff.project))
+        .where(Staff.username == username, Staff.deleted_at.is_(None))
+    )
+    return result.scalars().first()
+
+
+async def _resolve_principal(username: str) -> Optional[Staff]:
+    """Active staff for ``username`` from the auth cache, loading it on a miss."""
+    user = await auth_cache.get_principal(username)
+    if user is not None:
+        return user
+    generation = auth_cache.generation
+    async with async_session_scope() as db:
+        user = await _load_active_staff(db, username)
+    if user is not None:
+        await auth_cache.set_principal(user, generation)
+    return user
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
 ) -> Staff:
-    """Get current authenticated user from JWT token."""
+    """Get current authenticated user from JWT token.
+
+    The user comes from the auth cache or a short-lived async session, so it
+    is returned detached: column attributes (except ``password_hash``) and
+    ``project`` are loaded, other relationships are not. Endpoints that modify
+    the staff member must load it in their own session first.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -129,11 +198,8 @@ async def get_current_user(
         logger.info("Token verification failed: JWTError")
         raise credentials_exception
     
-    # Get user from database
-    user = db.query(Staff).filter(
-        Staff.username == username,
-        Staff.deleted_at.is_(None)
-    ).first()
+    # Get user from cache or database
+    user = await _resolve_principal(username)
     
     if user is None:
         logger.info("Token verification failed: User not found")
@@ -179,6 +245,51 @@ def get_project_by_id(db: Session, project_id: Union[str, UUID]) -> Optional[Pro
     ).first()
 
 
+async def get_project_by_id_async(db: AsyncSession, project_id: Union[str, UUID]) -> Optional[Project]:
+    """Get project by ID using an async session."""
+    try:
+        project_uuid = project_id if isinstance(project_id, UUID) else UUID(str(project_id))
+    except ValueError:
+        return None
+    result = await db.execute(
+        select(Project).where(Project.id == project_uuid, Project.deleted_at.is_(None))
+    )
+    return result.scalars().first()
+
+
+
+def get_platform_by_api_key(db: Session, api_key: Optional[str]) -> Optional[Platform]:
+    """Get the platform owning ``api_key`` (including disabled or deleted ones).
+
+    Served from the auth cache when possible; unknown keys are cached as
+    well. The platform (and its project) is attached to ``db`` without
+    reloading, so callers can use and modify it as if it had been queried.
+    """
+    if not api_key:
+        return None
+    key_hash = auth_cache.hash_api_key(api_key)
+    hit, platform = auth_cache.get_platform(key_hash)
+    if hit:
+        return db.merge(platform, load=False) if platform is not None else None
+
+    generation = auth_cache.generation
+    platform = (
+        db.query(Platform)
+        .options(joinedload(Platform.project))
+        .filter(Platform.api_key == api_key)
+        .first()
+    )
+    auth_cache.set_platform(key_hash, platform, generation)
+    return platform
+
+
+def get_active_platform_by_api_key(db: Session, api_key: Optional[str]) -> Optional[Platform]:
+    """Get the active, non-deleted platform owning ``api_key``."""
+    platform = get_platform_by_api_key(db, api_key)
+    if platform is None or not platform.is_active or platform.deleted_at is not None:
+        return None
+    return platform
+
 
 
 def generate_api_key() -> str:
@@ -194,7 +305,6 @@ def generate_api_key() -> str:
 
 async def get_authenticated_project(
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer(auto_error=True)),
-    db: Session = Depends(get_db),
 ) -> tuple[Project, str]:
     """
     Get authenticated project via JWT token.
@@ -242,26 +352,29 @@ async def get_authenticated_project(
 
     # Extract project_id from JWT claims
     project_id = payload.get("project_id")
-    if not project_id:
-        # Fallback: get project_id from user's project association
-        username = payload.get("sub")
-        if username:
-            user = db.query(Staff).filter(
-                Staff.username == username,
-                Staff.deleted_at.is_(None)
-            ).first()
-            if user:
-                project_id = user.project_id
-
-    if not project_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No project information in JWT token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    async with async_session_scope() as db:
+        if not project_id:
+            # Fallback: get project_id from user's project association
+            username = payload.get("sub")
+            if username:
+                project_id = (
+                    await db.execute(
+                        select(Staff.project_id).where(
+                            Staff.username == username,
+                            Staff.deleted_at.is_(None),
+                        )
+                    )
+                ).scalar()
+
+        if not project_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="No project information in JWT token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
-    # Get project from database
-    project = get_project_by_id(db, project_id)
+        # Get project from database
+        project = await get_project_by_id_async(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -276,19 +389,65 @@ async def get_authenticated_project(
     return project, api_key_for_forwarding
 
 
-def check_user_permission(
-    db: Session,
+async def get_role_permissions(
+    role: str,
+    project_id: Optional[UUID],
+    db: Optional[AsyncSession] = None,
+) -> FrozenSet[str]:
+    """
+    Get the permission codes of a role in a project.
+    
+    Uses MERGE mode: Final permissions = Global RolePermission + Project ProjectRolePermission
+    Projects can only ADD permissions, not disable global ones.
+    
+    Results are served from the auth cache; on a miss both tables are read
+    in one query (using ``db`` or a short-lived session).
+    
+    Returns:
+        Set of permission codes in resource:action format
+    """
+    permissions = await auth_cache.get_permissions(role, project_id)
+    if permissions is not None:
+        return permissions
+    
+    generation = auth_cache.generation
+    # Global RolePermission (inherited by all projects)
+    global_permissions = (
+        select(Permission.resource, Permission.action)
+        .join(RolePermission, RolePermission.permission_id == Permission.id)
+        .where(RolePermission.role == role)
+    )
+    # Project-specific ProjectRolePermission (additional permissions)
+    project_permissions = (
+        select(Permission.resource, Permission.action)
+        .join(ProjectRolePermission, ProjectRolePermission.permission_id == Permission.id)
+        .where(
+            ProjectRolePermission.role == role,
+            ProjectRolePermission.project_id == project_id,
+        )
+    )
+    stmt = global_permissions.union(project_permissions)
+    if db is None:
+        async with async_session_scope() as session:
+            rows = (await session.execute(stmt)).all()
+    else:
+        rows = (await db.execute(stmt)).all()
+    
+    permissions = frozenset(f"{resource}:{action}" for resource, action in rows)
+    await auth_cache.set_permissions(role, project_id, permissions, generation)
+    return permissions
+
+
+async def check_user_permission(
+    db: Optional[AsyncSession],
     user: Staff,
     permission: str,
 ) -> bool:
     """
     Check if user has the specified permission.
     
-    Uses MERGE mode: Final permissions = Global RolePermission + Project ProjectRolePermission
-    Projects can only ADD permissions, not disable global ones.
-    
     Args:
-        db: Database session
+        db: Database session used on a permission cache miss (optional)
         user: Staff user to check
         permission: Permission code in resource:action format (e.g., "staff:create")
     
@@ -299,32 +458,12 @@ def check_user_permission(
     if user.role == ADMIN_ROLE:
         return True
     
-    # Parse permission code
-    try:
-        resource, action = permission.split(":")
-    except ValueError:
+    # Validate permission code
+    if permission.count(":") != 1:
         logger.warning(f"Invalid permission format: {permission}")
         return False
     
-    # Check global RolePermission (inherited by all projects)
-    has_global_permission = db.query(RolePermission).join(Permission).filter(
-        RolePermission.role == user.role,
-        Permission.resource == resource,
-        Permission.action == action,
-    ).first()
-    
-    if has_global_permission:
-        return True
-    
-    # Check project-specific ProjectRolePermission (additional permissions)
-    has_project_permission = db.query(ProjectRolePermission).join(Permission).filter(
-        ProjectRolePermission.role == user.role,
-        ProjectRolePermission.project_id == user.project_id,
-        Permission.resource == resource,
-        Permission.action == action,
-    ).first()
-    
-    return has_project_permission is not None
+    return permission in await get_role_permissions(user.role, user.project_id, db)
 
 
 def require_permission(permission: str):
@@ -352,7 +491,6 @@ def require_permission(permission: str):
     """
     async def permission_dependency(
         credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db),
     ) -> Staff:
         """Check user has required permission."""
         # First authenticate the user
@@ -374,14 +512,11 @@ def require_permission(permission: str):
         except JWTError:
             raise credentials_exception
         
-        # Get user from database
-        user = db.query(Staff).filter(
-            Staff.username == username,
-            Staff.deleted_at.is_(None)
-        ).first()
-        
+        # Get user and permissions (cached; loaded on a miss)
+        user = await _resolve_principal(username)
         if user is None:
             raise credentials_exception
+        has_permission = await check_user_permission(None, user, permission)
         
         # Check if user is active
         if user.deleted_at is not None:
@@ -391,7 +526,7 @@ def require_permission(permission: str):
             )
         
         # Check permission
-        if not check_user_permission(db, user, permission):
+        if not has_permission:
             logger.warning(
                 f"Permission denied: user {user.username} lacks permission {permission}"
             )
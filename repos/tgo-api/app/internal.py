@@ -102,6 +102,18 @@ async def internal_shutdown_event():
     """Internal application shutdown event."""
     logger.info("Internal services shutting down...")
 
+    # Close pooled upstream HTTP connections (best-effort)
+    try:
+        from app.services.wukongim_client import wukongim_client
+        await wukongim_client.aclose()
+    except Exception:
+        pass
+    try:
+        from app.services.upstream import close_upstreams
+        await close_upstreams()
+    except Exception:
+        pass
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -21,6 +21,7 @@ from app.core.exceptions import (
 from app.schemas.base import ErrorResponse
 from app.core.logging import setup_logging
 from app.services.platform_type_seed import ensure_platform_types_seed
+from app.services.upstream import DeadlineMiddleware
 
 
 # Setup logging
@@ -82,6 +83,9 @@ def create_app(
         allow_headers=["*"],
     )
 
+    # Honour inbound request deadlines for upstream calls
+    application.add_middleware(DeadlineMiddleware)
+
     # Add additional middlewares (before exception handlers)
     if additional_middlewares:
         for middleware_class, kwargs in additional_middlewares:
@@ -183,58 +187,142 @@ def create_app(
 
         startup_log("🗄️  Connecting to database...")
 
-        # Start background sync monitor
+        # Auth cache: bind to this loop and listen for cross-replica invalidations
         try:
-            from app.services.platform_sync import start_sync_monitor
-            start_sync_monitor()
+            from app.core.auth_cache import auth_cache
+            await auth_cache.start()
         except Exception:
             # best-effort; don't block startup
             pass
 
-        # Start periodic AIProvider sync task (best-effort)
+        # GeoIP: load the database now so the first visitor does not pay for it
         try:
-            from app.tasks.sync_ai_providers import start_ai_provider_sync_task
-            start_ai_provider_sync_task()
+            import asyncio
+            from app.services.geoip_service import geoip_service
+            await asyncio.to_thread(geoip_service.preload)
         except Exception:
             # best-effort; don't block startup
             pass
 
-        # Start periodic ProjectAIConfig sync task (best-effort)
+        # Run registry: deliver cancels marked on other replicas to runs streamed here
         try:
-            from app.tasks.sync_project_ai_configs import start_project_ai_config_sync_task
-            start_project_ai_config_sync_task()
+            from app.services.run_registry import run_registry
+            await run_registry.start()
         except Exception:
             # best-effort; don't block startup
             pass
 
-        # Start periodic waiting queue processor task (best-effort)
+        # Platform sync jobs enqueued by this replica are processed locally
         try:
-            from app.tasks.process_waiting_queue import start_queue_processor
-            start_queue_processor()
+            from app.services.platform_sync import start_sync_consumer
+            start_sync_consumer()
         except Exception:
             # best-effort; don't block startup
             pass
 
-        # Start periodic session timeout check task (best-effort)
+        # Singleton background jobs: each runs on the one replica holding its
+        # lease (see app.core.leader_election) and fails over automatically
+        from app.core.leader_election import SingletonJob, leader_elector
+
+        # Platform sync retry scan
         try:
-            from app.tasks.close_timeout_sessions import start_session_timeout_task
-            await start_session_timeout_task()
+            from app.services.platform_sync import start_sync_retry_task, stop_sync_retry_task
+            leader_elector.register(SingletonJob("platform_sync_retry", start_sync_retry_task, stop_sync_retry_task))
         except Exception:
-            # best-effort; don't block startup
             pass
 
-        # Start periodic visitor online status sync task (best-effort)
+        # Periodic AIProvider sync
         try:
-            from app.tasks.sync_visitor_online_status import start_visitor_online_sync_task
-            await start_visitor_online_sync_task()
+            from app.tasks.sync_ai_providers import start_ai_provider_sync_task, stop_ai_provider_sync_task
+            leader_elector.register(SingletonJob("ai_provider_sync", start_ai_provider_sync_task, stop_ai_provider_sync_task))
+        except Exception:
+            pass
+
+        # Periodic ProjectAIConfig sync
+        try:
+            from app.tasks.sync_project_ai_configs import (
+                start_project_ai_config_sync_task,
+                stop_project_ai_config_sync_task,
+            )
+            leader_elector.register(
+                SingletonJob("project_ai_config_sync", start_project_ai_config_sync_task, stop_project_ai_config_sync_task)
+            )
+        except Exception:
+            pass
+
+        # Waiting queue fallback processor and cleanup (event triggers stay per-replica)
+        try:
+            from app.tasks.process_waiting_queue import start_queue_processor, stop_queue_processor
+            leader_elector.register(SingletonJob("waiting_queue", start_queue_processor, stop_queue_processor))
+        except Exception:
+            pass
+
+        # Session timeout checks
+        try:
+            from app.tasks.close_timeout_sessions import start_session_timeout_task, stop_session_timeout_task
+            leader_elector.register(SingletonJob("session_timeout", start_session_timeout_task, stop_session_timeout_task))
+        except Exception:
+            pass
+
+        # Staff load reconciliation
+        try:
+            from app.tasks.reconcile_staff_load import (
+                start_staff_load_reconcile_task,
+                stop_staff_load_reconcile_task,
+            )
+            leader_elector.register(
+                SingletonJob("staff_load_reconcile", start_staff_load_reconcile_task, stop_staff_load_reconcile_task)
+            )
         except Exception:
-            # best-effort; don't block startup
             pass
 
-        # Start periodic auto AI fallback task (best-effort)
+        # Visitor activity partition maintenance
         try:
-            from app.tasks.auto_fallback_to_ai import start_auto_fallback_to_ai_task
-            await start_auto_fallback_to_ai_task()
+            from app.tasks.maintain_activity_partitions import (
+                start_activity_partition_task,
+                stop_activity_partition_task,
+            )
+            leader_elector.register(
+                SingletonJob("activity_partitions", start_activity_partition_task, stop_activity_partition_task)
+            )
+        except Exception:
+            pass
+
+        # Abandoned direct chat file upload sweep
+        try:
+            from app.tasks.sweep_chat_file_uploads import (
+                start_chat_file_upload_sweep_task,
+                stop_chat_file_upload_sweep_task,
+            )
+            leader_elector.register(
+                SingletonJob("chat_file_upload_sweep", start_chat_file_upload_sweep_task, stop_chat_file_upload_sweep_task)
+            )
+        except Exception:
+            pass
+
+        # Visitor online status sync
+        try:
+            from app.tasks.sync_visitor_online_status import (
+                start_visitor_online_sync_task,
+                stop_visitor_online_sync_task,
+            )
+            leader_elector.register(
+                SingletonJob("visitor_online_sync", start_visitor_online_sync_task, stop_visitor_online_sync_task)
+            )
+        except Exception:
+            pass
+
+        # Auto AI fallback
+        try:
+            from app.tasks.auto_fallback_to_ai import start_auto_fallback_to_ai_task, stop_auto_fallback_to_ai_task
+            leader_elector.register(
+                SingletonJob("auto_fallback_to_ai", start_auto_fallback_to_ai_task, stop_auto_fallback_to_ai_task)
+            )
+        except Exception:
+            pass
+
+        try:
+            await leader_elector.start()
         except Exception:
             # best-effort; don't block startup
             pass
@@ -263,45 +351,57 @@ def create_app(
     @application.on_event("shutdown")
     async def shutdown_event():
         """Application shutdown event: stop background tasks."""
-        # Stop periodic AIProvider sync task (best-effort)
+        # Stop singleton background jobs and release their leases (best-effort)
         try:
-            from app.tasks.sync_ai_providers import stop_ai_provider_sync_task
-            await stop_ai_provider_sync_task()
+            from app.core.leader_election import leader_elector
+            await leader_elector.aclose()
         except Exception:
             pass
 
-        # Stop periodic ProjectAIConfig sync task (best-effort)
+        # Close pooled upstream HTTP connections (best-effort)
+        try:
+            from app.services.wukongim_client import wukongim_client
+            await wukongim_client.aclose()
+        except Exception:
+            pass
         try:
-            from app.tasks.sync_project_ai_configs import stop_project_ai_config_sync_task
-            await stop_project_ai_config_sync_task()
+            from app.services.upstream import close_upstreams
+            await close_upstreams()
         except Exception:
             pass
 
-        # Stop periodic waiting queue processor task (best-effort)
+        # Stop auth cache invalidation listener (best-effort)
         try:
-            from app.tasks.process_waiting_queue import stop_queue_processor
-            await stop_queue_processor()
+            from app.core.auth_cache import auth_cache
+            await auth_cache.aclose()
         except Exception:
             pass
 
-        # Stop periodic session timeout check task (best-effort)
+        # Stop chat file thumbnail workers (best-effort)
         try:
-            from app.tasks.close_timeout_sessions import stop_session_timeout_task
-            await stop_session_timeout_task()
+            from app.services import file_delivery
+            file_delivery.shutdown()
         except Exception:
             pass
 
-        # Stop periodic visitor online status sync task (best-effort)
+        # Stop run registry cancel listener (best-effort)
         try:
-            from app.tasks.sync_visitor_online_status import stop_visitor_online_sync_task
-            await stop_visitor_online_sync_task()
+            from app.services.run_registry import run_registry
+            await run_registry.aclose()
         except Exception:
             pass
 
-        # Stop periodic auto AI fallback task (best-effort)
+        # Flush buffered msg.notify visitor stats (best-effort)
         try:
-            from app.tasks.auto_fallback_to_ai import stop_auto_fallback_to_ai_task
-            await stop_auto_fallback_to_ai_task()
+            from app.services.message_stats import message_stats_aggregator
+            await message_stats_aggregator.aclose()
+        except Exception:
+            pass
+
+        # Flush buffered visitor activities (best-effort)
+        try:
+            from app.services.activity_ingest import visitor_activity_ingestor
+            await visitor_activity_ingestor.aclose()
         except Exception:
             pass
 
@@ -326,6 +426,35 @@ def create_app(
         """Health check endpoint."""
         return {"status": "healthy"}
 
+    @application.get("/health/leadership")
+    async def leadership_status() -> dict[str, Any]:
+        """Singleton background jobs: owned by this replica and current owner."""
+        from app.core.leader_election import leader_elector
+
+        return await leader_elector.ownership()
+
+    @application.get("/health/geoip")
+    async def geoip_stats() -> dict[str, Any]:
+        """GeoIP database status and lookup cache counters."""
+        from app.services.geoip_service import geoip_service
+
+        return geoip_service.stats()
+
+    @application.get("/health/visitor-online-sync")
+    async def visitor_online_sync_stats() -> dict[str, Any]:
+        """Metrics of the most recent visitor online status sync cycle."""
+        from app.tasks.sync_visitor_online_status import get_last_cycle_stats
+
+        return {"last_cycle": get_last_cycle_stats()}
+
+    @application.get("/health/upstreams")
+    async def upstream_pool_stats() -> dict[str, Any]:
+        """Connection pool and reuse counters of upstream HTTP clients."""
+        from app.services.upstream import upstream_stats
+        from app.services.wukongim_client import wukongim_client
+
+        return {"wukongim": wukongim_client.pool_stats(), **upstream_stats()}
+
     return application
 
 
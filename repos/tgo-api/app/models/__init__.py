@@ -12,7 +12,7 @@ from app.models.visitor_system_info import VisitorSystemInfo
 from app.models.visitor_activity import VisitorActivity
 from app.models.visitor_tag import VisitorTag
 from app.models.channel_member import ChannelMember
-from app.models.chat_file import ChatFile
+from app.models.chat_file import ChatFile, ChatFileUpload
 from app.models.visitor_customer_update import VisitorCustomerUpdate
 from app.models.ai_provider import AIProvider
 from app.models.ai_model import AIModel
@@ -23,6 +23,7 @@ from app.models.permission import Permission, RolePermission, ProjectRolePermiss
 from app.models.visitor_assignment_rule import VisitorAssignmentRule, DEFAULT_ASSIGNMENT_PROMPT
 from app.models.visitor_assignment_history import VisitorAssignmentHistory, AssignmentSource
 from app.models.visitor_session import VisitorSession, SessionStatus
+from app.models.staff_load import StaffLoad
 from app.models.visitor_waiting_queue import (
     VisitorWaitingQueue,
     WaitingStatus,
@@ -32,6 +33,7 @@ from app.models.visitor_waiting_queue import (
 )
 from app.models.channel_memory_clearance import ChannelMemoryClearance, ClearanceUserType
 from app.models.store_credential import StoreCredential
+from app.models.visitor_conversation import VisitorConversation
 
 __all__ = [
     # Models
@@ -51,6 +53,7 @@ __all__ = [
     "VisitorTag",
     "ChannelMember",
     "ChatFile",
+    "ChatFileUpload",
     "AIProvider",
     "AIModel",
     "AIProviderDefaultModel",
@@ -64,10 +67,12 @@ __all__ = [
     "DEFAULT_ASSIGNMENT_PROMPT",
     "VisitorAssignmentHistory",
     "VisitorSession",
+    "StaffLoad",
     "VisitorWaitingQueue",
     "URGENCY_PRIORITY_MAP",
     "ChannelMemoryClearance",
     "StoreCredential",
+    "VisitorConversation",
     # Enums
     "PlatformType",
     "StaffRole",
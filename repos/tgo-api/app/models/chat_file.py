@@ -34,6 +34,9 @@ class ChatFile(Base):
     file_path: Mapped[str] = mapped_column(String(1024), nullable=False, comment="Relative path from base upload directory")
     file_size: Mapped[int] = mapped_column(Integer, nullable=False, comment="File size in bytes")
     file_type: Mapped[str] = mapped_column(String(255), nullable=False, comment="MIME type")
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, comment="SHA-256 of the file content (hex), or the storage ETag of direct uploads; used as ETag"
+    )
 
     # Who uploaded
     uploaded_by_staff_id: Mapped[Optional[UUID]] = mapped_column(nullable=True, comment="Staff ID if uploaded by staff")
@@ -44,3 +47,30 @@ class ChatFile(Base):
     updated_at: Mapped[datetime] = mapped_column(nullable=False, default=func.now(), onupdate=func.now(), comment="Update time")
     deleted_at: Mapped[Optional[datetime]] = mapped_column(nullable=True, comment="Soft deletion time")
 
+
+class ChatFileUpload(Base):
+    """A presigned direct upload that has not been completed yet.
+
+    Created when the URL is issued and deleted by ``/chat/upload/complete``;
+    rows left once the URL has expired are swept together with any object
+    the client stored (see ``app.tasks.sweep_chat_file_uploads``).
+    """
+
+    __tablename__ = "api_chat_file_uploads"
+
+    # Primary key
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+
+    project_id: Mapped[UUID] = mapped_column(
+        ForeignKey("api_projects.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="Associated project ID",
+    )
+    file_path: Mapped[str] = mapped_column(
+        String(1024), nullable=False, unique=True, comment="Storage path the upload URL was signed for"
+    )
+    file_size: Mapped[int] = mapped_column(Integer, nullable=False, comment="Declared file size in bytes")
+    expires_at: Mapped[datetime] = mapped_column(
+        nullable=False, index=True, comment="When the upload URL and token expire"
+    )
+    created_at: Mapped[datetime] = mapped_column(nullable=False, default=func.now(), comment="Creation time")
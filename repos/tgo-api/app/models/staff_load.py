@@ -0,0 +1,131 @@
+"""Per-staff load index: number of open sessions assigned to each staff member."""
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Integer, case, event, func, inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.visitor_session import SessionStatus, VisitorSession
+
+
+class StaffLoad(Base):
+    """Maintained count of open sessions per staff member.
+
+    Adjusted in the same transaction as every VisitorSession insert, update
+    and delete flushed through the ORM (see the listeners below), so
+    assignment can rank staff by load with a single join instead of counting
+    sessions per candidate. ``app.tasks.reconcile_staff_load`` periodically
+    recomputes it from ``api_visitor_sessions`` to repair drift from writes
+    that bypass the ORM (bulk updates, FK cascades).
+    """
+
+    __tablename__ = "api_staff_load"
+
+    staff_id: Mapped[UUID] = mapped_column(
+        ForeignKey("api_staff.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Staff member",
+    )
+    project_id: Mapped[UUID] = mapped_column(
+        ForeignKey("api_projects.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="Project of the staff member",
+    )
+    open_sessions: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Number of open sessions assigned to this staff member",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        nullable=False,
+        default=func.now(),
+        onupdate=func.now(),
+        comment="Last update timestamp",
+    )
+
+    def __repr__(self) -> str:
+        return f"<StaffLoad(staff_id={self.staff_id}, open_sessions={self.open_sessions})>"
+
+
+LoadChange = Tuple[UUID, UUID, int]  # (staff_id, project_id, delta)
+
+
+def _counted(staff_id: Optional[UUID], status: Optional[str]) -> bool:
+    return staff_id is not None and status == SessionStatus.OPEN.value
+
+
+def _previous_value(target: VisitorSession, key: str):
+    history = sa_inspect(target).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def session_load_changes(target: VisitorSession, *, inserted: bool = False, deleted: bool = False) -> List[LoadChange]:
+    """Compute the load deltas a session write causes, ordered by staff id.
+
+    Args:
+        target: The session being flushed
+        inserted: The session is being inserted (no previous state)
+        deleted: The session is being deleted (no new state)
+    """
+    before = None
+    if not inserted:
+        before = (_previous_value(target, "staff_id"), _previous_value(target, "status"))
+    after = None if deleted else (target.staff_id, target.status)
+
+    changes: List[LoadChange] = []
+    if before is not None and _counted(*before):
+        changes.append((before[0], target.project_id, -1))
+    if after is not None and _counted(*after):
+        changes.append((after[0], target.project_id, 1))
+
+    # An unchanged assignment cancels out
+    if len(changes) == 2 and changes[0][0] == changes[1][0]:
+        return []
+    # Fixed lock order so concurrent opposite transfers cannot deadlock
+    return sorted(changes, key=lambda change: str(change[0]))
+
+
+def apply_load_changes(connection, changes: List[LoadChange]) -> None:
+    """Atomically apply load deltas on ``connection`` (never below zero)."""
+    for staff_id, project_id, delta in changes:
+        stmt = insert(StaffLoad).values(
+            staff_id=staff_id,
+            project_id=project_id,
+            open_sessions=max(delta, 0),
+            updated_at=func.now(),
+        )
+        new_count = StaffLoad.__table__.c.open_sessions + delta
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StaffLoad.__table__.c.staff_id],
+            set_={
+                "open_sessions": case((new_count < 0, 0), else_=new_count),
+                "updated_at": func.now(),
+            },
+        )
+        connection.execute(stmt)
+
+
+@event.listens_for(VisitorSession, "after_insert")
+def _session_after_insert(mapper, connection, target: VisitorSession) -> None:
+    apply_load_changes(connection, session_load_changes(target, inserted=True))
+
+
+@event.listens_for(VisitorSession, "after_update")
+def _session_after_update(mapper, connection, target: VisitorSession) -> None:
+    apply_load_changes(connection, session_load_changes(target))
+
+
+@event.listens_for(VisitorSession, "after_delete")
+def _session_after_delete(mapper, connection, target: VisitorSession) -> None:
+    apply_load_changes(connection, session_load_changes(target, deleted=True))
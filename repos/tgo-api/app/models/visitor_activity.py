@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, Integer, String, Text, func
+from sqlalchemy import ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,9 +12,18 @@ from app.core.database import Base
 
 
 class VisitorActivity(Base):
-    """Timeline entry representing a visitor activity."""
+    """Timeline entry representing a visitor activity.
+
+    The table is range-partitioned by month on ``occurred_at`` (see
+    ``app.tasks.maintain_activity_partitions``), so ``occurred_at`` is part of
+    the primary key.
+    """
 
     __tablename__ = "api_visitor_activities"
+    __table_args__ = (
+        Index("ix_api_visitor_activities_visitor_occurred", "visitor_id", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     project_id: Mapped[UUID] = mapped_column(
@@ -53,6 +62,7 @@ class VisitorActivity(Base):
         comment="Duration associated with the activity, in seconds"
     )
     occurred_at: Mapped[datetime] = mapped_column(
+        primary_key=True,
         nullable=False,
         default=func.now(),
         comment="When the activity occurred"
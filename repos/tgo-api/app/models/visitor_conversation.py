@@ -0,0 +1,346 @@
+"""Conversation-list projection: one precomputed row per visitor conversation."""
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import (
+    Boolean,
+    ForeignKey,
+    Integer,
+    String,
+    event,
+    func,
+    inspect,
+    literal,
+    literal_column,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session
+
+from app.core.database import Base
+from app.models.platform import Platform
+from app.models.tag import Tag
+from app.models.visitor import Visitor
+from app.models.visitor_activity import VisitorActivity
+from app.models.visitor_ai_insight import VisitorAIInsight
+from app.models.visitor_ai_profile import VisitorAIProfile
+from app.models.visitor_session import VisitorSession
+from app.models.visitor_system_info import VisitorSystemInfo
+from app.models.visitor_tag import VisitorTag
+
+
+class VisitorConversation(Base):
+    """Read model of a visitor conversation for the staff inbox lists.
+
+    Holds the language-neutral visitor payload (profile, tags, AI insights,
+    system info, recent activity, assigned staff) plus the columns the lists
+    filter on, so a page of conversations is one primary-key lookup instead of
+    loading and assembling every relation per visitor.
+
+    Writes never rebuild rows. Writes that only move the live visitor columns
+    (``LIVE_VISITOR_FIELDS``: message stats, presence, last visit) and new
+    activities patch the stored payload in place. Every other ORM write that
+    affects a visitor's payload sets ``stale`` (see the listeners below), and
+    ``app.services.conversation_projection`` rebuilds stale rows on read.
+    Both kinds of write bump ``version`` in the same transaction, and a
+    rebuild is only stored if ``version`` did not move meanwhile.
+    ``refreshed_at`` bounds staleness from writes that bypass all of this.
+    """
+
+    __tablename__ = "api_visitor_conversations"
+
+    visitor_id: Mapped[UUID] = mapped_column(
+        ForeignKey("api_visitors.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Visitor of the conversation",
+    )
+    project_id: Mapped[UUID] = mapped_column(
+        ForeignKey("api_projects.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="Project of the visitor",
+    )
+    platform_id: Mapped[Optional[UUID]] = mapped_column(
+        nullable=True,
+        index=True,
+        comment="Platform of the visitor (payload embeds its AI settings)",
+    )
+    service_status: Mapped[Optional[str]] = mapped_column(
+        String(20),
+        nullable=True,
+        comment="Visitor service status at refresh time",
+    )
+    assigned_staff_id: Mapped[Optional[UUID]] = mapped_column(
+        nullable=True,
+        comment="Staff of the visitor's latest open session",
+    )
+    tag_ids: Mapped[List[str]] = mapped_column(
+        ARRAY(String(255)),
+        nullable=False,
+        default=list,
+        server_default="{}",
+        comment="Active tag IDs of the visitor",
+    )
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True,
+        comment="Visitor's last message time at refresh time",
+    )
+    payload: Mapped[Optional[dict]] = mapped_column(
+        JSONB,
+        nullable=True,
+        comment="Language-neutral VisitorResponse JSON",
+    )
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Bumped by every write affecting the payload",
+    )
+    stale: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=True,
+        server_default="true",
+        comment="Payload must be rebuilt before use",
+    )
+    refreshed_at: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True,
+        comment="When the payload was last rebuilt",
+    )
+
+    def __repr__(self) -> str:
+        return f"<VisitorConversation(visitor_id={self.visitor_id}, version={self.version}, stale={self.stale})>"
+
+
+_table = VisitorConversation.__table__
+
+# Visitor columns that move with every message and presence event. Writes
+# touching only these patch the stored payload instead of marking it stale.
+LIVE_VISITOR_FIELDS = (
+    "is_online",
+    "last_visit_time",
+    "last_offline_time",
+    "last_message_at",
+    "visitor_send_count",
+    "last_message_seq",
+    "last_client_msg_no",
+    "is_last_message_from_visitor",
+    "is_last_message_from_ai",
+    "updated_at",
+)
+
+# Number of activities embedded in each payload, newest first
+RECENT_ACTIVITIES_PER_VISITOR = 10
+
+
+def stale_visitors_statement(visitor_ids: Iterable[UUID]):
+    """Upsert marking the projection rows of ``visitor_ids`` stale.
+
+    Rows are created as stubs when missing, so a rebuild racing with the
+    write cannot store a payload computed before it.
+    """
+    ids = sorted(set(visitor_ids), key=str)
+    source = (
+        select(Visitor.id, Visitor.project_id, literal(1), true())
+        .where(Visitor.id.in_(ids))
+        .order_by(Visitor.id)
+    )
+    stmt = insert(VisitorConversation).from_select(
+        ["visitor_id", "project_id", "version", "stale"], source
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[_table.c.visitor_id],
+        set_={"version": _table.c.version + 1, "stale": True},
+    )
+
+
+def live_visitors_statement(visitor_ids: Iterable[UUID]):
+    """Upsert copying the live columns of ``visitor_ids`` into their projection rows.
+
+    Used instead of ``stale_visitors_statement`` by writers that only change
+    ``LIVE_VISITOR_FIELDS``, so the next read does not rebuild the row. The
+    version is still bumped so a rebuild racing with the write is discarded,
+    and missing rows are created as stale stubs for the same reason (their
+    partial payload is never served).
+    """
+    ids = sorted(set(visitor_ids), key=str)
+    live_fields = []
+    for name in LIVE_VISITOR_FIELDS:
+        live_fields += [literal_column(f"'{name}'"), getattr(Visitor, name)]
+    source = (
+        select(
+            Visitor.id,
+            Visitor.project_id,
+            Visitor.last_message_at,
+            func.jsonb_build_object(*live_fields),
+            literal(1),
+            true(),
+        )
+        .where(Visitor.id.in_(ids))
+        .order_by(Visitor.id)
+    )
+    stmt = insert(VisitorConversation).from_select(
+        ["visitor_id", "project_id", "last_message_at", "payload", "version", "stale"], source
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[_table.c.visitor_id],
+        set_={
+            # A stub's NULL payload stays NULL (|| is strict)
+            "payload": _table.c.payload.op("||")(stmt.excluded.payload),
+            "last_message_at": stmt.excluded.last_message_at,
+            "version": _table.c.version + 1,
+        },
+    )
+
+
+# Prepends activities (a JSON array per visitor) to the stored recent
+# activities and keeps the newest RECENT_ACTIVITIES_PER_VISITOR of them.
+_PREPEND_ACTIVITIES_SQL = text(
+    """
+    UPDATE api_visitor_conversations AS c
+    SET payload = jsonb_set(
+            c.payload,
+            '{recent_activities}',
+            (
+                SELECT COALESCE(jsonb_agg(r.value ORDER BY CAST(r.value->>'occurred_at' AS timestamp) DESC), '[]'::jsonb)
+                FROM (
+                    SELECT e.value
+                    FROM jsonb_array_elements(
+                        CAST(d.activities AS jsonb) || COALESCE(c.payload->'recent_activities', '[]'::jsonb)
+                    ) AS e
+                    ORDER BY CAST(e.value->>'occurred_at' AS timestamp) DESC
+                    LIMIT :keep
+                ) AS r
+            )
+        ),
+        version = c.version + 1
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:activities AS text[])
+    ) AS d(id, activities)
+    WHERE c.visitor_id = d.id
+      AND c.payload IS NOT NULL
+    """
+)
+
+
+def prepend_activities_statement(activities_by_visitor: Dict[UUID, List[dict]]):
+    """Add newly inserted activities to the recent activities of stored payloads.
+
+    ``activities_by_visitor`` maps visitor ids to ``VisitorActivityResponse``
+    JSON dicts. Only pass activities that were actually inserted, or a retried
+    write would embed them twice.
+    """
+    ids = sorted(activities_by_visitor, key=str)
+    return _PREPEND_ACTIVITIES_SQL.bindparams(
+        ids=ids,
+        activities=[json.dumps(activities_by_visitor[v]) for v in ids],
+        keep=RECENT_ACTIVITIES_PER_VISITOR,
+    )
+
+
+def stale_tags_statement(tag_ids: Iterable[str]):
+    """Mark the projection rows of visitors carrying any of ``tag_ids`` stale."""
+    tagged = select(VisitorTag.visitor_id).where(VisitorTag.tag_id.in_(sorted(set(tag_ids))))
+    return (
+        update(VisitorConversation)
+        .where(VisitorConversation.visitor_id.in_(tagged))
+        .values(version=VisitorConversation.version + 1, stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def stale_platforms_statement(platform_ids: Iterable[UUID]):
+    """Mark the projection rows of visitors on any of ``platform_ids`` stale."""
+    return (
+        update(VisitorConversation)
+        .where(VisitorConversation.platform_id.in_(sorted(set(platform_ids), key=str)))
+        .values(version=VisitorConversation.version + 1, stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ---------------------------------------------------------------------------
+# ORM listeners: collect affected visitors per flush, mark them stale once
+# ---------------------------------------------------------------------------
+
+_CHANGES_KEY = "visitor_conversation_changes"
+
+
+def _changes(target) -> Optional[Dict[str, Set]]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(
+        _CHANGES_KEY,
+        {"visitor_ids": set(), "live_visitor_ids": set(), "tag_ids": set(), "platform_ids": set()},
+    )
+
+
+def _visitor_changed(mapper, connection, target: Visitor) -> None:
+    changes = _changes(target)
+    if changes is None:
+        return
+    attrs = inspect(target).attrs
+    changed = {prop.key for prop in mapper.column_attrs if attrs[prop.key].history.has_changes()}
+    if changed.issubset(LIVE_VISITOR_FIELDS):
+        changes["live_visitor_ids"].add(target.id)
+    else:
+        changes["visitor_ids"].add(target.id)
+
+
+def _visitor_relation_changed(mapper, connection, target) -> None:
+    changes = _changes(target)
+    if changes is not None and target.visitor_id is not None:
+        changes["visitor_ids"].add(target.visitor_id)
+
+
+def _tag_changed(mapper, connection, target: Tag) -> None:
+    changes = _changes(target)
+    if changes is not None:
+        changes["tag_ids"].add(target.id)
+
+
+def _platform_changed(mapper, connection, target: Platform) -> None:
+    changes = _changes(target)
+    if changes is not None:
+        changes["platform_ids"].add(target.id)
+
+
+event.listen(Visitor, "after_update", _visitor_changed)
+for _model in (
+    VisitorTag,
+    VisitorAIProfile,
+    VisitorAIInsight,
+    VisitorSystemInfo,
+    VisitorActivity,
+    VisitorSession,
+):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _visitor_relation_changed)
+event.listen(Tag, "after_update", _tag_changed)
+event.listen(Platform, "after_update", _platform_changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_changes(session: Session, flush_context) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    connection = session.connection()
+    if changes["visitor_ids"]:
+        connection.execute(stale_visitors_statement(changes["visitor_ids"]))
+    live_visitor_ids = changes["live_visitor_ids"] - changes["visitor_ids"]
+    if live_visitor_ids:
+        connection.execute(live_visitors_statement(live_visitor_ids))
+    if changes["tag_ids"]:
+        connection.execute(stale_tags_statement(changes["tag_ids"]))
+    if changes["platform_ids"]:
+        connection.execute(stale_platforms_statement(changes["platform_ids"]))
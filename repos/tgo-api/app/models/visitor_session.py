@@ -44,6 +44,8 @@ class VisitorSession(Base):
     staff_id: Mapped[Optional[UUID]] = mapped_column(
         ForeignKey("api_staff.id", ondelete="SET NULL"),
         nullable=True,
+        # Previous value is needed to maintain api_staff_load (see StaffLoad)
+        active_history=True,
         comment="Staff member currently handling this session",
     )
     platform_id: Mapped[Optional[UUID]] = mapped_column(
@@ -57,6 +59,7 @@ class VisitorSession(Base):
         String(20),
         nullable=False,
         default=SessionStatus.OPEN.value,
+        active_history=True,
         comment="Session status: open, closed",
     )
 
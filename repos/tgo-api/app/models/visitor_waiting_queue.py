@@ -5,7 +5,7 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -66,6 +66,16 @@ class VisitorWaitingQueue(Base):
     """
 
     __tablename__ = "api_visitor_waiting_queue"
+    __table_args__ = (
+        # Claim scan: waiting entries of a project in service order
+        Index(
+            "ix_api_visitor_waiting_queue_waiting_order",
+            "project_id",
+            text("priority DESC"),
+            "position",
+            postgresql_where=text("status = 'waiting'"),
+        ),
+    )
 
     # Primary key
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
@@ -178,6 +188,17 @@ class VisitorWaitingQueue(Base):
         comment="When this entry should expire if not assigned",
     )
 
+    # Cross-replica processing claim (see app.services.waiting_queue_claims)
+    claimed_by: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
+        comment="Token of the queue processor currently holding this entry",
+    )
+    claimed_until: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True,
+        comment="Claim visibility timeout; the entry is claimable again after this time",
+    )
+
     # Timestamps
     entered_at: Mapped[datetime] = mapped_column(
         nullable=False,
@@ -273,6 +294,7 @@ class VisitorWaitingQueue(Base):
         self.assigned_at = now
         self.exited_at = now
         self.updated_at = now
+        self.release_claim()
 
     def cancel(self) -> None:
         """Mark this queue entry as cancelled."""
@@ -280,6 +302,7 @@ class VisitorWaitingQueue(Base):
         self.status = WaitingStatus.CANCELLED.value
         self.exited_at = now
         self.updated_at = now
+        self.release_claim()
 
     def expire(self) -> None:
         """Mark this queue entry as expired."""
@@ -287,6 +310,7 @@ class VisitorWaitingQueue(Base):
         self.status = WaitingStatus.EXPIRED.value
         self.exited_at = now
         self.updated_at = now
+        self.release_claim()
 
     def record_attempt(self) -> None:
         """Record an assignment attempt."""
@@ -294,6 +318,11 @@ class VisitorWaitingQueue(Base):
         self.last_attempt_at = now
         self.updated_at = now
 
+    def release_claim(self) -> None:
+        """Drop the processing claim so other processors can pick the entry up."""
+        self.claimed_by = None
+        self.claimed_until = None
+
     @staticmethod
     def urgency_to_priority(urgency: str) -> int:
         """Convert urgency level to priority number."""
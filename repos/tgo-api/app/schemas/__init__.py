@@ -221,6 +221,9 @@ from app.schemas.wukongim import (
 )
 from app.schemas.search import MessageSearchResult, SearchPagination, SearchScope, UnifiedSearchResponse
 from app.schemas.chat import (
+    ChatFileCompleteRequest,
+    ChatFilePresignRequest,
+    ChatFilePresignResponse,
     ChatFileUploadResponse,
     StaffSendPlatformMessageRequest,
     StaffAgentChatRequest,
@@ -411,6 +414,9 @@ __all__ = [
     "BatchUploadSummary",
     "BatchFileUploadResponse",
     # Chat schemas
+    "ChatFileCompleteRequest",
+    "ChatFilePresignRequest",
+    "ChatFilePresignResponse",
     "ChatFileUploadResponse",
     "StaffSendPlatformMessageRequest",
     "OpenAIChatMessage",
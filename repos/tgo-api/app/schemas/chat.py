@@ -40,6 +40,34 @@ class ChatFileUploadResponse(BaseSchema):
     uploaded_by: Optional[str] = Field(None, description="Staff username or 'visitor'")
 
 
+class ChatFilePresignRequest(BaseSchema):
+    """Request for a direct-to-storage upload URL."""
+
+    channel_id: str = Field(..., description="Channel identifier")
+    channel_type: int = Field(..., description="Channel type code")
+    file_name: str = Field(..., max_length=255, description="Original filename")
+    file_size: int = Field(..., gt=0, description="Exact file size in bytes")
+    file_type: Optional[str] = Field(None, description="MIME type (guessed from the filename when omitted)")
+    platform_api_key: Optional[str] = Field(None, description="Platform API key (visitor uploads)")
+
+
+class ChatFilePresignResponse(BaseSchema):
+    """Presigned upload URL and the token to complete the upload with."""
+
+    upload_url: str = Field(..., description="URL to send the file body to")
+    method: str = Field(..., description="HTTP method to use for the upload")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Headers the upload request must carry")
+    upload_token: str = Field(..., description="Token for /chat/upload/complete")
+    expires_in: int = Field(..., description="Seconds until the URL and token expire")
+
+
+class ChatFileCompleteRequest(BaseSchema):
+    """Record a file uploaded through a presigned URL."""
+
+    upload_token: str = Field(..., description="Token returned by /chat/upload/presign")
+    platform_api_key: Optional[str] = Field(None, description="Platform API key (visitor uploads)")
+
+
 class ChatCompletionRequest(BaseSchema):
     """流式聊天请求参数。"""
 
@@ -72,7 +72,9 @@ class WaitingQueueResponse(BaseSchema):
     
     source: str = Field(..., description="Queue entry source")
     urgency: str = Field(..., description="Urgency level")
-    position: int = Field(..., description="Queue position")
+    position: Optional[int] = Field(
+        None, description="1-based place in the waiting queue; null once the entry left it"
+    )
     priority: int = Field(..., description="Priority level")
     status: str = Field(..., description="Queue status")
     
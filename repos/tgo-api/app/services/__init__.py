@@ -7,6 +7,8 @@ from app.services.transfer_service import (
     assign_from_waiting_queue,
     get_waiting_queue_count,
     get_visitor_queue_position,
+    get_queue_entry_rank,
+    get_queue_entry_ranks,
     cancel_visitor_from_queue,
 )
 
@@ -17,5 +19,7 @@ __all__ = [
     "assign_from_waiting_queue",
     "get_waiting_queue_count",
     "get_visitor_queue_position",
+    "get_queue_entry_rank",
+    "get_queue_entry_ranks",
     "cancel_visitor_from_queue",
 ]
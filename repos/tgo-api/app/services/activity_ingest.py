@@ -0,0 +1,474 @@
+"""Buffered ingestion of visitor activities recorded by the widget.
+
+``POST /visitors/activities`` used to insert one ``VisitorActivity`` row and
+update the visitor's ``last_visit_time`` in its own transaction per event, so
+page-view bursts turned directly into row-level write load on the primary.
+
+``VisitorActivityIngestor`` accepts new activities with an id assigned up
+front and acknowledges them immediately; a flusher task writes everything
+collected during the flush interval with one multi-row INSERT per
+``VISITOR_ACTIVITY_MAX_BATCH`` rows and one set-based UPDATE of the visitors'
+``last_visit_time``. Updates of an activity that has not been written yet are
+applied to the buffered row. An update of an activity that is neither
+buffered here nor in the database was most likely accepted by another replica
+that has not flushed it yet; it is queued as a ``PendingActivityUpdate`` and
+retried with every flush until the row appears or
+``VISITOR_ACTIVITY_UPDATE_TTL_SECONDS`` pass, so such an update is
+acknowledged, not rejected. Delivery is best-effort: a batch that still fails
+after ``VISITOR_ACTIVITY_FLUSH_ATTEMPTS`` is dropped and logged, and rows still
+buffered when the process is killed are lost (``aclose`` flushes them on a
+clean shutdown).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import text, update
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.core.logging import get_logger
+from app.models.visitor_activity import VisitorActivity
+from app.models.visitor_conversation import (
+    live_visitors_statement,
+    prepend_activities_statement,
+    stale_visitors_statement,
+)
+from app.schemas.visitor import VisitorActivityResponse
+
+logger = get_logger("services.activity_ingest")
+
+
+@dataclass
+class PendingActivity:
+    """A recorded activity that has not been written yet."""
+
+    project_id: UUID
+    visitor_id: UUID
+    activity_type: str
+    title: str
+    occurred_at: datetime
+    description: Optional[str] = None
+    context: Optional[Dict[str, Any]] = None
+    duration_seconds: Optional[int] = None
+    id: UUID = field(default_factory=uuid4)
+    received_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class PendingActivityUpdate:
+    """An update of an activity not found in this buffer or in the database.
+
+    ``values`` maps ``VisitorActivity`` columns to their new values.
+    """
+
+    id: UUID
+    project_id: UUID
+    visitor_id: UUID
+    values: Dict[str, Any]
+    received_at: datetime = field(default_factory=datetime.utcnow)
+
+
+ActivityWriter = Callable[[List[PendingActivity], datetime], Awaitable[int]]
+ActivityUpdater = Callable[[List[PendingActivityUpdate], datetime], Awaitable[Set[UUID]]]
+
+# Retry cadence of queued updates when no new activities keep the flusher busy
+_UPDATE_RETRY_SECONDS = 0.5
+
+
+_LOCK_SQL = text(
+    """
+    SELECT id FROM api_visitors
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+    ORDER BY id
+    FOR UPDATE
+    """
+)
+
+# Activities of visitors deleted since they were accepted are skipped instead
+# of failing the whole batch on the foreign key; ON CONFLICT makes a retried
+# flush whose first commit succeeded a no-op. RETURNING yields only the rows
+# actually inserted.
+_INSERT_SQL = text(
+    """
+    INSERT INTO api_visitor_activities (
+        id, project_id, visitor_id, activity_type, title, description,
+        context, duration_seconds, occurred_at, created_at, updated_at
+    )
+    SELECT d.id, d.project_id, d.visitor_id, d.activity_type, d.title, d.description,
+           CAST(d.context AS jsonb), d.duration_seconds, d.occurred_at, :now, :now
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:project_ids AS uuid[]),
+        CAST(:visitor_ids AS uuid[]),
+        CAST(:activity_types AS varchar[]),
+        CAST(:titles AS varchar[]),
+        CAST(:descriptions AS text[]),
+        CAST(:contexts AS text[]),
+        CAST(:durations AS integer[]),
+        CAST(:occurred_ats AS timestamp[])
+    ) AS d(id, project_id, visitor_id, activity_type, title, description,
+           context, duration_seconds, occurred_at)
+    JOIN api_visitors AS v ON v.id = d.visitor_id
+    ON CONFLICT DO NOTHING
+    RETURNING id
+    """
+)
+
+# last_visit_time only moves forward, whatever order batches commit in
+_TOUCH_VISITORS_SQL = text(
+    """
+    UPDATE api_visitors AS v
+    SET last_visit_time = GREATEST(v.last_visit_time, d.seen_at),
+        updated_at = now()
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:seen_ats AS timestamp[])
+    ) AS d(id, seen_at)
+    WHERE v.id = d.id
+    """
+)
+
+
+async def write_visitor_activities(activities: List[PendingActivity], now: datetime) -> int:
+    """Insert activities and touch their visitors in one transaction.
+
+    Returns the number of activities inserted.
+    """
+    seen_at: Dict[UUID, datetime] = {}
+    for activity in activities:
+        if activity.visitor_id not in seen_at or activity.received_at > seen_at[activity.visitor_id]:
+            seen_at[activity.visitor_id] = activity.received_at
+    visitor_ids = sorted(seen_at)
+
+    params = {
+        "ids": [a.id for a in activities],
+        "project_ids": [a.project_id for a in activities],
+        "visitor_ids": [a.visitor_id for a in activities],
+        "activity_types": [a.activity_type for a in activities],
+        "titles": [a.title for a in activities],
+        "descriptions": [a.description for a in activities],
+        "contexts": [json.dumps(a.context) if a.context is not None else None for a in activities],
+        "durations": [a.duration_seconds for a in activities],
+        "occurred_ats": [a.occurred_at for a in activities],
+        "now": now,
+    }
+    async with async_session_scope() as db:
+        # Same lock order as the msg.notify stats flush, so the two cannot deadlock
+        await db.execute(_LOCK_SQL, {"ids": visitor_ids})
+        inserted = {row.id for row in await db.execute(_INSERT_SQL, params)}
+        await db.execute(
+            _TOUCH_VISITORS_SQL,
+            {"ids": visitor_ids, "seen_ats": [seen_at[v] for v in visitor_ids]},
+        )
+        # Raw SQL bypasses the ORM listeners; patch the projection rows in place
+        await db.execute(live_visitors_statement(visitor_ids))
+        new_activities: Dict[UUID, List[dict]] = {}
+        for activity in activities:
+            if activity.id in inserted:
+                new_activities.setdefault(activity.visitor_id, []).append(_activity_json(activity))
+        if new_activities:
+            await db.execute(prepend_activities_statement(new_activities))
+        return len(inserted)
+
+
+async def update_visitor_activities(updates: List[PendingActivityUpdate], now: datetime) -> Set[UUID]:
+    """Apply queued updates to written activities in one transaction.
+
+    Returns the ids of the activities updated; the others are not written yet.
+    """
+    visitor_ids = sorted({u.visitor_id for u in updates})
+    applied: Set[UUID] = set()
+    seen_at: Dict[UUID, datetime] = {}
+    async with async_session_scope() as db:
+        await db.execute(_LOCK_SQL, {"ids": visitor_ids})
+        for pending in updates:
+            result = await db.execute(
+                update(VisitorActivity)
+                .where(
+                    VisitorActivity.id == pending.id,
+                    VisitorActivity.project_id == pending.project_id,
+                    VisitorActivity.visitor_id == pending.visitor_id,
+                    VisitorActivity.deleted_at.is_(None),
+                )
+                .values(**pending.values, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                applied.add(pending.id)
+                if pending.visitor_id not in seen_at or pending.received_at > seen_at[pending.visitor_id]:
+                    seen_at[pending.visitor_id] = pending.received_at
+        if seen_at:
+            touched = sorted(seen_at)
+            await db.execute(
+                _TOUCH_VISITORS_SQL,
+                {"ids": touched, "seen_ats": [seen_at[v] for v in touched]},
+            )
+            # Embedded recent activities may show the old values; rebuild on read
+            await db.execute(stale_visitors_statement(touched))
+    return applied
+
+
+def _activity_json(activity: PendingActivity) -> dict:
+    """Projection payload entry of an inserted activity."""
+    return VisitorActivityResponse(
+        id=activity.id,
+        activity_type=activity.activity_type,
+        title=activity.title,
+        description=activity.description,
+        occurred_at=activity.occurred_at,
+        duration_seconds=activity.duration_seconds,
+        context=activity.context,
+    ).model_dump(mode="json")
+
+
+class VisitorActivityIngestor:
+    """Write-behind buffer for new visitor activities.
+
+    Args:
+        flush_interval: Seconds to collect activities before a flush
+        max_batch: Flush early once this many activities are pending; also
+            the number of rows per INSERT
+        max_pending: Callers of ``submit`` wait for a flush above this many
+            pending activities
+        max_attempts: Write attempts per batch before it is dropped
+        update_ttl: Seconds a queued update is retried before it is dropped
+        writer: Coroutine writing a batch (defaults to the database writer)
+        updater: Coroutine applying queued updates (defaults to the database
+            updater)
+    """
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        update_ttl: Optional[float] = None,
+        writer: Optional[ActivityWriter] = None,
+        updater: Optional[ActivityUpdater] = None,
+    ) -> None:
+        self.flush_interval = (
+            settings.VISITOR_ACTIVITY_FLUSH_INTERVAL_MS / 1000.0
+            if flush_interval is None
+            else flush_interval
+        )
+        self.max_batch = max(1, max_batch or settings.VISITOR_ACTIVITY_MAX_BATCH)
+        self.max_pending = max(self.max_batch, max_pending or settings.VISITOR_ACTIVITY_MAX_PENDING)
+        self.max_attempts = max(1, max_attempts or settings.VISITOR_ACTIVITY_FLUSH_ATTEMPTS)
+        self.update_ttl = (
+            settings.VISITOR_ACTIVITY_UPDATE_TTL_SECONDS if update_ttl is None else update_ttl
+        )
+        self._writer = writer or write_visitor_activities
+        self._updater = updater or update_visitor_activities
+
+        self._pending: Dict[UUID, PendingActivity] = {}
+        self._updates: Dict[UUID, PendingActivityUpdate] = {}
+        self._in_flight: Dict[UUID, PendingActivity] = {}
+        self._flushed: Optional[asyncio.Future] = None
+        self._waiters: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.dropped_updates = 0
+
+    async def submit(self, activity: PendingActivity) -> None:
+        """Buffer a new activity; returns once it is queued, not written."""
+        self._ensure_started()
+        was_empty = not self._pending
+        self._pending[activity.id] = activity
+        if was_empty or len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        if len(self._pending) >= self.max_pending:
+            # Backpressure: the writer is behind, hold this caller until it catches up
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+
+    def defer_update(self, pending: PendingActivityUpdate) -> None:
+        """Queue an update of an activity that is not written yet.
+
+        Retried after every flush until it applies or ``update_ttl`` passes;
+        a later update of the same activity is merged into the queued one.
+        """
+        self._ensure_started()
+        queued = self._updates.get(pending.id)
+        if queued is not None and (queued.project_id, queued.visitor_id) == (
+            pending.project_id,
+            pending.visitor_id,
+        ):
+            # A new object, so a retry running right now does not consume it
+            pending.values = {**queued.values, **pending.values}
+        self._updates[pending.id] = pending
+        self._wakeup.set()
+
+    def take_update(self, activity_id: UUID) -> Optional[PendingActivityUpdate]:
+        """Remove and return the queued update of ``activity_id``, if any.
+
+        Callers updating the written row apply it first, so a later retry
+        cannot overwrite their newer values.
+        """
+        return self._updates.pop(activity_id, None)
+
+    async def find_pending(self, activity_id: UUID) -> Optional[PendingActivity]:
+        """The buffered activity ``activity_id``, if it has not been written yet.
+
+        Changes to the returned object are written with it, as long as they
+        are made before the caller's next ``await``. When the activity is
+        being written right now this waits for that flush and returns None,
+        so the caller finds the row in the database instead.
+        """
+        activity = self._pending.get(activity_id)
+        if activity is not None:
+            return activity
+        if activity_id in self._in_flight and self._flushed is not None:
+            await asyncio.shield(self._flushed)
+        return None
+
+    async def aclose(self) -> None:
+        """Flush what is pending and stop the flusher task."""
+        if self._task is None or self._task.done():
+            return
+        if self._flushed is not None:
+            await asyncio.shield(self._flushed)
+        if self._pending or self._updates:
+            await self._flush()
+        if self._updates:
+            logger.warning(
+                "Dropping queued visitor activity updates on shutdown",
+                extra={"updates": len(self._updates)},
+            )
+            self.dropped_updates += len(self._updates)
+            self._updates = {}
+        # The flag covers a cancel swallowed by a wakeup racing with it
+        self._stopping = True
+        self._wakeup.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        # (Re)create loop-bound state; a new loop (e.g. in tests) starts fresh
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._flushed = None
+        self._stopping = False
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            if not self._pending and not self._updates:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = self.flush_interval
+            if not self._pending:
+                delay = max(delay, _UPDATE_RETRY_SECONDS)
+            if len(self._pending) < self.max_batch and delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush()
+
+    async def _flush(self) -> None:
+        batch, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, []
+        if not batch:
+            await self._apply_updates()
+            return
+
+        flushed = asyncio.get_running_loop().create_future()
+        self._in_flight, self._flushed = batch, flushed
+        try:
+            activities = list(batch.values())
+            now = datetime.utcnow()
+            for start in range(0, len(activities), self.max_batch):
+                await self._write_chunk(activities[start:start + self.max_batch], now)
+            await self._apply_updates()
+        finally:
+            if self._flushed is flushed:
+                self._in_flight, self._flushed = {}, None
+            flushed.set_result(None)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def _write_chunk(self, chunk: List[PendingActivity], now: datetime) -> None:
+        error: Optional[BaseException] = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                inserted = await self._writer(chunk, now)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                logger.warning(
+                    "Visitor activity flush failed",
+                    extra={"attempt": attempt, "activities": len(chunk), "error": str(e)},
+                )
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(min(0.05 * 2 ** (attempt - 1), 1.0))
+
+        if error is None:
+            self.flushes += 1
+            logger.debug(
+                "Flushed visitor activities",
+                extra={"activities": len(chunk), "inserted": inserted},
+            )
+        else:
+            self.failed_flushes += 1
+            self.dropped += len(chunk)
+            logger.error(
+                "Dropping visitor activity batch",
+                extra={"activities": len(chunk), "error": str(error)},
+            )
+
+    async def _apply_updates(self) -> None:
+        if not self._updates:
+            return
+        now = datetime.utcnow()
+        updates = list(self._updates.values())
+        try:
+            applied = await self._updater(updates, now)
+        except Exception as e:
+            # Kept queued; the next flush retries them
+            logger.warning(
+                "Applying queued visitor activity updates failed",
+                extra={"updates": len(updates), "error": str(e)},
+            )
+            applied = set()
+
+        for pending in updates:
+            # A newer update of the same activity may have been merged meanwhile
+            if self._updates.get(pending.id) is not pending:
+                continue
+            if pending.id in applied:
+                del self._updates[pending.id]
+            elif (now - pending.received_at).total_seconds() > self.update_ttl:
+                del self._updates[pending.id]
+                self.dropped_updates += 1
+                logger.warning(
+                    "Dropping visitor activity update, activity not found",
+                    extra={"activity_id": str(pending.id)},
+                )
+
+
+visitor_activity_ingestor = VisitorActivityIngestor()
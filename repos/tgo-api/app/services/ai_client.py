@@ -12,6 +12,7 @@ from fastapi import HTTPException
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.upstream import UpstreamDeadlineExceeded, UpstreamError, get_upstream
 
 logger = get_logger("ai_client")
 
@@ -23,6 +24,7 @@ class AIServiceClient:
         self.base_url = str(settings.AI_SERVICE_URL).rstrip("/")
         self.timeout = settings.AI_SERVICE_TIMEOUT
         self.api_key = settings.AI_SERVICE_API_KEY
+        self.upstream = get_upstream("ai")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for AI service requests (no auth required by downstream)."""
@@ -89,32 +91,28 @@ class AIServiceClient:
         )
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                kwargs: Dict[str, Any] = {
-                    "method": method,
-                    "url": url,
-                    "headers": headers,
-                    "params": params,
+            kwargs: Dict[str, Any] = {
+                "headers": headers,
+                "params": params,
+            }
+            if json_data is not None:
+                kwargs["json"] = self._to_jsonable(json_data)
+            if content is not None:
+                kwargs["content"] = content
+            response = await self.upstream.request(method, endpoint, **kwargs)
+
+            logger.info(
+                f"AI service response: {response.status_code}",
+                extra={
+                    "request_id": request_id,
+                    "status_code": response.status_code,
+                    "response_time": response.elapsed.total_seconds() if response.elapsed else None,
                 }
-                if json_data is not None:
-                    kwargs["json"] = self._to_jsonable(json_data)
-                if content is not None:
-                    kwargs["content"] = content
-                response = await client.request(**kwargs
-                )
-
-                logger.info(
-                    f"AI service response: {response.status_code}",
-                    extra={
-                        "request_id": request_id,
-                        "status_code": response.status_code,
-                        "response_time": response.elapsed.total_seconds() if response.elapsed else None,
-                    }
-                )
-
-                return response
-
-        except httpx.TimeoutException as e:
+            )
+
+            return response
+
+        except (httpx.TimeoutException, UpstreamDeadlineExceeded) as e:
             logger.error(
                 f"AI service timeout: {url}",
                 extra={"request_id": request_id, "timeout": self.timeout}
@@ -123,6 +121,15 @@ class AIServiceClient:
                 status_code=504,
                 detail="AI service request timed out"
             )
+        except UpstreamError as e:
+            logger.warning(
+                f"AI service request rejected: {e}",
+                extra={"request_id": request_id, "error": str(e)}
+            )
+            raise HTTPException(
+                status_code=503,
+                detail="AI service is temporarily unavailable"
+            )
         except httpx.RequestError as e:
             logger.error(
                 f"AI service request error: {e}",
@@ -252,61 +259,63 @@ class AIServiceClient:
         )
 
         try:
-            async with httpx.AsyncClient(timeout=None) as client:
-                async with client.stream(
-                    "POST",
-                    url,
-                    headers=headers,
-                    json=self._to_jsonable(payload),
-                    params={"project_id": project_id},
-                ) as response:
-                    if response.status_code != 200:
-                        try:
-                            error_data = await response.json()
-                        except Exception:
-                            error_body = await response.aread()
-                            error_data = {"error": error_body.decode("utf-8", errors="ignore")}
-                        logger.warning(
-                            "AI service stream error: %s",
-                            response.status_code,
-                            extra={"request_id": request_id, "detail": error_data},
-                        )
-                        raise HTTPException(status_code=response.status_code, detail=error_data)
-
-                    event_name: Optional[str] = None
-                    data_lines: List[str] = []
-
-                    async for line in response.aiter_lines():
-                        if not line:
-                            if not data_lines:
-                                event_name = None
-                                continue
-                            data_text = '\n'.join(data_lines)
-                            try:
-                                parsed = json.loads(data_text)
-                            except json.JSONDecodeError:
-                                parsed = data_text
-                            yield (event_name or "message", parsed)
+            async with self.upstream.stream(
+                "POST",
+                "/api/v1/agents/run",
+                headers=headers,
+                json=self._to_jsonable(payload),
+                params={"project_id": project_id},
+            ) as response:
+                if response.status_code != 200:
+                    try:
+                        error_data = await response.json()
+                    except Exception:
+                        error_body = await response.aread()
+                        error_data = {"error": error_body.decode("utf-8", errors="ignore")}
+                    logger.warning(
+                        "AI service stream error: %s",
+                        response.status_code,
+                        extra={"request_id": request_id, "detail": error_data},
+                    )
+                    raise HTTPException(status_code=response.status_code, detail=error_data)
+
+                event_name: Optional[str] = None
+                data_lines: List[str] = []
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        if not data_lines:
                             event_name = None
-                            data_lines = []
-                            continue
-                        if line.startswith(":"):
                             continue
-                        if line.startswith("event:"):
-                            event_name = line.split(":", 1)[1].strip()
-                        elif line.startswith("data:"):
-                            data_lines.append(line.split(":", 1)[1].strip())
-
-                    if data_lines:
                         data_text = '\n'.join(data_lines)
                         try:
                             parsed = json.loads(data_text)
                         except json.JSONDecodeError:
                             parsed = data_text
                         yield (event_name or "message", parsed)
-        except httpx.TimeoutException:
+                        event_name = None
+                        data_lines = []
+                        continue
+                    if line.startswith(":"):
+                        continue
+                    if line.startswith("event:"):
+                        event_name = line.split(":", 1)[1].strip()
+                    elif line.startswith("data:"):
+                        data_lines.append(line.split(":", 1)[1].strip())
+
+                if data_lines:
+                    data_text = '\n'.join(data_lines)
+                    try:
+                        parsed = json.loads(data_text)
+                    except json.JSONDecodeError:
+                        parsed = data_text
+                    yield (event_name or "message", parsed)
+        except (httpx.TimeoutException, UpstreamDeadlineExceeded):
             logger.error("AI service stream timeout: %s", url, extra={"request_id": request_id})
             raise HTTPException(status_code=504, detail="AI service stream timed out")
+        except UpstreamError as exc:
+            logger.warning("AI service stream rejected: %s", exc, extra={"request_id": request_id})
+            raise HTTPException(status_code=503, detail="AI service is temporarily unavailable")
         except httpx.RequestError as exc:
             logger.error("AI service stream request error: %s", exc, extra={"request_id": request_id})
             raise HTTPException(status_code=502, detail="Failed to connect to AI service")
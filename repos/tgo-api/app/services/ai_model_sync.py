@@ -7,6 +7,7 @@ import httpx
 
 from app.core.config import settings
 from app.models.ai_model import AIModel
+from app.services.upstream import get_upstream
 
 
 def _model_to_upsert(item: AIModel) -> dict[str, Any]:
@@ -33,11 +34,11 @@ def _build_headers() -> dict[str, str]:
 
 
 async def sync_models(items: Sequence[AIModel]) -> tuple[bool, Optional[str], Optional[dict]]:
-    url = f"{settings.AI_SERVICE_URL.rstrip('/')}/api/v1/llm-models/sync"
     payload = {"models": [_model_to_upsert(x) for x in items]}
     try:
-        async with httpx.AsyncClient(timeout=settings.AI_SERVICE_TIMEOUT) as client:
-            resp = await client.post(url, json=payload, headers=_build_headers())
+        resp = await get_upstream("ai").request(
+            "POST", "/api/v1/llm-models/sync", json=payload, headers=_build_headers()
+        )
         if resp.status_code >= 400:
             return False, f"{resp.status_code} {resp.text}", None
         try:
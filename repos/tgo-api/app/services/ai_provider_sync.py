@@ -8,6 +8,7 @@ import httpx
 from app.core.config import settings
 from app.models.ai_provider import AIProvider
 from app.utils.crypto import decrypt_str
+from app.services.upstream import get_upstream
 
 
 def _map_kind_and_vendor(provider: str, config: Optional[dict] = None) -> tuple[str, Optional[str]]:
@@ -82,11 +83,11 @@ def _build_headers() -> dict[str, str]:
 
 
 async def sync_providers(items: Sequence[AIProvider]) -> tuple[bool, Optional[str], Optional[dict]]:
-    url = f"{settings.AI_SERVICE_URL.rstrip('/')}/api/v1/llm-providers/sync"
     payload = {"providers": [_provider_to_upsert(x) for x in items]}
     try:
-        async with httpx.AsyncClient(timeout=settings.AI_SERVICE_TIMEOUT) as client:
-            resp = await client.post(url, json=payload, headers=_build_headers())
+        resp = await get_upstream("ai").request(
+            "POST", "/api/v1/llm-providers/sync", json=payload, headers=_build_headers()
+        )
         if resp.status_code >= 400:
             return False, f"{resp.status_code} {resp.text}", None
         try:
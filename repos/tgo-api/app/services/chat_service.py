@@ -26,7 +26,9 @@ from app.models import (
 import app.services.visitor_service as visitor_service
 from app.tasks.process_waiting_queue import trigger_process_entry
 from app.services.wukongim_client import wukongim_client
+from app.services.wukongim_stream import WuKongIMStreamForwarder
 from app.services.ai_client import AIServiceClient
+from app.services.run_registry import run_registry
 from app.utils.encoding import build_project_staff_channel_id
 from app.utils.const import (
     CHANNEL_TYPE_PROJECT_STAFF,
@@ -53,15 +55,8 @@ def validate_platform_and_project(
     db: Session
 ) -> tuple[Platform, Project]:
     """Validate Platform API key and return platform with project."""
-    platform = (
-        db.query(Platform)
-        .filter(
-            Platform.api_key == platform_api_key,
-            Platform.is_active.is_(True),
-            Platform.deleted_at.is_(None),
-        )
-        .first()
-    )
+    from app.core.security import get_active_platform_by_api_key
+    platform = get_active_platform_by_api_key(db, platform_api_key)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -127,15 +122,8 @@ def authenticate_staff_or_platform(
                 )
 
     if not current_user and platform_api_key:
-        platform = (
-            db.query(Platform)
-            .filter(
-                Platform.api_key == platform_api_key,
-                Platform.is_active.is_(True),
-                Platform.deleted_at.is_(None),
-            )
-            .first()
-        )
+        from app.core.security import get_active_platform_by_api_key
+        platform = get_active_platform_by_api_key(db, platform_api_key)
 
     return current_user, platform
 
@@ -144,6 +132,20 @@ def authenticate_staff_or_platform(
 # AI Integration Logic
 # ============================================================================
 
+def _extract_chunk_text(data: Dict[str, Any]) -> Optional[str]:
+    """Robust extraction of the content chunk from an AI event's data."""
+    chunk_text = data.get("content_chunk") or data.get("content") or data.get("text")
+    if not chunk_text and isinstance(data, dict):
+        inner_data = data.get("data", {})
+        if isinstance(inner_data, dict):
+            chunk_text = (
+                inner_data.get("content_chunk")
+                or inner_data.get("content")
+                or inner_data.get("text")
+            )
+    return None if chunk_text is None else str(chunk_text)
+
+
 async def forward_ai_event_to_wukongim(
     event_type: str,
     event_data: Dict[str, Any],
@@ -151,6 +153,7 @@ async def forward_ai_event_to_wukongim(
     channel_type: int,
     client_msg_no: str,
     from_uid: str,
+    forwarder: Optional[WuKongIMStreamForwarder] = None,
 ) -> Optional[str]:
     """Forward AI event to WuKongIM using the new Stream API.
 
@@ -159,86 +162,122 @@ async def forward_ai_event_to_wukongim(
       agent_content_chunk      → send_stream_event (stream.delta)
       workflow_completed / agent_response_complete → close + finish
       workflow_failed          → send_stream_event (stream.error)
+
+    With a ``forwarder`` the event is only queued on the run's outbound queue
+    and delivered (coalesced, in order) by its sender task, so this returns
+    without waiting on WuKongIM. Without one, the event is delivered before
+    returning.
     """
+    owns_forwarder = forwarder is None
+    if forwarder is None:
+        forwarder = WuKongIMStreamForwarder(
+            channel_id=channel_id,
+            channel_type=channel_type,
+            client_msg_no=client_msg_no,
+            from_uid=from_uid,
+        )
+
+    chunk_str: Optional[str] = None
     try:
         data = event_data.get("data") or {}
-        logger.info(f"Forwarding AI event {event_type} to WuKongIM: {data}")
+        logger.debug(
+            f"Forwarding AI event {event_type} to WuKongIM",
+            extra={"client_msg_no": client_msg_no},
+        )
 
         if event_type == "agent_execution_started":
             # Send stream anchor message
-            await wukongim_client.send_stream_message(
-                from_uid=from_uid,
-                channel_id=channel_id,
-                channel_type=channel_type,
-                client_msg_no=client_msg_no,
-                payload={"type": 100, "content": "AI 正在思考中..."},
-            )
+            forwarder.send_anchor({"type": 100, "content": "AI 正在思考中..."})
 
         elif event_type == "agent_content_chunk":
-            # Robust extraction of content from data
-            chunk_text = data.get("content_chunk") or data.get("content") or data.get("text")
-            if not chunk_text and isinstance(data, dict):
-                inner_data = data.get("data", {})
-                if isinstance(inner_data, dict):
-                    chunk_text = (
-                        inner_data.get("content_chunk")
-                        or inner_data.get("content")
-                        or inner_data.get("text")
-                    )
-
-            if chunk_text is not None:
-                chunk_str = str(chunk_text)
-                if not chunk_str:
-                    return None
-                await wukongim_client.send_stream_event(
-                    channel_id=channel_id,
-                    channel_type=channel_type,
-                    client_msg_no=client_msg_no,
-                    event_id=uuid4().hex,
-                    event_type="stream.delta",
-                    event_key="main",
-                    from_uid=from_uid,
-                    payload={"kind": "text", "delta": chunk_str},
-                )
-                return chunk_str
+            chunk_str = _extract_chunk_text(data)
+            if chunk_str:
+                forwarder.send_delta(chunk_str)
+            else:
+                chunk_str = None
 
         elif event_type in {"workflow_completed", "agent_response_complete"}:
             # Close the stream channel, then finish the entire message
-            await wukongim_client.send_stream_event(
-                channel_id=channel_id,
-                channel_type=channel_type,
-                client_msg_no=client_msg_no,
-                event_id=uuid4().hex,
-                event_type="stream.close",
-                event_key="main",
-                from_uid=from_uid,
-            )
-            await wukongim_client.send_stream_event(
-                channel_id=channel_id,
-                channel_type=channel_type,
-                client_msg_no=client_msg_no,
-                event_id=uuid4().hex,
-                event_type="stream.finish",
-                event_key="main",
-                from_uid=from_uid,
-            )
+            forwarder.send_event("stream.close")
+            forwarder.send_event("stream.finish")
 
         elif event_type == "workflow_failed":
             error_message = data.get("error") or "AI processing failed"
-            await wukongim_client.send_stream_event(
-                channel_id=channel_id,
-                channel_type=channel_type,
-                client_msg_no=client_msg_no,
-                event_id=uuid4().hex,
-                event_type="stream.error",
-                event_key="main",
-                from_uid=from_uid,
-                payload={"error": str(error_message)},
-            )
+            forwarder.send_event("stream.error", payload={"error": str(error_message)})
 
     except Exception as e:
         logger.error(f"Failed to forward AI event {event_type} to WuKongIM: {e}")
-    return None
+    finally:
+        if owns_forwarder:
+            await forwarder.aclose()
+    return chunk_str
+
+
+class _RunCancellation:
+    """Cancels a supervisor run streamed by this replica as soon as it is asked to.
+
+    Registers the client_msg_no -> run_id mapping when the run starts and
+    watches the run registry, so a cancel marked on any replica is sent to
+    the AI service right away (or as soon as run_id is known).
+    """
+
+    def __init__(self, project_id: str, client_msg_no: str, session_id: Optional[str]) -> None:
+        self.project_id = project_id
+        self.client_msg_no = client_msg_no
+        self.session_id = session_id
+        self.run_id: Optional[str] = None
+        self._requested = False
+        self._reason: Optional[str] = None
+        self._sent = False
+        run_registry.watch(client_msg_no, self._on_cancel)
+
+    async def _on_cancel(self, reason: Optional[str]) -> None:
+        self._requested = True
+        self._reason = reason
+        if self.run_id:
+            await self._send(reason)
+
+    async def observe(self, event_type: Optional[str], data: Any) -> None:
+        """Pick up run_id from the stream and honour cancels queued before it."""
+        if event_type != "agent_execution_started" or self.run_id or not isinstance(data, dict):
+            return
+        run_id = (data.get("data") or {}).get("execution_id")
+        if not run_id:
+            return
+        self.run_id = str(run_id)
+        try:
+            pending, reason = await run_registry.set_mapping_and_check_pending(
+                client_msg_no=self.client_msg_no,
+                run_id=self.run_id,
+                project_id=self.project_id,
+                api_key=None,
+                session_id=self.session_id,
+            )
+            if pending or self._requested:
+                await self._send(reason if pending else self._reason)
+        except Exception as e:
+            logger.warning(
+                f"Failed to register AI run for cancellation: {e}",
+                extra={"client_msg_no": self.client_msg_no},
+            )
+
+    async def _send(self, reason: Optional[str]) -> None:
+        if self._sent:
+            return
+        self._sent = True
+        logger.info(
+            "Cancelling AI run",
+            extra={"client_msg_no": self.client_msg_no, "run_id": self.run_id},
+        )
+        await ai_client.cancel_supervisor_run(
+            project_id=self.project_id,
+            run_id=self.run_id,
+            reason=reason,
+        )
+
+    async def aclose(self) -> None:
+        run_registry.unwatch(self.client_msg_no)
+        await run_registry.clear(self.client_msg_no)
 
 
 async def process_ai_stream_to_wukongim(
@@ -256,7 +295,15 @@ async def process_ai_stream_to_wukongim(
 ):
     """Process AI stream and forward events to WuKongIM, while yielding events for SSE."""
     full_content = ""
+    forwarder = WuKongIMStreamForwarder(
+        channel_id=channel_id,
+        channel_type=channel_type,
+        client_msg_no=client_msg_no,
+        from_uid=from_uid,
+    )
     
+    cancellation = _RunCancellation(project_id, client_msg_no, session_id)
+
     # 1) Notify acceptance immediately (caller may already have done this, but here for consistency)
     # yield {"event_type": "accepted", "visitor_id": visitor_id, "client_msg_no": client_msg_no}
 
@@ -275,6 +322,7 @@ async def process_ai_stream_to_wukongim(
             event_type = data.get("event_type") if isinstance(data, dict) else None
             if not event_type:
                 event_type = stream_event_type
+            await cancellation.observe(event_type, data)
             # Forward to WuKongIM
             content_chunk = await forward_ai_event_to_wukongim(
                 event_type=event_type,
@@ -283,6 +331,7 @@ async def process_ai_stream_to_wukongim(
                 channel_type=channel_type,
                 client_msg_no=client_msg_no,
                 from_uid=from_uid,
+                forwarder=forwarder,
             )
             if content_chunk:
                 full_content += content_chunk
@@ -300,9 +349,13 @@ async def process_ai_stream_to_wukongim(
             channel_type=channel_type,
             client_msg_no=client_msg_no,
             from_uid=from_uid,
+            forwarder=forwarder,
         )
         yield {"event_type": "workflow_failed", "data": error_data}
-    
+    finally:
+        # Queued events keep draining in the background
+        forwarder.close()
+        await cancellation.aclose()
 
 
 async def handle_ai_response_non_stream(
@@ -321,7 +374,14 @@ async def handle_ai_response_non_stream(
     """Handle AI completion in a non-streaming way, while still forwarding to WuKongIM."""
     full_content = ""
     last_data = {}
-    
+    forwarder = WuKongIMStreamForwarder(
+        channel_id=channel_id,
+        channel_type=channel_type,
+        client_msg_no=client_msg_no,
+        from_uid=from_uid,
+    )
+    cancellation = _RunCancellation(project_id, client_msg_no, session_id)
+
     try:
         async for stream_event_type, data in ai_client.run_supervisor_agent_stream(
             project_id=project_id,
@@ -336,6 +396,7 @@ async def handle_ai_response_non_stream(
             event_type = data.get("event_type") if isinstance(data, dict) else None
             if not event_type:
                 event_type = stream_event_type
+            await cancellation.observe(event_type, data)
             content_chunk = await forward_ai_event_to_wukongim(
                 event_type=event_type,
                 event_data=data,
@@ -343,6 +404,7 @@ async def handle_ai_response_non_stream(
                 channel_type=channel_type,
                 client_msg_no=client_msg_no,
                 from_uid=from_uid,
+                forwarder=forwarder,
             )
             if content_chunk:
                 full_content += content_chunk
@@ -359,8 +421,12 @@ async def handle_ai_response_non_stream(
             channel_type=channel_type,
             client_msg_no=client_msg_no,
             from_uid=from_uid,
+            forwarder=forwarder,
         )
         return {"success": False, "error": str(e)}
+    finally:
+        forwarder.close()
+        await cancellation.aclose()
 
 
 async def run_background_ai_interaction(
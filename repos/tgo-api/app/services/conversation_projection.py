@@ -0,0 +1,207 @@
+"""Reads and lazy rebuilds of the conversation-list projection.
+
+``load_conversation_summaries`` serves a page of conversation lists from
+``api_visitor_conversations`` with one primary-key lookup. Message, presence
+and activity writes patch stored rows in place; rows that are missing, marked
+stale by any other write (see ``app.models.visitor_conversation``) or older
+than ``CONVERSATION_PROJECTION_MAX_AGE_SECONDS`` are rebuilt with the
+batch loaders in ``visitor_queries`` and stored back, unless a write bumped
+their ``version`` while they were being rebuilt.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.core.logging import get_logger
+from app.models import VisitorConversation
+from app.models.visitor_conversation import RECENT_ACTIVITIES_PER_VISITOR
+from app.schemas.visitor import VisitorResponse
+
+logger = get_logger("services.conversation_projection")
+
+
+@dataclass
+class ConversationSummary:
+    """Projection of one visitor conversation."""
+
+    visitor_id: UUID
+    payload: Dict[str, Any]
+    service_status: Optional[str] = None
+    assigned_staff_id: Optional[UUID] = None
+    tag_ids: List[str] = field(default_factory=list)
+    version: int = 0
+
+    def visitor_response(self) -> VisitorResponse:
+        """Fresh (unlocalized) VisitorResponse built from the stored payload."""
+        return VisitorResponse.model_validate(self.payload)
+
+
+def needs_refresh(row: Any, now: datetime, max_age_seconds: int) -> bool:
+    """Whether a stored projection row must be rebuilt before use."""
+    if row is None or row.stale or row.payload is None or row.refreshed_at is None:
+        return True
+    return row.refreshed_at < now - timedelta(seconds=max_age_seconds)
+
+
+async def load_conversation_summaries(
+    db: AsyncSession,
+    visitor_ids: Iterable[UUID],
+    project_id: UUID,
+) -> Dict[UUID, ConversationSummary]:
+    """Conversation summaries of the given visitors (deleted visitors are omitted)."""
+    ids = list(dict.fromkeys(visitor_ids))
+    if not ids:
+        return {}
+
+    rows = (
+        await db.execute(
+            select(VisitorConversation).where(
+                VisitorConversation.visitor_id.in_(ids),
+                VisitorConversation.project_id == project_id,
+            )
+        )
+    ).scalars().all()
+    stored = {row.visitor_id: row for row in rows}
+
+    now = datetime.utcnow()
+    max_age = settings.CONVERSATION_PROJECTION_MAX_AGE_SECONDS
+    summaries: Dict[UUID, ConversationSummary] = {}
+    to_rebuild: Dict[UUID, int] = {}
+    for visitor_id in ids:
+        row = stored.get(visitor_id)
+        if needs_refresh(row, now, max_age):
+            to_rebuild[visitor_id] = row.version if row is not None else 0
+            continue
+        summaries[visitor_id] = ConversationSummary(
+            visitor_id=visitor_id,
+            payload=row.payload,
+            service_status=row.service_status,
+            assigned_staff_id=row.assigned_staff_id,
+            tag_ids=list(row.tag_ids or []),
+            version=row.version,
+        )
+
+    if to_rebuild:
+        rebuilt = await _rebuild(db, to_rebuild, project_id)
+        summaries.update(rebuilt)
+        try:
+            await _store(rebuilt, to_rebuild, project_id, now)
+        except Exception as e:
+            # Serving the freshly built data is enough; the rows stay stale
+            logger.warning(f"Failed to store conversation projections: {e}")
+
+    return {visitor_id: summaries[visitor_id] for visitor_id in ids if visitor_id in summaries}
+
+
+async def _rebuild(
+    db: AsyncSession,
+    expected_versions: Dict[UUID, int],
+    project_id: UUID,
+) -> Dict[UUID, ConversationSummary]:
+    # Imported lazily: the endpoint modules import this service
+    from app.api.v1.endpoints.channels import _compose_base_visitor_payload
+    from app.services.visitor_queries import (
+        load_open_session_staff,
+        load_recent_activities,
+        load_visitors_with_relations,
+    )
+
+    visitor_map = await load_visitors_with_relations(db, expected_versions, project_id)
+    visitor_to_staff = await load_open_session_staff(db, visitor_map.keys(), project_id)
+    activities_by_visitor = await load_recent_activities(
+        db, visitor_map.keys(), project_id, per_visitor=RECENT_ACTIVITIES_PER_VISITOR
+    )
+
+    summaries: Dict[UUID, ConversationSummary] = {}
+    for visitor_id, visitor in visitor_map.items():
+        assigned_staff_id = visitor_to_staff.get(visitor_id)
+        payload = _compose_base_visitor_payload(
+            visitor,
+            activities_by_visitor.get(visitor_id, []),
+            assigned_staff_id,
+        )
+        summaries[visitor_id] = ConversationSummary(
+            visitor_id=visitor_id,
+            payload=payload.model_dump(mode="json"),
+            service_status=visitor.service_status,
+            assigned_staff_id=assigned_staff_id,
+            tag_ids=[tag.id for tag in payload.tags],
+            version=expected_versions[visitor_id],
+        )
+    return summaries
+
+
+async def _store(
+    rebuilt: Dict[UUID, ConversationSummary],
+    expected_versions: Dict[UUID, int],
+    project_id: UUID,
+    now: datetime,
+) -> None:
+    gone = [visitor_id for visitor_id in expected_versions if visitor_id not in rebuilt]
+    async with async_session_scope() as db:
+        if rebuilt:
+            values = [
+                {
+                    "visitor_id": summary.visitor_id,
+                    "project_id": project_id,
+                    "platform_id": _uuid_or_none(summary.payload.get("platform_id")),
+                    "service_status": summary.service_status,
+                    "assigned_staff_id": summary.assigned_staff_id,
+                    "tag_ids": summary.tag_ids,
+                    "last_message_at": _datetime_or_none(summary.payload.get("last_message_at")),
+                    "payload": summary.payload,
+                    "version": summary.version,
+                    "stale": False,
+                    "refreshed_at": now,
+                }
+                for summary in sorted(rebuilt.values(), key=lambda s: str(s.visitor_id))
+            ]
+            stmt = insert(VisitorConversation).values(values)
+            table = VisitorConversation.__table__
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.visitor_id],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in (
+                            "platform_id",
+                            "service_status",
+                            "assigned_staff_id",
+                            "tag_ids",
+                            "last_message_at",
+                            "payload",
+                            "stale",
+                            "refreshed_at",
+                        )
+                    },
+                    # A write since our read bumped the version: keep the row stale
+                    where=table.c.version == stmt.excluded.version,
+                )
+            )
+        if gone:
+            await db.execute(
+                delete(VisitorConversation).where(
+                    VisitorConversation.visitor_id.in_(gone),
+                    VisitorConversation.project_id == project_id,
+                )
+            )
+
+
+def _uuid_or_none(value: Any) -> Optional[UUID]:
+    return UUID(str(value)) if value else None
+
+
+def _datetime_or_none(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
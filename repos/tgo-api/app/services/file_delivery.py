@@ -0,0 +1,317 @@
+"""HTTP delivery of stored files: validators and byte ranges.
+
+- ``file_etag`` derives a strong ETag from the file's content hash (recorded
+  at upload), falling back to a weak size/mtime validator for older files
+- ``serve_file`` answers conditional GETs with 304 and ``Range`` requests
+  with 206 (single range, ``If-Range`` aware), independent of the Starlette
+  version's own ``FileResponse`` range support
+- ``serve_stream`` does the same for files proxied from object storage
+- ``get_thumbnail`` renders image derivatives on demand into a disk cache,
+  on a bounded thread pool with a bounded backlog; oversized or
+  undecodable images are served as-is
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("services.file_delivery")
+
+_CHUNK_SIZE = 64 * 1024
+
+# Formats Pillow can decode that are worth shrinking; SVG and icons are served as-is
+_THUMBNAIL_SOURCE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp", "image/bmp"}
+
+
+def file_etag(content_hash: Optional[str], path: Path, variant: str = "") -> str:
+    """ETag of a stored file (optionally of one of its derivatives)."""
+    suffix = f"-{variant}" if variant else ""
+    if content_hash:
+        return f'"{content_hash}{suffix}"'
+    stat = path.stat()
+    return f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag`` (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque(tag.strip()) == _opaque(etag) for tag in if_none_match.split(","))
+
+
+def if_range_matches(if_range: Optional[str], etag: str) -> bool:
+    """Strong comparison of ``If-Range`` against ``etag`` (RFC 9110 13.1.5).
+
+    Weak validators never match, on either side, and HTTP-date values are not
+    supported, so in those cases the whole file is served.
+    """
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    return not if_range.startswith("W/") and not etag.startswith("W/") and if_range == etag
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` of a single ``bytes=`` range.
+
+    Returns None when the header is absent, malformed or asks for several
+    ranges (the whole file is served then). Raises ValueError when the range
+    cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, last = (part.strip() for part in spec.split("-", 1))
+    if not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return (max(size - length, 0), size - 1)
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and start > end:
+        return None
+    if start >= size:
+        raise ValueError("range starts past the end of the file")
+    return (start, min(end, size - 1))
+
+
+def _iter_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    # Sync iterator: Starlette drains it on its thread pool
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _delivery_headers(etag: Optional[str], headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    headers = {
+        **(headers or {}),
+        "Cache-Control": f"private, max-age={settings.CHAT_FILE_CACHE_MAX_AGE_SECONDS}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
+def _evaluate(
+    request_headers: Mapping[str, str],
+    etag: Optional[str],
+    size: int,
+    headers: Dict[str, str],
+) -> Tuple[Optional[Response], Optional[Tuple[int, int]]]:
+    """A 304/416 response to send as-is, or the byte range to serve (None: all)."""
+    if etag and is_not_modified(request_headers.get("if-none-match"), etag):
+        headers.pop("Content-Disposition", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers), None
+
+    range_header = request_headers.get("range")
+    # A range against another version of the file must not be honoured
+    if_range = request_headers.get("if-range")
+    if if_range is not None and not (etag and if_range_matches(if_range, etag)):
+        range_header = None
+    try:
+        return None, parse_range(range_header, size)
+    except ValueError:
+        return (
+            Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            ),
+            None,
+        )
+
+
+def serve_file(
+    path: Path,
+    *,
+    media_type: str,
+    etag: str,
+    request_headers: Mapping[str, str],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Full, partial (206) or not-modified (304) response for ``path``."""
+    headers = _delivery_headers(etag, headers)
+    size = path.stat().st_size
+    early, byte_range = _evaluate(request_headers, etag, size, headers)
+    if early is not None:
+        return early
+    if byte_range is None:
+        return FileResponse(path=str(path), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def serve_stream(
+    open_stream: Callable[[int, Optional[int]], AsyncIterator[bytes]],
+    *,
+    size: int,
+    media_type: str,
+    etag: Optional[str],
+    request_headers: Mapping[str, str],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Like ``serve_file`` for a file read through ``open_stream(start, end)``.
+
+    Used to proxy objects from storage backends. Without an ``etag``,
+    conditional requests are never answered with 304 and ``If-Range``
+    never matches.
+    """
+    headers = _delivery_headers(etag, headers)
+    early, byte_range = _evaluate(request_headers, etag, size, headers)
+    if early is not None:
+        return early
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(open_stream(0, None), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        open_stream(start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Thumbnails
+# ---------------------------------------------------------------------------
+
+_executor: Optional[ThreadPoolExecutor] = None
+_in_flight: Dict[Path, asyncio.Future] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.CHAT_FILE_THUMBNAIL_WORKERS,
+            thread_name_prefix="thumbnail",
+        )
+    return _executor
+
+
+def thumbnail_size(requested: int) -> int:
+    """Smallest configured size covering ``requested`` (bounds the cache)."""
+    sizes = sorted(settings.CHAT_FILE_THUMBNAIL_SIZES)
+    for size in sizes:
+        if size >= requested:
+            return size
+    return sizes[-1]
+
+
+def _render(source: Path, base: Path, size: int) -> bool:
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        # Only the header has been read so far; refuse decompression bombs
+        # before any pixel data is decoded
+        if image.width * image.height > settings.CHAT_FILE_THUMBNAIL_MAX_PIXELS:
+            return False
+        # JPEGs decode straight at a reduced scale
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        transparent = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        target = base.with_suffix(".png" if transparent else ".jpg")
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if transparent:
+            image.convert("RGBA").save(tmp, format="PNG", optimize=True)
+        else:
+            image.convert("RGB").save(tmp, format="JPEG", quality=85, optimize=True)
+    # Readers only ever see complete files
+    os.replace(tmp, target)
+    return True
+
+
+def _cached(base: Path) -> Optional[Tuple[Path, str]]:
+    for suffix, media_type in ((".jpg", "image/jpeg"), (".png", "image/png")):
+        candidate = base.with_suffix(suffix)
+        if candidate.is_file():
+            return candidate, media_type
+    return None
+
+
+async def get_thumbnail(
+    source: Path,
+    *,
+    media_type: str,
+    cache_key: str,
+    size: int,
+) -> Optional[Tuple[Path, str]]:
+    """Path and media type of a ``size`` px thumbnail of ``source``.
+
+    Returns None when ``source`` is not a thumbnailable image, is too large
+    to decode, the render backlog is full or rendering fails; callers then
+    serve the original. Concurrent requests for the same thumbnail share one
+    render.
+    """
+    if media_type not in _THUMBNAIL_SOURCE_TYPES:
+        return None
+    base = Path(settings.CHAT_FILE_THUMBNAIL_DIR).resolve() / cache_key[:2] / cache_key / str(size)
+    cached = _cached(base)
+    if cached is not None:
+        return cached
+
+    future = _in_flight.get(base)
+    if future is None:
+        if len(_in_flight) >= settings.CHAT_FILE_THUMBNAIL_MAX_PENDING:
+            # Shed load instead of queueing renders behind a burst
+            return None
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_executor(), _render, source, base, size)
+        _in_flight[base] = future
+        future.add_done_callback(lambda _: _in_flight.pop(base, None))
+    try:
+        rendered = await asyncio.shield(future)
+    except Exception as e:
+        logger.warning(f"Thumbnail rendering failed for {source.name}: {e}")
+        return None
+    return _cached(base) if rendered else None
+
+
+def shutdown() -> None:
+    """Stop the thumbnail worker pool (pending renders are dropped)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -5,11 +5,20 @@ Supports two providers:
 2. ip2region (lionsoul2014) - Better for China, requires ip2region.xdb
 
 See: https://github.com/lionsoul2014/ip2region
+
+Databases are loaded according to ``GEOIP_LOAD_MODE`` (fully into memory by
+default, so lookups do no file I/O) and can be preloaded at startup. Results
+are kept in a bounded LRU keyed by IP address, since the same addresses
+(NAT, office networks, returning visitors) are looked up over and over.
+Addresses the database has no data for are cached as empty results; failed
+lookups are not cached, so a transient error does not stick to an address.
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional
 import os
+import threading
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -20,6 +29,7 @@ logger = get_logger("services.geoip")
 try:
     import geoip2.database
     import geoip2.errors
+    import maxminddb
     GEOIP2_AVAILABLE = True
 except ImportError:
     GEOIP2_AVAILABLE = False
@@ -49,6 +59,43 @@ class GeoLocation:
         return not any([self.country, self.country_code, self.region, self.city])
 
 
+class _LRUCache:
+    """Thread-safe bounded LRU with hit/miss counters."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, GeoLocation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[GeoLocation]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: GeoLocation) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 class GeoIPService:
     """Service for looking up geolocation data from IP addresses.
     
@@ -65,15 +112,25 @@ class GeoIPService:
         self._initialized = False
         self._init_error: Optional[str] = None
         self._provider: Optional[str] = None
+        self._init_lock = threading.Lock()
+        self._cache = _LRUCache(settings.GEOIP_CACHE_MAX_ENTRIES)
     
     def _ensure_initialized(self) -> bool:
         """Lazy initialization of the GeoIP database reader."""
         if self._initialized:
             has_ip2region = self._ip2region_searcher_v4 is not None or self._ip2region_searcher_v6 is not None
             return self._geoip2_reader is not None or has_ip2region
-        
-        self._initialized = True
-        
+
+        with self._init_lock:
+            if self._initialized:
+                return self._ensure_initialized()
+            try:
+                return self._initialize()
+            finally:
+                self._initialized = True
+
+    def _initialize(self) -> bool:
+        """Open the configured database (called once, under the init lock)."""
         if not settings.GEOIP_ENABLED:
             self._init_error = "GeoIP is disabled in settings"
             return False
@@ -156,16 +213,26 @@ class GeoIPService:
     def _load_ip2region_db(self, db_path: str, version: int, version_name: str) -> bool:
         """Load a single ip2region database file."""
         try:
-            # Load entire xdb into memory for best performance and thread-safety
-            # Note: load_content_from_file is in util module, not searcher
-            searcher = xdb_searcher.new_with_file_only(xdb_util.Version(version), db_path)
+            mode = settings.GEOIP_LOAD_MODE.lower()
+            if mode == "memory":
+                # Whole xdb in memory: no file I/O per lookup, and thread-safe
+                content = xdb_util.load_content_from_file(db_path)
+                searcher = xdb_searcher.new_with_buffer(xdb_util.Version(version), content)
+            elif mode == "mmap":
+                # Only the vector index in memory: one or two reads per lookup
+                vector_index = xdb_util.load_vector_index_from_file(db_path)
+                searcher = xdb_searcher.new_with_vector_index(
+                    xdb_util.Version(version), db_path, vector_index
+                )
+            else:
+                searcher = xdb_searcher.new_with_file_only(xdb_util.Version(version), db_path)
             
             if version == xdb_util.IPv4:
                 self._ip2region_searcher_v4 = searcher
             else:
                 self._ip2region_searcher_v6 = searcher
             
-            logger.info(f"ip2region {version_name} database loaded from {db_path}")
+            logger.info(f"ip2region {version_name} database loaded from {db_path} (mode={mode})")
             return True
         except Exception as e:
             logger.warning(f"Failed to load ip2region {version_name} database from {db_path}: {e}")
@@ -179,8 +246,13 @@ class GeoIPService:
             return False
         
         try:
-            self._geoip2_reader = geoip2.database.Reader(db_path)
-            logger.info(f"GeoIP2 database loaded successfully from {db_path}")
+            mode = {
+                "memory": maxminddb.MODE_MEMORY,
+                "mmap": maxminddb.MODE_MMAP,
+                "file": maxminddb.MODE_FILE,
+            }.get(settings.GEOIP_LOAD_MODE.lower(), maxminddb.MODE_AUTO)
+            self._geoip2_reader = geoip2.database.Reader(db_path, mode=mode)
+            logger.info(f"GeoIP2 database loaded successfully from {db_path} (mode={settings.GEOIP_LOAD_MODE})")
             return True
         except Exception as e:
             self._init_error = f"Failed to load GeoIP2 database: {e}"
@@ -202,7 +274,38 @@ class GeoIPService:
         
         if not self._ensure_initialized():
             return GeoLocation()
-        
+
+        ip_address = ip_address.strip()
+        cached = self._cache.get(ip_address)
+        if cached is None:
+            cached = self._resolve(ip_address)
+            if cached is None:
+                # The lookup failed; retry next time instead of caching it
+                return GeoLocation()
+            self._cache.set(ip_address, cached)
+        # Callers get their own copy of the cached value
+        return replace(cached)
+
+    def lookup_many(self, ip_addresses: Iterable[Optional[str]]) -> Dict[str, GeoLocation]:
+        """
+        Look up many IP addresses at once (e.g. for backfills).
+
+        Duplicates are resolved once; results share the lookup cache.
+
+        Returns:
+            Mapping of each distinct non-empty IP address to its GeoLocation
+        """
+        return {
+            ip_address: self.lookup(ip_address)
+            for ip_address in dict.fromkeys(ip for ip in ip_addresses if ip)
+        }
+
+    def preload(self) -> bool:
+        """Load the configured database now instead of on the first lookup."""
+        return self._ensure_initialized()
+
+    def _resolve(self, ip_address: str) -> Optional[GeoLocation]:
+        """Location of ``ip_address`` (empty if unknown), or None if the lookup failed."""
         # Skip private/local IP addresses
         if self._is_private_ip(ip_address):
             return GeoLocation()
@@ -220,8 +323,8 @@ class GeoIPService:
         """Check if an IP address is IPv6."""
         return ":" in ip_address
     
-    def _lookup_ip2region(self, ip_address: str) -> GeoLocation:
-        """Lookup using ip2region."""
+    def _lookup_ip2region(self, ip_address: str) -> Optional[GeoLocation]:
+        """Lookup using ip2region (None if the lookup failed)."""
         try:
             # Select the appropriate searcher based on IP version
             is_v6 = self._is_ipv6(ip_address)
@@ -278,10 +381,10 @@ class GeoIPService:
             )
         except Exception as e:
             logger.warning(f"ip2region lookup failed for {ip_address}: {e}")
-            return GeoLocation()
+            return None
     
-    def _lookup_geoip2(self, ip_address: str) -> GeoLocation:
-        """Lookup using geoip2."""
+    def _lookup_geoip2(self, ip_address: str) -> Optional[GeoLocation]:
+        """Lookup using geoip2 (None if the lookup failed)."""
         try:
             response = self._geoip2_reader.city(ip_address)
             
@@ -294,9 +397,13 @@ class GeoIPService:
         except geoip2.errors.AddressNotFoundError:
             logger.debug(f"IP address not found in GeoIP database: {ip_address}")
             return GeoLocation()
+        except ValueError:
+            # Not an IP address: as final as an address without data
+            logger.debug(f"Invalid IP address for GeoIP lookup: {ip_address}")
+            return GeoLocation()
         except Exception as e:
             logger.warning(f"GeoIP2 lookup failed for {ip_address}: {e}")
-            return GeoLocation()
+            return None
     
     def _get_country_code(self, country: Optional[str]) -> Optional[str]:
         """Get ISO country code from country name (for ip2region)."""
@@ -373,6 +480,7 @@ class GeoIPService:
     
     def close(self):
         """Close the database reader."""
+        self._cache.clear()
         if self._geoip2_reader:
             self._geoip2_reader.close()
             self._geoip2_reader = None
@@ -383,6 +491,19 @@ class GeoIPService:
             self._ip2region_searcher_v6.close()
             self._ip2region_searcher_v6 = None
     
+    def stats(self) -> Dict[str, object]:
+        """Lookup cache size and hit counters."""
+        lookups = self._cache.hits + self._cache.misses
+        return {
+            "status": self.status,
+            "load_mode": settings.GEOIP_LOAD_MODE,
+            "cache_entries": len(self._cache),
+            "cache_max_entries": self._cache.max_entries,
+            "hits": self._cache.hits,
+            "misses": self._cache.misses,
+            "hit_rate": round(self._cache.hits / lookups, 4) if lookups else None,
+        }
+    
     @property
     def is_available(self) -> bool:
         """Check if GeoIP lookup is available."""
@@ -0,0 +1,297 @@
+"""Write-behind aggregation of visitor message stats from WuKongIM msg.notify.
+
+Every msg.notify webhook used to run one locked UPDATE and commit per visitor,
+and skipped rows locked by other transactions (silently dropping send-count
+increments).
+
+``MessageStatsAggregator`` folds notifications from concurrent webhook calls
+into one delta per visitor and writes them with a single set-based UPDATE per
+flush interval. A webhook call only returns once the flush that contains its
+deltas has committed; if the flush fails the call raises, so the webhook is
+not acknowledged and WuKongIM redelivers it (at-least-once). Rows are locked
+in id order and waited for rather than skipped, so increments are not lost
+under contention, and messages at or below a visitor's stored
+``last_message_seq`` are treated as already applied, so a redelivered webhook
+does not count them twice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.core.logging import get_logger
+from app.models.visitor_conversation import live_visitors_statement
+
+logger = get_logger("services.message_stats")
+
+
+@dataclass
+class VisitorMessageDelta:
+    """Aggregated msg.notify effect on one visitor."""
+
+    max_seq: int = 0
+    client_msg_no: Optional[str] = None
+    is_last_from_visitor: bool = False
+    # Sequence numbers of visitor-sent messages; a set so a message redelivered
+    # into the same flush is counted once
+    sent_seqs: Set[int] = field(default_factory=set)
+
+    @property
+    def send_count(self) -> int:
+        return len(self.sent_seqs)
+
+    def add_message(self, message_seq: int, client_msg_no: Optional[str], is_from_visitor: bool) -> None:
+        """Fold one message into the delta."""
+        # Track the message with highest sequence number for last_message fields
+        if message_seq > self.max_seq:
+            self.max_seq = message_seq
+            self.client_msg_no = client_msg_no
+            self.is_last_from_visitor = is_from_visitor
+        if is_from_visitor:
+            self.sent_seqs.add(message_seq)
+
+    def merge(self, other: "VisitorMessageDelta") -> None:
+        """Fold another delta for the same visitor into this one."""
+        if other.max_seq > self.max_seq:
+            self.max_seq = other.max_seq
+            self.client_msg_no = other.client_msg_no
+            self.is_last_from_visitor = other.is_last_from_visitor
+        self.sent_seqs |= other.sent_seqs
+
+    def unapplied(self, applied_seq: int) -> Optional["VisitorMessageDelta"]:
+        """The part of this delta newer than the visitor's stored ``last_message_seq``.
+
+        Messages up to ``applied_seq`` were applied by an earlier flush (a
+        redelivered webhook), so they neither count again nor move
+        ``last_message_at``. Returns None if nothing is new.
+        """
+        if self.max_seq <= applied_seq:
+            return None
+        return VisitorMessageDelta(
+            max_seq=self.max_seq,
+            client_msg_no=self.client_msg_no,
+            is_last_from_visitor=self.is_last_from_visitor,
+            sent_seqs={seq for seq in self.sent_seqs if seq > applied_seq},
+        )
+
+
+StatsWriter = Callable[[Dict[UUID, VisitorMessageDelta], datetime], Awaitable[int]]
+
+
+# Locks the rows and reads the highest sequence already applied to each
+_LOCK_SQL = text(
+    """
+    SELECT id, last_message_seq FROM api_visitors
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+      AND deleted_at IS NULL
+    ORDER BY id
+    FOR UPDATE
+    """
+)
+
+# Only deltas newer than the stored last_message_seq reach this statement
+# (see VisitorMessageDelta.unapplied), so a redelivered webhook is a no-op.
+_UPDATE_SQL = text(
+    """
+    UPDATE api_visitors AS v
+    SET visitor_send_count = v.visitor_send_count + d.send_count,
+        last_message_at = :now,
+        last_message_seq = d.max_seq,
+        last_client_msg_no = COALESCE(d.client_msg_no, v.last_client_msg_no),
+        is_last_message_from_visitor = d.is_last_from_visitor,
+        updated_at = now()
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:max_seqs AS integer[]),
+        CAST(:client_msg_nos AS varchar[]),
+        CAST(:from_visitor AS boolean[]),
+        CAST(:send_counts AS integer[])
+    ) AS d(id, max_seq, client_msg_no, is_last_from_visitor, send_count)
+    WHERE v.id = d.id
+      AND v.last_message_seq < d.max_seq
+    """
+)
+
+
+async def write_visitor_message_stats(deltas: Dict[UUID, VisitorMessageDelta], now: datetime) -> int:
+    """Apply deltas in one transaction. Returns the number of visitors updated.
+
+    Idempotent under redelivery: each visitor's stored ``last_message_seq`` is
+    the highest sequence applied, and only messages above it are counted.
+    """
+    async with async_session_scope() as db:
+        # Lock in a fixed order so concurrent flushes (other workers) cannot deadlock
+        locked = await db.execute(_LOCK_SQL, {"ids": sorted(deltas)})
+        fresh: Dict[UUID, VisitorMessageDelta] = {}
+        for row in locked:
+            delta = deltas[row.id].unapplied(row.last_message_seq or 0)
+            if delta is not None:
+                fresh[row.id] = delta
+        if not fresh:
+            return 0
+
+        visitor_ids = sorted(fresh)
+        params = {
+            "ids": visitor_ids,
+            "max_seqs": [fresh[v].max_seq for v in visitor_ids],
+            "client_msg_nos": [fresh[v].client_msg_no for v in visitor_ids],
+            "from_visitor": [fresh[v].is_last_from_visitor for v in visitor_ids],
+            "send_counts": [fresh[v].send_count for v in visitor_ids],
+            "now": now,
+        }
+        result = await db.execute(_UPDATE_SQL, params)
+        # Raw SQL bypasses the ORM listeners; patch the projection rows in place
+        await db.execute(live_visitors_statement(visitor_ids))
+        return result.rowcount or 0
+
+
+class MessageStatsAggregator:
+    """Group-commit buffer for visitor message stats.
+
+    Args:
+        flush_interval: Seconds to collect deltas before a flush
+        max_batch: Flush early once this many visitors are pending
+        max_attempts: Write attempts per flush before its callers get the error
+        writer: Coroutine applying a batch (defaults to the database writer)
+    """
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        writer: Optional[StatsWriter] = None,
+    ) -> None:
+        self.flush_interval = (
+            settings.WUKONGIM_MSG_STATS_FLUSH_INTERVAL_MS / 1000.0
+            if flush_interval is None
+            else flush_interval
+        )
+        self.max_batch = max(1, max_batch or settings.WUKONGIM_MSG_STATS_MAX_BATCH)
+        self.max_attempts = max(1, max_attempts or settings.WUKONGIM_MSG_STATS_FLUSH_ATTEMPTS)
+        self._writer = writer or write_visitor_message_stats
+
+        self._pending: Dict[UUID, VisitorMessageDelta] = {}
+        self._waiters: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    async def submit(self, deltas: Dict[UUID, VisitorMessageDelta]) -> None:
+        """Add deltas and wait until they are committed.
+
+        Raises:
+            Exception: The flush containing these deltas failed; they were not applied
+        """
+        if not deltas:
+            return
+        self._ensure_started()
+        was_empty = not self._pending
+        for visitor_id, delta in deltas.items():
+            pending = self._pending.get(visitor_id)
+            if pending is None:
+                self._pending[visitor_id] = VisitorMessageDelta(
+                    max_seq=delta.max_seq,
+                    client_msg_no=delta.client_msg_no,
+                    is_last_from_visitor=delta.is_last_from_visitor,
+                    sent_seqs=set(delta.sent_seqs),
+                )
+            else:
+                pending.merge(delta)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if was_empty or len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        await waiter
+
+    async def aclose(self) -> None:
+        """Flush what is pending and stop the flusher task."""
+        if self._task is None or self._task.done():
+            return
+        if self._pending:
+            await self._flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        # (Re)create loop-bound state; a new loop (e.g. in tests) starts fresh
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if len(self._pending) < self.max_batch and self.flush_interval > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush()
+
+    async def _flush(self) -> None:
+        batch, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, []
+        if not batch:
+            return
+
+        error: Optional[BaseException] = None
+        now = datetime.utcnow()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                updated = await self._writer(batch, now)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                logger.warning(
+                    "Visitor message stats flush failed",
+                    extra={"attempt": attempt, "visitors": len(batch), "error": str(e)},
+                )
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(min(0.05 * 2 ** (attempt - 1), 1.0))
+
+        if error is None:
+            self.flushes += 1
+            logger.debug(
+                "Flushed visitor message stats",
+                extra={"visitors": len(batch), "updated": updated, "webhooks": len(waiters)},
+            )
+        else:
+            self.failed_flushes += 1
+            logger.error(
+                "Dropping visitor message stats batch; webhooks will be redelivered",
+                extra={"visitors": len(batch), "webhooks": len(waiters), "error": str(error)},
+            )
+
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+
+
+message_stats_aggregator = MessageStatsAggregator()
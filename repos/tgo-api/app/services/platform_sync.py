@@ -4,6 +4,7 @@ This module exposes:
 - trigger_platform_sync: enqueue a sync job for a Platform (create/update)
 - trigger_platform_delete: enqueue a delete sync job for a Platform
 - start_sync_monitor: start background tasks to process queue and retry
+  (``start_sync_consumer`` / ``start_sync_retry_task`` start them separately)
 
 It maintains minimal, dependency-free scheduling using asyncio tasks
 (kicks off in app.main startup_event). In multi-process deployments, migrate
@@ -87,9 +88,15 @@ async def _process_job(job: PlatformSyncJob) -> None:
             if platform is None:
                 # attempt remote delete if possible
                 try:
-                    await platform_sync_client.delete_platform(job.platform_id)
+                    resp = await platform_sync_client.delete_platform(job.platform_id)
                 except Exception as exc:
                     logger.warning("Remote delete failed", extra={"platform_id": job.platform_id, "error": str(exc)})
+                    return
+                if resp.status_code >= 400 and resp.status_code not in (404, 405):
+                    logger.warning(
+                        "Remote delete failed",
+                        extra={"platform_id": job.platform_id, "error": f"HTTP {resp.status_code}: {resp.text}"},
+                    )
                 return
 
         if not platform:
@@ -179,12 +186,36 @@ async def _retry_loop() -> None:
             db.close()
 
 
-def start_sync_monitor() -> None:
-    global _consumer_task, _retry_task
+def start_sync_consumer() -> None:
+    """Start processing jobs enqueued by this process (needed on every replica)."""
+    global _consumer_task
     if _consumer_task is None or _consumer_task.done():
         _consumer_task = asyncio.create_task(_consumer_loop())
         logger.info("Platform sync consumer started")
+
+
+def start_sync_retry_task() -> None:
+    """Start the retry scan (a singleton job: one replica is enough)."""
+    global _retry_task
     if _retry_task is None or _retry_task.done():
         _retry_task = asyncio.create_task(_retry_loop())
         logger.info("Platform sync retry started")
 
+
+async def stop_sync_retry_task() -> None:
+    global _retry_task
+    if _retry_task is None:
+        return
+    _retry_task.cancel()
+    try:
+        await _retry_task
+    except asyncio.CancelledError:
+        pass
+    _retry_task = None
+    logger.info("Platform sync retry stopped")
+
+
+def start_sync_monitor() -> None:
+    start_sync_consumer()
+    start_sync_retry_task()
+
@@ -10,11 +10,12 @@ accordingly (e.g., PATCH/DELETE /v1/platforms/{id}).
 """
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
 import httpx
 
 from app.core.config import settings
+from app.services.upstream import get_upstream
 
 
 def _platform_to_payload(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -40,6 +41,7 @@ class PlatformSyncClient:
         self.base_url = settings.PLATFORM_SERVICE_URL.rstrip("/")
         self.timeout = settings.PLATFORM_SERVICE_TIMEOUT
         self.api_key = settings.PLATFORM_SERVICE_API_KEY
+        self.upstream = get_upstream("platform")
 
     def _headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
@@ -53,28 +55,24 @@ class PlatformSyncClient:
         The remote service auto-generates id if omitted; we include id to keep
         records synchronized across services.
         """
-        url = f"{self.base_url}/v1/platforms"
         payload = _platform_to_payload(platform_data)
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(url, json=payload, headers=self._headers())
-        return resp
-
-    async def delete_platform(self, platform_id: str) -> Optional[httpx.Response]:
-        """Attempt to delete a platform. If DELETE is unsupported, return None.
-
-        We try DELETE /v1/platforms/{id}. If the endpoint doesn't exist, callers
-        should fall back to a soft-delete upsert (deleted_at set, or is_active=False).
+        # Upsert by id: safe to retry
+        return await self.upstream.request(
+            "POST", "/v1/platforms", json=payload, headers=self._headers(), idempotent=True
+        )
+
+    async def delete_platform(self, platform_id: str) -> httpx.Response:
+        """Delete a platform via DELETE /v1/platforms/{id}.
+
+        The response is returned as-is; a 404/405 means the remote record is
+        already gone or DELETE is unsupported, and callers should fall back to
+        a soft-delete upsert (deleted_at set, or is_active=False). Transport
+        failures and ``UpstreamError`` (circuit open, busy, deadline) propagate
+        so callers can tell a failed delete from a completed one.
         """
-        url = f"{self.base_url}/v1/platforms/{platform_id}"
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                resp = await client.delete(url, headers=self._headers())
-                return resp
-            except httpx.HTTPStatusError:
-                raise
-            except Exception:
-                return None
-
+        return await self.upstream.request(
+            "DELETE", f"/v1/platforms/{platform_id}", headers=self._headers()
+        )
 
 platform_sync_client = PlatformSyncClient()
 
@@ -8,6 +8,7 @@ import httpx
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.models.project_ai_config import ProjectAIConfig
+from app.services.upstream import get_upstream
 
 logger = get_logger("services.project_ai_config_sync")
 
@@ -32,11 +33,11 @@ def _build_headers() -> dict[str, str]:
 
 
 async def sync_configs(items: Sequence[ProjectAIConfig]) -> tuple[bool, Optional[str], Optional[dict]]:
-    url = f"{settings.AI_SERVICE_URL.rstrip('/')}/api/v1/project-ai-configs/sync"
     payload = {"configs": [_config_to_upsert(x) for x in items]}
     try:
-        async with httpx.AsyncClient(timeout=settings.AI_SERVICE_TIMEOUT) as client:
-            resp = await client.post(url, json=payload, headers=_build_headers())
+        resp = await get_upstream("ai").request(
+            "POST", "/api/v1/project-ai-configs/sync", json=payload, headers=_build_headers()
+        )
         if resp.status_code >= 400:
             return False, f"{resp.status_code} {resp.text}", None
         try:
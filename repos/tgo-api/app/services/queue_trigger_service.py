@@ -3,6 +3,11 @@
 This service provides methods to trigger queue processing when:
 - Staff becomes available (resumes service, goes online, finishes a session)
 - Visitor enters the queue (immediate attempt)
+
+Entries are claimed through ``waiting_queue_claims`` so processors on
+different replicas never work on the same entry. A wakeup that arrives while
+a project is already being processed schedules another pass instead of being
+dropped, so assignment latency does not fall back to the fallback interval.
 """
 
 from __future__ import annotations
@@ -11,20 +16,15 @@ import asyncio
 from typing import List, Optional, Set
 from uuid import UUID
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.logging import get_logger
-from app.models import (
-    Staff,
-    StaffRole,
-    VisitorAssignmentRule,
-    VisitorSession,
-    SessionStatus,
-    VisitorWaitingQueue,
-    WaitingStatus,
+from app.services.waiting_queue_claims import (
+    begin_attempt,
+    claim_entries,
+    finish_assignment,
+    new_claim_token,
+    release_claims,
 )
 
 logger = get_logger("services.queue_trigger")
@@ -32,6 +32,7 @@ logger = get_logger("services.queue_trigger")
 # Global state for tracking in-progress processing
 _processing_lock = asyncio.Lock()
 _processing_project_ids: Set[UUID] = set()
+_rerun_project_ids: Set[UUID] = set()
 _semaphore: Optional[asyncio.Semaphore] = None
 
 
@@ -58,7 +59,9 @@ async def trigger_queue_for_project(project_id: UUID) -> None:
     # Check if already processing this project
     async with _processing_lock:
         if project_id in _processing_project_ids:
-            logger.debug(f"Project {project_id} queue is already being processed")
+            # Run another pass when the current one finishes so this wakeup is not lost
+            logger.debug(f"Project {project_id} queue is already being processed, scheduling another pass")
+            _rerun_project_ids.add(project_id)
             return
         _processing_project_ids.add(project_id)
     
@@ -90,9 +93,30 @@ async def trigger_queue_for_staff(staff_id: UUID, project_id: UUID) -> None:
 
 async def _process_project_queue_internal(project_id: UUID) -> None:
     """
-    Internal method to process waiting queue for a project.
-    
-    Attempts to assign waiting visitors to available staff.
+    Process the waiting queue of a project until no wakeup is pending.
+    """
+    try:
+        while True:
+            try:
+                await _process_project_queue_once(project_id)
+            except Exception as e:
+                logger.exception(f"Error in queue processing for project {project_id}: {e}")
+            
+            async with _processing_lock:
+                if project_id not in _rerun_project_ids:
+                    _processing_project_ids.discard(project_id)
+                    return
+                _rerun_project_ids.discard(project_id)
+    except BaseException:
+        async with _processing_lock:
+            _processing_project_ids.discard(project_id)
+            _rerun_project_ids.discard(project_id)
+        raise
+
+
+async def _process_project_queue_once(project_id: UUID) -> None:
+    """
+    Claim a batch of waiting entries for a project and assign them to available staff.
     """
     # Import here to avoid circular imports
     from app.services.transfer_service import transfer_to_staff
@@ -100,109 +124,99 @@ async def _process_project_queue_internal(project_id: UUID) -> None:
     
     semaphore = _get_semaphore()
     
-    try:
-        async with semaphore:
-            db = SessionLocal()
-            try:
-                # Get waiting queue entries for this project
-                waiting_entries = (
-                    db.query(VisitorWaitingQueue)
-                    .filter(
-                        VisitorWaitingQueue.project_id == project_id,
-                        VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-                        # Only process non-expired entries
-                        (
-                            (VisitorWaitingQueue.expired_at.is_(None)) |
-                            (VisitorWaitingQueue.expired_at > func.now())
-                        ),
-                    )
-                    .order_by(
-                        VisitorWaitingQueue.priority.desc(),
-                        VisitorWaitingQueue.position.asc(),
+    async with semaphore:
+        db = SessionLocal()
+        token = new_claim_token()
+        claimed_ids: List[UUID] = []
+        try:
+            # Claim waiting entries for this project (skips entries other processors hold)
+            claimed_ids = [
+                entry.id for entry in claim_entries(db, token, project_id=project_id)
+            ]
+            
+            if not claimed_ids:
+                logger.debug(f"No claimable waiting entries for project {project_id}")
+                return
+            
+            logger.info(
+                f"Processing {len(claimed_ids)} waiting entries for project {project_id}",
+                extra={"project_id": str(project_id), "count": len(claimed_ids)}
+            )
+            
+            # Process each entry
+            assigned_count = 0
+            for entry_id in claimed_ids:
+                try:
+                    entry = begin_attempt(db, entry_id, token)
+                    if not entry:
+                        continue
+                    
+                    result = await transfer_to_staff(
+                        db=db,
+                        visitor_id=entry.visitor_id,
+                        project_id=project_id,
+                        source=AssignmentSource.RULE,
+                        visitor_message=entry.visitor_message,
+                        session_id=entry.session_id,
+                        notes=f"From queue trigger (entry_id={entry.id})",
+                        skip_queue_status_check=True,
+                        auto_commit=False,
+                        ai_disabled=entry.ai_disabled,
+                        add_to_queue_if_no_staff=False,  # Already in queue
                     )
-                    .limit(settings.QUEUE_PROCESS_BATCH_SIZE)
-                    .all()
-                )
-                
-                if not waiting_entries:
-                    logger.debug(f"No waiting entries for project {project_id}")
-                    return
-                
-                logger.info(
-                    f"Processing {len(waiting_entries)} waiting entries for project {project_id}",
-                    extra={"project_id": str(project_id), "count": len(waiting_entries)}
-                )
-                
-                # Process each entry
-                assigned_count = 0
-                for entry in waiting_entries:
-                    try:
-                        entry.record_attempt()
-                        
-                        result = await transfer_to_staff(
-                            db=db,
-                            visitor_id=entry.visitor_id,
-                            project_id=project_id,
-                            source=AssignmentSource.RULE,
-                            visitor_message=entry.visitor_message,
-                            session_id=entry.session_id,
-                            notes=f"From queue trigger (entry_id={entry.id})",
-                            skip_queue_status_check=True,
-                            auto_commit=False,
-                            ai_disabled=entry.ai_disabled,
-                            add_to_queue_if_no_staff=False,  # Already in queue
-                        )
-                        
-                        if result.success and result.assigned_staff_id:
-                            entry.assign_to_staff(result.assigned_staff_id)
-                            db.commit()
-                            assigned_count += 1
-                            logger.info(
-                                f"Queue entry {entry.id} assigned to staff {result.assigned_staff_id}",
-                                extra={
-                                    "entry_id": str(entry.id),
-                                    "visitor_id": str(entry.visitor_id),
-                                    "staff_id": str(result.assigned_staff_id),
-                                }
-                            )
-                        else:
-                            # No staff available, stop processing
-                            # (next entries won't find staff either)
-                            db.commit()  # Commit the attempt record
-                            logger.debug(
-                                f"No staff available for entry {entry.id}, stopping batch",
-                                extra={"entry_id": str(entry.id)}
+                    
+                    if result.success and result.assigned_staff_id:
+                        if not finish_assignment(db, entry_id, token, result.assigned_staff_id):
+                            logger.warning(
+                                f"Lost claim on queue entry {entry_id} during assignment",
+                                extra={"entry_id": str(entry_id)}
                             )
-                            break
-                            
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing queue entry {entry.id}: {e}",
+                            continue
+                        assigned_count += 1
+                        logger.info(
+                            f"Queue entry {entry.id} assigned to staff {result.assigned_staff_id}",
+                            extra={
+                                "entry_id": str(entry.id),
+                                "visitor_id": str(entry.visitor_id),
+                                "staff_id": str(result.assigned_staff_id),
+                            }
+                        )
+                    else:
+                        # No staff available, stop processing
+                        # (next entries won't find staff either)
+                        db.commit()
+                        logger.debug(
+                            f"No staff available for entry {entry.id}, stopping batch",
                             extra={"entry_id": str(entry.id)}
                         )
-                        try:
-                            db.rollback()
-                        except Exception:
-                            pass
-                
-                logger.info(
-                    f"Queue processing complete for project {project_id}",
-                    extra={
-                        "project_id": str(project_id),
-                        "assigned_count": assigned_count,
-                        "total_processed": len(waiting_entries),
-                    }
-                )
-                
-            finally:
-                db.close()
-                
-    except Exception as e:
-        logger.exception(f"Error in queue processing for project {project_id}: {e}")
-    finally:
-        # Remove from processing set
-        async with _processing_lock:
-            _processing_project_ids.discard(project_id)
+                        break
+                        
+                except Exception as e:
+                    logger.error(
+                        f"Error processing queue entry {entry_id}: {e}",
+                        extra={"entry_id": str(entry_id)}
+                    )
+                    try:
+                        db.rollback()
+                    except Exception:
+                        pass
+            
+            logger.info(
+                f"Queue processing complete for project {project_id}",
+                extra={
+                    "project_id": str(project_id),
+                    "assigned_count": assigned_count,
+                    "total_processed": len(claimed_ids),
+                }
+            )
+            
+        finally:
+            # Entries that were not assigned become claimable again right away
+            try:
+                release_claims(db, claimed_ids, token)
+            except Exception as e:
+                logger.warning(f"Failed to release queue claims for project {project_id}: {e}")
+            db.close()
 
 
 async def trigger_queue_for_entry(entry_id: UUID) -> bool:
@@ -227,22 +241,16 @@ async def trigger_queue_for_entry(entry_id: UUID) -> bool:
     try:
         async with semaphore:
             db = SessionLocal()
+            token = new_claim_token()
+            claimed = False
             try:
-                entry = (
-                    db.query(VisitorWaitingQueue)
-                    .filter(
-                        VisitorWaitingQueue.id == entry_id,
-                        VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-                    )
-                    .first()
-                )
+                claimed = bool(claim_entries(db, token, entry_id=entry_id, limit=1))
+                entry = begin_attempt(db, entry_id, token) if claimed else None
                 
                 if not entry:
-                    logger.debug(f"Queue entry {entry_id} not found or not waiting")
+                    logger.debug(f"Queue entry {entry_id} not found, not waiting or claimed elsewhere")
                     return False
                 
-                entry.record_attempt()
-                
                 result = await transfer_to_staff(
                     db=db,
                     visitor_id=entry.visitor_id,
@@ -258,8 +266,9 @@ async def trigger_queue_for_entry(entry_id: UUID) -> bool:
                 )
                 
                 if result.success and result.assigned_staff_id:
-                    entry.assign_to_staff(result.assigned_staff_id)
-                    db.commit()
+                    if not finish_assignment(db, entry_id, token, result.assigned_staff_id):
+                        logger.warning(f"Lost claim on queue entry {entry_id} during immediate assignment")
+                        return False
                     logger.info(
                         f"Queue entry {entry_id} immediately assigned to staff {result.assigned_staff_id}",
                         extra={
@@ -269,11 +278,16 @@ async def trigger_queue_for_entry(entry_id: UUID) -> bool:
                     )
                     return True
                 else:
-                    db.commit()  # Commit the attempt record
+                    db.commit()
                     logger.debug(f"No staff available for immediate assignment of entry {entry_id}")
                     return False
                     
             finally:
+                if claimed:
+                    try:
+                        release_claims(db, [entry_id], token)
+                    except Exception as e:
+                        logger.warning(f"Failed to release queue claim for entry {entry_id}: {e}")
                 db.close()
                 
     except Exception as e:
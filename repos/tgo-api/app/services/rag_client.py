@@ -9,6 +9,7 @@ from fastapi import HTTPException, UploadFile
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.upstream import UpstreamDeadlineExceeded, UpstreamError, get_upstream
 
 logger = get_logger("rag_client")
 
@@ -20,6 +21,7 @@ class RAGServiceClient:
         self.base_url = settings.RAG_SERVICE_URL.rstrip("/")
         self.timeout = settings.RAG_SERVICE_TIMEOUT
         self.api_key = settings.RAG_SERVICE_API_KEY
+        self.upstream = get_upstream("rag")
         
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for RAG service requests (no authentication)."""
@@ -69,29 +71,28 @@ class RAGServiceClient:
         )
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=json_data,
-                    params=params,
-                    files=files,
-                    data=data,
-                )
-                
-                logger.info(
-                    f"RAG service response: {response.status_code}",
-                    extra={
-                        "request_id": request_id,
-                        "status_code": response.status_code,
-                        "response_time": response.elapsed.total_seconds() if response.elapsed else None,
-                    }
-                )
-                
-                return response
-                
-        except httpx.TimeoutException as e:
+            response = await self.upstream.request(
+                method,
+                endpoint,
+                headers=headers,
+                json=json_data,
+                params=params,
+                files=files,
+                data=data,
+            )
+
+            logger.info(
+                f"RAG service response: {response.status_code}",
+                extra={
+                    "request_id": request_id,
+                    "status_code": response.status_code,
+                    "response_time": response.elapsed.total_seconds() if response.elapsed else None,
+                }
+            )
+
+            return response
+
+        except (httpx.TimeoutException, UpstreamDeadlineExceeded) as e:
             logger.error(
                 f"RAG service timeout: {url}",
                 extra={"request_id": request_id, "timeout": self.timeout}
@@ -100,6 +101,15 @@ class RAGServiceClient:
                 status_code=504,
                 detail="RAG service request timed out"
             )
+        except UpstreamError as e:
+            logger.warning(
+                f"RAG service request rejected: {e}",
+                extra={"request_id": request_id, "error": str(e)}
+            )
+            raise HTTPException(
+                status_code=503,
+                detail="RAG service is temporarily unavailable"
+            )
         except httpx.RequestError as e:
             logger.error(
                 f"RAG service request error: {e}",
@@ -362,28 +372,28 @@ class RAGServiceClient:
         )
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    url=url,
-                    headers=headers,
-                    params={"project_id": project_id},
-                )
-
-                logger.info(
-                    f"RAG service download response: {response.status_code}",
-                    extra={
-                        "request_id": request_id,
-                        "status_code": response.status_code,
-                        "content_type": response.headers.get("content-type"),
-                        "content_length": response.headers.get("content-length"),
-                        "response_time": response.elapsed.total_seconds() if response.elapsed else None,
-                    }
-                )
-
-                # Return the raw response for streaming (don't call _handle_response)
-                return response
-
-        except httpx.TimeoutException as e:
+            response = await self.upstream.request(
+                "GET",
+                f"/v1/files/{file_id}/download",
+                headers=headers,
+                params={"project_id": project_id},
+            )
+
+            logger.info(
+                f"RAG service download response: {response.status_code}",
+                extra={
+                    "request_id": request_id,
+                    "status_code": response.status_code,
+                    "content_type": response.headers.get("content-type"),
+                    "content_length": response.headers.get("content-length"),
+                    "response_time": response.elapsed.total_seconds() if response.elapsed else None,
+                }
+            )
+
+            # Return the raw response for streaming (don't call _handle_response)
+            return response
+
+        except (httpx.TimeoutException, UpstreamDeadlineExceeded) as e:
             logger.error(
                 f"RAG service download timeout: {url}",
                 extra={"request_id": request_id, "timeout": self.timeout}
@@ -392,6 +402,15 @@ class RAGServiceClient:
                 status_code=504,
                 detail="RAG service download request timed out"
             )
+        except UpstreamError as e:
+            logger.warning(
+                f"RAG service download rejected: {e}",
+                extra={"request_id": request_id, "error": str(e)}
+            )
+            raise HTTPException(
+                status_code=503,
+                detail="RAG service is temporarily unavailable"
+            )
         except httpx.RequestError as e:
             logger.error(
                 f"RAG service download request error: {e}",
@@ -4,17 +4,21 @@ This is used to support cancelling running AI supervisor runs by client_msg_no.
 - ai_processor records the mapping when the stream emits agent_execution_started (run_id available)
 - HTTP endpoint can request cancellation by client_msg_no; if run_id not known yet, we mark pending
 - When run_id arrives and pending is set, ai_processor will immediately invoke cancel
+- The replica streaming a run ``watch``es its client_msg_no; a cancel marked on any
+  replica is pushed to that watcher right away instead of waiting for run_id
 
-If REDIS_URL is configured, uses Redis as shared storage (required for multi-process deployments).
+If REDIS_URL is configured, uses Redis as shared storage (required for multi-process deployments)
+and a pub/sub channel to deliver cancels to the owning replica.
 Otherwise falls back to in-memory storage (single-process only).
 """
 from __future__ import annotations
 
 import asyncio
+import heapq
 import json
 import time
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -23,6 +27,10 @@ logger = get_logger("run_registry")
 
 DEFAULT_TTL_SECONDS = 15 * 60  # 15 minutes
 REDIS_KEY_PREFIX = "tgo:run_registry:"
+REDIS_CANCEL_CHANNEL = "tgo:run_registry:cancel"
+
+# Called with the cancel reason on the replica that owns the run
+CancelHandler = Callable[[Optional[str]], Awaitable[None]]
 
 
 @dataclass
@@ -53,23 +61,87 @@ class RunEntry:
         )
 
 
-class InMemoryRunRegistry:
-    """In-memory registry (single-process only)."""
+class _CancelWatchers:
+    """Cancel handlers of the runs streamed by this process."""
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, CancelHandler] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def watch(self, client_msg_no: str, handler: CancelHandler) -> None:
+        """Call ``handler`` as soon as a cancel for ``client_msg_no`` is marked."""
+        self._handlers[client_msg_no] = handler
+
+    def unwatch(self, client_msg_no: str) -> None:
+        self._handlers.pop(client_msg_no, None)
+
+    def _dispatch_cancel(self, client_msg_no: str, reason: Optional[str]) -> bool:
+        handler = self._handlers.get(client_msg_no)
+        if handler is None:
+            return False
+        # Handlers call the AI service; never block the caller or the listener on them
+        task = asyncio.create_task(self._run_handler(client_msg_no, handler, reason))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run_handler(
+        self, client_msg_no: str, handler: CancelHandler, reason: Optional[str]
+    ) -> None:
+        try:
+            await handler(reason)
+        except Exception as e:
+            logger.warning(
+                f"Cancel handler failed: {e}",
+                extra={"client_msg_no": client_msg_no},
+            )
+
+    async def start(self) -> None:
+        """Start receiving cancels from other replicas (no-op when in-memory)."""
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+        self._handlers.clear()
+
+
+class InMemoryRunRegistry(_CancelWatchers):
+    """In-memory registry (single-process only).
+
+    Expiry is indexed by a min-heap of ``(expires_at, client_msg_no)``; every
+    update pushes a new item and superseded items are skipped when popped, so
+    pruning only touches entries that actually expired.
+    """
 
     def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> None:
+        super().__init__()
         self._ttl = ttl_seconds
         self._by_client: Dict[str, RunEntry] = {}
+        self._expiry: List[Tuple[float, str]] = []
         self._lock = asyncio.Lock()
 
-    async def _prune_locked(self) -> None:
+    def _touch_locked(self, entry: RunEntry, now: float) -> None:
+        entry.ts = now
+        heapq.heappush(self._expiry, (now + self._ttl, entry.client_msg_no))
+        # Entries updated many times leave superseded items behind
+        if len(self._expiry) > 2 * len(self._by_client) + 64:
+            self._expiry = [
+                (e.ts + self._ttl, k) for k, e in self._by_client.items()
+            ]
+            heapq.heapify(self._expiry)
+
+    def _prune_locked(self) -> None:
         now = time.time()
-        expired = [k for k, v in self._by_client.items() if now - (v.ts or 0.0) > self._ttl]
-        for k in expired:
-            self._by_client.pop(k, None)
+        while self._expiry and self._expiry[0][0] < now:
+            _, client_msg_no = heapq.heappop(self._expiry)
+            entry = self._by_client.get(client_msg_no)
+            if entry is not None and (entry.ts or 0.0) + self._ttl < now:
+                del self._by_client[client_msg_no]
 
     async def get(self, client_msg_no: str) -> Optional[RunEntry]:
         async with self._lock:
-            await self._prune_locked()
+            self._prune_locked()
             return self._by_client.get(client_msg_no)
 
     async def clear(self, client_msg_no: str) -> None:
@@ -85,7 +157,7 @@ class InMemoryRunRegistry:
         api_key: Optional[str],
     ) -> None:
         async with self._lock:
-            await self._prune_locked()
+            self._prune_locked()
             entry = self._by_client.get(client_msg_no)
             now = time.time()
             if entry is None:
@@ -97,7 +169,6 @@ class InMemoryRunRegistry:
                     run_id=None,
                     pending_cancel=True,
                     cancel_reason=reason,
-                    ts=now,
                 )
                 self._by_client[client_msg_no] = entry
             else:
@@ -107,7 +178,8 @@ class InMemoryRunRegistry:
                     entry.project_id = entry.project_id or project_id
                 if api_key:
                     entry.api_key = entry.api_key or api_key
-                entry.ts = now
+            self._touch_locked(entry, now)
+        self._dispatch_cancel(client_msg_no, reason)
 
     async def set_mapping_and_check_pending(
         self,
@@ -119,7 +191,7 @@ class InMemoryRunRegistry:
         session_id: Optional[str],
     ) -> Tuple[bool, Optional[str]]:
         async with self._lock:
-            await self._prune_locked()
+            self._prune_locked()
             now = time.time()
             entry = self._by_client.get(client_msg_no)
             if entry is None:
@@ -131,16 +203,16 @@ class InMemoryRunRegistry:
                     run_id=run_id,
                     pending_cancel=False,
                     cancel_reason=None,
-                    ts=now,
                 )
                 self._by_client[client_msg_no] = entry
+                self._touch_locked(entry, now)
                 return (False, None)
 
             entry.run_id = run_id
             entry.session_id = session_id or entry.session_id
             entry.project_id = entry.project_id or project_id
             entry.api_key = entry.api_key or api_key
-            entry.ts = now
+            self._touch_locked(entry, now)
             if entry.pending_cancel:
                 reason = entry.cancel_reason
                 entry.pending_cancel = False
@@ -148,14 +220,21 @@ class InMemoryRunRegistry:
             return (False, None)
 
 
-class RedisRunRegistry:
-    """Redis-backed registry for multi-process deployments."""
+class RedisRunRegistry(_CancelWatchers):
+    """Redis-backed registry for multi-process deployments.
+
+    Entries expire through Redis TTLs. Marking a cancel also publishes it on
+    ``REDIS_CANCEL_CHANNEL``; every replica listens and hands it to its local
+    watcher, so the replica streaming the run reacts without polling.
+    """
 
     def __init__(self, redis_url: str, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> None:
+        super().__init__()
         self._ttl = ttl_seconds
         self._redis_url = redis_url
         self._redis: Any = None
         self._lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
 
     async def _get_redis(self) -> Any:
         if self._redis is None:
@@ -237,6 +316,11 @@ class RedisRunRegistry:
                     "Marked cancel pending in Redis",
                     extra={"client_msg_no": client_msg_no, "reason": reason},
                 )
+            redis = await self._get_redis()
+            await redis.publish(
+                REDIS_CANCEL_CHANNEL,
+                json.dumps({"client_msg_no": client_msg_no, "reason": reason}),
+            )
         except Exception as e:
             logger.error(f"Redis mark_cancel_pending failed: {e}")
             raise
@@ -290,6 +374,44 @@ class RedisRunRegistry:
             logger.error(f"Redis set_mapping_and_check_pending failed: {e}")
             return (False, None)
 
+    async def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        await super().aclose()
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                redis = await self._get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(REDIS_CANCEL_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    self._dispatch_cancel(data["client_msg_no"], data.get("reason"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Cancels published meanwhile still reach the run through pending_cancel
+                logger.warning(f"Run registry cancel listener error: {e}")
+                await asyncio.sleep(1)
+
 
 def _create_registry() -> InMemoryRunRegistry | RedisRunRegistry:
     """Create the appropriate registry based on configuration."""
@@ -1,11 +1,13 @@
 """Storage services module.
 
-Provides a unified interface for file storage.
-Currently only supports local storage, OSS can be added later.
+Provides a unified interface for file storage: local disk, Aliyun OSS and
+MinIO/S3. Backends accept and return bodies as async chunk iterators, and
+object stores can hand out presigned URLs so clients upload and download
+directly.
 """
 
 from app.core.config import settings
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import PresignedUpload, StorageBackend, StoredObject
 from app.services.storage.local import LocalStorageBackend
 
 
@@ -55,7 +57,9 @@ def get_storage() -> StorageBackend:
 
 
 __all__ = [
+    "PresignedUpload",
     "StorageBackend",
+    "StoredObject",
     "LocalStorageBackend",
     "get_storage_backend",
     "get_storage",
@@ -1,7 +1,7 @@
 """Aliyun OSS storage backend."""
 
 import asyncio
-from typing import BinaryIO, Any
+from typing import AsyncIterator, BinaryIO, Any, Optional
 from urllib.parse import urlparse
 
 try:
@@ -9,7 +9,7 @@ try:
 except ImportError:
     oss2 = None
 
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import STREAM_CHUNK_SIZE, PresignedUpload, StorageBackend, StoredObject
 
 
 class AliyunOSSBackend(StorageBackend):
@@ -82,6 +82,56 @@ class AliyunOSSBackend(StorageBackend):
             
         return f"{self.bucket_url}/{clean_path}"
 
+    async def open_stream(
+        self, path: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream an object (or byte range) from Aliyun OSS."""
+        byte_range = (start, end) if start or end is not None else None
+        result = await asyncio.to_thread(
+            lambda: self.bucket.get_object(path.lstrip("/"), byte_range=byte_range)
+        )
+        try:
+            while True:
+                chunk = await asyncio.to_thread(result.read, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            result.close()
+
+    async def stat(self, path: str) -> Optional[StoredObject]:
+        """Size, content type and ETag of an object, or None if it does not exist."""
+        try:
+            result = await asyncio.to_thread(lambda: self.bucket.head_object(path.lstrip("/")))
+        except oss2.exceptions.NotFound:
+            return None
+        return StoredObject(
+            size=result.content_length,
+            content_type=result.content_type,
+            etag=(result.etag or "").strip('"') or None,
+        )
+
+    def presign_upload(
+        self, path: str, content_type: str, content_length: int, expires_in: int
+    ) -> Optional[PresignedUpload]:
+        """Presigned PUT; the client must send the signed Content-Type.
+
+        OSS V1 signatures cannot cover Content-Length, so the size is only
+        checked when the upload is completed (and unfinished uploads swept).
+        """
+        headers = {"Content-Type": content_type}
+        url = self.bucket.sign_url("PUT", path.lstrip("/"), expires_in, headers=headers)
+        return PresignedUpload(
+            url=url,
+            method="PUT",
+            headers={**headers, "Content-Length": str(content_length)},
+            expires_in=expires_in,
+        )
+
+    def presign_download(self, path: str, expires_in: int) -> Optional[str]:
+        """Presigned GET for private buckets."""
+        return self.bucket.sign_url("GET", path.lstrip("/"), expires_in)
+
     async def exists(self, path: str) -> bool:
         """Check if file exists in Aliyun OSS."""
         loop = asyncio.get_event_loop()
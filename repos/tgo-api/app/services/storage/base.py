@@ -1,7 +1,42 @@
 """Storage backend abstraction for file storage."""
 
+import asyncio
+import tempfile
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, BinaryIO, Dict, Optional
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class PresignedUpload:
+    """A URL the client uploads the file body to directly."""
+
+    url: str
+    method: str = "PUT"
+    headers: Dict[str, str] = field(default_factory=dict)
+    expires_in: int = 0
+
+
+@dataclass
+class StoredObject:
+    """Metadata of a stored file."""
+
+    size: int
+    content_type: Optional[str] = None
+    # Entity tag reported by the storage service (unquoted); a strong
+    # validator of the content where the backend provides one
+    etag: Optional[str] = None
+
+
+async def iter_file(file: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a file-like object in chunks without blocking the event loop."""
+    while True:
+        chunk = await asyncio.to_thread(file.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
 
 
 class StorageBackend(ABC):
@@ -90,3 +125,54 @@ class StorageBackend(ABC):
             The URL that frontend should use to access the file
         """
         pass
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], path: str, content_type: str
+    ) -> str:
+        """
+        Upload a file from an async iterator of chunks.
+
+        Backends override this to stream; the default spools the chunks to a
+        temporary file and calls ``upload``. If the iterator raises, nothing
+        is stored and the error propagates.
+
+        Returns:
+            Public URL to access the file
+        """
+        with tempfile.SpooledTemporaryFile(max_size=8 * STREAM_CHUNK_SIZE) as spool:
+            async for chunk in chunks:
+                await asyncio.to_thread(spool.write, chunk)
+            await asyncio.to_thread(spool.seek, 0)
+            return await self.upload(spool, path, content_type)
+
+    async def open_stream(
+        self, path: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a stored file, optionally the inclusive byte range ``start``-``end``.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming reads")
+        yield b""  # pragma: no cover - makes this an async generator
+
+    async def stat(self, path: str) -> Optional[StoredObject]:
+        """
+        Size, content type and ETag of a stored file, or None if it does not exist.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support stat")
+
+    def presign_upload(
+        self, path: str, content_type: str, content_length: int, expires_in: int
+    ) -> Optional[PresignedUpload]:
+        """
+        URL for uploading ``path`` directly to storage, or None if unsupported.
+
+        Backends that can sign the body size make storage reject uploads of
+        any other length than ``content_length``.
+        """
+        return None
+
+    def presign_download(self, path: str, expires_in: int) -> Optional[str]:
+        """
+        Time-limited URL for reading ``path`` directly from storage, or None if unsupported.
+        """
+        return None
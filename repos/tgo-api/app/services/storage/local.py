@@ -1,12 +1,14 @@
 """Local file system storage backend."""
 
+import asyncio
+import mimetypes
 import os
-import shutil
 from pathlib import Path
-from typing import BinaryIO, Any
+from typing import AsyncIterator, BinaryIO, Optional
 from urllib.parse import urlparse
+from uuid import uuid4
 
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import STREAM_CHUNK_SIZE, StorageBackend, StoredObject, iter_file
 
 
 class LocalStorageBackend(StorageBackend):
@@ -28,17 +30,64 @@ class LocalStorageBackend(StorageBackend):
         """Ensure base storage directory exists."""
         self.base_path.mkdir(parents=True, exist_ok=True)
 
+    def _full_path(self, path: str) -> Path:
+        return self.base_path / path.lstrip("/")
+
     async def upload(self, file: BinaryIO, path: str, content_type: str) -> str:
         """Upload file to local storage."""
-        full_path = self.base_path / path.lstrip("/")
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write file synchronously (file uploads are already buffered)
-        with open(full_path, "wb") as f:
-            shutil.copyfileobj(file, f)
-        
+        return await self.upload_stream(iter_file(file), path, content_type)
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], path: str, content_type: str
+    ) -> str:
+        """Write chunks to local storage as they arrive.
+
+        The body goes to a temporary file that is renamed into place once
+        complete, so readers never see a partial file.
+        """
+        full_path = self._full_path(path)
+        await asyncio.to_thread(full_path.parent.mkdir, parents=True, exist_ok=True)
+        tmp_path = full_path.with_name(f".{full_path.name}.{uuid4().hex}.part")
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.replace, tmp_path, full_path)
+        except BaseException:
+            f.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
         return self.get_public_url(path)
 
+    async def open_stream(
+        self, path: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream a file (or byte range) from local storage."""
+        f = await asyncio.to_thread(open, self._full_path(path), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def stat(self, path: str) -> Optional[StoredObject]:
+        """Size and guessed content type of a local file."""
+        full_path = self._full_path(path)
+        try:
+            result = await asyncio.to_thread(full_path.stat)
+        except FileNotFoundError:
+            return None
+        return StoredObject(size=result.st_size, content_type=mimetypes.guess_type(full_path.name)[0])
+
     async def delete(self, path: str) -> bool:
         """Delete file from local storage."""
         full_path = self.base_path / path.lstrip("/")
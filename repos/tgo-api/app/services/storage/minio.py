@@ -1,17 +1,28 @@
 """MinIO/S3 storage backend."""
 
 import asyncio
-from typing import BinaryIO, Any, Optional
+from typing import AsyncIterator, BinaryIO, Any, Optional
 from urllib.parse import urlparse
 
 try:
     import boto3
+    from botocore.config import Config
     from botocore.exceptions import ClientError
 except ImportError:
     boto3 = None
+    Config = None
     ClientError = Exception
 
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import (
+    STREAM_CHUNK_SIZE,
+    PresignedUpload,
+    StorageBackend,
+    StoredObject,
+    iter_file,
+)
+
+# S3 requires every multipart part but the last to be at least 5 MiB
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
 
 
 class MinIOBackend(StorageBackend):
@@ -48,32 +59,172 @@ class MinIOBackend(StorageBackend):
         self.bucket_name = bucket_name
         self.download_url = (download_url or endpoint_url).rstrip("/")
         self.upload_url = (upload_url or endpoint_url).rstrip("/")
+        self._credentials = {
+            "aws_access_key_id": access_key_id,
+            "aws_secret_access_key": secret_access_key,
+            "region_name": region_name,
+        }
         
         # Initialize boto3 client
         self.s3 = boto3.client(
             "s3",
             endpoint_url=self.upload_url,
-            aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key,
-            region_name=region_name,
+            **self._credentials,
         )
+        self._presign_s3: Any = None
+
+    def _public_client(self) -> Any:
+        """Client signing URLs for the public host (signatures cover the host)."""
+        if self._presign_s3 is None:
+            endpoint = self.download_url
+            if endpoint.endswith(f"/{self.bucket_name}"):
+                endpoint = endpoint[: -len(self.bucket_name) - 1]
+            self._presign_s3 = boto3.client(
+                "s3",
+                endpoint_url=endpoint,
+                config=Config(signature_version="s3v4"),
+                **self._credentials,
+            )
+        return self._presign_s3
 
     async def upload(self, file: BinaryIO, path: str, content_type: str) -> str:
         """Upload file to MinIO/S3."""
-        loop = asyncio.get_event_loop()
-        clean_path = path.lstrip("/")
-        
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3.put_object(
+        return await self.upload_stream(iter_file(file), path, content_type)
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], path: str, content_type: str
+    ) -> str:
+        """Upload chunks to MinIO/S3 as they arrive.
+
+        Bodies smaller than one part are sent with a single ``put_object``;
+        larger ones as a multipart upload holding at most one part in memory.
+        A failed or interrupted upload is aborted.
+        """
+        key = path.lstrip("/")
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        parts = []
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                if len(buffer) < MULTIPART_PART_SIZE:
+                    continue
+                if upload_id is None:
+                    created = await asyncio.to_thread(
+                        self.s3.create_multipart_upload,
+                        Bucket=self.bucket_name,
+                        Key=key,
+                        ContentType=content_type,
+                    )
+                    upload_id = created["UploadId"]
+                parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                buffer.clear()
+
+            if upload_id is None:
+                await asyncio.to_thread(
+                    self.s3.put_object,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=bytes(buffer),
+                    ContentType=content_type,
+                )
+                return self.get_public_url(path)
+
+            if buffer:
+                parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+            await asyncio.to_thread(
+                self.s3.complete_multipart_upload,
                 Bucket=self.bucket_name,
-                Key=clean_path,
-                Body=file,
-                ContentType=content_type
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
             )
-        )
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await asyncio.to_thread(
+                        self.s3.abort_multipart_upload,
+                        Bucket=self.bucket_name,
+                        Key=key,
+                        UploadId=upload_id,
+                    )
+                except Exception:
+                    pass
+            raise
         return self.get_public_url(path)
 
+    async def _upload_part(self, key: str, upload_id: str, number: int, body: bytes) -> dict:
+        result = await asyncio.to_thread(
+            self.s3.upload_part,
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        return {"ETag": result["ETag"], "PartNumber": number}
+
+    async def open_stream(
+        self, path: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream an object (or byte range) from MinIO/S3."""
+        params = {"Bucket": self.bucket_name, "Key": path.lstrip("/")}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        result = await asyncio.to_thread(lambda: self.s3.get_object(**params))
+        body = result["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def stat(self, path: str) -> Optional[StoredObject]:
+        """Size, content type and ETag of an object, or None if it does not exist."""
+        try:
+            result = await asyncio.to_thread(
+                lambda: self.s3.head_object(Bucket=self.bucket_name, Key=path.lstrip("/"))
+            )
+        except ClientError:
+            return None
+        return StoredObject(
+            size=result["ContentLength"],
+            content_type=result.get("ContentType"),
+            etag=(result.get("ETag") or "").strip('"') or None,
+        )
+
+    def presign_upload(
+        self, path: str, content_type: str, content_length: int, expires_in: int
+    ) -> Optional[PresignedUpload]:
+        """Presigned PUT; the client must send the signed Content-Type and Content-Length."""
+        url = self._public_client().generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": path.lstrip("/"),
+                "ContentType": content_type,
+                "ContentLength": content_length,
+            },
+            ExpiresIn=expires_in,
+        )
+        return PresignedUpload(
+            url=url,
+            method="PUT",
+            headers={"Content-Type": content_type, "Content-Length": str(content_length)},
+            expires_in=expires_in,
+        )
+
+    def presign_download(self, path: str, expires_in: int) -> Optional[str]:
+        """Presigned GET for private buckets."""
+        return self._public_client().generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": path.lstrip("/")},
+            ExpiresIn=expires_in,
+        )
+
     async def delete(self, path: str) -> bool:
         """Delete file from MinIO/S3."""
         loop = asyncio.get_event_loop()
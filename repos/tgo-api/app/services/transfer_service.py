@@ -7,7 +7,7 @@ from typing import List, Optional
 from uuid import UUID
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import func
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -25,9 +25,11 @@ from app.models import (
     AssignmentSource,
     SessionStatus,
     Staff,
+    StaffLoad,
     StaffRole,
     ChannelMember,
 )
+from app.services.waiting_queue_claims import QUEUE_ORDER, claimable_filter
 from app.services.wukongim_client import wukongim_client
 from app.utils.encoding import build_visitor_channel_id, build_project_staff_channel_id
 from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE, CHANNEL_TYPE_PROJECT_STAFF, MEMBER_TYPE_STAFF
@@ -505,15 +507,22 @@ async def _add_to_waiting_queue(
     ).first()
     
     if existing_queue:
-        logger.info(f"Visitor {visitor_id} already in waiting queue at position {existing_queue.position}")
-        return existing_queue, existing_queue.position
+        queue_position = get_queue_entry_rank(db, existing_queue)
+        logger.info(f"Visitor {visitor_id} already in waiting queue at position {queue_position}")
+        return existing_queue, queue_position
     
-    # Calculate queue position
+    # Calculate queue position (reported to the visitor: number waiting ahead + 1)
     current_queue_count = db.query(VisitorWaitingQueue).filter(
         VisitorWaitingQueue.project_id == project_id,
         VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
     ).count()
     queue_position = current_queue_count + 1
+    # Stored position is a monotonically increasing ticket so entries keep
+    # their relative order after earlier ones leave the queue
+    last_ticket = db.query(func.max(VisitorWaitingQueue.position)).filter(
+        VisitorWaitingQueue.project_id == project_id,
+        VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+    ).scalar() or 0
     
     # Calculate expiration time
     timeout_minutes = settings.QUEUE_DEFAULT_TIMEOUT_MINUTES
@@ -527,7 +536,7 @@ async def _add_to_waiting_queue(
         visitor_id=visitor_id,
         session_id=session_id,
         source=QueueSource.NO_STAFF.value,
-        position=queue_position,
+        position=last_ticket + 1,
         priority=0,
         status=WaitingStatus.WAITING.value,
         visitor_message=visitor_message,
@@ -865,40 +874,40 @@ async def _get_available_staff_candidates(
         max_concurrent = assignment_rule.max_concurrent_chats
     
     # Query available staff (only user role, not admin or agent, active and not paused)
-    staff_query = db.query(Staff).filter(
-        Staff.project_id == project_id,
-        Staff.deleted_at.is_(None),
-        Staff.is_active == True,  # noqa: E712 - SQLAlchemy requires == for boolean
-        Staff.service_paused == False,  # noqa: E712 - SQLAlchemy requires == for boolean
+    # together with their open-session count from the maintained load index,
+    # least-loaded first.
+    open_sessions = func.coalesce(StaffLoad.open_sessions, 0)
+    status_priority = case(
+        (Staff.status == "online", 0),
+        (Staff.status == "busy", 1),
+        else_=2,
     )
+    staff_query = (
+        db.query(Staff, open_sessions.label("open_sessions"))
+        .outerjoin(StaffLoad, StaffLoad.staff_id == Staff.id)
+        .filter(
+            Staff.project_id == project_id,
+            Staff.deleted_at.is_(None),
+            Staff.is_active == True,  # noqa: E712 - SQLAlchemy requires == for boolean
+            Staff.service_paused == False,  # noqa: E712 - SQLAlchemy requires == for boolean
+        )
+    )
+    # Skip staff at max capacity
+    if max_concurrent:
+        staff_query = staff_query.filter(open_sessions < max_concurrent)
+    staff_query = staff_query.order_by(status_priority, open_sessions, Staff.id)
     
-    available_staff = staff_query.all()
-    
-    if not available_staff:
-        return []
-    
-    # Get current active chat count for each staff
-    candidates = []
-    for staff in available_staff:
-        # Count active sessions for this staff
-        active_session_count = db.query(func.count(VisitorSession.id)).filter(
-            VisitorSession.staff_id == staff.id,
-            VisitorSession.status == SessionStatus.OPEN.value,
-        ).scalar() or 0
-        
-        # Skip if at max capacity
-        if max_concurrent and active_session_count >= max_concurrent:
-            logger.debug(f"Staff {staff.id} at max capacity ({active_session_count}/{max_concurrent})")
-            continue
-        
-        candidates.append(StaffCandidate(
+    candidates = [
+        StaffCandidate(
             id=staff.id,
             name=staff.name,
             nickname=staff.nickname,
             description=staff.description,
             status=staff.status,
             current_chat_count=active_session_count,
-        ))
+        )
+        for staff, active_session_count in staff_query.all()
+    ]
     
     return candidates
 
@@ -1104,21 +1113,21 @@ async def assign_from_waiting_queue(
         return None
     
     # Get the queue entry
+    # Skip entries a queue processor is assigning right now (row locked)
     if queue_entry_id:
         queue_entry = db.query(VisitorWaitingQueue).filter(
             VisitorWaitingQueue.id == queue_entry_id,
             VisitorWaitingQueue.project_id == project_id,
             VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-        ).first()
+        ).with_for_update(skip_locked=True).first()
     else:
-        # Get the next visitor in queue (ordered by priority desc, position asc)
+        # Get the next unclaimed visitor in queue (ordered by priority desc, position asc)
         queue_entry = db.query(VisitorWaitingQueue).filter(
             VisitorWaitingQueue.project_id == project_id,
-            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+            claimable_filter(),
         ).order_by(
-            VisitorWaitingQueue.priority.desc(),
-            VisitorWaitingQueue.position.asc(),
-        ).first()
+            *QUEUE_ORDER
+        ).with_for_update(skip_locked=True).first()
     
     if not queue_entry:
         logger.info(f"No visitors in waiting queue for project {project_id}")
@@ -1141,7 +1150,7 @@ async def assign_from_waiting_queue(
         target_staff_id=staff_id,
         session_id=queue_entry.session_id,
         visitor_message=queue_entry.visitor_message,
-        notes=f"Assigned from waiting queue (position: {queue_entry.position})",
+        notes=f"Assigned from waiting queue (ticket: {queue_entry.position})",
         ai_disabled=queue_entry.ai_disabled,
     )
     
@@ -1156,6 +1165,59 @@ def get_waiting_queue_count(db: Session, project_id: UUID) -> int:
     ).count()
 
 
+def _ahead_of(entry: VisitorWaitingQueue):
+    """SQL condition for waiting entries served before ``entry`` (see QUEUE_ORDER)."""
+    return (
+        (VisitorWaitingQueue.project_id == entry.project_id)
+        & (VisitorWaitingQueue.status == WaitingStatus.WAITING.value)
+        & (
+            (VisitorWaitingQueue.priority > entry.priority)
+            | (
+                (VisitorWaitingQueue.priority == entry.priority)
+                & (VisitorWaitingQueue.position < entry.position)
+            )
+        )
+    )
+
+
+def get_queue_entry_rank(db: Session, entry: VisitorWaitingQueue) -> Optional[int]:
+    """
+    Get the 1-based place of a waiting entry in service order.
+
+    ``position`` is a ticket that only orders entries; the rank is counted
+    at read time so it shrinks as entries ahead leave the queue.
+
+    Returns None if the entry is no longer waiting.
+    """
+    if entry.status != WaitingStatus.WAITING.value:
+        return None
+    return db.query(func.count(VisitorWaitingQueue.id)).filter(_ahead_of(entry)).scalar() + 1
+
+
+def get_queue_entry_ranks(db: Session, entries: List[VisitorWaitingQueue]) -> dict[UUID, int]:
+    """Ranks (see ``get_queue_entry_rank``) of the waiting entries among ``entries``."""
+    waiting = [e for e in entries if e.status == WaitingStatus.WAITING.value]
+    if not waiting:
+        return {}
+    ranked = (
+        db.query(
+            VisitorWaitingQueue.id.label("id"),
+            func.row_number().over(
+                partition_by=VisitorWaitingQueue.project_id, order_by=QUEUE_ORDER
+            ).label("rank"),
+        )
+        .filter(
+            VisitorWaitingQueue.project_id.in_({e.project_id for e in waiting}),
+            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+        )
+        .subquery()
+    )
+    rows = db.query(ranked.c.id, ranked.c.rank).filter(
+        ranked.c.id.in_([e.id for e in waiting])
+    ).all()
+    return {row.id: row.rank for row in rows}
+
+
 def get_visitor_queue_position(
     db: Session, 
     visitor_id: UUID, 
@@ -1171,20 +1233,7 @@ def get_visitor_queue_position(
     if not queue_entry:
         return None
     
-    # Count how many visitors are ahead (higher priority or lower position)
-    position = db.query(VisitorWaitingQueue).filter(
-        VisitorWaitingQueue.project_id == project_id,
-        VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-        (
-            (VisitorWaitingQueue.priority > queue_entry.priority) |
-            (
-                (VisitorWaitingQueue.priority == queue_entry.priority) &
-                (VisitorWaitingQueue.position < queue_entry.position)
-            )
-        )
-    ).count() + 1
-    
-    return position
+    return get_queue_entry_rank(db, queue_entry)
 
 
 async def cancel_visitor_from_queue(
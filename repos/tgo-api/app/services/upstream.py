@@ -0,0 +1,520 @@
+"""Shared resilient HTTP client layer for upstream services.
+
+The AI, RAG, Workflow and Platform clients send their requests through one
+``UpstreamClient`` per upstream instead of opening an ``httpx.AsyncClient``
+per call. Each upstream gets:
+
+- a pooled, keep-alive HTTP client
+- a concurrency limit, so a slow upstream cannot pile up unbounded
+  in-flight requests (callers fail fast once the wait for a slot expires)
+- a circuit breaker that rejects calls while the upstream keeps failing
+- retries with jittered exponential backoff for idempotent requests
+- deadline propagation: a deadline set with ``deadline_scope`` (or received
+  in the ``X-Request-Deadline-Ms`` header) caps every timeout and is
+  forwarded to the upstream in the same header
+- counters exposed via ``upstream_stats`` (``GET /health/upstreams``)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Set
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("upstream")
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Statuses that mean the upstream itself is unhealthy (not a bad request)
+FAILURE_STATUSES = frozenset({502, 503, 504})
+
+_deadline: ContextVar[Optional[float]] = ContextVar("upstream_deadline", default=None)
+
+
+class UpstreamError(Exception):
+    """Base class for requests rejected by the upstream client layer."""
+
+    def __init__(self, upstream: str, message: str):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+
+
+class UpstreamCircuitOpenError(UpstreamError):
+    """The upstream's circuit breaker is open."""
+
+
+class UpstreamBusyError(UpstreamError):
+    """No request slot became free within the acquire timeout."""
+
+
+class UpstreamDeadlineExceeded(UpstreamError):
+    """The request deadline expired before the upstream answered."""
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Limit all upstream calls in this context to ``seconds`` from now.
+
+    Nested scopes can only shorten the deadline.
+    """
+    deadline = time.monotonic() + max(0.0, seconds)
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current deadline, or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class DeadlineMiddleware:
+    """ASGI middleware applying an inbound ``X-Request-Deadline-Ms`` header."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            header = DEADLINE_HEADER.lower().encode()
+            for name, value in scope.get("headers", ()):
+                if name != header:
+                    continue
+                try:
+                    budget_ms = int(value)
+                except ValueError:
+                    break
+                if budget_ms > 0:
+                    with deadline_scope(budget_ms / 1000.0):
+                        await self.app(scope, receive, send)
+                    return
+                break
+        await self.app(scope, receive, send)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        if self.failure_threshold <= 0 or self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def abandon_probe(self) -> None:
+        """Release the half-open probe of a request that ended without a result."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for upstream {self.name} opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+@dataclass
+class UpstreamConfig:
+    """Connection, limit and retry settings of one upstream."""
+
+    name: str
+    base_url: str
+    timeout: Optional[float]
+    connect_timeout: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    max_concurrency: int = 0
+    acquire_timeout: float = 5.0
+    max_retries: int = 2
+    backoff_base: float = 0.2
+    backoff_max: float = 2.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+
+
+class UpstreamClient:
+    """Pooled, limited and circuit-broken HTTP client for one upstream."""
+
+    def __init__(
+        self,
+        config: UpstreamConfig,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.config = config
+        self.name = config.name
+        self.breaker = CircuitBreaker(config.name, config.breaker_failure_threshold, config.breaker_reset_seconds)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "responses": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "rejected_circuit_open": 0,
+            "rejected_busy": 0,
+            "deadline_exceeded": 0,
+            "connections_opened": 0,
+            "max_in_flight": 0,
+            "latency_ms_total": 0.0,
+        }
+
+    # -- plumbing -----------------------------------------------------------
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # Pooled connections and the semaphore belong to the loop that created them
+            if self._client is not None and not self._client.is_closed:
+                self._close_stale_client(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                base_url=self.config.base_url,
+                timeout=self._timeout(self.config.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                transport=self._transport,
+            )
+            self._slots = (
+                asyncio.Semaphore(self.config.max_concurrency) if self.config.max_concurrency > 0 else None
+            )
+            self._loop = loop
+        return self._client
+
+    def _close_stale_client(
+        self,
+        client: httpx.AsyncClient,
+        owner_loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        """Close a client left behind by a previous event loop without leaking its pool."""
+        if owner_loop is not None and owner_loop.is_running():
+            # Still serving another thread's loop: close the connections there
+            asyncio.run_coroutine_threadsafe(client.aclose(), owner_loop)
+            return
+        # The owning loop has stopped; release its transports from here
+        task = asyncio.get_running_loop().create_task(self._aclose_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _aclose_quietly(self, client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.debug(f"Closing upstream client {self.name} from a previous event loop: {exc}")
+
+    def _timeout(self, timeout: Optional[float], budget: Optional[float] = None) -> httpx.Timeout:
+        if budget is not None:
+            timeout = budget if timeout is None else min(timeout, budget)
+        connect = self.config.connect_timeout if budget is None else min(self.config.connect_timeout, budget)
+        return httpx.Timeout(timeout, connect=connect, pool=connect)
+
+    def _budget_or_raise(self) -> Optional[float]:
+        budget = remaining_budget()
+        if budget is not None and budget <= 0:
+            self._stats["deadline_exceeded"] += 1
+            raise UpstreamDeadlineExceeded(self.name, "request deadline exceeded")
+        return budget
+
+    def _prepare_headers(self, headers: Optional[Dict[str, str]], budget: Optional[float]) -> Dict[str, str]:
+        merged = dict(headers or {})
+        if budget is not None:
+            merged[DEADLINE_HEADER] = str(max(1, int(budget * 1000)))
+        return merged
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            self._stats["rejected_circuit_open"] += 1
+            raise UpstreamCircuitOpenError(self.name, "circuit open, upstream is failing")
+
+    def _record_status(self, status_code: int) -> None:
+        if status_code in FAILURE_STATUSES:
+            self._stats["failures"] += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _record_error(self, exc: Exception) -> None:
+        self._stats["failures"] += 1
+        if isinstance(exc, httpx.TimeoutException):
+            self._stats["timeouts"] += 1
+        self.breaker.record_failure()
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        delay = random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt)))
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.config.backoff_max))
+        return delay
+
+    @asynccontextmanager
+    async def _slot(self, budget: Optional[float]) -> AsyncIterator[None]:
+        slots = self._slots
+        if slots is not None:
+            wait = self.config.acquire_timeout if budget is None else min(self.config.acquire_timeout, budget)
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout=wait)
+            except asyncio.TimeoutError:
+                self._stats["rejected_busy"] += 1
+                raise UpstreamBusyError(
+                    self.name, f"{self.config.max_concurrency} requests already in flight"
+                ) from None
+        self._in_flight += 1
+        self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if slots is not None:
+                slots.release()
+
+    # -- public API ---------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request and return the (fully read) response.
+
+        Args:
+            method: HTTP method
+            url: Path relative to the upstream base URL
+            idempotent: Allow retries (default: by method)
+            timeout: Read timeout in seconds (default: upstream timeout)
+            headers: Request headers
+            **kwargs: Passed to ``httpx.AsyncClient.request``
+
+        Raises:
+            UpstreamCircuitOpenError, UpstreamBusyError, UpstreamDeadlineExceeded
+            httpx.TimeoutException, httpx.RequestError: after retries are exhausted
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        max_retries = self.config.max_retries if idempotent else 0
+        timeout = self.config.timeout if timeout is None else timeout
+
+        client = self._get_client()
+        attempt = 0
+        while True:
+            budget = self._budget_or_raise()
+            response: Optional[httpx.Response] = None
+            error: Optional[Exception] = None
+            async with self._slot(budget):
+                self._check_breaker()
+                self._stats["requests"] += 1
+                started = time.monotonic()
+                try:
+                    response = await client.request(
+                        method,
+                        url,
+                        headers=self._prepare_headers(headers, budget),
+                        timeout=self._timeout(timeout, budget),
+                        extensions={"trace": self._trace},
+                        **kwargs,
+                    )
+                except (httpx.TimeoutException, httpx.TransportError) as exc:
+                    self._record_error(exc)
+                    if attempt >= max_retries:
+                        raise
+                    error = exc
+                except BaseException:
+                    self.breaker.abandon_probe()
+                    raise
+                else:
+                    self._stats["responses"] += 1
+                    self._stats["latency_ms_total"] += (time.monotonic() - started) * 1000
+                    self._record_status(response.status_code)
+                    if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                        return response
+
+            delay = self._backoff(attempt, response)
+            if not self._can_wait(delay):
+                if error is not None:
+                    raise error
+                return response  # type: ignore[return-value]
+            attempt += 1
+            self._stats["retries"] += 1
+            logger.info(
+                f"Retrying {self.name} {method} {url} in {delay:.2f}s (attempt {attempt + 1})",
+                extra={"upstream": self.name, "status_code": response.status_code if response else None},
+            )
+            await asyncio.sleep(delay)
+
+    def _can_wait(self, delay: float) -> bool:
+        budget = remaining_budget()
+        return budget is None or budget > delay
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[httpx.Response]:
+        """Open a streaming request over the pooled client.
+
+        Streams are long-lived (agent runs, workflow executions), so they use
+        the circuit breaker and deadline but not the concurrency limit, and
+        are never retried. ``timeout`` defaults to no read timeout.
+        """
+        budget = self._budget_or_raise()
+        self._check_breaker()
+        self._stats["requests"] += 1
+        client = self._get_client()
+        try:
+            async with client.stream(
+                method,
+                url,
+                headers=self._prepare_headers(headers, budget),
+                timeout=self._timeout(timeout, budget),
+                extensions={"trace": self._trace},
+                **kwargs,
+            ) as response:
+                self._stats["responses"] += 1
+                self._record_status(response.status_code)
+                yield response
+        except (httpx.TimeoutException, httpx.TransportError) as exc:
+            self._record_error(exc)
+            raise
+        except BaseException:
+            self.breaker.abandon_probe()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and breaker state of this upstream."""
+        stats: Dict[str, Any] = dict(self._stats)
+        responses = stats["responses"]
+        requests = stats["requests"]
+        opened = stats["connections_opened"]
+        stats["latency_ms_avg"] = round(stats.pop("latency_ms_total") / responses, 2) if responses else None
+        stats["connection_reuse_ratio"] = round(1 - opened / requests, 4) if requests else None
+        stats["in_flight"] = self._in_flight
+        stats["max_concurrency"] = self.config.max_concurrency
+        stats["circuit_state"] = self.breaker.state
+        return stats
+
+    async def aclose(self) -> None:
+        client, self._client, self._loop, self._slots = self._client, None, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
+def _config_for(name: str) -> UpstreamConfig:
+    services = {
+        "ai": (settings.AI_SERVICE_URL, settings.AI_SERVICE_TIMEOUT),
+        "rag": (settings.RAG_SERVICE_URL, settings.RAG_SERVICE_TIMEOUT),
+        "workflow": (settings.WORKFLOW_SERVICE_URL, settings.WORKFLOW_SERVICE_TIMEOUT),
+        "platform": (settings.PLATFORM_SERVICE_URL, settings.PLATFORM_SERVICE_TIMEOUT),
+    }
+    if name not in services:
+        raise ValueError(f"Unknown upstream: {name}")
+    base_url, timeout = services[name]
+    return UpstreamConfig(
+        name=name,
+        base_url=str(base_url).rstrip("/"),
+        timeout=float(timeout),
+        connect_timeout=settings.UPSTREAM_CONNECT_TIMEOUT,
+        max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        max_concurrency=settings.UPSTREAM_CONCURRENCY_LIMITS.get(name, 0),
+        acquire_timeout=settings.UPSTREAM_ACQUIRE_TIMEOUT,
+        max_retries=settings.UPSTREAM_MAX_RETRIES,
+        backoff_base=settings.UPSTREAM_RETRY_BACKOFF_BASE,
+        backoff_max=settings.UPSTREAM_RETRY_BACKOFF_MAX,
+        breaker_failure_threshold=settings.UPSTREAM_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_seconds=settings.UPSTREAM_BREAKER_RESET_SECONDS,
+    )
+
+
+_upstreams: Dict[str, UpstreamClient] = {}
+
+
+def get_upstream(name: str) -> UpstreamClient:
+    """Get the shared client of an upstream ("ai", "rag", "workflow", "platform")."""
+    client = _upstreams.get(name)
+    if client is None:
+        client = _upstreams[name] = UpstreamClient(_config_for(name))
+    return client
+
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every upstream used so far in this process."""
+    return {name: client.stats() for name, client in _upstreams.items()}
+
+
+async def close_upstreams() -> None:
+    """Close all pooled upstream connections (application shutdown)."""
+    for client in list(_upstreams.values()):
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.warning(f"Failed to close upstream client {client.name}: {exc}")
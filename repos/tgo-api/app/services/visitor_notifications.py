@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import logging
 
+from typing import Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import Visitor
@@ -14,7 +17,7 @@ from app.utils.encoding import build_visitor_channel_id
 logger = logging.getLogger("services.visitor_notifications")
 
 
-async def notify_visitor_profile_updated(db: Session, visitor: Visitor) -> None:
+async def notify_visitor_profile_updated(db: Union[Session, AsyncSession], visitor: Visitor) -> None:
     """
     Notify all staff associated with the visitor's customer-service channel that the profile was updated.
     """
@@ -0,0 +1,125 @@
+"""Async batch queries for visitor data used by conversation and channel lists.
+
+These helpers take an ``AsyncSession`` and load everything a list endpoint
+needs for a page of visitors in a fixed number of queries, instead of one or
+two queries per visitor.
+"""
+
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    SessionStatus,
+    Visitor,
+    VisitorActivity,
+    VisitorServiceStatus,
+    VisitorSession,
+    VisitorTag,
+)
+
+
+async def load_visitors_with_relations(
+    db: AsyncSession,
+    visitor_ids: Iterable[UUID],
+    project_id: UUID,
+    include_closed_and_queued: bool = True,
+) -> Dict[UUID, Visitor]:
+    """Load visitors with the relations needed to build a visitor payload."""
+    ids = list(visitor_ids)
+    if not ids:
+        return {}
+    stmt = (
+        select(Visitor)
+        .options(
+            selectinload(Visitor.platform),
+            selectinload(Visitor.visitor_tags).selectinload(VisitorTag.tag),
+            selectinload(Visitor.ai_profile),
+            selectinload(Visitor.ai_insight),
+            selectinload(Visitor.system_info),
+        )
+        .where(
+            Visitor.id.in_(ids),
+            Visitor.project_id == project_id,
+            Visitor.deleted_at.is_(None),
+        )
+    )
+    if not include_closed_and_queued:
+        stmt = stmt.where(
+            Visitor.service_status.notin_([
+                VisitorServiceStatus.CLOSED.value,
+                VisitorServiceStatus.QUEUED.value,
+            ])
+        )
+    visitors = (await db.execute(stmt)).scalars().all()
+    return {visitor.id: visitor for visitor in visitors}
+
+
+async def load_open_session_staff(
+    db: AsyncSession,
+    visitor_ids: Iterable[UUID],
+    project_id: UUID,
+) -> Dict[UUID, UUID]:
+    """Map visitor_id -> staff_id of the visitor's latest open session."""
+    ids = list(visitor_ids)
+    if not ids:
+        return {}
+    rows = await db.execute(
+        select(VisitorSession.visitor_id, VisitorSession.staff_id)
+        .where(
+            VisitorSession.visitor_id.in_(ids),
+            VisitorSession.project_id == project_id,
+            VisitorSession.status == SessionStatus.OPEN.value,
+            VisitorSession.staff_id.isnot(None),
+        )
+        .order_by(VisitorSession.created_at.desc())
+    )
+    visitor_to_staff: Dict[UUID, UUID] = {}
+    for visitor_id, staff_id in rows:
+        visitor_to_staff.setdefault(visitor_id, staff_id)
+    return visitor_to_staff
+
+
+async def load_recent_activities(
+    db: AsyncSession,
+    visitor_ids: Iterable[UUID],
+    project_id: UUID,
+    per_visitor: int = 10,
+) -> Dict[UUID, List[VisitorActivity]]:
+    """Load the latest ``per_visitor`` activities of each visitor in one query."""
+    ids = list(visitor_ids)
+    if not ids:
+        return {}
+    ranked = (
+        select(
+            VisitorActivity.id,
+            func.row_number()
+            .over(
+                partition_by=VisitorActivity.visitor_id,
+                order_by=VisitorActivity.occurred_at.desc(),
+            )
+            .label("rank"),
+        )
+        .where(
+            VisitorActivity.visitor_id.in_(ids),
+            VisitorActivity.project_id == project_id,
+            VisitorActivity.deleted_at.is_(None),
+        )
+        .subquery()
+    )
+    activities = (
+        await db.execute(
+            select(VisitorActivity)
+            .join(ranked, ranked.c.id == VisitorActivity.id)
+            .where(ranked.c.rank <= per_visitor)
+            .order_by(VisitorActivity.visitor_id, VisitorActivity.occurred_at.desc())
+        )
+    ).scalars().all()
+    by_visitor: Dict[UUID, List[VisitorActivity]] = {}
+    for activity in activities:
+        by_visitor.setdefault(activity.visitor_id, []).append(activity)
+    return by_visitor
+
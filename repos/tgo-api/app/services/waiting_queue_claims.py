@@ -0,0 +1,213 @@
+"""Cross-replica claiming of waiting queue entries.
+
+Every tgo-api replica runs the queue processors (event triggers and the
+fallback loop). Entries are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``
+and a visibility timeout (``claimed_until``) that is committed before any
+assignment starts, so concurrent processors on any replica take disjoint
+entries instead of re-scanning and contending on the same rows. A claim held
+by a crashed worker lapses after ``QUEUE_CLAIM_VISIBILITY_TIMEOUT_SECONDS``.
+
+No row lock is held while an entry is being assigned (``transfer_to_staff``
+awaits IM and AI calls). ``begin_attempt`` records the attempt and renews the
+claim in its own short transaction; ``finish_assignment`` then locks the row
+only to re-check the claim and mark the entry assigned, so a processor whose
+claim lapsed mid-assignment cannot assign the same entry twice.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import VisitorWaitingQueue, WaitingStatus
+
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Service order: higher priority first, then earlier position
+QUEUE_ORDER = (
+    VisitorWaitingQueue.priority.desc(),
+    VisitorWaitingQueue.position.asc(),
+    VisitorWaitingQueue.entered_at.asc(),
+)
+
+
+def new_claim_token() -> str:
+    """Create a token identifying one claim batch (worker plus batch id)."""
+    return f"{_WORKER_ID}:{uuid4().hex[:12]}"
+
+
+def claimable_filter(now: Optional[datetime] = None):
+    """SQL condition for entries that are waiting, unexpired and not claimed."""
+    now = now or datetime.utcnow()
+    return (
+        (VisitorWaitingQueue.status == WaitingStatus.WAITING.value)
+        & (
+            VisitorWaitingQueue.expired_at.is_(None)
+            | (VisitorWaitingQueue.expired_at > func.now())
+        )
+        & or_(
+            VisitorWaitingQueue.claimed_until.is_(None),
+            VisitorWaitingQueue.claimed_until < now,
+        )
+    )
+
+
+def claim_entries(
+    db: Session,
+    token: str,
+    *,
+    project_id: Optional[UUID] = None,
+    entry_id: Optional[UUID] = None,
+    attempted_before: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[VisitorWaitingQueue]:
+    """
+    Atomically claim up to ``limit`` waiting entries in service order.
+
+    The claim is committed before returning, so other processors skip these
+    entries until they are assigned, released or the claim times out.
+
+    Args:
+        db: Database session (committed by this call)
+        token: Claim token from ``new_claim_token``
+        project_id: Only claim entries of this project
+        entry_id: Only claim this entry
+        attempted_before: Only claim entries never attempted or attempted before this time
+        limit: Maximum entries to claim (defaults to QUEUE_PROCESS_BATCH_SIZE)
+
+    Returns:
+        The claimed entries in service order
+    """
+    now = datetime.utcnow()
+    stmt = select(VisitorWaitingQueue.id).where(claimable_filter(now))
+    if project_id is not None:
+        stmt = stmt.where(VisitorWaitingQueue.project_id == project_id)
+    if entry_id is not None:
+        stmt = stmt.where(VisitorWaitingQueue.id == entry_id)
+    if attempted_before is not None:
+        stmt = stmt.where(
+            VisitorWaitingQueue.last_attempt_at.is_(None)
+            | (VisitorWaitingQueue.last_attempt_at < attempted_before)
+        )
+    stmt = (
+        stmt.order_by(*QUEUE_ORDER)
+        .limit(limit or settings.QUEUE_PROCESS_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+
+    ids = list(db.execute(stmt).scalars().all())
+    if not ids:
+        db.rollback()
+        return []
+
+    db.execute(
+        update(VisitorWaitingQueue)
+        .where(VisitorWaitingQueue.id.in_(ids))
+        .values(
+            claimed_by=token,
+            claimed_until=now + timedelta(seconds=settings.QUEUE_CLAIM_VISIBILITY_TIMEOUT_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return (
+        db.query(VisitorWaitingQueue)
+        .filter(VisitorWaitingQueue.id.in_(ids))
+        .order_by(*QUEUE_ORDER)
+        .all()
+    )
+
+
+def begin_attempt(db: Session, entry_id: UUID, token: str) -> Optional[VisitorWaitingQueue]:
+    """
+    Record an assignment attempt and renew the claim (committed by this call).
+
+    Returns the entry (not locked), or None if it is no longer waiting or the
+    claim was lost.
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(VisitorWaitingQueue)
+        .where(
+            VisitorWaitingQueue.id == entry_id,
+            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+            VisitorWaitingQueue.claimed_by == token,
+        )
+        .values(
+            last_attempt_at=now,
+            updated_at=now,
+            claimed_until=now + timedelta(seconds=settings.QUEUE_CLAIM_VISIBILITY_TIMEOUT_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if not result.rowcount:
+        return None
+    return (
+        db.query(VisitorWaitingQueue)
+        .filter(VisitorWaitingQueue.id == entry_id)
+        .populate_existing()
+        .first()
+    )
+
+
+def finish_assignment(db: Session, entry_id: UUID, token: str, staff_id: UUID) -> bool:
+    """
+    Mark a claimed entry assigned and commit the processing transaction.
+
+    If the claim was lost meanwhile, the transaction (including the
+    assignment made by ``transfer_to_staff``) is rolled back and False is
+    returned; the processor now holding the entry assigns it instead.
+    """
+    entry = lock_claimed_entry(db, entry_id, token)
+    if entry is None:
+        db.rollback()
+        return False
+    entry.assign_to_staff(staff_id)
+    db.commit()
+    return True
+
+
+def lock_claimed_entry(db: Session, entry_id: UUID, token: str) -> Optional[VisitorWaitingQueue]:
+    """
+    Lock a claimed entry for processing in the current transaction.
+
+    Returns None if the entry is no longer waiting or the claim was lost
+    (timed out and taken by another processor).
+    """
+    return (
+        db.query(VisitorWaitingQueue)
+        .filter(
+            VisitorWaitingQueue.id == entry_id,
+            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+            VisitorWaitingQueue.claimed_by == token,
+        )
+        .populate_existing()
+        .with_for_update()
+        .first()
+    )
+
+
+def release_claims(db: Session, entry_ids: Iterable[UUID], token: str) -> None:
+    """Release claims still held by ``token`` (committed by this call)."""
+    ids = list(entry_ids)
+    if not ids:
+        return
+    db.execute(
+        update(VisitorWaitingQueue)
+        .where(
+            VisitorWaitingQueue.id.in_(ids),
+            VisitorWaitingQueue.claimed_by == token,
+        )
+        .values(claimed_by=None, claimed_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
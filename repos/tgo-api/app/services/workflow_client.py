@@ -9,6 +9,7 @@ from fastapi import HTTPException
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.upstream import UpstreamDeadlineExceeded, UpstreamError, get_upstream
 
 logger = get_logger("workflow_client")
 
@@ -20,6 +21,7 @@ class WorkflowServiceClient:
         self.base_url = settings.WORKFLOW_SERVICE_URL.rstrip("/")
         self.timeout = settings.WORKFLOW_SERVICE_TIMEOUT
         self.api_key = settings.WORKFLOW_SERVICE_API_KEY
+        self.upstream = get_upstream("workflow")
         
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for Workflow service requests."""
@@ -55,29 +57,31 @@ class WorkflowServiceClient:
         )
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=json_data,
-                    params=params,
-                )
-                
-                logger.info(
-                    f"Workflow service response: {response.status_code}",
-                    extra={
-                        "request_id": request_id,
-                        "status_code": response.status_code,
-                        "response_time": response.elapsed.total_seconds() if response.elapsed else None,
-                    }
-                )
-                
-                return response
-                
-        except httpx.TimeoutException as e:
+            response = await self.upstream.request(
+                method,
+                endpoint,
+                headers=headers,
+                json=json_data,
+                params=params,
+            )
+
+            logger.info(
+                f"Workflow service response: {response.status_code}",
+                extra={
+                    "request_id": request_id,
+                    "status_code": response.status_code,
+                    "response_time": response.elapsed.total_seconds() if response.elapsed else None,
+                }
+            )
+
+            return response
+
+        except (httpx.TimeoutException, UpstreamDeadlineExceeded) as e:
             logger.error(f"Workflow service timeout: {url}")
             raise HTTPException(status_code=504, detail="Workflow service request timed out")
+        except UpstreamError as e:
+            logger.warning(f"Workflow service request rejected: {e}")
+            raise HTTPException(status_code=503, detail="Workflow service is temporarily unavailable")
         except httpx.RequestError as e:
             logger.error(f"Workflow service request error: {e}")
             raise HTTPException(status_code=502, detail="Failed to connect to Workflow service")
@@ -214,7 +218,6 @@ class WorkflowServiceClient:
         self, workflow_id: str, project_id: str, request: Dict[str, Any]
     ) -> Union[Dict[str, Any], Any]:
         """Execute workflow. Supports sync, async, and streaming modes."""
-        url = f"{self.base_url}/v1/workflows/{workflow_id}/execute"
         params = {"project_id": project_id}
         headers = self._get_headers()
         headers["X-Request-ID"] = str(uuid4())
@@ -223,23 +226,26 @@ class WorkflowServiceClient:
         if request.get("stream"):
 
             async def stream_generator():
-                async with httpx.AsyncClient(timeout=None) as client:
-                    async with client.stream(
-                        "POST", url, json=request, params=params, headers=headers
-                    ) as response:
-                        if not response.is_success:
-                            await response.aread()
-                            try:
-                                error_detail = response.json()
-                            except:
-                                error_detail = response.text
-                            raise HTTPException(
-                                status_code=response.status_code, detail=error_detail
-                            )
-
-                        async for line in response.aiter_lines():
-                            if line:
-                                yield f"{line}\n\n"
+                async with self.upstream.stream(
+                    "POST",
+                    f"/v1/workflows/{workflow_id}/execute",
+                    json=request,
+                    params=params,
+                    headers=headers,
+                ) as response:
+                    if not response.is_success:
+                        await response.aread()
+                        try:
+                            error_detail = response.json()
+                        except:
+                            error_detail = response.text
+                        raise HTTPException(
+                            status_code=response.status_code, detail=error_detail
+                        )
+
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield f"{line}\n\n"
 
             return stream_generator()
 
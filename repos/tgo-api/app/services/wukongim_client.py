@@ -1,11 +1,12 @@
 """WuKongIM client for instant messaging integration."""
 
+import asyncio
 import base64
 import binascii
 from datetime import datetime
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import uuid4
 
 import httpx
@@ -47,6 +48,92 @@ class WuKongIMClient:
         self.base_url = settings.WUKONGIM_SERVICE_URL.rstrip("/")
         self.timeout = settings.WUKONGIM_SERVICE_TIMEOUT
         self.enabled = settings.WUKONGIM_ENABLED
+        self.endpoint_timeouts: Dict[str, float] = dict(settings.WUKONGIM_ENDPOINT_TIMEOUTS)
+        # One pooled client per process, created lazily on the running loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+        self._stats: Dict[str, int] = {
+            "requests": 0,
+            "connections_opened": 0,
+            "timeouts": 0,
+            "transport_errors": 0,
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # Pooled connections belong to the loop that opened them
+            if self._client is not None and not self._client.is_closed:
+                self._close_stale_client(self._client, self._client_loop)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(
+                    self.timeout,
+                    connect=settings.WUKONGIM_CONNECT_TIMEOUT,
+                    pool=settings.WUKONGIM_POOL_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.WUKONGIM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.WUKONGIM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.WUKONGIM_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _close_stale_client(
+        self,
+        client: httpx.AsyncClient,
+        owner_loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        """Close a client left behind by a previous event loop without leaking its pool."""
+        if owner_loop is not None and owner_loop.is_running():
+            # Still serving another thread's loop: close the connections there
+            asyncio.run_coroutine_threadsafe(client.aclose(), owner_loop)
+            return
+        # The owning loop has stopped, so its transports can only be released
+        # from here; errors from transports bound to a closed loop are expected
+        task = asyncio.get_running_loop().create_task(self._aclose_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Closing WuKongIM client from a previous event loop: {e}")
+
+    def _timeout_for(self, endpoint: str, timeout: Optional[float]) -> httpx.Timeout:
+        read = timeout if timeout is not None else self.endpoint_timeouts.get(endpoint, self.timeout)
+        return httpx.Timeout(
+            read,
+            connect=settings.WUKONGIM_CONNECT_TIMEOUT,
+            pool=settings.WUKONGIM_POOL_TIMEOUT,
+        )
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook: counts newly opened TCP connections."""
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection reuse counters for this process."""
+        requests = self._stats["requests"]
+        opened = self._stats["connections_opened"]
+        return {
+            **self._stats,
+            "connections_reused": max(0, requests - opened),
+            "reuse_ratio": round(1 - opened / requests, 4) if requests else None,
+        }
+
+    async def aclose(self) -> None:
+        """Close pooled connections (application shutdown)."""
+        client, self._client, self._client_loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
 
     def _decode_message_payload(self, payload: str) -> Dict[str, Any]:
         """
@@ -154,8 +241,9 @@ class WuKongIMClient:
         endpoint: str,
         json_data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
-        """Make HTTP request to WuKongIM service."""
+        """Make HTTP request to WuKongIM service over the pooled client."""
         if not self.enabled:
             logger.debug("WuKongIM integration is disabled, skipping request")
             return {}
@@ -164,45 +252,49 @@ class WuKongIMClient:
 
         logger.debug(f"WuKongIM request: {method} {url}")
 
+        self._stats["requests"] += 1
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    json=json_data,
-                    params=params,
-                )
+            response = await self._get_client().request(
+                method=method,
+                url=endpoint,
+                json=json_data,
+                params=params,
+                timeout=self._timeout_for(endpoint, timeout),
+                extensions={"trace": self._trace},
+            )
 
-                logger.debug(f"WuKongIM response: {response.status_code}")
-
-                # WuKongIM API returns 200 for success, other codes for errors
-                if response.status_code == 200:
-                    # Some endpoints return empty response body on success
-                    try:
-                        return response.json() if response.text else {}
-                    except Exception:
-                        return {}
-                else:
-                    # Handle error responses
-                    try:
-                        error_data = response.json()
-                        error_msg = error_data.get("msg", f"WuKongIM error: {response.status_code}")
-                    except Exception:
-                        error_msg = f"WuKongIM HTTP error: {response.status_code}"
-
-                    logger.error(f"WuKongIM error response: {response.status_code} - {error_msg}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"WuKongIM service error: {error_msg}"
-                    )
+            logger.debug(f"WuKongIM response: {response.status_code}")
+
+            # WuKongIM API returns 200 for success, other codes for errors
+            if response.status_code == 200:
+                # Some endpoints return empty response body on success
+                try:
+                    return response.json() if response.text else {}
+                except Exception:
+                    return {}
+            else:
+                # Handle error responses
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get("msg", f"WuKongIM error: {response.status_code}")
+                except Exception:
+                    error_msg = f"WuKongIM HTTP error: {response.status_code}"
+
+                logger.error(f"WuKongIM error response: {response.status_code} - {error_msg}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"WuKongIM service error: {error_msg}"
+                )
 
         except httpx.TimeoutException:
+            self._stats["timeouts"] += 1
             logger.error(f"WuKongIM request timeout: {method} {url}")
             raise HTTPException(
                 status_code=500,
                 detail="WuKongIM service timeout"
             )
         except httpx.RequestError as e:
+            self._stats["transport_errors"] += 1
             logger.error(f"WuKongIM request error: {e}")
             raise HTTPException(
                 status_code=500,
@@ -1361,12 +1453,14 @@ class WuKongIMClient:
             # Re-raise the exception to be handled by the caller
             raise
 
-    async def check_user_online_status(self, uids: list[str]) -> list[str]:
+    async def check_user_online_status(self, uids: list[str], raise_errors: bool = False) -> list[str]:
         """
         Check online status of users.
 
         Args:
             uids: List of user IDs to check
+            raise_errors: Raise on request failure instead of returning an empty list
+                (callers that treat "not returned" as offline must set this)
 
         Returns:
             List of online user IDs
@@ -1396,6 +1490,8 @@ class WuKongIMClient:
 
         except Exception as e:
             logger.error(f"Failed to check user online status: {e}")
+            if raise_errors:
+                raise
             # Return empty list on error to avoid breaking the main flow
             return []
 
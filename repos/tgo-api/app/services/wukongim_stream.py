@@ -0,0 +1,253 @@
+"""Per-run outbound queue that forwards AI stream events to WuKongIM.
+
+Reading the AI stream must not wait on IM delivery: every ``stream.delta``
+used to be its own POST, so a long answer meant hundreds of sequential
+requests and the AI reader ran at WuKongIM's latency.
+
+``WuKongIMStreamForwarder`` decouples the two. The reader enqueues events
+without awaiting; one sender task per run delivers them in order. Deltas that
+arrive while the sender is busy (or within the flush window) are merged into a
+single ``stream.delta``, so the number of POSTs depends on WuKongIM latency
+rather than on the number of chunks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.wukongim_client import wukongim_client
+
+logger = get_logger("services.wukongim_stream")
+
+_ANCHOR = "anchor"
+_DELTA = "stream.delta"
+
+# Sender tasks of closed forwarders that are still draining; keeps them
+# referenced until they finish.
+_draining: Set["asyncio.Task[None]"] = set()
+
+
+@dataclass
+class _Outbound:
+    """One queued WuKongIM call."""
+
+    kind: str
+    payload: Optional[Dict[str, Any]] = None
+    event_key: str = "main"
+    parts: List[str] = field(default_factory=list)
+    size: int = 0
+    created_at: float = 0.0
+
+    def delta_text(self) -> str:
+        return "".join(self.parts)
+
+
+class WuKongIMStreamForwarder:
+    """Bounded, in-order, coalescing sender for one AI run.
+
+    Args:
+        flush_interval: Seconds a lone delta may wait for more text before it is sent
+        flush_chars: Send a delta as soon as it holds this many characters
+        max_pending: Maximum queued calls; past it, deltas are merged into the
+            last one regardless of size so the queue never grows further
+    """
+
+    def __init__(
+        self,
+        *,
+        channel_id: str,
+        channel_type: int,
+        client_msg_no: str,
+        from_uid: str,
+        flush_interval: Optional[float] = None,
+        flush_chars: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.channel_id = channel_id
+        self.channel_type = channel_type
+        self.client_msg_no = client_msg_no
+        self.from_uid = from_uid
+        self.flush_interval = (
+            settings.WUKONGIM_STREAM_FLUSH_INTERVAL_MS / 1000.0
+            if flush_interval is None
+            else flush_interval
+        )
+        self.flush_chars = flush_chars or settings.WUKONGIM_STREAM_FLUSH_CHARS
+        self.max_pending = max(1, max_pending or settings.WUKONGIM_STREAM_MAX_PENDING)
+
+        self._queue: Deque[_Outbound] = deque()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task[None]] = None
+        self.deltas_received = 0
+        self.requests_sent = 0
+        self.failures = 0
+
+    # ------------------------------------------------------------------
+    # Producer side (never awaits WuKongIM)
+    # ------------------------------------------------------------------
+
+    def send_anchor(self, payload: Dict[str, Any]) -> None:
+        """Queue the stream anchor message (``is_stream=1``)."""
+        self._enqueue(_Outbound(kind=_ANCHOR, payload=payload))
+
+    def send_delta(self, text: str, event_key: str = "main") -> None:
+        """Queue text for a ``stream.delta``, merging with the pending delta if possible."""
+        if not text or self._closed:
+            return
+        self.deltas_received += 1
+        tail = self._queue[-1] if self._queue else None
+        if tail is not None and tail.kind == _DELTA and tail.event_key == event_key and (
+            tail.size < self.flush_chars or len(self._queue) >= self.max_pending
+        ):
+            tail.parts.append(text)
+            tail.size += len(text)
+            if tail.size >= self.flush_chars:
+                self._wakeup.set()
+            return
+        self._enqueue(
+            _Outbound(
+                kind=_DELTA,
+                event_key=event_key,
+                parts=[text],
+                size=len(text),
+                created_at=asyncio.get_running_loop().time(),
+            )
+        )
+
+    def send_event(
+        self,
+        event_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        event_key: str = "main",
+    ) -> None:
+        """Queue a non-delta stream event (close / finish / error / cancel)."""
+        self._enqueue(_Outbound(kind=event_type, payload=payload, event_key=event_key))
+
+    def close(self) -> None:
+        """Stop accepting events; queued ones are still delivered in the background."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None and not self._task.done():
+            _draining.add(self._task)
+            self._task.add_done_callback(_draining.discard)
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """Close and wait (up to ``timeout`` seconds) for queued events to be delivered."""
+        self.close()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "WuKongIM stream forwarder did not drain in time",
+                extra={"client_msg_no": self.client_msg_no, "pending": len(self._queue)},
+            )
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def _enqueue(self, item: _Outbound) -> None:
+        if self._closed:
+            logger.debug(
+                "Dropping WuKongIM stream event after close",
+                extra={"client_msg_no": self.client_msg_no, "kind": item.kind},
+            )
+            return
+        if len(self._queue) >= self.max_pending and item.kind != _DELTA:
+            # Control events are rare and must not be lost; the bound is
+            # enforced on deltas, which merge instead of queueing.
+            logger.debug(
+                "WuKongIM stream queue over limit",
+                extra={"client_msg_no": self.client_msg_no, "pending": len(self._queue)},
+            )
+        self._queue.append(item)
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    # ------------------------------------------------------------------
+    # Sender side
+    # ------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._queue:
+                if self._closed:
+                    break
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            head = self._queue[0]
+            if (
+                head.kind == _DELTA
+                and len(self._queue) == 1
+                and not self._closed
+                and head.size < self.flush_chars
+            ):
+                # A lone, small delta waits for more text until its window ends
+                remaining = head.created_at + self.flush_interval - loop.time()
+                if remaining > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+            self._queue.popleft()
+            await self._deliver(head)
+
+        logger.debug(
+            "WuKongIM stream forwarder finished",
+            extra={
+                "client_msg_no": self.client_msg_no,
+                "deltas": self.deltas_received,
+                "requests": self.requests_sent,
+                "failures": self.failures,
+            },
+        )
+
+    async def _deliver(self, item: _Outbound) -> None:
+        try:
+            if item.kind == _ANCHOR:
+                await wukongim_client.send_stream_message(
+                    from_uid=self.from_uid,
+                    channel_id=self.channel_id,
+                    channel_type=self.channel_type,
+                    client_msg_no=self.client_msg_no,
+                    payload=item.payload or {},
+                )
+            else:
+                payload = item.payload
+                if item.kind == _DELTA:
+                    payload = {"kind": "text", "delta": item.delta_text()}
+                await wukongim_client.send_stream_event(
+                    channel_id=self.channel_id,
+                    channel_type=self.channel_type,
+                    client_msg_no=self.client_msg_no,
+                    event_id=uuid4().hex,
+                    event_type=item.kind,
+                    event_key=item.event_key,
+                    from_uid=self.from_uid,
+                    payload=payload,
+                )
+            self.requests_sent += 1
+        except Exception as e:
+            self.failures += 1
+            logger.error(
+                f"Failed to deliver WuKongIM stream event {item.kind}: {e}",
+                extra={"client_msg_no": self.client_msg_no},
+            )
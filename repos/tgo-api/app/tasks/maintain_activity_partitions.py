@@ -0,0 +1,213 @@
+"""Monthly partition maintenance for api_visitor_activities.
+
+The activity table is range-partitioned on ``occurred_at``, one partition per
+calendar month (``api_visitor_activities_pYYYY_MM``) plus a default partition
+that catches rows outside the created range. This task keeps
+``VISITOR_ACTIVITY_PARTITION_MONTHS_AHEAD`` future partitions created and
+drops whole partitions once they fall out of
+``VISITOR_ACTIVITY_RETENTION_MONTHS`` instead of deleting rows (0 disables
+retention).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.core.logging import get_logger
+
+logger = get_logger("tasks.maintain_activity_partitions")
+
+PARENT_TABLE = "api_visitor_activities"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+# Global state
+_task: Optional[asyncio.Task] = None
+_processing_lock = asyncio.Lock()
+
+_LIST_PARTITIONS_SQL = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits AS i
+    JOIN pg_class AS parent ON parent.oid = i.inhparent
+    JOIN pg_class AS child ON child.oid = i.inhrelid
+    WHERE parent.relname = :parent
+    """
+)
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing ``value``."""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """``month`` (a month start) shifted by ``months``."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Name of the partition holding ``month``."""
+    return f"{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Month a partition holds, or None for other tables (e.g. the default partition)."""
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def plan_partitions(
+    existing: List[str],
+    now: datetime,
+    months_ahead: int,
+    retention_months: int,
+) -> Tuple[List[datetime], List[str], Optional[datetime]]:
+    """Decide which monthly partitions to create and which to drop.
+
+    Returns:
+        (months to create, partition names to drop, retention cutoff). The
+        cutoff is None when retention is disabled; otherwise rows older than
+        it are out of retention.
+    """
+    current = month_start(now)
+    have = {partition_month(name): name for name in existing}
+    have.pop(None, None)
+
+    cutoff = add_months(current, -retention_months) if retention_months > 0 else None
+    to_create = [
+        month
+        for month in (add_months(current, offset) for offset in range(months_ahead + 1))
+        if month not in have
+    ]
+    to_drop = sorted(
+        name for month, name in have.items()
+        if cutoff is not None and add_months(month, 1) <= cutoff
+    )
+    return to_create, to_drop, cutoff
+
+
+async def _create_partition(month: datetime) -> None:
+    name = partition_name(month)
+    lower, upper = month.isoformat(sep=" "), add_months(month, 1).isoformat(sep=" ")
+    async with async_session_scope() as db:
+        await db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        # Built detached and then attached, so rows that already landed in the
+        # default partition for this month can be moved over first
+        await db.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        await db.execute(
+            text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE occurred_at >= :lower AND occurred_at < :upper
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ),
+            {"lower": month, "upper": add_months(month, 1)},
+        )
+        await db.execute(
+            text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+        )
+
+
+async def _drop_partition(name: str) -> None:
+    async with async_session_scope() as db:
+        await db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        await db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+
+
+async def maintain_activity_partitions(now: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Create upcoming activity partitions and drop expired ones.
+
+    Returns:
+        Number of partitions created and dropped
+    """
+    now = now or datetime.utcnow()
+    async with async_session_scope() as db:
+        await db.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT")
+        )
+        existing = list((await db.execute(_LIST_PARTITIONS_SQL, {"parent": PARENT_TABLE})).scalars())
+
+    to_create, to_drop, cutoff = plan_partitions(
+        existing,
+        now,
+        settings.VISITOR_ACTIVITY_PARTITION_MONTHS_AHEAD,
+        settings.VISITOR_ACTIVITY_RETENTION_MONTHS,
+    )
+    for month in to_create:
+        await _create_partition(month)
+    for name in to_drop:
+        await _drop_partition(name)
+    if cutoff is not None:
+        # Out-of-range rows live in the default partition and expire row by row
+        async with async_session_scope() as db:
+            await db.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE occurred_at < :cutoff"),
+                {"cutoff": cutoff},
+            )
+    return len(to_create), len(to_drop)
+
+
+async def _run_periodic_task():
+    """Run the periodic partition maintenance (first run immediately)."""
+    logger.info(
+        f"Starting activity partition maintenance task "
+        f"(interval={settings.VISITOR_ACTIVITY_PARTITION_INTERVAL_SECONDS}s)"
+    )
+
+    while True:
+        try:
+            async with _processing_lock:
+                created, dropped = await maintain_activity_partitions()
+                if created or dropped:
+                    logger.info(f"Activity partitions: created {created}, dropped {dropped}")
+        except Exception as e:
+            logger.error(f"Error in activity partition maintenance: {e}")
+        await asyncio.sleep(settings.VISITOR_ACTIVITY_PARTITION_INTERVAL_SECONDS)
+
+
+async def start_activity_partition_task():
+    """Start the background activity partition maintenance task."""
+    global _task
+
+    if _task is not None and not _task.done():
+        logger.warning("Activity partition maintenance task is already running")
+        return
+
+    _task = asyncio.create_task(_run_periodic_task())
+    logger.info("Activity partition maintenance task started")
+
+
+async def stop_activity_partition_task():
+    """Stop the background activity partition maintenance task."""
+    global _task
+
+    if _task is None:
+        return
+
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+
+    _task = None
+    logger.info("Activity partition maintenance task stopped")
@@ -10,7 +10,7 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Set
+from typing import Optional
 from uuid import UUID
 
 from sqlalchemy import func
@@ -27,14 +27,19 @@ from app.models import (
     AssignmentSource,
 )
 from app.services.transfer_service import transfer_to_staff
+from app.services.waiting_queue_claims import (
+    begin_attempt,
+    claim_entries,
+    finish_assignment,
+    new_claim_token,
+    release_claims,
+)
 
 logger = get_logger("tasks.process_waiting_queue")
 
 # Global state for tasks
 _fallback_task: Optional[asyncio.Task] = None
 _cleanup_task: Optional[asyncio.Task] = None
-_processing_lock = asyncio.Lock()
-_processing_ids: Set[UUID] = set()
 _semaphore: Optional[asyncio.Semaphore] = None
 
 
@@ -59,72 +64,43 @@ async def _process_fallback_batch() -> None:
     - Entries present after system restart
     - Entries where staff became available without triggering events
     
-    Only processes entries that:
+    Only claims entries that:
     - Are in WAITING status
     - Are not expired (expired_at > now or expired_at is null)
+    - Are not claimed by another processor (on any replica)
     - Haven't been attempted recently (last_attempt_at < now - fallback_interval)
     """
     db = SessionLocal()
+    token = new_claim_token()
+    claimed_ids: list[UUID] = []
     try:
         fallback_delay = timedelta(seconds=settings.QUEUE_FALLBACK_INTERVAL_SECONDS)
         cutoff_time = datetime.utcnow() - fallback_delay
         
-        # Query entries that need fallback processing
-        entries = (
-            db.query(VisitorWaitingQueue)
-            .filter(
-                VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-                # Not expired
-                (
-                    (VisitorWaitingQueue.expired_at.is_(None)) |
-                    (VisitorWaitingQueue.expired_at > func.now())
-                ),
-                # Haven't been attempted recently
-                (
-                    (VisitorWaitingQueue.last_attempt_at.is_(None)) |
-                    (VisitorWaitingQueue.last_attempt_at < cutoff_time)
-                ),
-            )
-            .order_by(
-                VisitorWaitingQueue.priority.desc(),
-                VisitorWaitingQueue.position.asc(),
-            )
-            .limit(settings.QUEUE_PROCESS_BATCH_SIZE)
-            .all()
-        )
+        # Claim entries that need fallback processing
+        entries = claim_entries(db, token, attempted_before=cutoff_time)
 
         if not entries:
             logger.debug("Fallback processor: no entries to process")
             return
 
-        # Filter out entries already being processed
-        async with _processing_lock:
-            entries_to_process = [e for e in entries if e.id not in _processing_ids]
-            for e in entries_to_process:
-                _processing_ids.add(e.id)
-
-        if not entries_to_process:
-            logger.debug("Fallback processor: all entries already being processed")
-            return
-
+        claimed_ids = [e.id for e in entries]
         logger.info(
-            f"Fallback processor: processing {len(entries_to_process)} entries",
-            extra={"count": len(entries_to_process)},
+            f"Fallback processor: processing {len(entries)} entries",
+            extra={"count": len(entries)},
         )
 
         # Group entries by project for efficient processing
-        project_entries: dict[UUID, list[VisitorWaitingQueue]] = {}
-        for entry in entries_to_process:
-            if entry.project_id not in project_entries:
-                project_entries[entry.project_id] = []
-            project_entries[entry.project_id].append(entry)
+        project_entries: dict[UUID, list[UUID]] = {}
+        for entry in entries:
+            project_entries.setdefault(entry.project_id, []).append(entry.id)
 
         # Process each project's entries
         semaphore = _get_semaphore()
         
         async def process_project_entries(
             project_id: UUID,
-            entries: list[VisitorWaitingQueue]
+            entry_ids: list[UUID]
         ) -> tuple[int, int]:
             """Process entries for a single project."""
             async with semaphore:
@@ -132,22 +108,14 @@ async def _process_fallback_batch() -> None:
                 assigned = 0
                 processed = 0
                 try:
-                    for entry in entries:
+                    for entry_id in entry_ids:
                         try:
-                            # Re-fetch entry to get latest state
-                            fresh_entry = (
-                                entry_db.query(VisitorWaitingQueue)
-                                .filter(
-                                    VisitorWaitingQueue.id == entry.id,
-                                    VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-                                )
-                                .first()
-                            )
+                            # Record the attempt and renew the claim (skips lost claims)
+                            fresh_entry = begin_attempt(entry_db, entry_id, token)
                             
                             if not fresh_entry:
                                 continue
                                 
-                            fresh_entry.record_attempt()
                             processed += 1
                             
                             result = await transfer_to_staff(
@@ -164,8 +132,9 @@ async def _process_fallback_batch() -> None:
                             )
                             
                             if result.success and result.assigned_staff_id:
-                                fresh_entry.assign_to_staff(result.assigned_staff_id)
-                                entry_db.commit()
+                                if not finish_assignment(entry_db, entry_id, token, result.assigned_staff_id):
+                                    logger.warning(f"Fallback: lost claim on entry {entry_id} during assignment")
+                                    continue
                                 assigned += 1
                                 logger.info(
                                     f"Fallback: entry {fresh_entry.id} assigned to {result.assigned_staff_id}",
@@ -175,12 +144,12 @@ async def _process_fallback_batch() -> None:
                                     }
                                 )
                             else:
-                                entry_db.commit()  # Commit attempt record
+                                entry_db.commit()
                                 # No staff available, stop processing this project
                                 break
                                 
                         except Exception as e:
-                            logger.error(f"Fallback: error processing entry {entry.id}: {e}")
+                            logger.error(f"Fallback: error processing entry {entry_id}: {e}")
                             try:
                                 entry_db.rollback()
                             except Exception:
@@ -205,15 +174,10 @@ async def _process_fallback_batch() -> None:
                 total_assigned += result[0]
                 total_processed += result[1]
 
-        # Remove from processing set
-        async with _processing_lock:
-            for e in entries_to_process:
-                _processing_ids.discard(e.id)
-
         logger.info(
             f"Fallback processor: batch complete",
             extra={
-                "total": len(entries_to_process),
+                "total": len(entries),
                 "processed": total_processed,
                 "assigned": total_assigned,
             },
@@ -222,6 +186,11 @@ async def _process_fallback_batch() -> None:
     except Exception as e:
         logger.exception(f"Fallback processor: batch exception: {e}")
     finally:
+        # Entries that were not assigned become claimable again right away
+        try:
+            release_claims(db, claimed_ids, token)
+        except Exception as e:
+            logger.warning(f"Fallback processor: failed to release claims: {e}")
         db.close()
 
 
@@ -259,6 +228,8 @@ async def _cleanup_expired_entries() -> None:
                 VisitorWaitingQueue.expired_at < func.now(),
             )
             .limit(100)  # Process in batches
+            # Leave entries a processor is assigning right now to that processor
+            .with_for_update(skip_locked=True)
             .all()
         )
 
@@ -0,0 +1,154 @@
+"""Periodic reconciliation of the per-staff load index (api_staff_load)."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.core.logging import get_logger
+from app.models import SessionStatus
+
+logger = get_logger("tasks.reconcile_staff_load")
+
+# Global state
+_task: Optional[asyncio.Task] = None
+_processing_lock = asyncio.Lock()
+
+# Staff are recounted in keyset batches by id, one transaction per batch, so
+# session assign/release writes only ever wait for the batch holding their
+# staff's row rather than for a pass over every project.
+_BATCH_SQL = text(
+    """
+    SELECT id FROM api_staff
+    WHERE deleted_at IS NULL
+      AND (CAST(:after_id AS uuid) IS NULL OR id > CAST(:after_id AS uuid))
+    ORDER BY id
+    LIMIT :limit
+    """
+)
+
+# Lock the batch's existing load rows first: session writes that are still in
+# flight hold their staff's row, so the recount below starts after they commit
+# and sees their effect, while writes that start later wait for this
+# transaction and apply their delta on top of the corrected value.
+_LOCK_SQL = text(
+    """
+    SELECT staff_id FROM api_staff_load
+    WHERE staff_id = ANY(CAST(:ids AS uuid[]))
+    ORDER BY staff_id
+    FOR UPDATE
+    """
+)
+
+_RECONCILE_SQL = text(
+    """
+    INSERT INTO api_staff_load (staff_id, project_id, open_sessions, updated_at)
+    SELECT s.id, s.project_id, COUNT(vs.id), now()
+    FROM api_staff AS s
+    LEFT JOIN api_visitor_sessions AS vs
+        ON vs.staff_id = s.id AND vs.status = :open_status
+    WHERE s.id = ANY(CAST(:ids AS uuid[]))
+      AND s.deleted_at IS NULL
+    GROUP BY s.id, s.project_id
+    ON CONFLICT (staff_id) DO UPDATE
+    SET open_sessions = EXCLUDED.open_sessions,
+        project_id = EXCLUDED.project_id,
+        updated_at = EXCLUDED.updated_at
+    WHERE api_staff_load.open_sessions <> EXCLUDED.open_sessions
+       OR api_staff_load.project_id <> EXCLUDED.project_id
+    """
+)
+
+
+async def _reconcile_batch(after_id: Optional[UUID], limit: int) -> Tuple[List[UUID], int]:
+    """Recount the next batch of staff after ``after_id`` in its own transaction.
+
+    Returns:
+        (staff ids of the batch, number of load rows fixed)
+    """
+    async with async_session_scope() as db:
+        ids = list(
+            (await db.execute(_BATCH_SQL, {"after_id": after_id, "limit": limit})).scalars().all()
+        )
+        if not ids:
+            return ids, 0
+        await db.execute(_LOCK_SQL, {"ids": ids})
+        result = await db.execute(
+            _RECONCILE_SQL,
+            {"ids": ids, "open_status": SessionStatus.OPEN.value},
+        )
+        return ids, result.rowcount or 0
+
+
+async def reconcile_staff_load() -> int:
+    """
+    Recompute open-session counts for all staff from api_visitor_sessions.
+    
+    Returns:
+        Number of load rows that were missing or wrong (and were fixed)
+    """
+    batch_size = settings.STAFF_LOAD_RECONCILE_BATCH_SIZE
+    fixed = 0
+    after_id: Optional[UUID] = None
+    while True:
+        ids, batch_fixed = await _reconcile_batch(after_id, batch_size)
+        fixed += batch_fixed
+        if len(ids) < batch_size:
+            return fixed
+        after_id = ids[-1]
+
+
+async def _run_periodic_task():
+    """Run the periodic staff load reconciliation."""
+    logger.info(
+        f"Starting staff load reconciliation task "
+        f"(interval={settings.STAFF_LOAD_RECONCILE_INTERVAL_SECONDS}s)"
+    )
+    
+    while True:
+        await asyncio.sleep(settings.STAFF_LOAD_RECONCILE_INTERVAL_SECONDS)
+        try:
+            async with _processing_lock:
+                fixed = await reconcile_staff_load()
+                if fixed > 0:
+                    logger.warning(f"Staff load reconciliation corrected {fixed} staff load rows")
+        except Exception as e:
+            logger.error(f"Error in staff load reconciliation: {e}")
+
+
+async def start_staff_load_reconcile_task():
+    """Start the background staff load reconciliation task."""
+    global _task
+    
+    if not settings.STAFF_LOAD_RECONCILE_ENABLED:
+        logger.info("Staff load reconciliation is disabled")
+        return
+    
+    if _task is not None and not _task.done():
+        logger.warning("Staff load reconciliation task is already running")
+        return
+    
+    _task = asyncio.create_task(_run_periodic_task())
+    logger.info("Staff load reconciliation task started")
+
+
+async def stop_staff_load_reconcile_task():
+    """Stop the background staff load reconciliation task."""
+    global _task
+    
+    if _task is None:
+        return
+    
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    
+    _task = None
+    logger.info("Staff load reconciliation task stopped")
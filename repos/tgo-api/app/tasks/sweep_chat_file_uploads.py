@@ -0,0 +1,135 @@
+"""Periodic cleanup of presigned chat file uploads that were never completed.
+
+``/chat/upload/presign`` records every issued upload URL in
+``api_chat_file_uploads`` and ``/chat/upload/complete`` removes the record.
+A client that uploads but never completes leaves an object no chat file
+points to; once the URL and its upload token have expired (plus a grace
+period for completions still in flight) this task deletes the object and
+the record.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.core.logging import get_logger
+from app.models import ChatFile, ChatFileUpload
+
+logger = get_logger("tasks.sweep_chat_file_uploads")
+
+# Global state
+_task: Optional[asyncio.Task] = None
+_processing_lock = asyncio.Lock()
+
+SWEEP_GRACE = timedelta(minutes=5)
+SWEEP_BATCH_SIZE = 100
+
+
+async def sweep_chat_file_uploads(now: Optional[datetime] = None) -> int:
+    """
+    Delete expired, never completed uploads and their stored objects.
+
+    Returns:
+        Number of abandoned uploads whose object was deleted
+    """
+    from app.services.storage import get_storage
+
+    cutoff = (now or datetime.utcnow()) - SWEEP_GRACE
+    storage = get_storage()
+    swept = 0
+    # Records whose object could not be deleted stay for the next sweep
+    failed: Set[UUID] = set()
+    while True:
+        stmt = (
+            select(ChatFileUpload.id, ChatFileUpload.file_path)
+            .where(ChatFileUpload.expires_at < cutoff)
+            .order_by(ChatFileUpload.expires_at)
+            .limit(SWEEP_BATCH_SIZE)
+        )
+        if failed:
+            stmt = stmt.where(ChatFileUpload.id.notin_(failed))
+        async with async_session_scope() as db:
+            uploads = (await db.execute(stmt)).all()
+            if not uploads:
+                return swept
+            completed = set(
+                (
+                    await db.execute(
+                        select(ChatFile.file_path).where(
+                            ChatFile.file_path.in_([upload.file_path for upload in uploads])
+                        )
+                    )
+                ).scalars()
+            )
+
+        done: List[UUID] = []
+        for upload in uploads:
+            if upload.file_path in completed:
+                # The upload was completed, only its record was left behind
+                done.append(upload.id)
+            elif await storage.delete(upload.file_path):
+                done.append(upload.id)
+                swept += 1
+            else:
+                logger.warning(f"Failed to delete abandoned chat file upload {upload.file_path}")
+                failed.add(upload.id)
+        if done:
+            async with async_session_scope() as db:
+                await db.execute(delete(ChatFileUpload).where(ChatFileUpload.id.in_(done)))
+
+        if len(uploads) < SWEEP_BATCH_SIZE:
+            return swept
+
+
+async def _run_periodic_task():
+    """Run the periodic upload sweep."""
+    logger.info(
+        f"Starting chat file upload sweep task "
+        f"(interval={settings.CHAT_FILE_UPLOAD_SWEEP_INTERVAL_SECONDS}s)"
+    )
+
+    while True:
+        await asyncio.sleep(settings.CHAT_FILE_UPLOAD_SWEEP_INTERVAL_SECONDS)
+        try:
+            async with _processing_lock:
+                swept = await sweep_chat_file_uploads()
+                if swept > 0:
+                    logger.info(f"Deleted {swept} abandoned chat file uploads")
+        except Exception as e:
+            logger.error(f"Error in chat file upload sweep: {e}")
+
+
+async def start_chat_file_upload_sweep_task():
+    """Start the background chat file upload sweep task."""
+    global _task
+
+    if _task is not None and not _task.done():
+        logger.warning("Chat file upload sweep task is already running")
+        return
+
+    _task = asyncio.create_task(_run_periodic_task())
+    logger.info("Chat file upload sweep task started")
+
+
+async def stop_chat_file_upload_sweep_task():
+    """Stop the background chat file upload sweep task."""
+    global _task
+
+    if _task is None:
+        return
+
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+
+    _task = None
+    logger.info("Chat file upload sweep task stopped")
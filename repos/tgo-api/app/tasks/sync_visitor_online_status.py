@@ -1,18 +1,27 @@
-"""Periodic task to sync visitor online status with WuKongIM."""
+"""Periodic task to sync visitor online status with WuKongIM.
+
+Visitors marked online are paged through by id (keyset pagination) so a cycle
+never loads the whole online set, each page is checked against WuKongIM with a
+bounded number of concurrent requests, and only visitors that turned out to be
+offline are written, with one bulk ``UPDATE ... FROM (VALUES ...)`` per page.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Uuid, column, select, update, values
 
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import async_session_scope
 from app.core.logging import get_logger
 from app.models import Visitor
+from app.models.visitor_conversation import live_visitors_statement
 from app.services.wukongim_client import wukongim_client
 
 logger = get_logger("tasks.sync_visitor_online_status")
@@ -22,6 +31,89 @@ _task: Optional[asyncio.Task] = None
 _processing_lock = asyncio.Lock()
 
 
+@dataclass
+class OnlineSyncCycleStats:
+    """Metrics of one online status sync cycle."""
+
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    duration_seconds: float = 0.0
+    pages: int = 0
+    checked: int = 0
+    marked_offline: int = 0
+    failed_batches: int = 0
+
+
+_last_cycle: Optional[OnlineSyncCycleStats] = None
+
+
+def get_last_cycle_stats() -> Optional[Dict[str, Any]]:
+    """Metrics of the most recent completed sync cycle, if any."""
+    return asdict(_last_cycle) if _last_cycle else None
+
+
+async def _load_online_page(after_id: Optional[UUID], limit: int) -> List[UUID]:
+    """Next page of ids of visitors marked online, ordered by id."""
+    stmt = (
+        select(Visitor.id)
+        .where(Visitor.is_online.is_(True))
+        .order_by(Visitor.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Visitor.id > after_id)
+    async with async_session_scope() as db:
+        return list((await db.execute(stmt)).scalars().all())
+
+
+async def _find_offline(
+    visitor_ids: Sequence[UUID],
+    semaphore: asyncio.Semaphore,
+) -> Optional[List[UUID]]:
+    """
+    Return the visitors of a batch that WuKongIM reports as offline.
+    
+    Returns None if the batch could not be checked.
+    """
+    # Map visitor ID to UID (WuKongIM uses "{visitor_id}-vtr")
+    uid_to_visitor = {f"{visitor_id}-vtr": visitor_id for visitor_id in visitor_ids}
+    async with semaphore:
+        try:
+            # This returns a list of UIDs that are ACTUALLY online
+            actually_online = set(
+                await wukongim_client.check_user_online_status(
+                    list(uid_to_visitor), raise_errors=True
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error checking batch of visitor online status: {e}")
+            return None
+    return [v for uid, v in uid_to_visitor.items() if uid not in actually_online]
+
+
+async def _mark_offline(visitor_ids: Sequence[UUID], now: datetime) -> int:
+    """Mark visitors offline in one statement. Returns the number of rows changed."""
+    if not visitor_ids:
+        return 0
+    offline = values(column("id", Uuid), name="offline").data(
+        [(visitor_id,) for visitor_id in visitor_ids]
+    )
+    stmt = (
+        update(Visitor)
+        .where(
+            Visitor.id == offline.c.id,
+            # Skip visitors another writer already marked offline
+            Visitor.is_online.is_(True),
+        )
+        .values(is_online=False, last_offline_time=now)
+        .execution_options(synchronize_session=False)
+    )
+    async with async_session_scope() as db:
+        result = await db.execute(stmt)
+        # Bulk UPDATE bypasses the ORM listeners; patch the projection rows in place
+        await db.execute(live_visitors_statement(visitor_ids))
+        return result.rowcount or 0
+
+
 async def _process_online_status_sync() -> int:
     """
     Sync visitor online status with WuKongIM.
@@ -31,66 +123,57 @@ async def _process_online_status_sync() -> int:
     Returns:
         Number of visitors marked offline
     """
-    db: Session = SessionLocal()
-    marked_offline_count = 0
+    global _last_cycle
+    
+    # Without WuKongIM every visitor would look offline
+    if not wukongim_client.enabled:
+        return 0
+    
+    stats = OnlineSyncCycleStats()
+    started = time.monotonic()
+    batch_size = settings.VISITOR_ONLINE_SYNC_BATCH_SIZE
+    concurrency = settings.VISITOR_ONLINE_SYNC_CONCURRENCY
+    page_size = batch_size * concurrency
+    semaphore = asyncio.Semaphore(concurrency)
     
     try:
-        # 1) Find all visitors currently marked as online in DB
-        online_visitors = (
-            db.query(Visitor)
-            .filter(Visitor.is_online == True)
-            .all()
-        )
-        
-        if not online_visitors:
-            return 0
+        after_id: Optional[UUID] = None
+        while True:
+            page = await _load_online_page(after_id, page_size)
+            if not page:
+                break
+            stats.pages += 1
+            stats.checked += len(page)
+            after_id = page[-1]
             
-        logger.debug(f"Found {len(online_visitors)} visitors marked as online in DB")
-        
-        # 2) Batch processing
-        batch_size = settings.VISITOR_ONLINE_SYNC_BATCH_SIZE
-        for i in range(0, len(online_visitors), batch_size):
-            batch = online_visitors[i : i + batch_size]
+            results = await asyncio.gather(*(
+                _find_offline(page[i : i + batch_size], semaphore)
+                for i in range(0, len(page), batch_size)
+            ))
+            offline_ids: List[UUID] = []
+            for result in results:
+                if result is None:
+                    stats.failed_batches += 1
+                else:
+                    offline_ids.extend(result)
             
-            # Map visitor ID to UID (WuKongIM uses "{visitor_id}-vtr")
-            uid_to_visitor = {f"{v.id}-vtr": v for v in batch}
-            uids = list(uid_to_visitor.keys())
+            stats.marked_offline += await _mark_offline(offline_ids, datetime.utcnow())
             
-            try:
-                # 3) Check real online status from WuKongIM
-                # This returns a list of UIDs that are ACTUALLY online
-                actually_online_uids = await wukongim_client.check_user_online_status(uids)
-                actually_online_set = set(actually_online_uids)
-                
-                # 4) Identify visitors who are actually offline
-                any_changes = False
-                for uid, visitor in uid_to_visitor.items():
-                    if uid not in actually_online_set:
-                        # This visitor is marked online in DB but is offline in WuKongIM
-                        visitor.is_online = False
-                        visitor.last_offline_time = datetime.utcnow()
-                        marked_offline_count += 1
-                        any_changes = True
-                        
-                        logger.info(
-                            f"Visitor {visitor.id} corrected to offline (sync)",
-                            extra={"visitor_id": str(visitor.id)}
-                        )
-                
-                if any_changes:
-                    db.commit()
-                    
-            except Exception as e:
-                logger.error(f"Error syncing batch of visitor online status: {e}")
-                # Continue with next batch
-                
-        return marked_offline_count
-        
+            if len(page) < page_size:
+                break
     except Exception as e:
         logger.error(f"Error in visitor online status sync process: {e}")
-        return marked_offline_count
     finally:
-        db.close()
+        stats.duration_seconds = round(time.monotonic() - started, 3)
+        _last_cycle = stats
+        log = (
+            logger.warning
+            if stats.duration_seconds > settings.VISITOR_ONLINE_SYNC_INTERVAL_SECONDS
+            else logger.debug
+        )
+        log("Visitor online status sync cycle finished", extra=asdict(stats))
+    
+    return stats.marked_offline
 
 
 async def _run_periodic_task():
@@ -0,0 +1,217 @@
+"""Tests for buffered visitor activity ingestion and partition planning."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from datetime import datetime
+from typing import List, Set
+from uuid import UUID, uuid4
+
+from app.services.activity_ingest import (
+    PendingActivity,
+    PendingActivityUpdate,
+    VisitorActivityIngestor,
+)
+from app.tasks.maintain_activity_partitions import (
+    add_months,
+    partition_month,
+    partition_name,
+    plan_partitions,
+)
+
+
+class _RecordingWriter:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.batches: List[List[PendingActivity]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, activities: List[PendingActivity], now: datetime) -> int:
+        await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("could not serialize access")
+        self.batches.append(activities)
+        return len(activities)
+
+
+class _RecordingUpdater:
+    """Applies queued updates once their activity ids are marked written."""
+
+    def __init__(self) -> None:
+        self.written: Set[UUID] = set()
+        self.applied: List[PendingActivityUpdate] = []
+
+    async def __call__(self, updates: List[PendingActivityUpdate], now: datetime) -> Set[UUID]:
+        applied = [u for u in updates if u.id in self.written]
+        self.applied.extend(applied)
+        return {u.id for u in applied}
+
+
+def _update(activity_id: UUID, **values) -> PendingActivityUpdate:
+    return PendingActivityUpdate(
+        id=activity_id, project_id=uuid4(), visitor_id=uuid4(), values=values
+    )
+
+
+def _activity(title: str = "Pricing") -> PendingActivity:
+    return PendingActivity(
+        project_id=uuid4(),
+        visitor_id=uuid4(),
+        activity_type="page_view",
+        title=title,
+        occurred_at=datetime(2026, 10, 18, 12, 0, 0),
+    )
+
+
+class VisitorActivityIngestorTests(unittest.IsolatedAsyncioTestCase):
+    """Immediate acknowledgement, batching and amending buffered rows."""
+
+    async def test_burst_is_written_in_batches(self) -> None:
+        writer = _RecordingWriter()
+        ingestor = VisitorActivityIngestor(flush_interval=0.02, max_batch=4, writer=writer)
+
+        for i in range(10):
+            await ingestor.submit(_activity(f"page {i}"))
+        # Accepted, nothing written yet
+        self.assertEqual(writer.batches, [])
+
+        await ingestor.aclose()
+
+        self.assertTrue(all(len(batch) <= 4 for batch in writer.batches))
+        titles = [a.title for batch in writer.batches for a in batch]
+        self.assertEqual(titles, [f"page {i}" for i in range(10)])
+
+    async def test_buffered_activity_is_amended_before_write(self) -> None:
+        writer = _RecordingWriter()
+        ingestor = VisitorActivityIngestor(flush_interval=10, writer=writer)
+        activity = _activity()
+        await ingestor.submit(activity)
+
+        pending = await ingestor.find_pending(activity.id)
+        pending.duration_seconds = 42
+        await ingestor.aclose()
+
+        self.assertEqual(writer.batches[0][0].duration_seconds, 42)
+        self.assertIsNone(await ingestor.find_pending(activity.id))
+
+    async def test_lookup_of_in_flight_activity_waits_for_the_write(self) -> None:
+        writer = _RecordingWriter()
+        writer.release.clear()
+        ingestor = VisitorActivityIngestor(flush_interval=0, writer=writer)
+        activity = _activity()
+        await ingestor.submit(activity)
+        await asyncio.sleep(0.01)
+
+        lookup = asyncio.ensure_future(ingestor.find_pending(activity.id))
+        await asyncio.sleep(0.01)
+        self.assertFalse(lookup.done())
+
+        writer.release.set()
+        self.assertIsNone(await asyncio.wait_for(lookup, 1))
+        self.assertEqual(len(writer.batches), 1)
+        await ingestor.aclose()
+
+    async def test_failed_batch_is_retried_then_dropped(self) -> None:
+        writer = _RecordingWriter(failures=1)
+        ingestor = VisitorActivityIngestor(flush_interval=0, max_attempts=2, writer=writer)
+        await ingestor.submit(_activity())
+        await ingestor.aclose()
+        self.assertEqual(len(writer.batches), 1)
+        self.assertEqual(ingestor.dropped, 0)
+
+        failing = VisitorActivityIngestor(
+            flush_interval=0, max_attempts=2, writer=_RecordingWriter(failures=5)
+        )
+        await failing.submit(_activity())
+        await failing.aclose()
+        self.assertEqual(failing.dropped, 1)
+
+    async def test_update_of_activity_buffered_elsewhere_waits_for_its_row(self) -> None:
+        updater = _RecordingUpdater()
+        ingestor = VisitorActivityIngestor(
+            flush_interval=0, update_ttl=60, writer=_RecordingWriter(), updater=updater
+        )
+        activity_id = uuid4()
+        first = _update(activity_id, title="Pricing", duration_seconds=5)
+        ingestor.defer_update(first)
+        await asyncio.sleep(0.01)
+        self.assertEqual(updater.applied, [])
+
+        # A second update before the row shows up is merged into the queued one
+        second = PendingActivityUpdate(
+            id=activity_id,
+            project_id=first.project_id,
+            visitor_id=first.visitor_id,
+            values={"duration_seconds": 42},
+        )
+        ingestor.defer_update(second)
+        # The other replica writes the row
+        updater.written.add(activity_id)
+        await ingestor.aclose()
+
+        self.assertEqual(len(updater.applied), 1)
+        self.assertEqual(updater.applied[0].values, {"title": "Pricing", "duration_seconds": 42})
+        self.assertEqual(ingestor.dropped_updates, 0)
+
+    async def test_update_of_unknown_activity_expires(self) -> None:
+        updater = _RecordingUpdater()
+        ingestor = VisitorActivityIngestor(
+            flush_interval=0, update_ttl=0, writer=_RecordingWriter(), updater=updater
+        )
+        ingestor.defer_update(_update(uuid4(), title="Pricing"))
+        await asyncio.sleep(0.01)
+        await ingestor.aclose()
+
+        self.assertEqual(ingestor.dropped_updates, 1)
+        self.assertEqual(updater.applied, [])
+
+    async def test_queued_update_is_taken_by_a_synchronous_update(self) -> None:
+        updater = _RecordingUpdater()
+        ingestor = VisitorActivityIngestor(flush_interval=0, writer=_RecordingWriter(), updater=updater)
+        queued = _update(uuid4(), title="Pricing")
+        ingestor.defer_update(queued)
+
+        self.assertIs(ingestor.take_update(queued.id), queued)
+        self.assertIsNone(ingestor.take_update(queued.id))
+        updater.written.add(queued.id)
+        await ingestor.aclose()
+        self.assertEqual(updater.applied, [])
+
+
+class PartitionPlanTests(unittest.TestCase):
+    """Monthly partition naming, creation and retention."""
+
+    def test_names_round_trip(self) -> None:
+        month = datetime(2026, 1, 1)
+
+        self.assertEqual(partition_name(month), "api_visitor_activities_p2026_01")
+        self.assertEqual(partition_month(partition_name(month)), month)
+        self.assertIsNone(partition_month("api_visitor_activities_default"))
+        self.assertEqual(add_months(month, -1), datetime(2025, 12, 1))
+
+    def test_upcoming_months_are_created_and_expired_ones_dropped(self) -> None:
+        existing = [
+            "api_visitor_activities_default",
+            "api_visitor_activities_p2026_06",
+            "api_visitor_activities_p2026_07",
+            "api_visitor_activities_p2026_10",
+        ]
+
+        to_create, to_drop, cutoff = plan_partitions(
+            existing, datetime(2026, 10, 18), months_ahead=2, retention_months=3
+        )
+
+        self.assertEqual(to_create, [datetime(2026, 11, 1), datetime(2026, 12, 1)])
+        self.assertEqual(to_drop, ["api_visitor_activities_p2026_06"])
+        self.assertEqual(cutoff, datetime(2026, 7, 1))
+
+    def test_zero_retention_keeps_everything(self) -> None:
+        _, to_drop, cutoff = plan_partitions(
+            ["api_visitor_activities_p2000_01"], datetime(2026, 10, 18), months_ahead=1, retention_months=0
+        )
+
+        self.assertEqual(to_drop, [])
+        self.assertIsNone(cutoff)
@@ -0,0 +1,211 @@
+"""Tests for the principal, permission and platform API key cache."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core import auth_cache as auth_cache_module
+from app.core.auth_cache import AuthCache, _decode_snapshot, _encode, _snapshot
+from app.core.security import check_user_permission, get_active_platform_by_api_key
+from app.models import Platform, Project, Staff
+
+
+def _loaded_staff(username: str = "alice", project: Optional[Project] = None) -> Staff:
+    if project is None:
+        project = Project(id=uuid4(), name="Acme", api_key="ak_live_x", created_at=datetime(2026, 1, 2, 3, 4, 5))
+    staff = Staff(
+        id=uuid4(),
+        project_id=project.id,
+        username=username,
+        password_hash="secret-hash",
+        role="user",
+        created_at=datetime(2026, 1, 2, 3, 4, 5),
+    )
+    staff.project = project
+    if sa_inspect(project).transient:
+        make_transient_to_detached(project)
+    make_transient_to_detached(staff)
+    return staff
+
+
+def _share_redis(*caches: AuthCache) -> Dict[Tuple[str, str], Any]:
+    """Point the caches' Redis reads and writes at one JSON-encoded dict."""
+    shared: Dict[Tuple[str, str], Any] = {}
+
+    async def redis_get(key: str, field: str) -> Any:
+        raw = shared.get((key, field))
+        return None if raw is None else json.loads(raw)
+
+    async def redis_set(key: str, field: str, value: Any) -> None:
+        shared[(key, field)] = json.dumps(value)
+
+    for cache in caches:
+        cache._redis_get = redis_get
+        cache._redis_set = redis_set
+    return shared
+
+
+def _loaded_platform(api_key: str = "pk_test") -> Platform:
+    project = Project(id=uuid4(), name="Acme", api_key="ak_live_x", created_at=datetime(2026, 1, 2, 3, 4, 5))
+    platform = Platform(
+        id=uuid4(),
+        project_id=project.id,
+        type="website",
+        api_key=api_key,
+        config={"theme": "dark"},
+        is_active=True,
+        deleted_at=None,
+    )
+    platform.project = project
+    make_transient_to_detached(project)
+    make_transient_to_detached(platform)
+    return platform
+
+
+class AuthCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Caching, isolation and invalidation of principals and permissions."""
+
+    async def test_principal_round_trip_returns_fresh_detached_copies(self) -> None:
+        cache = AuthCache(ttl_seconds=60, redis_ttl_seconds=60, max_entries=10)
+        staff = _loaded_staff()
+
+        self.assertIsNone(await cache.get_principal("alice"))
+        await cache.set_principal(staff, cache.generation)
+        first = await cache.get_principal("alice")
+        second = await cache.get_principal("alice")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first.id, staff.id)
+        self.assertEqual(first.project.api_key, "ak_live_x")
+        self.assertTrue(sa_inspect(first).detached)
+        # Credentials never enter the cache
+        self.assertIn("password_hash", sa_inspect(first).unloaded)
+
+    async def test_load_racing_an_invalidation_is_not_cached(self) -> None:
+        cache = AuthCache(ttl_seconds=60, redis_ttl_seconds=60, max_entries=10)
+        generation = cache.generation
+
+        cache.invalidate(["alice"])
+        await cache.set_principal(_loaded_staff(), generation)
+        await cache.set_permissions("user", None, frozenset({"chat:send"}), generation)
+
+        self.assertIsNone(await cache.get_principal("alice"))
+        self.assertIsNone(await cache.get_permissions("user", None))
+
+    async def test_permission_check_is_a_cached_set_lookup(self) -> None:
+        staff = _loaded_staff()
+        cache = auth_cache_module.auth_cache
+        await cache.set_permissions(
+            staff.role, staff.project_id, frozenset({"chat:send"}), cache.generation
+        )
+        try:
+            # No session: a cache miss would fail here
+            self.assertTrue(await check_user_permission(None, staff, "chat:send"))
+            self.assertFalse(await check_user_permission(None, staff, "staff:delete"))
+            self.assertFalse(await check_user_permission(None, staff, "malformed"))
+        finally:
+            cache.invalidate(permissions=True)
+
+    async def test_staff_change_invalidates_after_commit(self) -> None:
+        cache = auth_cache_module.auth_cache
+        staff = _loaded_staff("bob")
+        await cache.set_principal(staff, cache.generation)
+        self.assertIsNotNone(await cache.get_principal("bob"))
+
+        session = Session()
+        session.add(staff)
+        staff.username = "robert"
+        auth_cache_module._staff_changed(None, None, staff)
+        self.assertIsNotNone(await cache.get_principal("bob"))
+
+        auth_cache_module._apply_invalidations(session)
+
+        self.assertIsNone(await cache.get_principal("bob"))
+        session.close()
+
+    async def test_project_api_key_is_not_shared_through_redis(self) -> None:
+        replica_a = AuthCache(ttl_seconds=60, redis_ttl_seconds=60, max_entries=10)
+        replica_b = AuthCache(ttl_seconds=60, redis_ttl_seconds=60, max_entries=10)
+        shared = _share_redis(replica_a, replica_b)
+        alice = _loaded_staff("alice")
+
+        await replica_a.set_principal(alice, replica_a.generation)
+
+        self.assertTrue(shared)
+        self.assertNotIn("ak_live_x", "".join(shared.values()))
+        # Without the project cached locally the shared entry is not enough
+        self.assertIsNone(await replica_b.get_principal("alice"))
+
+        await replica_b.set_principal(_loaded_staff("bob", alice.project), replica_b.generation)
+        cached = await replica_b.get_principal("alice")
+
+        self.assertEqual(cached.id, alice.id)
+        self.assertEqual(cached.project.api_key, "ak_live_x")
+
+    def test_snapshot_survives_json_encoding(self) -> None:
+        staff = _loaded_staff()
+        encoded = {k: _encode(v) for k, v in _snapshot(staff).items()}
+
+        decoded = _decode_snapshot(Staff, encoded)
+
+        self.assertEqual(decoded["id"], staff.id)
+        self.assertEqual(decoded["created_at"], staff.created_at)
+
+
+class PlatformKeyCacheTests(unittest.TestCase):
+    """Caching of platforms by API key hash, including unknown keys."""
+
+    def test_platform_round_trip_and_negative_entries(self) -> None:
+        cache = AuthCache(ttl_seconds=60, redis_ttl_seconds=60, max_entries=10)
+        platform = _loaded_platform()
+        key_hash = cache.hash_api_key("pk_test")
+        unknown_hash = cache.hash_api_key("pk_guess")
+
+        self.assertEqual(cache.get_platform(key_hash), (False, None))
+        cache.set_platform(key_hash, platform, cache.generation)
+        cache.set_platform(unknown_hash, None, cache.generation)
+
+        hit, cached = cache.get_platform(key_hash)
+        self.assertTrue(hit)
+        self.assertEqual(cached.project.api_key, "ak_live_x")
+        cached.config["theme"] = "light"
+        self.assertEqual(cache.get_platform(key_hash)[1].config, {"theme": "dark"})
+        self.assertEqual(cache.get_platform(unknown_hash), (True, None))
+
+    def test_cache_hit_needs_no_database(self) -> None:
+        cache = auth_cache_module.auth_cache
+        platform = _loaded_platform("pk_hit")
+        cache.set_platform(cache.hash_api_key("pk_hit"), platform, cache.generation)
+        cache.set_platform(cache.hash_api_key("pk_unknown"), None, cache.generation)
+        session = Session()  # unbound: any query would fail
+        try:
+            attached = get_active_platform_by_api_key(session, "pk_hit")
+            self.assertIn(attached, session)
+            self.assertEqual(attached.project.id, platform.project_id)
+            self.assertIsNone(get_active_platform_by_api_key(session, "pk_unknown"))
+        finally:
+            session.close()
+            cache.invalidate(platforms=True)
+
+    def test_key_rotation_invalidates_old_and_new_key_after_commit(self) -> None:
+        cache = auth_cache_module.auth_cache
+        platform = _loaded_platform("pk_old")
+        cache.set_platform(cache.hash_api_key("pk_old"), platform, cache.generation)
+        cache.set_platform(cache.hash_api_key("pk_new"), None, cache.generation)
+
+        session = Session()
+        session.add(platform)
+        platform.api_key = "pk_new"
+        auth_cache_module._platform_changed(None, None, platform)
+        auth_cache_module._apply_invalidations(session)
+
+        self.assertEqual(cache.get_platform(cache.hash_api_key("pk_old")), (False, None))
+        self.assertEqual(cache.get_platform(cache.hash_api_key("pk_new")), (False, None))
+        session.close()
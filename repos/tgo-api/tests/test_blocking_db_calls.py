@@ -0,0 +1,118 @@
+"""Guards against synchronous database access on the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import pkgutil
+
+import pytest
+from fastapi.dependencies.utils import get_dependant
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.api.v1.endpoints as endpoints_package
+from app.core.database import (
+    BlockingDatabaseCallError,
+    get_async_db,
+    get_db,
+    install_blocking_call_guard,
+)
+from app.core.security import (
+    get_authenticated_project,
+    get_current_active_user,
+    get_current_user,
+    require_permission,
+)
+
+# Routers converted to AsyncSession so far; see docs/README.md for the
+# follow-up list (visitors, chat).
+ASYNC_ONLY_ROUTERS = ("conversations",)
+
+# Endpoint modules that open their own sessions instead of using Depends
+ASYNC_SESSION_MODULES = ("wukongim_webhook",)
+
+# Auth dependencies shared by every router; they run on each request
+ASYNC_AUTH_DEPENDENCIES = (
+    get_current_user,
+    get_current_active_user,
+    get_authenticated_project,
+    require_permission("conversations:read"),
+)
+
+
+def _dependency_calls(dependant) -> list:
+    calls = []
+    for sub in dependant.dependencies:
+        calls.append(sub.call)
+        calls.extend(_dependency_calls(sub))
+    return calls
+
+
+def _endpoint_routes() -> dict:
+    routes = {}
+    for info in pkgutil.iter_modules(endpoints_package.__path__):
+        module = importlib.import_module(f"{endpoints_package.__name__}.{info.name}")
+        router = getattr(module, "router", None)
+        if router is not None:
+            routes[info.name] = [
+                route for route in router.routes if isinstance(route, APIRoute)
+            ]
+    return routes
+
+
+def test_auth_dependencies_do_not_depend_on_sync_session() -> None:
+    """Authentication runs on every request and must stay on AsyncSession."""
+
+    for dependency in ASYNC_AUTH_DEPENDENCIES:
+        dependant = get_dependant(path="/", call=dependency)
+        assert get_db not in _dependency_calls(dependant), dependency
+
+
+def test_converted_routers_do_not_depend_on_sync_session() -> None:
+    """Every router using get_async_db is fully converted and listed here."""
+
+    converted = set()
+    offenders = []
+    for name, routes in _endpoint_routes().items():
+        calls = {
+            f"{sorted(route.methods)} {route.path}": _dependency_calls(route.dependant)
+            for route in routes
+        }
+        uses_async = any(get_async_db in deps for deps in calls.values())
+        if not uses_async and name not in ASYNC_ONLY_ROUTERS:
+            continue
+        converted.add(name)
+        offenders += [f"{name}: {route}" for route, deps in calls.items() if get_db in deps]
+
+    assert offenders == []
+    # A newly converted router must be listed (and documented) so it stays converted
+    assert converted == set(ASYNC_ONLY_ROUTERS)
+
+
+def test_self_managed_sessions_are_async() -> None:
+    """Modules opening sessions themselves must not reach for the sync factory."""
+
+    for name in ASYNC_SESSION_MODULES:
+        module = importlib.import_module(f"{endpoints_package.__name__}.{name}")
+        assert not hasattr(module, "SessionLocal"), name
+        assert not hasattr(module, "get_db"), name
+
+
+@pytest.mark.asyncio
+async def test_guard_rejects_sync_query_on_event_loop() -> None:
+    """A sync Session query on the loop thread is reported; threadpool use is not."""
+
+    engine = create_engine("sqlite://")
+    factory = sessionmaker(bind=engine)
+    install_blocking_call_guard(factory, "raise")
+
+    def query() -> int:
+        with factory() as session:
+            return session.execute(text("SELECT 1")).scalar_one()
+
+    with pytest.raises(BlockingDatabaseCallError):
+        query()
+    assert await asyncio.to_thread(query) == 1
+    engine.dispose()
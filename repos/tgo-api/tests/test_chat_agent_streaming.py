@@ -9,6 +9,7 @@ import pytest
 
 import app.services.ai_client as ai_client_module
 import app.services.chat_service as chat_service
+from app.services.wukongim_stream import WuKongIMStreamForwarder
 
 
 @pytest.mark.asyncio
@@ -86,6 +87,94 @@ async def test_forward_ai_event_to_wukongim_reports_workflow_failed(monkeypatch)
     assert sent_events[0]["event_type"] == "stream.error"
 
 
+@pytest.mark.asyncio
+async def test_forwarder_coalesces_deltas_in_order_without_blocking_reader(
+    monkeypatch,
+) -> None:
+    """Deltas queued while WuKongIM is slow should merge and keep their order."""
+
+    release = asyncio.Event()
+    sent_events: list[dict[str, object]] = []
+
+    async def slow_send(**kwargs):
+        await release.wait()
+        sent_events.append(kwargs)
+
+    monkeypatch.setattr(chat_service.wukongim_client, "send_stream_event", slow_send)
+
+    forwarder = WuKongIMStreamForwarder(
+        channel_id="channel-1",
+        channel_type=1,
+        client_msg_no="msg-1",
+        from_uid="agent-1-agent",
+        flush_interval=0,
+        flush_chars=1024,
+    )
+    for chunk in ["a", "b", "c"]:
+        await chat_service.forward_ai_event_to_wukongim(
+            event_type="agent_content_chunk",
+            event_data={"data": {"content_chunk": chunk}},
+            channel_id="channel-1",
+            channel_type=1,
+            client_msg_no="msg-1",
+            from_uid="agent-1-agent",
+            forwarder=forwarder,
+        )
+        # Let the sender pick up the first delta and block on delivery
+        await asyncio.sleep(0)
+    await chat_service.forward_ai_event_to_wukongim(
+        event_type="agent_response_complete",
+        event_data={"data": {}},
+        channel_id="channel-1",
+        channel_type=1,
+        client_msg_no="msg-1",
+        from_uid="agent-1-agent",
+        forwarder=forwarder,
+    )
+
+    # The reader got here while the first delivery is still in flight
+    assert sent_events == []
+
+    release.set()
+    await forwarder.aclose(timeout=1)
+
+    assert [event["event_type"] for event in sent_events] == [
+        "stream.delta",
+        "stream.delta",
+        "stream.close",
+        "stream.finish",
+    ]
+    assert [event["payload"]["delta"] for event in sent_events[:2]] == ["a", "bc"]
+
+
+@pytest.mark.asyncio
+async def test_forwarder_flushes_delta_at_size_threshold(monkeypatch) -> None:
+    """A delta reaching the size threshold is sent without waiting for the window."""
+
+    sent_events: list[dict[str, object]] = []
+    monkeypatch.setattr(
+        chat_service.wukongim_client,
+        "send_stream_event",
+        AsyncMock(side_effect=lambda **kwargs: sent_events.append(kwargs)),
+    )
+
+    forwarder = WuKongIMStreamForwarder(
+        channel_id="channel-1",
+        channel_type=1,
+        client_msg_no="msg-1",
+        from_uid="agent-1-agent",
+        flush_interval=60,
+        flush_chars=4,
+    )
+    forwarder.send_delta("ab")
+    forwarder.send_delta("cd")
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert [event["payload"]["delta"] for event in sent_events] == ["abcd"]
+    await forwarder.aclose(timeout=1)
+
+
 @pytest.mark.asyncio
 async def test_run_background_ai_interaction_sets_started_event_on_agent_execution_started(
     monkeypatch,
@@ -137,16 +226,7 @@ async def test_run_supervisor_agent_stream_omits_legacy_team_selectors(
             if False:
                 yield ""
 
-    class _FakeAsyncClient:
-        def __init__(self, timeout=None) -> None:
-            self.timeout = timeout
-
-        async def __aenter__(self) -> "_FakeAsyncClient":
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb) -> None:
-            return None
-
+    class _FakeUpstream:
         def stream(self, method: str, url: str, headers=None, json=None, params=None):
             captured["method"] = method
             captured["url"] = url
@@ -154,9 +234,8 @@ async def test_run_supervisor_agent_stream_omits_legacy_team_selectors(
             captured["params"] = params
             return _FakeStreamResponse()
 
-    monkeypatch.setattr(ai_client_module.httpx, "AsyncClient", _FakeAsyncClient)
-
     client = ai_client_module.AIServiceClient()
+    client.upstream = _FakeUpstream()
     events = [
         event
         async for event in client.run_supervisor_agent_stream(
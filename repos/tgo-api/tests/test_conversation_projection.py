@@ -0,0 +1,177 @@
+"""Tests for the conversation-list projection."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.api.v1.endpoints.conversations import _build_channels_for_conversations
+from app.models import Visitor, VisitorTag
+from app.models import visitor_conversation
+from app.schemas.tag import TagResponse
+from app.schemas.visitor import VisitorResponse
+from app.schemas.wukongim import WuKongIMConversation
+from app.services.conversation_projection import ConversationSummary, needs_refresh
+from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
+from app.utils.encoding import build_visitor_channel_id
+
+
+def _summary(service_status: str = "active") -> ConversationSummary:
+    now = datetime(2026, 1, 2, 3, 4, 5)
+    visitor_id = uuid4()
+    tag = TagResponse.model_validate(
+        {
+            "id": "dmlw",
+            "project_id": uuid4(),
+            "name": "VIP",
+            "name_zh": "贵宾",
+            "category": "visitor",
+            "weight": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+    )
+    payload = VisitorResponse(
+        id=visitor_id,
+        project_id=uuid4(),
+        platform_id=uuid4(),
+        platform_open_id="open-1",
+        nickname="Jane",
+        nickname_zh="小简",
+        first_visit_time=now,
+        last_visit_time=now,
+        is_online=True,
+        created_at=now,
+        updated_at=now,
+        tags=[tag],
+    ).model_dump(mode="json")
+    return ConversationSummary(
+        visitor_id=visitor_id,
+        payload=payload,
+        service_status=service_status,
+        assigned_staff_id=uuid4(),
+        tag_ids=["dmlw"],
+    )
+
+
+def _conversation(visitor_id) -> WuKongIMConversation:
+    return WuKongIMConversation(
+        channel_id=build_visitor_channel_id(visitor_id),
+        channel_type=CHANNEL_TYPE_CUSTOMER_SERVICE,
+        unread=0,
+        timestamp=0,
+        last_msg_seq=0,
+        last_client_msg_no="",
+        version=0,
+        recents=[],
+    )
+
+
+class ConversationProjectionTests(unittest.IsolatedAsyncioTestCase):
+    """Serving channels from projection rows and tracking writes."""
+
+    async def test_channels_are_built_from_summaries_without_queries(self) -> None:
+        open_summary = _summary()
+        closed_summary = _summary(service_status="closed")
+        conversations = [_conversation(open_summary.visitor_id), _conversation(closed_summary.visitor_id)]
+        summaries = {s.visitor_id: s for s in (open_summary, closed_summary)}
+
+        channels = await _build_channels_for_conversations(
+            db=None,
+            conversations=conversations,
+            project_id=uuid4(),
+            user_language="zh",
+            summaries=summaries,
+        )
+
+        self.assertEqual([c.channel_id for c in channels], [conversations[0].channel_id])
+        channel = channels[0]
+        self.assertEqual(channel.name, "小简")
+        self.assertEqual(channel.extra["assigned_staff_id"], str(open_summary.assigned_staff_id))
+        self.assertEqual(channel.extra["tags"][0]["display_name"], "贵宾")
+        # The stored payload stays language neutral
+        self.assertIsNone(open_summary.payload["tags"][0].get("display_name"))
+
+    def test_needs_refresh(self) -> None:
+        now = datetime(2026, 1, 2, 3, 4, 5)
+        fresh = SimpleNamespace(stale=False, payload={}, refreshed_at=now - timedelta(seconds=10))
+
+        self.assertFalse(needs_refresh(fresh, now, 300))
+        self.assertTrue(needs_refresh(None, now, 300))
+        self.assertTrue(needs_refresh(SimpleNamespace(**{**vars(fresh), "stale": True}), now, 300))
+        self.assertTrue(needs_refresh(fresh, now + timedelta(seconds=300), 300))
+
+    def test_related_writes_are_collected_per_session(self) -> None:
+        session = Session()
+        visitor_id = uuid4()
+        tag = VisitorTag(project_id=uuid4(), visitor_id=visitor_id, tag_id="dmlw")
+        session.add(tag)
+
+        visitor_conversation._visitor_relation_changed(None, None, tag)
+
+        changes = session.info[visitor_conversation._CHANGES_KEY]
+        self.assertEqual(changes["visitor_ids"], {visitor_id})
+        session.close()
+
+    def test_stale_upsert_bumps_version(self) -> None:
+        sql = str(
+            visitor_conversation.stale_visitors_statement([uuid4()]).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+
+        self.assertIn("ON CONFLICT (visitor_id) DO UPDATE", sql)
+        self.assertIn("version = (api_visitor_conversations.version +", sql)
+
+    def _persistent_visitor(self, session: Session) -> Visitor:
+        now = datetime(2026, 1, 2, 3, 4, 5)
+        visitor = Visitor(
+            id=uuid4(),
+            project_id=uuid4(),
+            platform_id=uuid4(),
+            platform_open_id="open-1",
+            name="Jane",
+            is_online=False,
+            last_visit_time=now,
+            first_visit_time=now,
+        )
+        make_transient_to_detached(visitor)
+        session.add(visitor)
+        return visitor
+
+    def test_live_visitor_writes_patch_instead_of_marking_stale(self) -> None:
+        session = Session()
+        presence = self._persistent_visitor(session)
+        renamed = self._persistent_visitor(session)
+
+        presence.is_online = True
+        presence.last_visit_time = datetime(2026, 1, 2, 4, 0, 0)
+        renamed.is_online = True
+        renamed.name = "Janet"
+        for visitor in (presence, renamed):
+            visitor_conversation._visitor_changed(inspect(Visitor), None, visitor)
+
+        changes = session.info[visitor_conversation._CHANGES_KEY]
+        self.assertEqual(changes["live_visitor_ids"], {presence.id})
+        self.assertEqual(changes["visitor_ids"], {renamed.id})
+        session.close()
+
+    def test_live_upsert_patches_payload_without_marking_stale(self) -> None:
+        sql = str(
+            visitor_conversation.live_visitors_statement([uuid4()]).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        conflict_set = sql.split("DO UPDATE SET", 1)[1]
+
+        self.assertIn("payload = (api_visitor_conversations.payload || excluded.payload)", conflict_set)
+        self.assertIn("version = (api_visitor_conversations.version +", conflict_set)
+        self.assertNotIn("stale", conflict_set)
+        for name in visitor_conversation.LIVE_VISITOR_FIELDS:
+            self.assertIn(f"'{name}', api_visitors.{name}", sql)
@@ -0,0 +1,172 @@
+"""Tests for chat file validators, range requests and thumbnails."""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.services import file_delivery
+
+
+class FileDeliveryTests(unittest.IsolatedAsyncioTestCase):
+    """ETag, conditional and range handling of served files."""
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = Path(self._dir.name) / "file.bin"
+        self.path.write_bytes(bytes(range(100)))
+        self.etag = file_delivery.file_etag("abc123", self.path)
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _serve(self, **request_headers):
+        return file_delivery.serve_file(
+            self.path,
+            media_type="application/octet-stream",
+            etag=self.etag,
+            request_headers=request_headers,
+            headers={"Content-Disposition": "inline"},
+        )
+
+    def test_etag_is_content_addressed_with_weak_fallback(self) -> None:
+        self.assertEqual(self.etag, '"abc123"')
+        self.assertEqual(file_delivery.file_etag("abc123", self.path, variant="t320"), '"abc123-t320"')
+        self.assertTrue(file_delivery.file_etag(None, self.path).startswith('W/"'))
+
+    def test_parse_range(self) -> None:
+        self.assertEqual(file_delivery.parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(file_delivery.parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(file_delivery.parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(file_delivery.parse_range("bytes=50-500", 100), (50, 99))
+        self.assertIsNone(file_delivery.parse_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(file_delivery.parse_range("items=0-1", 100))
+        self.assertIsNone(file_delivery.parse_range("bytes=a-b", 100))
+        with self.assertRaises(ValueError):
+            file_delivery.parse_range("bytes=100-", 100)
+
+    def test_matching_if_none_match_returns_304(self) -> None:
+        response = self._serve(**{"if-none-match": 'W/"other", W/"abc123"'})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], '"abc123"')
+        self.assertNotIn("content-disposition", response.headers)
+
+    async def test_range_returns_partial_content(self) -> None:
+        response = self._serve(range="bytes=10-19")
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, bytes(range(10, 20)))
+        self.assertEqual(response.headers["content-range"], "bytes 10-19/100")
+        self.assertEqual(response.headers["content-length"], "10")
+
+    def test_stale_if_range_and_unsatisfiable_range(self) -> None:
+        full = self._serve(range="bytes=10-19", **{"if-range": '"old"'})
+        unsatisfiable = self._serve(range="bytes=200-300")
+
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(full.headers["cache-control"].split(",")[0], "private")
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable.headers["content-range"], "bytes */100")
+
+    def test_if_range_uses_strong_comparison(self) -> None:
+        weak = self._serve(range="bytes=10-19", **{"if-range": 'W/"abc123"'})
+        strong = self._serve(range="bytes=10-19", **{"if-range": '"abc123"'})
+
+        self.assertEqual(weak.status_code, 200)
+        self.assertEqual(strong.status_code, 206)
+        # A weak validator of our own never satisfies If-Range either
+        self.assertFalse(file_delivery.if_range_matches('W/"1-2"', 'W/"1-2"'))
+
+    async def test_streamed_objects_get_the_same_range_handling(self) -> None:
+        data = bytes(range(100))
+        reads = []
+
+        async def open_stream(start, end):
+            reads.append((start, end))
+            yield data[start:None if end is None else end + 1]
+
+        def serve(etag, **request_headers):
+            return file_delivery.serve_stream(
+                open_stream,
+                size=len(data),
+                media_type="image/png",
+                etag=etag,
+                request_headers=request_headers,
+            )
+
+        partial = serve('"d41d8c"', range="bytes=90-")
+        body = b"".join([chunk async for chunk in partial.body_iterator])
+        not_modified = serve('"d41d8c"', **{"if-none-match": '"d41d8c"'})
+        # Without a validator If-Range cannot match: the whole object is sent
+        whole = serve(None, range="bytes=0-9", **{"if-range": '"d41d8c"'})
+
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(body, data[90:])
+        self.assertEqual(partial.headers["content-range"], "bytes 90-99/100")
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(whole.status_code, 200)
+        self.assertEqual(whole.headers["content-length"], "100")
+        self.assertNotIn("etag", whole.headers)
+        self.assertEqual(reads, [(90, 99)])
+
+
+class ThumbnailTests(unittest.IsolatedAsyncioTestCase):
+    """On-demand image thumbnails and their bounds."""
+
+    def setUp(self) -> None:
+        from PIL import Image
+
+        self._dir = tempfile.TemporaryDirectory()
+        self.source = Path(self._dir.name) / "photo.png"
+        Image.new("RGB", (800, 600), "red").save(self.source)
+        self._settings = mock.patch.multiple(
+            file_delivery.settings,
+            CHAT_FILE_THUMBNAIL_DIR=str(Path(self._dir.name) / "thumbs"),
+            CHAT_FILE_THUMBNAIL_SIZES=[160, 320, 640],
+        )
+        self._settings.start()
+
+    def tearDown(self) -> None:
+        self._settings.stop()
+        file_delivery.shutdown()
+        self._dir.cleanup()
+
+    async def _thumbnail(self, media_type: str = "image/png"):
+        return await file_delivery.get_thumbnail(
+            self.source, media_type=media_type, cache_key="abc123", size=160
+        )
+
+    async def test_renders_once_into_the_cache(self) -> None:
+        from PIL import Image
+
+        first = await self._thumbnail()
+        with mock.patch.object(file_delivery, "_render", side_effect=AssertionError("re-rendered")):
+            second = await self._thumbnail()
+
+        self.assertIsNotNone(first)
+        path, media_type = first
+        self.assertEqual(media_type, "image/jpeg")
+        self.assertEqual(second, first)
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (160, 120))
+
+    async def test_non_images_and_oversized_images_are_served_as_is(self) -> None:
+        self.assertIsNone(await self._thumbnail(media_type="application/pdf"))
+        with mock.patch.object(file_delivery.settings, "CHAT_FILE_THUMBNAIL_MAX_PIXELS", 800 * 600 - 1):
+            self.assertIsNone(await self._thumbnail())
+
+    async def test_full_backlog_serves_the_original(self) -> None:
+        with mock.patch.object(file_delivery.settings, "CHAT_FILE_THUMBNAIL_MAX_PENDING", 1), mock.patch.dict(
+            file_delivery._in_flight, {Path("/busy"): asyncio.get_running_loop().create_future()}
+        ):
+            self.assertIsNone(await self._thumbnail())
+
+    def test_thumbnail_size_rounds_up_to_configured_sizes(self) -> None:
+        self.assertEqual(file_delivery.thumbnail_size(100), 160)
+        self.assertEqual(file_delivery.thumbnail_size(321), 640)
+        self.assertEqual(file_delivery.thumbnail_size(5000), 640)
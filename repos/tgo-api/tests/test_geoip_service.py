@@ -0,0 +1,92 @@
+"""Tests for the GeoIP lookup cache and batch lookups."""
+
+from __future__ import annotations
+
+import unittest
+from typing import List
+
+from app.services.geoip_service import GeoIPService, _LRUCache
+
+
+class _FakeSearcher:
+    def __init__(self) -> None:
+        self.searched: List[str] = []
+        self.failures = 0
+        self.unknown = set()
+
+    def search(self, ip_address: str) -> str:
+        self.searched.append(ip_address)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("xdb read failed")
+        if ip_address in self.unknown:
+            return ""
+        return "中国|0|广东省|深圳市|电信"
+
+    def close(self) -> None:
+        pass
+
+
+def _service(max_entries: int = 100) -> GeoIPService:
+    service = GeoIPService()
+    service._cache = _LRUCache(max_entries)
+    service._initialized = True
+    service._provider = "ip2region"
+    service._ip2region_searcher_v4 = _FakeSearcher()
+    return service
+
+
+class GeoIPCacheTests(unittest.TestCase):
+    """Repeated addresses are resolved once."""
+
+    def test_repeated_lookups_hit_the_cache(self) -> None:
+        service = _service()
+
+        first = service.lookup("8.8.8.8")
+        first.city = "changed by caller"
+        second = service.lookup(" 8.8.8.8 ")
+
+        self.assertEqual(second.city, "深圳市")
+        self.assertEqual(second.country_code, "CN")
+        self.assertEqual(service._ip2region_searcher_v4.searched, ["8.8.8.8"])
+        stats = service.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_lookup_many_dedupes_and_skips_empty(self) -> None:
+        service = _service()
+
+        results = service.lookup_many(["1.1.1.1", None, "", "1.1.1.1", "10.0.0.1"])
+
+        self.assertEqual(list(results), ["1.1.1.1", "10.0.0.1"])
+        self.assertTrue(results["10.0.0.1"].is_empty())
+        self.assertEqual(service._ip2region_searcher_v4.searched, ["1.1.1.1"])
+
+    def test_cache_is_bounded_lru(self) -> None:
+        service = _service(max_entries=2)
+
+        for ip_address in ("1.0.0.1", "1.0.0.2", "1.0.0.1", "1.0.0.3", "1.0.0.1", "1.0.0.2"):
+            service.lookup(ip_address)
+
+        self.assertEqual(len(service._cache), 2)
+        # 1.0.0.2 was evicted as least recently used, 1.0.0.1 stayed cached
+        self.assertEqual(
+            service._ip2region_searcher_v4.searched,
+            ["1.0.0.1", "1.0.0.2", "1.0.0.3", "1.0.0.2"],
+        )
+
+    def test_failed_lookups_are_retried_but_unknown_addresses_are_cached(self) -> None:
+        service = _service()
+        searcher = service._ip2region_searcher_v4
+        searcher.failures = 1
+        searcher.unknown.add("203.0.113.9")
+
+        failed = service.lookup("8.8.8.8")
+        retried = service.lookup("8.8.8.8")
+        service.lookup("8.8.8.8")
+        unknown = service.lookup("203.0.113.9")
+        service.lookup("203.0.113.9")
+
+        self.assertTrue(failed.is_empty())
+        self.assertEqual(retried.city, "深圳市")
+        self.assertTrue(unknown.is_empty())
+        self.assertEqual(searcher.searched, ["8.8.8.8", "8.8.8.8", "203.0.113.9"])
@@ -0,0 +1,94 @@
+"""Tests for leader election of singleton background jobs."""
+
+from __future__ import annotations
+
+import unittest
+from typing import Dict, List
+
+from app.core.leader_election import LeaderElector, SingletonJob, _lock_ids, lock_key
+
+
+class _Result:
+    def __init__(self, value) -> None:
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class _FakeConnection:
+    """Advisory locks shared through ``locks``, released when the connection closes."""
+
+    def __init__(self, locks: Dict[int, "_FakeConnection"]) -> None:
+        self.locks = locks
+        self.broken = False
+
+    async def execute(self, statement, params=None):
+        if self.broken:
+            raise ConnectionError("server closed the connection unexpectedly")
+        if "pg_try_advisory_lock" in str(statement):
+            holder = self.locks.setdefault(params["key"], self)
+            return _Result(holder is self)
+        return _Result(1)
+
+    async def invalidate(self) -> None:
+        for key in [key for key, holder in self.locks.items() if holder is self]:
+            del self.locks[key]
+
+
+class _Elector(LeaderElector):
+    def __init__(self, locks, jobs) -> None:
+        super().__init__(jobs=jobs, renew_interval=1, enabled=True)
+        self._locks = locks
+
+    async def _connect(self):
+        return _FakeConnection(self._locks)
+
+
+def _job(name: str, events: List[str], replica: str) -> SingletonJob:
+    async def stop() -> None:
+        events.append(f"stop:{replica}")
+
+    return SingletonJob(name, lambda: events.append(f"start:{replica}"), stop)
+
+
+class LeaderElectionTests(unittest.IsolatedAsyncioTestCase):
+    """Exactly-one ownership and failover."""
+
+    async def test_job_runs_on_one_replica_and_fails_over(self) -> None:
+        locks: Dict[int, _FakeConnection] = {}
+        events: List[str] = []
+        first = _Elector(locks, [_job("queue", events, "a")])
+        second = _Elector(locks, [_job("queue", events, "b")])
+
+        await first.elect_once()
+        await second.elect_once()
+        self.assertEqual(events, ["start:a"])
+        self.assertTrue(first.status()["jobs"]["queue"]["owned"])
+        self.assertFalse(second.status()["jobs"]["queue"]["owned"])
+
+        # The leader's connection dies: it stops the job, the lock is released
+        first._conn.broken = True
+        await first.elect_once()
+        await second.elect_once()
+
+        self.assertEqual(events, ["start:a", "stop:a", "start:b"])
+        self.assertTrue(second.status()["jobs"]["queue"]["owned"])
+        await second.aclose()
+        self.assertEqual(locks, {})
+
+    async def test_disabled_runs_jobs_locally(self) -> None:
+        events: List[str] = []
+        elector = LeaderElector(jobs=[_job("sync", events, "a")], enabled=False)
+
+        await elector.start()
+        await elector.aclose()
+
+        self.assertEqual(events, ["start:a", "stop:a"])
+
+    def test_lock_key_maps_to_pg_locks_ids(self) -> None:
+        key = lock_key("waiting_queue")
+        classid, objid = _lock_ids(key)
+
+        self.assertEqual(key, lock_key("waiting_queue"))
+        self.assertEqual(((classid << 32) | objid), key & 0xFFFFFFFFFFFFFFFF)
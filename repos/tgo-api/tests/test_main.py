@@ -1,5 +1,8 @@
 """Test main application."""
 
+import app.tasks.sync_visitor_online_status as online_sync
+
+
 def test_root_endpoint(client):
     """Test root endpoint."""
     response = client.get("/")
@@ -18,6 +21,24 @@ def test_health_endpoint(client):
     assert data["status"] == "healthy"
 
 
+def test_visitor_online_sync_health_endpoint(client, monkeypatch):
+    """The last online status sync cycle is exposed for monitoring."""
+    monkeypatch.setattr(online_sync, "_last_cycle", None)
+    assert client.get("/health/visitor-online-sync").json() == {"last_cycle": None}
+
+    monkeypatch.setattr(
+        online_sync,
+        "_last_cycle",
+        online_sync.OnlineSyncCycleStats(pages=2, checked=7, marked_offline=4, failed_batches=1),
+    )
+    response = client.get("/health/visitor-online-sync")
+    assert response.status_code == 200
+    last_cycle = response.json()["last_cycle"]
+    assert last_cycle["checked"] == 7
+    assert last_cycle["marked_offline"] == 4
+    assert last_cycle["failed_batches"] == 1
+
+
 def test_openapi_docs(client):
     """Test OpenAPI documentation is accessible."""
     response = client.get("/v1/docs")
@@ -0,0 +1,237 @@
+"""Tests for write-behind msg.notify visitor stats."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+from app.api.v1.endpoints.wukongim_webhook import _aggregate_msg_notify
+from app.services import message_stats
+from app.services.message_stats import (
+    MessageStatsAggregator,
+    VisitorMessageDelta,
+    write_visitor_message_stats,
+)
+from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
+from app.utils.encoding import build_visitor_channel_id
+
+
+class _RecordingWriter:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.batches: List[Dict[UUID, VisitorMessageDelta]] = []
+
+    async def __call__(self, deltas: Dict[UUID, VisitorMessageDelta], now: datetime) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("deadlock detected")
+        self.batches.append(deltas)
+        return len(deltas)
+
+
+class MessageStatsAggregatorTests(unittest.IsolatedAsyncioTestCase):
+    """Folding, group commit and failure propagation."""
+
+    async def test_concurrent_webhooks_fold_into_one_write(self) -> None:
+        """Deltas for the same visitor from concurrent calls merge before writing."""
+
+        writer = _RecordingWriter()
+        aggregator = MessageStatsAggregator(flush_interval=0.02, writer=writer)
+        visitor_id = uuid4()
+
+        first = VisitorMessageDelta()
+        first.add_message(5, "m5", is_from_visitor=True)
+        second = VisitorMessageDelta()
+        second.add_message(7, "m7", is_from_visitor=False)
+        second.add_message(6, "m6", is_from_visitor=True)
+
+        await asyncio.gather(
+            aggregator.submit({visitor_id: first}),
+            aggregator.submit({visitor_id: second}),
+        )
+
+        self.assertEqual(len(writer.batches), 1)
+        delta = writer.batches[0][visitor_id]
+        self.assertEqual(delta.max_seq, 7)
+        self.assertEqual(delta.client_msg_no, "m7")
+        self.assertFalse(delta.is_last_from_visitor)
+        self.assertEqual(delta.send_count, 2)
+        await aggregator.aclose()
+
+    async def test_transient_failure_is_retried(self) -> None:
+        """A failed write is retried before callers see an error."""
+
+        writer = _RecordingWriter(failures=1)
+        aggregator = MessageStatsAggregator(flush_interval=0, max_attempts=2, writer=writer)
+
+        await aggregator.submit({uuid4(): VisitorMessageDelta(max_seq=1, sent_seqs={1})})
+
+        self.assertEqual(len(writer.batches), 1)
+        await aggregator.aclose()
+
+    async def test_persistent_failure_is_raised_to_callers(self) -> None:
+        """Callers are not acknowledged when their batch could not be written."""
+
+        writer = _RecordingWriter(failures=5)
+        aggregator = MessageStatsAggregator(flush_interval=0, max_attempts=2, writer=writer)
+
+        with self.assertRaises(RuntimeError):
+            await aggregator.submit({uuid4(): VisitorMessageDelta(max_seq=1, sent_seqs={1})})
+
+        self.assertEqual(writer.batches, [])
+        self.assertEqual(aggregator.failed_flushes, 1)
+        await aggregator.aclose()
+
+
+class _VisitorTable:
+    """In-memory api_visitors rows behind the lock and update statements."""
+
+    def __init__(self, *visitor_ids: UUID) -> None:
+        self.rows = {
+            visitor_id: {
+                "last_message_seq": 0,
+                "visitor_send_count": 0,
+                "last_message_at": None,
+                "last_client_msg_no": None,
+            }
+            for visitor_id in visitor_ids
+        }
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    async def execute(self, statement: Any, params: Dict[str, Any] = None) -> Any:
+        if statement is message_stats._LOCK_SQL:
+            return [
+                SimpleNamespace(id=visitor_id, last_message_seq=self.rows[visitor_id]["last_message_seq"])
+                for visitor_id in sorted(params["ids"])
+                if visitor_id in self.rows
+            ]
+        if statement is message_stats._UPDATE_SQL:
+            updated = 0
+            for i, visitor_id in enumerate(params["ids"]):
+                row = self.rows[visitor_id]
+                if row["last_message_seq"] >= params["max_seqs"][i]:
+                    continue
+                row["visitor_send_count"] += params["send_counts"][i]
+                row["last_message_seq"] = params["max_seqs"][i]
+                row["last_message_at"] = params["now"]
+                row["last_client_msg_no"] = params["client_msg_nos"][i] or row["last_client_msg_no"]
+                updated += 1
+            return SimpleNamespace(rowcount=updated)
+        return None
+
+
+def _visitor_messages(*seqs: int) -> VisitorMessageDelta:
+    delta = VisitorMessageDelta()
+    for seq in seqs:
+        delta.add_message(seq, f"c{seq}", is_from_visitor=True)
+    return delta
+
+
+class WriteVisitorMessageStatsTests(unittest.IsolatedAsyncioTestCase):
+    """Redelivered msg.notify batches must not be applied twice."""
+
+    async def test_replayed_batch_is_not_counted_twice(self) -> None:
+        visitor_id = uuid4()
+        table = _VisitorTable(visitor_id)
+        first_at = datetime(2026, 10, 18, 12, 0, 0)
+
+        with patch.object(message_stats, "async_session_scope", table.session):
+            self.assertEqual(
+                await write_visitor_message_stats({visitor_id: _visitor_messages(1, 2, 3)}, first_at), 1
+            )
+            # WuKongIM redelivers the same webhook after a lost acknowledgement
+            self.assertEqual(
+                await write_visitor_message_stats(
+                    {visitor_id: _visitor_messages(1, 2, 3)}, first_at + timedelta(minutes=1)
+                ),
+                0,
+            )
+
+        row = table.rows[visitor_id]
+        self.assertEqual(row["visitor_send_count"], 3)
+        self.assertEqual(row["last_message_seq"], 3)
+        self.assertEqual(row["last_message_at"], first_at)
+
+    async def test_overlapping_redelivery_counts_only_new_messages(self) -> None:
+        visitor_id, other_id = uuid4(), uuid4()
+        table = _VisitorTable(visitor_id, other_id)
+        later = datetime(2026, 10, 18, 12, 5, 0)
+
+        with patch.object(message_stats, "async_session_scope", table.session):
+            await write_visitor_message_stats({visitor_id: _visitor_messages(1, 2)}, datetime(2026, 10, 18, 12))
+            # Seqs 1-2 were applied; only 3 and 4 (and the other visitor) are new
+            updated = await write_visitor_message_stats(
+                {visitor_id: _visitor_messages(1, 2, 3, 4), other_id: _visitor_messages(7)}, later
+            )
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(table.rows[visitor_id]["visitor_send_count"], 4)
+        self.assertEqual(table.rows[visitor_id]["last_client_msg_no"], "c4")
+        self.assertEqual(table.rows[visitor_id]["last_message_at"], later)
+        self.assertEqual(table.rows[other_id]["visitor_send_count"], 1)
+
+    async def test_duplicate_delivery_within_one_flush_is_counted_once(self) -> None:
+        visitor_id = uuid4()
+        table = _VisitorTable(visitor_id)
+        aggregator = MessageStatsAggregator(flush_interval=0.02, writer=write_visitor_message_stats)
+
+        with patch.object(message_stats, "async_session_scope", table.session):
+            await asyncio.gather(
+                aggregator.submit({visitor_id: _visitor_messages(5, 6)}),
+                aggregator.submit({visitor_id: _visitor_messages(5, 6)}),
+            )
+            await aggregator.aclose()
+
+        self.assertEqual(table.rows[visitor_id]["visitor_send_count"], 2)
+
+    def test_unapplied_keeps_only_messages_above_the_applied_seq(self) -> None:
+        delta = _visitor_messages(4, 5)
+        delta.add_message(6, "c6", is_from_visitor=False)
+
+        self.assertIsNone(delta.unapplied(6))
+        newer = delta.unapplied(4)
+        self.assertEqual(newer.sent_seqs, {5})
+        self.assertEqual((newer.max_seq, newer.client_msg_no), (6, "c6"))
+        self.assertFalse(newer.is_last_from_visitor)
+
+
+class AggregateMsgNotifyTests(unittest.TestCase):
+    """Folding a msg.notify payload into per-visitor deltas."""
+
+    def test_counts_visitor_messages_and_tracks_latest(self) -> None:
+        visitor_id = uuid4()
+        channel_id = build_visitor_channel_id(visitor_id)
+        messages = [
+            {
+                "channel_id": channel_id,
+                "channel_type": CHANNEL_TYPE_CUSTOMER_SERVICE,
+                "from_uid": f"{visitor_id}-vtr",
+                "message_seq": 3,
+                "client_msg_no": "c3",
+            },
+            {
+                "channel_id": channel_id,
+                "channel_type": CHANNEL_TYPE_CUSTOMER_SERVICE,
+                "from_uid": "staff-1-staff",
+                "message_seq": 4,
+                "client_msg_no": "c4",
+            },
+            {"channel_id": "other", "channel_type": 1, "message_seq": 9},
+        ]
+
+        deltas = _aggregate_msg_notify(messages)
+
+        self.assertEqual(list(deltas), [visitor_id])
+        delta = deltas[visitor_id]
+        self.assertEqual((delta.max_seq, delta.client_msg_no), (4, "c4"))
+        self.assertFalse(delta.is_last_from_visitor)
+        self.assertEqual(delta.send_count, 1)
@@ -0,0 +1,183 @@
+"""Tests for run registry expiry and cross-replica cancellation."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from typing import Dict, List, Optional
+from unittest import mock
+
+from app.services import chat_service
+from app.services.run_registry import InMemoryRunRegistry, RedisRunRegistry
+
+
+class _Broker:
+    """Keys and pub/sub subscribers shared by the fake Redis clients."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.subscribers: List[asyncio.Queue] = []
+
+
+class _FakePubSub:
+    def __init__(self, broker: _Broker) -> None:
+        self._broker = broker
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self._broker.subscribers.append(self._queue)
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+
+class _FakeRedis:
+    def __init__(self, broker: _Broker) -> None:
+        self._broker = broker
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._broker.values.get(key)
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        self._broker.values[key] = value
+
+    async def delete(self, key: str) -> None:
+        self._broker.values.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self._broker.subscribers:
+            queue.put_nowait({"type": "message", "data": message})
+
+    def pubsub(self) -> _FakePubSub:
+        return _FakePubSub(self._broker)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _replica(broker: _Broker) -> RedisRunRegistry:
+    registry = RedisRunRegistry("redis://replica")
+    registry._redis = _FakeRedis(broker)
+    return registry
+
+
+async def _until(condition, timeout: float = 1.0) -> None:
+    async def wait() -> None:
+        while not condition():
+            await asyncio.sleep(0)
+
+    await asyncio.wait_for(wait(), timeout)
+
+
+class InMemoryExpiryTests(unittest.IsolatedAsyncioTestCase):
+    """Heap-indexed expiry of local entries."""
+
+    async def test_expired_entries_are_pruned_and_refreshed_ones_kept(self) -> None:
+        registry = InMemoryRunRegistry(ttl_seconds=10)
+        with mock.patch("app.services.run_registry.time.time", return_value=100.0):
+            await registry.mark_cancel_pending("old", reason=None, project_id="p", api_key=None)
+            await registry.mark_cancel_pending("kept", reason=None, project_id="p", api_key=None)
+        with mock.patch("app.services.run_registry.time.time", return_value=105.0):
+            await registry.set_mapping_and_check_pending(
+                client_msg_no="kept", run_id="run-1", project_id="p", api_key=None, session_id=None
+            )
+        with mock.patch("app.services.run_registry.time.time", return_value=112.0):
+            self.assertIsNone(await registry.get("old"))
+            kept = await registry.get("kept")
+
+        self.assertEqual(kept.run_id, "run-1")
+        self.assertEqual(list(registry._by_client), ["kept"])
+
+    async def test_superseded_heap_items_are_compacted(self) -> None:
+        registry = InMemoryRunRegistry(ttl_seconds=60)
+        for _ in range(500):
+            await registry.mark_cancel_pending("msg", reason=None, project_id="p", api_key=None)
+
+        self.assertLessEqual(len(registry._expiry), 2 * len(registry._by_client) + 64)
+
+    async def test_cancel_is_pushed_to_local_watcher(self) -> None:
+        registry = InMemoryRunRegistry()
+        received = asyncio.Queue()
+
+        async def on_cancel(reason: Optional[str]) -> None:
+            received.put_nowait(reason)
+
+        registry.watch("msg", on_cancel)
+        await registry.mark_cancel_pending("msg", reason="user", project_id="p", api_key=None)
+
+        self.assertEqual(await asyncio.wait_for(received.get(), 1), "user")
+        await registry.aclose()
+
+
+class CrossReplicaCancelTests(unittest.IsolatedAsyncioTestCase):
+    """Cancels published by one replica reach the replica streaming the run."""
+
+    async def asyncSetUp(self) -> None:
+        self.broker = _Broker()
+        self.owner = _replica(self.broker)
+        self.other = _replica(self.broker)
+        await self.owner.start()
+        await self.other.start()
+        await _until(lambda: len(self.broker.subscribers) == 2)
+
+    async def asyncTearDown(self) -> None:
+        await self.owner.aclose()
+        await self.other.aclose()
+
+    async def test_concurrent_cancels_reach_only_the_owner(self) -> None:
+        received: Dict[str, List[Optional[str]]] = {}
+
+        def handler(client_msg_no: str):
+            async def on_cancel(reason: Optional[str]) -> None:
+                received.setdefault(client_msg_no, []).append(reason)
+
+            return on_cancel
+
+        runs = [f"msg-{i}" for i in range(50)]
+        for client_msg_no in runs:
+            self.owner.watch(client_msg_no, handler(client_msg_no))
+
+        await asyncio.gather(
+            *(
+                self.other.mark_cancel_pending(
+                    client_msg_no, reason=f"stop {client_msg_no}", project_id="p", api_key=None
+                )
+                for client_msg_no in runs
+            )
+        )
+        await _until(lambda: len(received) == len(runs))
+
+        self.assertEqual(received, {c: [f"stop {c}"] for c in runs})
+
+    async def test_owner_cancels_once_whether_cancel_lands_before_or_after_start(self) -> None:
+        cancelled: List[tuple] = []
+
+        async def cancel_supervisor_run(project_id, run_id, reason=None):
+            cancelled.append((run_id, reason))
+
+        started = {"event_type": "agent_execution_started", "data": {"execution_id": "run-1"}}
+        with mock.patch.object(chat_service, "run_registry", self.owner), mock.patch.object(
+            chat_service.ai_client, "cancel_supervisor_run", cancel_supervisor_run
+        ):
+            # Cancel marked on another replica before the run id is known
+            early = chat_service._RunCancellation("p", "early", None)
+            await self.other.mark_cancel_pending("early", reason="r1", project_id="p", api_key=None)
+            await _until(lambda: early._requested)
+            await early.observe("agent_execution_started", started)
+
+            # Cancel racing with the start of the run
+            racing = chat_service._RunCancellation("p", "racing", None)
+            racing_started = {"event_type": "agent_execution_started", "data": {"execution_id": "run-2"}}
+            await asyncio.gather(
+                racing.observe("agent_execution_started", racing_started),
+                self.other.mark_cancel_pending("racing", reason="r2", project_id="p", api_key=None),
+            )
+            await _until(lambda: len(cancelled) == 2)
+            await asyncio.sleep(0.01)
+
+            await early.aclose()
+            await racing.aclose()
+
+        self.assertEqual(sorted(cancelled), [("run-1", "r1"), ("run-2", "r2")])
+        self.assertEqual(self.broker.values, {})
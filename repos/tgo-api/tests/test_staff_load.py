@@ -0,0 +1,163 @@
+"""Tests for the maintained per-staff load index."""
+
+from __future__ import annotations
+
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.models import SessionStatus, VisitorSession
+import app.tasks.reconcile_staff_load as reconcile_task
+from app.core.config import settings
+from app.models.staff_load import apply_load_changes, session_load_changes
+
+
+def _persisted_session(staff_id, status=SessionStatus.OPEN.value) -> VisitorSession:
+    session = VisitorSession(
+        id=uuid4(),
+        project_id=uuid4(),
+        visitor_id=uuid4(),
+        staff_id=staff_id,
+        status=status,
+        created_at=datetime.utcnow(),
+    )
+    # Pretend it was loaded from the database so changes are tracked as history
+    make_transient_to_detached(session)
+    return session
+
+
+class SessionLoadChangesTests(unittest.TestCase):
+    """Deltas produced by session inserts, transfers, closes and deletes."""
+
+    def test_new_open_session_with_staff_increments(self) -> None:
+        staff_id = uuid4()
+        session = VisitorSession(project_id=uuid4(), staff_id=staff_id, status=SessionStatus.OPEN.value)
+
+        changes = session_load_changes(session, inserted=True)
+
+        self.assertEqual(changes, [(staff_id, session.project_id, 1)])
+
+    def test_unassigned_session_changes_nothing(self) -> None:
+        session = VisitorSession(project_id=uuid4(), status=SessionStatus.OPEN.value)
+
+        self.assertEqual(session_load_changes(session, inserted=True), [])
+
+    def test_assignment_of_queued_session_increments(self) -> None:
+        staff_id = uuid4()
+        session = _persisted_session(None)
+        session.staff_id = staff_id
+
+        self.assertEqual(session_load_changes(session), [(staff_id, session.project_id, 1)])
+
+    def test_transfer_moves_load_between_staff_in_lock_order(self) -> None:
+        old_staff, new_staff = uuid4(), uuid4()
+        session = _persisted_session(old_staff)
+        session.staff_id = new_staff
+
+        changes = session_load_changes(session)
+
+        self.assertEqual(
+            sorted(changes),
+            sorted([(old_staff, session.project_id, -1), (new_staff, session.project_id, 1)]),
+        )
+        self.assertEqual([c[0] for c in changes], sorted([old_staff, new_staff], key=str))
+
+    def test_close_decrements(self) -> None:
+        staff_id = uuid4()
+        session = _persisted_session(staff_id)
+        session.close()
+
+        self.assertEqual(session_load_changes(session), [(staff_id, session.project_id, -1)])
+
+    def test_unrelated_update_changes_nothing(self) -> None:
+        session = _persisted_session(uuid4())
+        session.message_count = 3
+
+        self.assertEqual(session_load_changes(session), [])
+
+    def test_closed_session_update_changes_nothing(self) -> None:
+        session = _persisted_session(uuid4(), status=SessionStatus.CLOSED.value)
+        session.staff_id = uuid4()
+
+        self.assertEqual(session_load_changes(session), [])
+
+    def test_delete_of_open_session_decrements(self) -> None:
+        staff_id = uuid4()
+        session = _persisted_session(staff_id)
+
+        self.assertEqual(
+            session_load_changes(session, deleted=True),
+            [(staff_id, session.project_id, -1)],
+        )
+
+
+class ApplyLoadChangesTests(unittest.TestCase):
+    """The counter is adjusted with an atomic upsert."""
+
+    def test_emits_clamped_upsert_per_change(self) -> None:
+        statements = []
+
+        class _Connection:
+            def execute(self, stmt):
+                statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+        apply_load_changes(_Connection(), [(uuid4(), uuid4(), -1), (uuid4(), uuid4(), 1)])
+
+        self.assertEqual(len(statements), 2)
+        for sql in statements:
+            self.assertIn("INSERT INTO api_staff_load", sql)
+            self.assertIn("ON CONFLICT (staff_id) DO UPDATE", sql)
+            self.assertIn("CASE WHEN", sql)
+
+
+class ReconcileStaffLoadTests(unittest.IsolatedAsyncioTestCase):
+    """Reconciliation locks and recounts one keyset batch of staff per transaction."""
+
+    async def test_batches_lock_only_their_own_staff(self) -> None:
+        staff_ids = sorted((uuid4() for _ in range(5)), key=str)
+        transactions: list[list[tuple]] = []
+
+        class _Session:
+            def __init__(self, calls):
+                self.calls = calls
+
+            async def execute(self, stmt, params):
+                sql = str(stmt)
+                self.calls.append((sql, params))
+                if "LIMIT" in sql:
+                    after = params["after_id"]
+                    ids = [s for s in staff_ids if after is None or str(s) > str(after)]
+                    return SimpleNamespace(
+                        scalars=lambda: SimpleNamespace(all=lambda: ids[: params["limit"]])
+                    )
+                return SimpleNamespace(rowcount=1 if "INSERT" in sql else None)
+
+        @asynccontextmanager
+        async def session_scope():
+            transactions.append([])
+            yield _Session(transactions[-1])
+
+        with patch.object(reconcile_task, "async_session_scope", session_scope), patch.object(
+            settings, "STAFF_LOAD_RECONCILE_BATCH_SIZE", 2
+        ):
+            fixed = await reconcile_task.reconcile_staff_load()
+
+        self.assertEqual(len(transactions), 3)
+        locked = [
+            params["ids"]
+            for calls in transactions
+            for sql, params in calls
+            if "FOR UPDATE" in sql
+        ]
+        self.assertEqual(locked, [staff_ids[0:2], staff_ids[2:4], staff_ids[4:5]])
+        self.assertEqual(
+            [calls[0][1]["after_id"] for calls in transactions],
+            [None, staff_ids[1], staff_ids[3]],
+        )
+        self.assertEqual(fixed, 3)
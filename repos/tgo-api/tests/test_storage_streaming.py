@@ -0,0 +1,204 @@
+"""Tests for streaming storage backends and presigned uploads."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+from uuid import uuid4
+
+from app.services.storage import minio as minio_module
+from app.services.storage.local import LocalStorageBackend
+from app.services.storage.minio import MinIOBackend
+import app.tasks.sweep_chat_file_uploads as sweep_task
+
+
+async def _chunks(*parts: bytes, fail: bool = False):
+    for part in parts:
+        yield part
+    if fail:
+        raise RuntimeError("client disconnected")
+
+
+class _Body:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def read(self, size: int) -> bytes:
+        chunk, self._data = self._data[:size], self._data[size:]
+        return chunk
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeS3:
+    """In-memory stand-in for the MinIO/S3 calls the backend makes."""
+
+    def __init__(self) -> None:
+        self.objects: Dict[str, bytes] = {}
+        self.uploads: Dict[str, List[bytes]] = {}
+        self.aborted: List[str] = []
+        self._next_upload = 0
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = f"upload-{self._next_upload}"
+        self._next_upload += 1
+        self.uploads[upload_id] = []
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId].append(Body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.uploads.pop(UploadId))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(UploadId)
+
+    def head_object(self, Bucket, Key):
+        data = self.objects[Key]
+        return {"ContentLength": len(data), "ContentType": "x/y", "ETag": f'"{len(data):x}-etag"'}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[Key]
+        if Range:
+            start, end = Range[len("bytes="):].split("-")
+            data = data[int(start): int(end) + 1 if end else None]
+        return {"Body": _Body(data)}
+
+
+class LocalStorageStreamingTests(unittest.IsolatedAsyncioTestCase):
+    """Chunked writes and ranged reads on local disk."""
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.storage = LocalStorageBackend(self._dir.name, "http://api")
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    async def test_stream_round_trip_with_range(self) -> None:
+        await self.storage.upload_stream(_chunks(b"hello ", b"world"), "chat/a.txt", "text/plain")
+
+        whole = b"".join([c async for c in self.storage.open_stream("chat/a.txt")])
+        part = b"".join([c async for c in self.storage.open_stream("chat/a.txt", 6, 10)])
+
+        self.assertEqual(whole, b"hello world")
+        self.assertEqual(part, b"world")
+        self.assertEqual((await self.storage.stat("chat/a.txt")).size, 11)
+
+    async def test_interrupted_upload_leaves_nothing_behind(self) -> None:
+        with self.assertRaises(RuntimeError):
+            await self.storage.upload_stream(_chunks(b"partial", fail=True), "chat/b.txt", "text/plain")
+
+        self.assertIsNone(await self.storage.stat("chat/b.txt"))
+        self.assertEqual(list(self.storage.base_path.joinpath("chat").iterdir()), [])
+
+
+class MinIOStreamingTests(unittest.IsolatedAsyncioTestCase):
+    """Multipart streaming and presigning against an in-memory stand-in."""
+
+    def setUp(self) -> None:
+        self.storage = MinIOBackend(
+            endpoint_url="http://minio:9000",
+            access_key_id="key",
+            secret_access_key="secret",
+            bucket_name="tgo",
+            download_url="https://files.example.com/tgo",
+        )
+        self.s3 = _FakeS3()
+        self.storage.s3 = self.s3
+
+    async def test_small_upload_is_a_single_put(self) -> None:
+        await self.storage.upload_stream(_chunks(b"abc", b"def"), "chat/small.bin", "application/octet-stream")
+
+        self.assertEqual(self.s3.objects["chat/small.bin"], b"abcdef")
+        self.assertEqual(self.s3.uploads, {})
+
+    async def test_large_upload_streams_parts_and_aborts_on_failure(self) -> None:
+        with mock.patch.object(minio_module, "MULTIPART_PART_SIZE", 4):
+            await self.storage.upload_stream(_chunks(b"abc", b"def", b"ghij", b"k"), "chat/big.bin", "x/y")
+            with self.assertRaises(RuntimeError):
+                await self.storage.upload_stream(_chunks(b"abcdef", fail=True), "chat/broken.bin", "x/y")
+
+        self.assertEqual(self.s3.objects["chat/big.bin"], b"abcdefghijk")
+        self.assertNotIn("chat/broken.bin", self.s3.objects)
+        self.assertEqual(self.s3.aborted, ["upload-1"])
+        ranged = b"".join([c async for c in self.storage.open_stream("chat/big.bin", 3, 5)])
+        self.assertEqual(ranged, b"def")
+        stored = await self.storage.stat("chat/big.bin")
+        self.assertEqual((stored.size, stored.etag), (11, "b-etag"))
+
+    def test_presigned_urls_target_the_public_host(self) -> None:
+        upload = self.storage.presign_upload("chat/p.png", "image/png", 1234, 300)
+        download = self.storage.presign_download("chat/p.png", 300)
+
+        for url in (upload.url, download):
+            parsed = urlparse(url)
+            self.assertEqual(parsed.netloc, "files.example.com")
+            self.assertEqual(parsed.path, "/tgo/chat/p.png")
+            self.assertEqual(parse_qs(parsed.query)["X-Amz-Expires"], ["300"])
+        self.assertEqual(upload.method, "PUT")
+        self.assertEqual(upload.headers, {"Content-Type": "image/png", "Content-Length": "1234"})
+        # Storage rejects bodies of any other size
+        signed = parse_qs(urlparse(upload.url).query)["X-Amz-SignedHeaders"][0].split(";")
+        self.assertIn("content-length", signed)
+
+
+class ChatFileUploadSweepTests(unittest.IsolatedAsyncioTestCase):
+    """Expired presigned uploads are deleted from storage unless completed."""
+
+    async def test_sweep_deletes_abandoned_objects_and_keeps_failures(self) -> None:
+        uploads = [
+            SimpleNamespace(id=uuid4(), file_path="chat/p/abandoned.png"),
+            SimpleNamespace(id=uuid4(), file_path="chat/p/completed.png"),
+            SimpleNamespace(id=uuid4(), file_path="chat/p/unreachable.png"),
+        ]
+        statements: List[str] = []
+        removed: List = []
+
+        class _Session:
+            async def execute(self, stmt):
+                sql = str(stmt)
+                statements.append(sql)
+                if sql.startswith("DELETE"):
+                    removed.extend(stmt.compile().params["id_1"])
+                    return SimpleNamespace()
+                if "FROM api_chat_file_uploads" in sql:
+                    return SimpleNamespace(all=lambda: list(uploads))
+                return SimpleNamespace(scalars=lambda: iter(["chat/p/completed.png"]))
+
+        @asynccontextmanager
+        async def session_scope():
+            yield _Session()
+
+        class _Storage:
+            def __init__(self) -> None:
+                self.deleted: List[str] = []
+
+            async def delete(self, path: str) -> bool:
+                self.deleted.append(path)
+                return path != "chat/p/unreachable.png"
+
+        storage = _Storage()
+        with mock.patch.object(sweep_task, "async_session_scope", session_scope), mock.patch(
+            "app.services.storage.get_storage", return_value=storage
+        ):
+            swept = await sweep_task.sweep_chat_file_uploads(now=datetime(2026, 1, 1))
+
+        self.assertEqual(swept, 1)
+        self.assertEqual(storage.deleted, ["chat/p/abandoned.png", "chat/p/unreachable.png"])
+        # The failed record stays behind for the next sweep
+        self.assertEqual(removed, [uploads[0].id, uploads[1].id])
+        self.assertIn("expires_at <", statements[0])
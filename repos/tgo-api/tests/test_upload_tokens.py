@@ -0,0 +1,44 @@
+"""Tests for presigned upload tokens versus access tokens."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from app.core.security import (
+    create_access_token,
+    create_purpose_token,
+    verify_purpose_token,
+    verify_token,
+)
+from app.main import app
+from tests.conftest import SyncASGIClient
+
+
+def _upload_token() -> str:
+    return create_purpose_token(
+        "chat_upload",
+        {"project_id": "6f1c0f0e-4c1b-4a7e-9d2a-2b9b0e0a1c11", "path": "chat/a.png"},
+        timedelta(minutes=5),
+    )
+
+
+def test_upload_token_is_not_an_access_token() -> None:
+    token = _upload_token()
+
+    assert verify_token(token) is None
+    assert verify_purpose_token(token, "chat_upload")["path"] == "chat/a.png"
+    assert verify_purpose_token(token, "password_reset") is None
+    assert verify_purpose_token(create_access_token("alice"), "chat_upload") is None
+
+
+def test_upload_token_is_rejected_by_project_auth() -> None:
+    client = SyncASGIClient(app)
+    try:
+        response = client.get(
+            "/v1/ai/agents",
+            headers={"Authorization": f"Bearer {_upload_token()}"},
+        )
+    finally:
+        client.close()
+
+    assert response.status_code == 401
@@ -0,0 +1,177 @@
+"""Tests for the shared upstream client layer."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import httpx
+
+from app.services.platform_sync_client import PlatformSyncClient
+from app.services.upstream import (
+    DEADLINE_HEADER,
+    UpstreamBusyError,
+    UpstreamCircuitOpenError,
+    UpstreamClient,
+    UpstreamConfig,
+    UpstreamDeadlineExceeded,
+    deadline_scope,
+)
+
+
+def _client(handler, **overrides) -> UpstreamClient:
+    config = UpstreamConfig(
+        name="test",
+        base_url="http://upstream.test",
+        timeout=5.0,
+        backoff_base=0.001,
+        backoff_max=0.01,
+        **overrides,
+    )
+    return UpstreamClient(config, transport=httpx.MockTransport(handler))
+
+
+class UpstreamClientTests(unittest.IsolatedAsyncioTestCase):
+    """Retry, breaker, limit and deadline behaviour of UpstreamClient."""
+
+    async def test_idempotent_request_retries_unavailable_upstream(self) -> None:
+        """GET should be retried on 503 and return the first success."""
+
+        statuses = [503, 503, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses.pop(0))
+
+        client = _client(handler, max_retries=2)
+        response = await client.request("GET", "/items")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.stats()["retries"], 2)
+        await client.aclose()
+
+    async def test_post_is_not_retried(self) -> None:
+        """Non-idempotent requests should return the first response."""
+
+        calls: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.method)
+            return httpx.Response(503)
+
+        client = _client(handler, max_retries=2)
+        response = await client.request("POST", "/runs", json={})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(calls, ["POST"])
+        await client.aclose()
+
+    async def test_circuit_opens_after_consecutive_failures(self) -> None:
+        """Once the threshold is reached, calls fail fast without a request."""
+
+        calls: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            raise httpx.ConnectError("refused", request=request)
+
+        client = _client(
+            handler,
+            max_retries=0,
+            breaker_failure_threshold=2,
+            breaker_reset_seconds=60,
+        )
+        for _ in range(2):
+            with self.assertRaises(httpx.ConnectError):
+                await client.request("GET", "/items")
+        with self.assertRaises(UpstreamCircuitOpenError):
+            await client.request("GET", "/items")
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(client.stats()["circuit_state"], "open")
+        await client.aclose()
+
+    async def test_concurrency_limit_fails_fast_when_busy(self) -> None:
+        """A caller that cannot get a slot in time gets UpstreamBusyError."""
+
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200)
+
+        client = _client(handler, max_concurrency=1, acquire_timeout=0.05)
+        first = asyncio.create_task(client.request("GET", "/slow"))
+        await asyncio.sleep(0.01)
+
+        with self.assertRaises(UpstreamBusyError):
+            await client.request("GET", "/slow")
+
+        release.set()
+        self.assertEqual((await first).status_code, 200)
+        await client.aclose()
+
+    async def test_deadline_is_propagated_and_enforced(self) -> None:
+        """The remaining budget is forwarded; an expired one raises."""
+
+        seen: list[int] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(int(request.headers[DEADLINE_HEADER]))
+            return httpx.Response(200)
+
+        client = _client(handler)
+        with deadline_scope(2.0):
+            await client.request("GET", "/items")
+        with deadline_scope(0):
+            with self.assertRaises(UpstreamDeadlineExceeded):
+                await client.request("GET", "/items")
+
+        self.assertEqual(len(seen), 1)
+        self.assertTrue(0 < seen[0] <= 2000)
+        await client.aclose()
+
+    async def test_platform_delete_surfaces_upstream_failures(self) -> None:
+        """delete_platform must not report a failed delete as unsupported."""
+
+        statuses = [204]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if not statuses:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(statuses.pop(0))
+
+        sync_client = PlatformSyncClient()
+        sync_client.upstream = _client(
+            handler,
+            max_retries=0,
+            breaker_failure_threshold=1,
+            breaker_reset_seconds=60,
+        )
+
+        response = await sync_client.delete_platform("p1")
+        self.assertEqual(response.status_code, 204)
+        with self.assertRaises(httpx.ConnectError):
+            await sync_client.delete_platform("p1")
+        with self.assertRaises(UpstreamCircuitOpenError):
+            await sync_client.delete_platform("p1")
+        await sync_client.upstream.aclose()
+
+
+class UpstreamClientLoopTests(unittest.TestCase):
+    """A client used from a new event loop replaces and closes the old pool."""
+
+    def test_client_of_previous_loop_is_closed(self) -> None:
+        client = _client(lambda request: httpx.Response(200))
+
+        async def request() -> httpx.AsyncClient:
+            await client.request("GET", "/items")
+            return client._client
+
+        first = asyncio.run(request())
+        second = asyncio.run(request())
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed)
+        self.assertFalse(second.is_closed)
+        asyncio.run(client.aclose())
+        self.assertTrue(second.is_closed)
@@ -0,0 +1,93 @@
+"""Tests for the keyset-paginated visitor online status sync."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from uuid import UUID, uuid4
+
+import app.tasks.sync_visitor_online_status as online_sync
+from app.core.config import settings
+
+
+class OnlineStatusSyncTests(unittest.IsolatedAsyncioTestCase):
+    """Paging, bounded fan-out and skipping of failed batches."""
+
+    def setUp(self) -> None:
+        self.visitor_ids = sorted((uuid4() for _ in range(7)), key=str)
+        self.online = set(self.visitor_ids[:2])
+        self.failing = {self.visitor_ids[6]}
+        self.pages: list[tuple] = []
+        self.marked: list[UUID] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        async def load_page(after_id, limit):
+            self.pages.append((after_id, limit))
+            ids = sorted(self.visitor_ids)
+            if after_id is not None:
+                ids = [v for v in ids if v > after_id]
+            return ids[:limit]
+
+        async def mark_offline(visitor_ids, now):
+            self.marked.extend(visitor_ids)
+            return len(visitor_ids)
+
+        test = self
+
+        class _FakeWuKongIM:
+            enabled = True
+
+            async def check_user_online_status(self, uids, raise_errors=False):
+                test.in_flight += 1
+                test.max_in_flight = max(test.max_in_flight, test.in_flight)
+                await asyncio.sleep(0)
+                test.in_flight -= 1
+                if any(UUID(uid[:-4]) in test.failing for uid in uids):
+                    raise RuntimeError("wukongim unavailable")
+                return [uid for uid in uids if UUID(uid[:-4]) in test.online]
+
+        self._originals = (
+            online_sync._load_online_page,
+            online_sync._mark_offline,
+            online_sync.wukongim_client,
+            settings.VISITOR_ONLINE_SYNC_BATCH_SIZE,
+            settings.VISITOR_ONLINE_SYNC_CONCURRENCY,
+        )
+        online_sync._load_online_page = load_page
+        online_sync._mark_offline = mark_offline
+        online_sync.wukongim_client = _FakeWuKongIM()
+        settings.VISITOR_ONLINE_SYNC_BATCH_SIZE = 1
+        settings.VISITOR_ONLINE_SYNC_CONCURRENCY = 2
+
+    def tearDown(self) -> None:
+        (
+            online_sync._load_online_page,
+            online_sync._mark_offline,
+            online_sync.wukongim_client,
+            settings.VISITOR_ONLINE_SYNC_BATCH_SIZE,
+            settings.VISITOR_ONLINE_SYNC_CONCURRENCY,
+        ) = self._originals
+
+    async def test_pages_by_id_and_marks_only_confirmed_offline(self) -> None:
+        corrected = await online_sync._process_online_status_sync()
+
+        # Pages of batch_size * concurrency, each starting after the previous last id
+        self.assertEqual(
+            self.pages,
+            [
+                (None, 2),
+                (self.visitor_ids[1], 2),
+                (self.visitor_ids[3], 2),
+                (self.visitor_ids[5], 2),
+            ],
+        )
+        self.assertLessEqual(self.max_in_flight, 2)
+        # Online visitors and the batch WuKongIM failed on are left alone
+        self.assertEqual(self.marked, self.visitor_ids[2:6])
+        self.assertEqual(corrected, 4)
+
+        stats = online_sync.get_last_cycle_stats()
+        self.assertEqual(stats["checked"], 7)
+        self.assertEqual(stats["failed_batches"], 1)
+        self.assertEqual(stats["marked_offline"], 4)
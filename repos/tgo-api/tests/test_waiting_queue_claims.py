@@ -0,0 +1,270 @@
+"""Tests for cross-replica waiting queue claims, queue ranks and event-driven wakeups."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+import app.services.queue_trigger_service as queue_trigger_service
+import app.services.transfer_service as transfer_service
+from app.models import VisitorWaitingQueue, WaitingStatus
+from app.services.transfer_service import get_queue_entry_rank, get_queue_entry_ranks
+from app.services.waiting_queue_claims import (
+    begin_attempt,
+    claim_entries,
+    finish_assignment,
+    new_claim_token,
+)
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(type_, compiler, **kw) -> str:
+    return "JSON"
+
+
+class _QueueDatabase:
+    """The waiting queue table in a file-backed SQLite database.
+
+    A file (not ``:memory:``) so separate sessions use separate connections,
+    as processors on different replicas would.
+    """
+
+    def __init__(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.engine = create_engine(
+            f"sqlite:///{self.path}", connect_args={"timeout": 0.2}
+        )
+        VisitorWaitingQueue.__table__.create(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.project_id = uuid4()
+
+    def add(self, position: int, priority: int = 0) -> UUID:
+        with self.Session() as db:
+            entry = VisitorWaitingQueue(
+                project_id=self.project_id,
+                visitor_id=uuid4(),
+                source="no_staff",
+                urgency="normal",
+                position=position,
+                priority=priority,
+                status=WaitingStatus.WAITING.value,
+                expired_at=datetime.utcnow() + timedelta(hours=1),
+            )
+            db.add(entry)
+            db.commit()
+            return entry.id
+
+    def get(self, entry_id: UUID) -> VisitorWaitingQueue:
+        with self.Session() as db:
+            entry = db.get(VisitorWaitingQueue, entry_id)
+            db.expunge(entry)
+            return entry
+
+    def expire_claim(self, entry_id: UUID) -> None:
+        with self.Session() as db:
+            db.execute(
+                update(VisitorWaitingQueue)
+                .where(VisitorWaitingQueue.id == entry_id)
+                .values(claimed_until=datetime.utcnow() - timedelta(seconds=1))
+            )
+            db.commit()
+
+    def close(self) -> None:
+        self.engine.dispose()
+        os.unlink(self.path)
+
+
+class ClaimTests(unittest.TestCase):
+    """Claims give processors disjoint entries and never assign one twice."""
+
+    def setUp(self) -> None:
+        self.queue = _QueueDatabase()
+
+    def tearDown(self) -> None:
+        self.queue.close()
+
+    def test_processors_claim_disjoint_entries_in_service_order(self) -> None:
+        low = self.queue.add(position=1)
+        urgent = self.queue.add(position=2, priority=3)
+        later = self.queue.add(position=3)
+
+        with self.queue.Session() as first, self.queue.Session() as second:
+            first_ids = [e.id for e in claim_entries(first, new_claim_token(), project_id=self.queue.project_id, limit=2)]
+            second_ids = [e.id for e in claim_entries(second, new_claim_token(), project_id=self.queue.project_id)]
+            third_ids = [e.id for e in claim_entries(second, new_claim_token(), project_id=self.queue.project_id)]
+
+        self.assertEqual(first_ids, [urgent, low])
+        self.assertEqual(second_ids, [later])
+        self.assertEqual(third_ids, [])
+
+    def test_lapsed_claim_is_taken_over_and_not_assigned_twice(self) -> None:
+        entry_id = self.queue.add(position=1)
+        stale_token, new_token = new_claim_token(), new_claim_token()
+        staff_a, staff_b = uuid4(), uuid4()
+
+        with self.queue.Session() as stale, self.queue.Session() as fresh:
+            claim_entries(stale, stale_token, entry_id=entry_id)
+            self.assertIsNotNone(begin_attempt(stale, entry_id, stale_token))
+
+            # The first processor stalls past the visibility timeout
+            self.queue.expire_claim(entry_id)
+            self.assertEqual(len(claim_entries(fresh, new_token, entry_id=entry_id)), 1)
+
+            self.assertFalse(finish_assignment(stale, entry_id, stale_token, staff_a))
+            self.assertIsNone(begin_attempt(stale, entry_id, stale_token))
+            self.assertTrue(finish_assignment(fresh, entry_id, new_token, staff_b))
+
+        entry = self.queue.get(entry_id)
+        self.assertEqual(entry.status, WaitingStatus.ASSIGNED.value)
+        self.assertEqual(entry.assigned_staff_id, staff_b)
+        self.assertIsNone(entry.claimed_by)
+
+
+class QueueRankTests(unittest.TestCase):
+    """Reported positions are ranks computed from the stored tickets."""
+
+    def setUp(self) -> None:
+        self.queue = _QueueDatabase()
+
+    def tearDown(self) -> None:
+        self.queue.close()
+
+    def test_rank_follows_service_order_and_shrinks_as_entries_leave(self) -> None:
+        first = self.queue.add(position=1)
+        second = self.queue.add(position=2)
+        urgent = self.queue.add(position=3, priority=2)
+        last = self.queue.add(position=4)
+
+        with self.queue.Session() as db:
+            entries = {e.id: e for e in db.query(VisitorWaitingQueue).all()}
+            self.assertEqual(get_queue_entry_rank(db, entries[urgent]), 1)
+            self.assertEqual(get_queue_entry_rank(db, entries[last]), 4)
+
+            entries[first].assign_to_staff(uuid4())
+            entries[second].cancel()
+            db.commit()
+
+            self.assertIsNone(get_queue_entry_rank(db, entries[first]))
+            self.assertEqual(get_queue_entry_rank(db, entries[last]), 2)
+            self.assertEqual(
+                get_queue_entry_ranks(db, list(entries.values())),
+                {urgent: 1, last: 2},
+            )
+
+
+class ProcessProjectQueueTests(unittest.IsolatedAsyncioTestCase):
+    """A queue pass assigns claimed entries without locking them across the transfer."""
+
+    async def asyncSetUp(self) -> None:
+        self.queue = _QueueDatabase()
+
+    async def asyncTearDown(self) -> None:
+        self.queue.close()
+
+    async def test_entry_row_is_writable_while_transfer_is_awaited(self) -> None:
+        entry_id = self.queue.add(position=1)
+        staff_id = uuid4()
+        seen = {}
+
+        async def fake_transfer(**kwargs):
+            await asyncio.sleep(0)
+            # Another connection (e.g. the expiry cleanup on another replica)
+            # can write the row: no transaction holds it during the transfer
+            with self.queue.Session() as other:
+                row = other.get(VisitorWaitingQueue, entry_id)
+                seen["attempt_recorded"] = row.last_attempt_at is not None
+                seen["claim_renewed"] = row.claimed_until > datetime.utcnow()
+                row.urgency = "high"
+                other.commit()
+            return SimpleNamespace(success=True, assigned_staff_id=staff_id)
+
+        with patch.object(queue_trigger_service, "SessionLocal", self.queue.Session), patch.object(
+            transfer_service, "transfer_to_staff", fake_transfer
+        ):
+            await queue_trigger_service._process_project_queue_once(self.queue.project_id)
+
+        self.assertEqual(seen, {"attempt_recorded": True, "claim_renewed": True})
+        entry = self.queue.get(entry_id)
+        self.assertEqual(entry.status, WaitingStatus.ASSIGNED.value)
+        self.assertEqual(entry.assigned_staff_id, staff_id)
+        self.assertEqual(entry.urgency, "high")
+
+    async def test_claim_lost_during_transfer_is_not_assigned(self) -> None:
+        entry_id = self.queue.add(position=1)
+        thief_token = new_claim_token()
+
+        async def slow_transfer(**kwargs):
+            # The claim lapses and another processor takes the entry meanwhile
+            self.queue.expire_claim(entry_id)
+            with self.queue.Session() as other:
+                claim_entries(other, thief_token, entry_id=entry_id)
+            return SimpleNamespace(success=True, assigned_staff_id=uuid4())
+
+        with patch.object(queue_trigger_service, "SessionLocal", self.queue.Session), patch.object(
+            transfer_service, "transfer_to_staff", slow_transfer
+        ):
+            await queue_trigger_service._process_project_queue_once(self.queue.project_id)
+
+        entry = self.queue.get(entry_id)
+        self.assertEqual(entry.status, WaitingStatus.WAITING.value)
+        self.assertEqual(entry.claimed_by, thief_token)
+
+    async def test_unassigned_entries_are_released_after_the_pass(self) -> None:
+        entry_id = self.queue.add(position=1)
+
+        async def no_staff(**kwargs):
+            return SimpleNamespace(success=False, assigned_staff_id=None)
+
+        with patch.object(queue_trigger_service, "SessionLocal", self.queue.Session), patch.object(
+            transfer_service, "transfer_to_staff", no_staff
+        ):
+            await queue_trigger_service._process_project_queue_once(self.queue.project_id)
+
+        entry = self.queue.get(entry_id)
+        self.assertEqual(entry.status, WaitingStatus.WAITING.value)
+        self.assertIsNone(entry.claimed_by)
+        self.assertIsNotNone(entry.last_attempt_at)
+
+
+class ProjectWakeupTests(unittest.IsolatedAsyncioTestCase):
+    """Wakeups during a processing pass are not dropped."""
+
+    async def test_wakeup_while_processing_runs_another_pass(self) -> None:
+        project_id = uuid4()
+        release = asyncio.Event()
+        passes: list[int] = []
+
+        async def fake_once(pid):
+            passes.append(len(passes) + 1)
+            if len(passes) == 1:
+                await release.wait()
+
+        original = queue_trigger_service._process_project_queue_once
+        queue_trigger_service._process_project_queue_once = fake_once
+        try:
+            await queue_trigger_service.trigger_queue_for_project(project_id)
+            await asyncio.sleep(0)
+            # Two wakeups during the first pass collapse into one more pass
+            await queue_trigger_service.trigger_queue_for_project(project_id)
+            await queue_trigger_service.trigger_queue_for_project(project_id)
+            release.set()
+            for _ in range(10):
+                await asyncio.sleep(0)
+        finally:
+            queue_trigger_service._process_project_queue_once = original
+
+        self.assertEqual(passes, [1, 2])
+        self.assertNotIn(project_id, queue_trigger_service._processing_project_ids)
+        self.assertNotIn(project_id, queue_trigger_service._rerun_project_ids)
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
 import unittest
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
+import httpx
+
 from app.services.wukongim_client import WuKongIMClient
 
 
@@ -93,3 +97,87 @@ class WuKongIMClientTests(unittest.IsolatedAsyncioTestCase):
             red_dot=False,
             sync_once=True,
         )
+
+
+class WuKongIMClientPoolTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the pooled WuKongIM HTTP client."""
+
+    async def test_requests_share_one_client_with_per_endpoint_timeouts(
+        self,
+    ) -> None:
+        """Calls should reuse the pooled client and apply endpoint timeouts."""
+
+        seen: list[tuple[str, float]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append((request.url.path, request.extensions["timeout"]["read"]))
+            return httpx.Response(200, json={"ok": True})
+
+        client = WuKongIMClient()
+        client.enabled = True
+        client.endpoint_timeouts = {"/user/onlinestatus": 2.0}
+        client._client = httpx.AsyncClient(
+            base_url="http://wukongim.test",
+            transport=httpx.MockTransport(handler),
+        )
+        client._client_loop = asyncio.get_running_loop()
+        pooled = client._client
+
+        await client._make_request("POST", "/user/onlinestatus", json_data=[])
+        await client._make_request("GET", "/route", params={"uid": "u1"})
+
+        self.assertIs(client._get_client(), pooled)
+        self.assertEqual(
+            seen,
+            [("/user/onlinestatus", 2.0), ("/route", float(client.timeout))],
+        )
+        self.assertEqual(client.pool_stats()["requests"], 2)
+
+        await client.aclose()
+        self.assertTrue(pooled.is_closed)
+        self.assertIsNone(client._client)
+
+    async def test_client_from_stopped_loop_is_closed_on_replacement(self) -> None:
+        """A loop change should close the old pool instead of leaking it."""
+
+        client = WuKongIMClient()
+        stale = httpx.AsyncClient(base_url="http://wukongim.test")
+        old_loop = asyncio.new_event_loop()
+        old_loop.close()
+        client._client, client._client_loop = stale, old_loop
+
+        fresh = client._get_client()
+        await asyncio.gather(*client._closing)
+
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.is_closed)
+        self.assertFalse(client._closing)
+        await client.aclose()
+
+    async def test_client_of_running_loop_is_closed_on_that_loop(self) -> None:
+        """A client still owned by another thread's loop is closed there."""
+
+        client = WuKongIMClient()
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            async def open_client() -> httpx.AsyncClient:
+                return httpx.AsyncClient(base_url="http://wukongim.test")
+
+            stale = asyncio.run_coroutine_threadsafe(open_client(), other_loop).result(1)
+            client._client, client._client_loop = stale, other_loop
+
+            client._get_client()
+            for _ in range(100):
+                if stale.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+
+            self.assertTrue(stale.is_closed)
+            self.assertFalse(client._closing)
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join(1)
+            other_loop.close()
+            await client.aclose()
@@ -0,0 +1,74 @@
+"""Tests for the WuKongIM online status webhook on AsyncSession."""
+
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+
+import app.api.v1.endpoints.wukongim_webhook as webhook
+from app.models.staff import StaffStatus
+from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
+
+
+class _Result:
+    def __init__(self, rows) -> None:
+        self._rows = rows
+
+    def scalars(self):
+        return iter(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class _AsyncSession:
+    """Answers the staff, visitor and membership batch loads in order."""
+
+    def __init__(self, staff, visitors, memberships) -> None:
+        self._results = [staff, visitors, memberships]
+        self.statements: list[str] = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt))
+        return _Result(self._results.pop(0))
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+class OnlineStatusWebhookTests(unittest.IsolatedAsyncioTestCase):
+    """Presence events update staff and visitors with one query per kind."""
+
+    async def test_batch_is_loaded_once_and_presence_is_broadcast(self) -> None:
+        staff = SimpleNamespace(id=uuid4(), status=StaffStatus.OFFLINE.value)
+        visitor = SimpleNamespace(id=uuid4(), is_online=False, last_visit_time=None, last_offline_time=None)
+        channel = ("visitor-channel", CHANNEL_TYPE_CUSTOMER_SERVICE)
+        db = _AsyncSession([staff], [visitor], [(visitor.id, *channel)])
+        payload = [
+            {"uid": f"{staff.id}-staff", "online": 1},
+            {"uid": f"{visitor.id}-vtr", "online": 1},
+            {"uid": f"{uuid4()}-vtr", "online": 0},
+        ]
+
+        with mock.patch.object(webhook.settings, "WUKONGIM_ENABLED", True), mock.patch.object(
+            webhook.wukong_client, "send_event", new=mock.AsyncMock()
+        ) as send_event, mock.patch.object(
+            webhook, "notify_visitor_profile_updated", new=mock.AsyncMock()
+        ) as notify:
+            await webhook._handle_user_online_status(payload, db)
+
+        self.assertEqual(len(db.statements), 3)
+        self.assertEqual(db.commits, 1)
+        self.assertEqual(staff.status, StaffStatus.ONLINE.value)
+        self.assertTrue(visitor.is_online)
+        self.assertIsNotNone(visitor.last_visit_time)
+        send_event.assert_awaited_once()
+        self.assertEqual(send_event.await_args.kwargs["channel_id"], channel[0])
+        self.assertEqual(send_event.await_args.kwargs["event_type"], "visitor.online")
+        notify.assert_awaited_once_with(db, visitor)
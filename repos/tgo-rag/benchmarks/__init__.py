@@ -0,0 +1,6 @@
+"""
+Local performance benchmarks for the RAG service.
+
+Benchmarks run against a local Postgres+pgvector database using deterministic
+stand-in providers so results are reproducible and comparable in review.
+"""
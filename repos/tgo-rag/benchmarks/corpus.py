@@ -0,0 +1,153 @@
+"""
+Synthetic multilingual corpus with planted relevance judgments.
+
+Every query owns a few rare "needle" terms that are planted into a fixed
+number of relevant chunks; the rest of the corpus is filler drawn from shared
+per-language vocabularies. Recall@k is measured against the planted set, so
+the same ground truth applies to semantic, keyword and hybrid search.
+"""
+
+import json
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+LANGUAGES = ("en", "es", "zh", "ja")
+
+_FILLER = {
+    "en": (
+        "the customer support team reviews every ticket before the weekly report "
+        "and updates the knowledge base with account billing shipping refund "
+        "password security integration webhook dashboard invoice policy"
+    ).split(),
+    "es": (
+        "el equipo de soporte revisa cada solicitud antes del informe semanal y "
+        "actualiza la base de conocimiento con cuenta factura envio reembolso "
+        "contraseña seguridad integracion panel politica"
+    ).split(),
+    "zh": list("客服团队在每周报告之前审核工单并更新知识库账户账单物流退款密码安全集成仪表盘发票政策"),
+    "ja": list("サポートチームは毎週の報告前にチケットを確認しナレッジベースを更新します請求配送返金"),
+}
+
+_LATIN_SYLLABLES = ("ka", "lo", "mi", "ru", "te", "vo", "zan", "qui", "pex", "dor", "fen", "gul")
+_CJK_NEEDLE_CHARS = "璟瑄翊瀚骞皓璇祺蔚琮珩瑾旻昱煜桀"
+
+
+@dataclass
+class BenchQuery:
+    """A benchmark query and the chunk indexes planted as relevant."""
+
+    query_id: int
+    language: str
+    text: str
+    relevant: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Corpus:
+    """Generated corpus description (chunks are produced lazily)."""
+
+    size: int
+    seed: int
+    queries: List[BenchQuery]
+    _needles_by_chunk: Dict[int, List[str]] = field(default_factory=dict, repr=False)
+
+    def language_of(self, index: int) -> str:
+        return LANGUAGES[index % len(LANGUAGES)]
+
+    def chunk_text(self, index: int, words: int = 60) -> str:
+        """Deterministically build the text of chunk ``index``."""
+        language = self.language_of(index)
+        rng = random.Random(self.seed * 1_000_003 + index)
+        filler = _FILLER[language]
+        tokens = [rng.choice(filler) for _ in range(words)]
+        for needle in self._needles_by_chunk.get(index, []):
+            tokens.insert(rng.randrange(len(tokens) + 1), needle)
+        separator = "" if language in ("zh", "ja") else " "
+        return separator.join(tokens)
+
+    def iter_chunks(self) -> Iterator[tuple[int, str, str]]:
+        """Yield (index, language, text) for every chunk."""
+        for index in range(self.size):
+            yield index, self.language_of(index), self.chunk_text(index)
+
+    def save_queries(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps([asdict(q) for q in self.queries], ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+
+
+def _needle(rng: random.Random, language: str) -> str:
+    if language in ("zh", "ja"):
+        return "".join(rng.choice(_CJK_NEEDLE_CHARS) for _ in range(3))
+    return "".join(rng.choice(_LATIN_SYLLABLES) for _ in range(3))
+
+
+def generate_corpus(
+    size: int,
+    num_queries: int = 200,
+    relevant_per_query: int = 5,
+    needles_per_query: int = 3,
+    seed: int = 42,
+) -> Corpus:
+    """
+    Generate a deterministic corpus with planted relevant chunks.
+
+    Relevant chunks for a query share its language so keyword search can match
+    them with the same analyzer.
+
+    Args:
+        size: Number of chunks
+        num_queries: Number of benchmark queries
+        relevant_per_query: Chunks that receive each query's needle terms
+        needles_per_query: Rare terms per query
+        seed: Random seed
+
+    Returns:
+        Corpus with queries and relevance judgments
+    """
+    rng = random.Random(seed)
+    needles_by_chunk: Dict[int, List[str]] = {}
+    queries: List[BenchQuery] = []
+    used_needles: set[str] = set()
+
+    for query_id in range(num_queries):
+        language = LANGUAGES[query_id % len(LANGUAGES)]
+        needles: List[str] = []
+        while len(needles) < needles_per_query:
+            candidate = _needle(rng, language)
+            if candidate not in used_needles:
+                used_needles.add(candidate)
+                needles.append(candidate)
+
+        # Chunks of the same language are those with index % len(LANGUAGES) == offset
+        offset = LANGUAGES.index(language)
+        slots = max(1, (size - offset + len(LANGUAGES) - 1) // len(LANGUAGES))
+        relevant = sorted(
+            offset + len(LANGUAGES) * slot
+            for slot in rng.sample(range(slots), min(relevant_per_query, slots))
+        )
+        for index in relevant:
+            needles_by_chunk.setdefault(index, []).extend(needles)
+
+        separator = "" if language in ("zh", "ja") else " "
+        queries.append(
+            BenchQuery(
+                query_id=query_id,
+                language=language,
+                text=separator.join(needles),
+                relevant=relevant,
+            )
+        )
+
+    return Corpus(size=size, seed=seed, queries=queries, _needles_by_chunk=needles_by_chunk)
+
+
+def load_queries(path: Optional[Path]) -> Optional[List[BenchQuery]]:
+    """Load queries saved by ``Corpus.save_queries``."""
+    if path is None or not path.exists():
+        return None
+    return [BenchQuery(**item) for item in json.loads(path.read_text(encoding="utf-8"))]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible embeddings server for benchmarks.
+
+Serves ``POST /v1/embeddings`` with deterministic hashing vectors and injects
+provider-like behaviour: a fixed per-request latency, a per-input latency,
+jitter, a token-bucket request rate limit and a concurrency cap. Requests over
+either limit get ``429`` with ``Retry-After``, which exercises the OpenAI SDK's
+retry path exactly like a throttled provider would.
+
+Usage:
+    poetry run python benchmarks/embedding_server.py --port 8765 --latency-ms 80 --rps 20
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from benchmarks.fakes import hash_embedding, tokenize  # noqa: E402
+
+
+@dataclass
+class ServerBehaviour:
+    """Latency and throttling knobs of the stand-in provider."""
+
+    latency_ms: float = 50.0
+    per_input_ms: float = 0.5
+    jitter_ms: float = 10.0
+    rps: float = 0.0  # 0 disables the rate limit
+    burst: int = 10
+    max_concurrency: int = 0  # 0 disables the concurrency cap
+    default_dimensions: int = 1536
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    inputs: int = 0
+    throttled: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "inputs": self.inputs,
+            "throttled": self.throttled,
+            "max_in_flight": self.max_in_flight,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+        }
+
+
+class TokenBucket:
+    """Request-rate limiter; ``try_acquire`` never blocks."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> Optional[float]:
+        """Take a token; returns None on success or seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return None
+        return (1.0 - self.tokens) / self.rate
+
+
+def create_app(behaviour: ServerBehaviour) -> FastAPI:
+    app = FastAPI(title="tgo-rag benchmark embeddings")
+    stats = ServerStats()
+    bucket = TokenBucket(behaviour.rps, behaviour.burst) if behaviour.rps > 0 else None
+
+    def throttled(retry_after: float, reason: str) -> JSONResponse:
+        stats.throttled += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": f"{max(retry_after, 0.001):.3f}"},
+            content={"error": {"message": reason, "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+        )
+
+    @app.get("/health")
+    async def health() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        return stats.as_dict()
+
+    @app.post("/stats/reset")
+    async def reset_stats() -> Dict[str, Any]:
+        nonlocal stats
+        stats = ServerStats()
+        return stats.as_dict()
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request) -> Any:
+        body = await request.json()
+        raw_input: Union[str, List[str]] = body.get("input", [])
+        texts = [raw_input] if isinstance(raw_input, str) else list(raw_input)
+        dimensions = int(body.get("dimensions") or behaviour.default_dimensions)
+
+        if bucket is not None:
+            wait = bucket.try_acquire()
+            if wait is not None:
+                return throttled(wait, "Rate limit reached for requests")
+        if behaviour.max_concurrency and stats.in_flight >= behaviour.max_concurrency:
+            return throttled(0.05, "Too many concurrent requests")
+
+        stats.requests += 1
+        stats.inputs += len(texts)
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            delay_ms = behaviour.latency_ms + behaviour.per_input_ms * len(texts)
+            if behaviour.jitter_ms:
+                delay_ms += random.uniform(0, behaviour.jitter_ms)
+            await asyncio.sleep(delay_ms / 1000.0)
+
+            data = [
+                {"object": "embedding", "index": i, "embedding": hash_embedding(text, dimensions)}
+                for i, text in enumerate(texts)
+            ]
+        finally:
+            stats.in_flight -= 1
+
+        token_count = sum(len(tokenize(text)) for text in texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "bench-hashing"),
+            "usage": {"prompt_tokens": token_count, "total_tokens": token_count},
+        }
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fixed latency per request")
+    parser.add_argument("--per-input-ms", type=float, default=0.5, help="Additional latency per input text")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Uniform random extra latency")
+    parser.add_argument("--rps", type=float, default=0.0, help="Request rate limit (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=10, help="Token bucket capacity for --rps")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="In-flight request cap (0 = unlimited)")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Dimensions when the request omits them")
+    return parser.parse_args()
+
+
+def main() -> None:
+    import uvicorn
+
+    args = parse_args()
+    behaviour = ServerBehaviour(
+        latency_ms=args.latency_ms,
+        per_input_ms=args.per_input_ms,
+        jitter_ms=args.jitter_ms,
+        rps=args.rps,
+        burst=args.burst,
+        max_concurrency=args.max_concurrency,
+        default_dimensions=args.dimensions,
+    )
+    uvicorn.run(create_app(behaviour), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
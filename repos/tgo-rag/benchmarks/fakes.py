@@ -0,0 +1,77 @@
+"""
+Deterministic stand-in providers for benchmarks.
+
+``HashingEmbeddingClient`` maps text to vectors with signed feature hashing of
+word tokens (Latin scripts) and character bigrams (CJK). Texts that share rare
+terms end up close in cosine space, which is enough to measure recall without
+calling a real embedding API.
+"""
+
+import hashlib
+import math
+import re
+from typing import List
+
+from rag_service.services.embedding import BaseEmbeddingClient
+
+_LATIN_TOKEN_RE = re.compile(r"[a-z0-9\u00c0-\u024f]+")
+_CJK_RUN_RE = re.compile(r"[\u3040-\u30ff\u4e00-\u9fff]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into hashing features (words and CJK character bigrams)."""
+    lowered = text.lower()
+    features = _LATIN_TOKEN_RE.findall(lowered)
+    for run in _CJK_RUN_RE.findall(lowered):
+        if len(run) == 1:
+            features.append(run)
+        features.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return features
+
+
+def hash_embedding(text: str, dimensions: int) -> List[float]:
+    """Compute a deterministic, L2-normalized feature-hashing embedding."""
+    vector = [0.0] * dimensions
+    for feature in tokenize(text):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        index = value % dimensions
+        sign = 1.0 if (value >> 63) & 1 else -1.0
+        vector[index] += sign
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0.0:
+        # Empty text: unit vector on the first axis keeps cosine distance defined
+        vector[0] = 1.0
+        return vector
+    return [v / norm for v in vector]
+
+
+class HashingEmbeddingClient(BaseEmbeddingClient):
+    """Embedding client that never leaves the process."""
+
+    def __init__(self, dimensions: int = 1536, model: str = "bench-hashing"):
+        self.model = model
+        self.dimensions = dimensions
+        self.api_key = None
+        self.base_url = None
+        self.calls = 0
+
+    async def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return hash_embedding(text, self.dimensions)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return [hash_embedding(text, self.dimensions) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embed_documents(texts)
+
+    def get_dimensions(self) -> int:
+        return self.dimensions
+
+    def get_model_name(self) -> str:
+        return self.model
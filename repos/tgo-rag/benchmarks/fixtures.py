@@ -0,0 +1,234 @@
+"""
+Ingestion fixtures: PDF, DOCX, markdown and crawled website pages.
+
+Files are written with the standard library only (a minimal text PDF and a
+minimal WordprocessingML package), so generating fixtures needs no extra
+dependencies while still going through the real PDFMiner and Word loaders.
+Paragraph text comes from the synthetic corpus, so fixture size is controlled
+by the paragraph count.
+"""
+
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from benchmarks.corpus import Corpus
+
+FIXTURE_TYPES = ("pdf", "docx", "markdown", "website")
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "markdown": "text/markdown",
+    # Crawled pages are stored as markdown, exactly as the crawl task does
+    "website": "text/markdown",
+}
+
+_EXTENSIONS = {"pdf": ".pdf", "docx": ".docx", "markdown": ".md", "website": ".md"}
+
+# PDF layout: US letter, Helvetica 10pt
+_PDF_LINE_CHARS = 95
+_PDF_LINES_PER_PAGE = 60
+
+
+@dataclass
+class Fixture:
+    """A generated file plus what the pipeline needs to register it."""
+
+    fixture_type: str
+    path: Path
+    content_type: str
+    original_filename: str
+    size_bytes: int
+    title: str
+    url: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def paragraphs_for(corpus: Corpus, doc_index: int, count: int, latin_only: bool = False) -> List[str]:
+    """Deterministic paragraphs for one document."""
+    result = []
+    index = doc_index * count
+    while len(result) < count:
+        if not latin_only or corpus.language_of(index) in ("en", "es"):
+            result.append(corpus.chunk_text(index % max(corpus.size, 1), words=80))
+        index += 1
+    return result
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _pdf_string(text: str) -> str:
+    out = []
+    for byte in text.encode("latin-1", errors="replace"):
+        char = chr(byte)
+        if char in "()\\":
+            out.append("\\" + char)
+        elif 32 <= byte < 127:
+            out.append(char)
+        else:
+            out.append(f"\\{byte:03o}")
+    return "".join(out)
+
+
+def write_pdf(path: Path, title: str, paragraphs: List[str]) -> None:
+    """Write a text-based (extractable) PDF."""
+    lines = [title, ""]
+    for paragraph in paragraphs:
+        lines.extend(_wrap(paragraph, _PDF_LINE_CHARS))
+        lines.append("")
+    pages = [lines[i:i + _PDF_LINES_PER_PAGE] for i in range(0, len(lines), _PDF_LINES_PER_PAGE)] or [[]]
+
+    # Object numbers: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects: List[bytes] = []
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for i, page_lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 12 TL 50 750 Td " + " ".join(
+            f"({_pdf_string(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        stream_bytes = stream.encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream_bytes)} >>\nstream\n".encode() + stream_bytes + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+
+def write_docx(path: Path, title: str, paragraphs: List[str]) -> None:
+    """Write a minimal .docx with a heading and body paragraphs."""
+    body = [f"<w:p><w:r><w:rPr><w:b/></w:rPr><w:t>{escape(title)}</w:t></w:r></w:p>"]
+    body.extend(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(paragraph)}</w:t></w:r></w:p>'
+        for paragraph in paragraphs
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{''.join(body)}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+
+
+def write_markdown(path: Path, title: str, paragraphs: List[str], links: Optional[List[str]] = None) -> None:
+    """Write a markdown document with section headings every few paragraphs."""
+    parts = [f"# {title}", ""]
+    for i, paragraph in enumerate(paragraphs):
+        if i and i % 4 == 0:
+            parts.extend([f"## Section {i // 4}", ""])
+        parts.extend([paragraph, ""])
+    if links:
+        parts.extend(["## Related", ""])
+        parts.extend(f"- [{link.rsplit('/', 1)[-1]}]({link})" for link in links)
+        parts.append("")
+    path.write_text("\n".join(parts), encoding="utf-8")
+
+
+def generate_fixtures(
+    fixture_type: str,
+    corpus: Corpus,
+    directory: Path,
+    count: int,
+    paragraphs: int,
+) -> List[Fixture]:
+    """
+    Generate ``count`` fixture files of one type.
+
+    Args:
+        fixture_type: One of FIXTURE_TYPES
+        corpus: Text source
+        directory: Output directory (created if missing)
+        count: Number of documents
+        paragraphs: Paragraphs per document (~80 words each)
+
+    Returns:
+        Generated fixtures
+    """
+    if fixture_type not in FIXTURE_TYPES:
+        raise ValueError(f"Unknown fixture type: {fixture_type}")
+    directory.mkdir(parents=True, exist_ok=True)
+
+    fixtures = []
+    for doc_index in range(count):
+        title = f"Benchmark {fixture_type} document {doc_index}"
+        name = f"{fixture_type}_{doc_index:05d}{_EXTENSIONS[fixture_type]}"
+        path = directory / name
+        # The PDF writer only covers WinAnsi text
+        text = paragraphs_for(corpus, doc_index, paragraphs, latin_only=fixture_type == "pdf")
+        url = None
+
+        if fixture_type == "pdf":
+            write_pdf(path, title, text)
+        elif fixture_type == "docx":
+            write_docx(path, title, text)
+        elif fixture_type == "markdown":
+            write_markdown(path, title, text)
+        else:
+            url = f"https://bench.example.com/docs/page-{doc_index}"
+            links = [f"https://bench.example.com/docs/page-{(doc_index + step) % count}" for step in (1, 2, 3)]
+            write_markdown(path, title, text, links=links)
+
+        fixtures.append(
+            Fixture(
+                fixture_type=fixture_type,
+                path=path,
+                content_type=CONTENT_TYPES[fixture_type],
+                original_filename=name,
+                size_bytes=path.stat().st_size,
+                title=title,
+                url=url,
+            )
+        )
+    return fixtures
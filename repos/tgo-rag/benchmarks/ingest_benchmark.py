@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Ingestion throughput benchmark.
+
+Runs the real document pipeline (``process_file_async``: load -> chunk ->
+store -> embed) over generated PDF, DOCX, markdown and crawled-website
+fixtures against a local Postgres+pgvector database. Embeddings are served by
+``embedding_server.py``, a local OpenAI-compatible stand-in with configurable
+latency and rate limits, so the embedding client, its HTTP round trips and
+429 retries are all exercised without calling a real provider.
+
+Reports docs/sec, chunks/sec, peak RSS and a per-stage time breakdown for
+each fixture type.
+
+Usage:
+    poetry run python benchmarks/ingest_benchmark.py --docs 50 --concurrency 4 \\
+        --latency-ms 80 --rps 20 --output benchmarks/results/ingest.json
+
+Set DATABASE_URL (or pass --database-url) to point at a disposable database
+migrated with ``alembic upgrade head``. The website fixtures start from the
+markdown the crawl task stores; crawling itself needs a browser and is not
+part of this benchmark.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+BENCH_MODEL = "bench-hashing"
+BENCH_DIMENSIONS = 1536
+
+# process_file_async stage -> document_processing_core function names
+STAGES = {
+    "load_file_info": ("_load_file_info",),
+    "extract": ("_load_document_content",),
+    "chunk": ("_chunk_documents",),
+    "store": ("_store_document_chunks",),
+    "embed": ("_generate_document_embeddings",),
+    "status": ("_update_file_status", "_update_file_completion", "_update_website_page_status"),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    from benchmarks.fixtures import FIXTURE_TYPES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=",".join(FIXTURE_TYPES), help="Comma-separated fixture types")
+    parser.add_argument("--docs", type=int, default=20, help="Documents per fixture type")
+    parser.add_argument("--paragraphs", type=int, default=40, help="Paragraphs (~80 words) per document")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents processed concurrently")
+    parser.add_argument("--batch-size", type=int, default=10, help="Embedding batch size in the project config")
+    parser.add_argument("--seed", type=int, default=42, help="Text seed")
+    parser.add_argument("--embedding-url", default=None, help="Use an already running server (base URL incl. /v1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the spawned embedding server")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Embedding server fixed latency")
+    parser.add_argument("--per-input-ms", type=float, default=0.5, help="Embedding server latency per input")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Embedding server latency jitter")
+    parser.add_argument("--rps", type=float, default=0.0, help="Embedding server request rate limit (0 = off)")
+    parser.add_argument("--burst", type=int, default=10, help="Embedding server rate limit burst")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Embedding server in-flight cap (0 = off)")
+    parser.add_argument("--workdir", default=None, help="Fixture directory (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep ingested rows after the run")
+    parser.add_argument("--database-url", default=None, help="Override DATABASE_URL")
+    parser.add_argument("--output", default=str(ROOT / "benchmarks" / "results" / "ingest.json"))
+    return parser.parse_args()
+
+
+def bench_project_id(seed: int) -> uuid.UUID:
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"tgo-rag-bench/ingest/{seed}")
+
+
+class RssSampler:
+    """Samples resident set size on a background thread to find the peak of a run."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self.start_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def current_bytes() -> int:
+        try:
+            with open("/proc/self/statm", "r", encoding="ascii") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            # No procfs (macOS): fall back to the process-lifetime peak
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, self.current_bytes())
+
+    def __enter__(self) -> "RssSampler":
+        self.start_bytes = self.peak_bytes = self.current_bytes()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes())
+
+
+class StageTimer:
+    """Wraps pipeline stage functions in place and accumulates their wall time."""
+
+    def __init__(self, module: Any):
+        self.module = module
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._originals: Dict[str, Callable[..., Any]] = {}
+
+    def _wrap(self, stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.seconds[stage] += time.perf_counter() - started
+                self.calls[stage] += 1
+
+        return timed
+
+    def install(self) -> None:
+        for stage, names in STAGES.items():
+            for name in names:
+                original = getattr(self.module, name)
+                self._originals[name] = original
+                setattr(self.module, name, self._wrap(stage, original))
+
+    def uninstall(self) -> None:
+        for name, original in self._originals.items():
+            setattr(self.module, name, original)
+        self._originals.clear()
+
+    def reset(self) -> None:
+        self.seconds.clear()
+        self.calls.clear()
+
+    def breakdown(self, documents: int) -> Dict[str, Any]:
+        total = sum(self.seconds.values()) or 1.0
+        return {
+            stage: {
+                "seconds": round(self.seconds.get(stage, 0.0), 3),
+                "ms_per_doc": round(self.seconds.get(stage, 0.0) * 1000 / max(documents, 1), 3),
+                "share": round(self.seconds.get(stage, 0.0) / total, 4),
+            }
+            for stage in STAGES
+        }
+
+
+def start_embedding_server(args: argparse.Namespace) -> subprocess.Popen:
+    """Spawn the stand-in server in its own process so its memory is not counted."""
+    command = [
+        sys.executable,
+        str(ROOT / "benchmarks" / "embedding_server.py"),
+        "--port", str(args.port),
+        "--latency-ms", str(args.latency_ms),
+        "--per-input-ms", str(args.per_input_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--rps", str(args.rps),
+        "--burst", str(args.burst),
+        "--max-concurrency", str(args.max_concurrency),
+        "--dimensions", str(BENCH_DIMENSIONS),
+    ]
+    return subprocess.Popen(command)
+
+
+async def wait_for_server(base_url: str, timeout: float = 30.0) -> None:
+    import httpx
+
+    health_url = base_url.rsplit("/v1", 1)[0] + "/health"
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(health_url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Embedding server at {health_url} did not become ready")
+            await asyncio.sleep(0.2)
+
+
+async def server_request(base_url: str, method: str, path: str) -> Dict[str, Any]:
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        response = await client.request(method, base_url.rsplit("/v1", 1)[0] + path)
+        response.raise_for_status()
+        return response.json()
+
+
+async def reset_project(project_id: uuid.UUID) -> None:
+    """Remove rows left by a previous run of this benchmark project."""
+    from sqlalchemy import delete
+
+    from rag_service.database import get_db_session
+    from rag_service.models import Collection, File, FileDocument, WebsitePage
+
+    async with get_db_session() as db:
+        await db.execute(delete(FileDocument).where(FileDocument.project_id == project_id))
+        await db.execute(delete(WebsitePage).where(WebsitePage.project_id == project_id))
+        await db.execute(delete(File).where(File.project_id == project_id))
+        await db.execute(delete(Collection).where(Collection.project_id == project_id))
+
+
+async def ensure_embedding_config(project_id: uuid.UUID, base_url: str, batch_size: int) -> None:
+    from sqlalchemy import select
+
+    from rag_service.database import get_db_session
+    from rag_service.models import EmbeddingConfig
+
+    async with get_db_session() as db:
+        result = await db.execute(
+            select(EmbeddingConfig).where(
+                EmbeddingConfig.project_id == project_id,
+                EmbeddingConfig.is_active.is_(True),
+            )
+        )
+        rec = result.scalar_one_or_none()
+        if rec is None:
+            rec = EmbeddingConfig(project_id=project_id, is_active=True)
+            db.add(rec)
+        rec.provider = "openai_compatible"
+        rec.model = BENCH_MODEL
+        rec.dimensions = BENCH_DIMENSIONS
+        rec.batch_size = batch_size
+        rec.api_key = "benchmark"
+        rec.base_url = base_url
+        rec.vector_storage_mode = "full"
+        rec.vector_table = None
+
+
+async def register_fixtures(project_id: uuid.UUID, fixture_type: str, fixtures: List[Any]) -> tuple[uuid.UUID, List[uuid.UUID]]:
+    """Create the collection, File rows and (for websites) WebsitePage rows."""
+    from rag_service.database import get_db_session
+    from rag_service.models import Collection, CollectionType, File, WebsitePage
+
+    collection_id = uuid.uuid4()
+    file_ids: List[uuid.UUID] = []
+    is_website = fixture_type == "website"
+
+    async with get_db_session() as db:
+        db.add(
+            Collection(
+                id=collection_id,
+                project_id=project_id,
+                display_name=f"Ingest benchmark ({fixture_type})",
+                collection_type=CollectionType.website if is_website else CollectionType.file,
+            )
+        )
+        await db.flush()
+
+        for fixture in fixtures:
+            file_id = uuid.uuid4()
+            page_id = uuid.uuid4() if is_website else None
+            storage_metadata = (
+                {"source": "website_crawl", "source_url": fixture.url, "page_id": str(page_id)}
+                if is_website
+                else {}
+            )
+            db.add(
+                File(
+                    id=file_id,
+                    project_id=project_id,
+                    collection_id=collection_id,
+                    original_filename=fixture.original_filename,
+                    file_size=fixture.size_bytes,
+                    content_type=fixture.content_type,
+                    storage_provider="local",
+                    storage_path=str(fixture.path),
+                    storage_metadata=storage_metadata,
+                    status="pending",
+                )
+            )
+            if is_website:
+                await db.flush()
+                content = fixture.path.read_text(encoding="utf-8")
+                db.add(
+                    WebsitePage(
+                        id=page_id,
+                        collection_id=collection_id,
+                        project_id=project_id,
+                        file_id=file_id,
+                        url=fixture.url,
+                        url_hash=hashlib.sha256(fixture.url.encode("utf-8")).hexdigest(),
+                        title=fixture.title,
+                        depth=0,
+                        crawl_source="initial",
+                        content_length=len(content),
+                        status="extracted",
+                    )
+                )
+            file_ids.append(file_id)
+
+    return collection_id, file_ids
+
+
+async def run_fixture_type(
+    fixture_type: str,
+    fixtures: List[Any],
+    project_id: uuid.UUID,
+    concurrency: int,
+    timer: StageTimer,
+    embedding_url: str,
+) -> Dict[str, Any]:
+    from rag_service.tasks.document_processing_core import process_file_async
+
+    collection_id, file_ids = await register_fixtures(project_id, fixture_type, fixtures)
+    await server_request(embedding_url, "POST", "/stats/reset")
+    timer.reset()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ingest(file_id: uuid.UUID) -> Any:
+        async with semaphore:
+            return await process_file_async(file_id, collection_id)
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*[ingest(file_id) for file_id in file_ids])
+        elapsed = time.perf_counter() - started
+
+    completed = [o for o in outcomes if o.status == "completed"]
+    errors = sorted({o.error for o in outcomes if o.error})
+    chunks = sum(o.document_count for o in completed)
+    server_stats = await server_request(embedding_url, "GET", "/stats")
+
+    return {
+        "fixture_type": fixture_type,
+        "documents": len(fixtures),
+        "completed": len(completed),
+        "failed": len(outcomes) - len(completed),
+        "errors": errors[:5],
+        "chunks": chunks,
+        "total_tokens": sum(o.total_tokens for o in completed),
+        "input_mb": round(sum(f.size_bytes for f in fixtures) / 1e6, 3),
+        "wall_seconds": round(elapsed, 3),
+        "docs_per_sec": round(len(completed) / elapsed, 3) if elapsed else 0.0,
+        "chunks_per_sec": round(chunks / elapsed, 3) if elapsed else 0.0,
+        "rss_mb": {
+            "start": round(rss.start_bytes / 1e6, 1),
+            "peak": round(rss.peak_bytes / 1e6, 1),
+            "growth": round((rss.peak_bytes - rss.start_bytes) / 1e6, 1),
+        },
+        "stages": timer.breakdown(len(fixtures)),
+        "embedding_server": server_stats,
+    }
+
+
+async def main() -> None:
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # Benchmarks should not spam per-document info logs
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.fixtures import FIXTURE_TYPES, generate_fixtures
+    from benchmarks.reporting import write_results
+    from rag_service.database import close_database
+    from rag_service.tasks import document_processing_core
+
+    fixture_types = [f for f in args.fixtures.split(",") if f]
+    unknown = set(fixture_types) - set(FIXTURE_TYPES)
+    if unknown:
+        raise SystemExit(f"Unknown fixture types: {', '.join(sorted(unknown))}")
+
+    server: Optional[subprocess.Popen] = None
+    embedding_url = args.embedding_url
+    if embedding_url is None:
+        server = start_embedding_server(args)
+        embedding_url = f"http://127.0.0.1:{args.port}/v1"
+
+    corpus = generate_corpus(max(args.docs * args.paragraphs * 2, 1000), num_queries=0, seed=args.seed)
+    project_id = bench_project_id(args.seed)
+    timer = StageTimer(document_processing_core)
+    results: List[Dict[str, Any]] = []
+
+    tmp = tempfile.TemporaryDirectory(prefix="tgo-rag-ingest-") if args.workdir is None else None
+    workdir = Path(args.workdir or tmp.name)
+    try:
+        await wait_for_server(embedding_url)
+        await reset_project(project_id)
+        await ensure_embedding_config(project_id, embedding_url, args.batch_size)
+        timer.install()
+
+        for fixture_type in fixture_types:
+            fixtures = generate_fixtures(fixture_type, corpus, workdir / fixture_type, args.docs, args.paragraphs)
+            row = await run_fixture_type(
+                fixture_type, fixtures, project_id, args.concurrency, timer, embedding_url
+            )
+            results.append(row)
+            print(
+                f"{fixture_type:8s} {row['docs_per_sec']} docs/s {row['chunks_per_sec']} chunks/s "
+                f"peak_rss={row['rss_mb']['peak']}MB failed={row['failed']} "
+                f"throttled={row['embedding_server']['throttled']}"
+            )
+            for error in row["errors"]:
+                print(f"  error: {error}")
+    finally:
+        timer.uninstall()
+        if not args.keep:
+            await reset_project(project_id)
+        await close_database()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        if tmp is not None:
+            tmp.cleanup()
+
+    path = write_results(
+        Path(args.output),
+        benchmark="ingest",
+        config={
+            "fixtures": fixture_types,
+            "docs": args.docs,
+            "paragraphs": args.paragraphs,
+            "concurrency": args.concurrency,
+            "batch_size": args.batch_size,
+            "seed": args.seed,
+            "embedding": {"model": BENCH_MODEL, "dimensions": BENCH_DIMENSIONS},
+            "embedding_server": None if args.embedding_url else {
+                "latency_ms": args.latency_ms,
+                "per_input_ms": args.per_input_ms,
+                "jitter_ms": args.jitter_ms,
+                "rps": args.rps,
+                "burst": args.burst,
+                "max_concurrency": args.max_concurrency,
+            },
+        },
+        results=results,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Statistics and JSON result helpers shared by the benchmarks.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return float(ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower))
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """Summarize latencies in milliseconds."""
+    if not latencies_ms:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "count": len(latencies_ms),
+        "p50": round(percentile(latencies_ms, 50), 3),
+        "p95": round(percentile(latencies_ms, 95), 3),
+        "mean": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "max": round(max(latencies_ms), 3),
+    }
+
+
+def recall_at_k(retrieved: Iterable[Any], relevant: Iterable[Any], k: int) -> float:
+    """Fraction of relevant items found in the top-k (capped at k relevant)."""
+    relevant_set = set(relevant)
+    if not relevant_set:
+        return 1.0
+    top = list(retrieved)[:k]
+    hits = sum(1 for item in top if item in relevant_set)
+    return hits / min(k, len(relevant_set))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def write_results(path: Path, benchmark: str, config: Dict[str, Any], results: List[Dict[str, Any]]) -> Path:
+    """
+    Write benchmark results as stable, diff-friendly JSON.
+
+    Args:
+        path: Output file path
+        benchmark: Benchmark name
+        config: Parameters the benchmark ran with
+        results: Result rows
+
+    Returns:
+        The output path
+    """
+    payload = {
+        "benchmark": benchmark,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "config": config,
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Search quality and latency benchmark.
+
+Loads a synthetic multilingual corpus into a local Postgres+pgvector database
+and measures p50/p95 latency and recall@k for ``semantic_search``,
+``keyword_search`` and ``hybrid_search`` through the real SearchService. Query
+embeddings come from a deterministic hashing provider, so no external API is
+called and results are reproducible.
+
+Usage:
+    poetry run python benchmarks/search_benchmark.py --sizes 10000,100000 \\
+        --output benchmarks/results/search.json
+
+Set DATABASE_URL (or pass --database-url) to point at a disposable database
+migrated with ``alembic upgrade head``. Corpora are stored under deterministic
+project IDs, so ``--reuse`` skips reloading an already loaded size.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+SEARCH_TYPES = ("semantic", "keyword", "hybrid")
+BENCH_MODEL = "bench-hashing"
+BENCH_DIMENSIONS = 1536
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated corpus sizes (chunks)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per corpus")
+    parser.add_argument("--relevant-per-query", type=int, default=5, help="Planted relevant chunks per query")
+    parser.add_argument("--k", default="5,10", help="Comma-separated cutoffs; the largest is used as search limit")
+    parser.add_argument("--search-types", default=",".join(SEARCH_TYPES), help="Search types to run")
+    parser.add_argument(
+        "--storage-mode",
+        default="full",
+        choices=("full", "halfvec", "binary"),
+        help="Vector storage mode configured for the benchmark project",
+    )
+    parser.add_argument("--warmup", type=int, default=10, help="Warmup queries per search type (not measured)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per insert batch when loading")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus seed")
+    parser.add_argument("--reuse", action="store_true", help="Reuse an already loaded corpus of the same size")
+    parser.add_argument("--database-url", default=None, help="Override DATABASE_URL")
+    parser.add_argument("--output", default=str(ROOT / "benchmarks" / "results" / "search.json"))
+    return parser.parse_args()
+
+
+def bench_project_id(size: int, seed: int) -> uuid.UUID:
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"tgo-rag-bench/search/{size}/{seed}")
+
+
+def chunk_id(project_id: uuid.UUID, index: int) -> uuid.UUID:
+    return uuid.uuid5(project_id, str(index))
+
+
+async def ensure_embedding_config(project_id: uuid.UUID, storage_mode: str) -> None:
+    from sqlalchemy import select
+
+    from rag_service.database import get_db_session
+    from rag_service.models import EmbeddingConfig
+
+    async with get_db_session() as db:
+        result = await db.execute(
+            select(EmbeddingConfig).where(
+                EmbeddingConfig.project_id == project_id,
+                EmbeddingConfig.is_active.is_(True),
+            )
+        )
+        rec = result.scalar_one_or_none()
+        if rec is None:
+            rec = EmbeddingConfig(project_id=project_id, is_active=True)
+            db.add(rec)
+        rec.provider = "openai"
+        rec.model = BENCH_MODEL
+        rec.dimensions = BENCH_DIMENSIONS
+        rec.batch_size = 10
+        rec.api_key = "benchmark"
+        rec.base_url = None
+        rec.vector_storage_mode = storage_mode
+        rec.vector_table = None
+
+
+async def load_corpus(corpus: Any, project_id: uuid.UUID, batch_size: int, reuse: bool) -> Dict[str, Any]:
+    """Insert the corpus with precomputed embeddings; returns load statistics."""
+    from sqlalchemy import delete, func, insert, select, text
+
+    from benchmarks.fakes import hash_embedding
+    from rag_service.database import get_db_session
+    from rag_service.models import FileDocument
+
+    async with get_db_session() as db:
+        existing = (
+            await db.execute(select(func.count()).where(FileDocument.project_id == project_id))
+        ).scalar_one()
+
+    if reuse and existing == corpus.size:
+        print(f"  reusing {existing} loaded chunks")
+        return {"reused": True, "load_seconds": 0.0}
+
+    started = time.perf_counter()
+    async with get_db_session() as db:
+        await db.execute(delete(FileDocument).where(FileDocument.project_id == project_id))
+
+    rows: List[Dict[str, Any]] = []
+    for index, language, content in corpus.iter_chunks():
+        rows.append(
+            {
+                "id": chunk_id(project_id, index),
+                "project_id": project_id,
+                "content": content,
+                "content_length": len(content),
+                "chunk_index": index,
+                "content_type": "paragraph",
+                "language": language,
+                "embedding": hash_embedding(content, BENCH_DIMENSIONS),
+                "embedding_model": BENCH_MODEL,
+                "embedding_dimensions": BENCH_DIMENSIONS,
+            }
+        )
+        if len(rows) >= batch_size or index == corpus.size - 1:
+            async with get_db_session() as db:
+                await db.execute(insert(FileDocument.__table__), rows)
+                await db.execute(
+                    text(
+                        f"UPDATE {FileDocument.table_name} "
+                        "SET content_tsv = to_tsvector('english', content) "
+                        "WHERE id = ANY(:ids)"
+                    ),
+                    {"ids": [row["id"] for row in rows]},
+                )
+            rows = []
+            if (index + 1) % (batch_size * 20) == 0:
+                print(f"  loaded {index + 1}/{corpus.size}")
+
+    async with get_db_session() as db:
+        await db.execute(text(f"ANALYZE {FileDocument.table_name}"))
+
+    return {"reused": False, "load_seconds": round(time.perf_counter() - started, 3)}
+
+
+def install_fake_embeddings(storage_mode: str) -> None:
+    """Route project embedding resolution in SearchService to the hashing client."""
+    from benchmarks.fakes import HashingEmbeddingClient
+    from rag_service.services import search as search_module
+    from rag_service.services.embedding import EmbeddingService
+
+    client = HashingEmbeddingClient(dimensions=BENCH_DIMENSIONS, model=BENCH_MODEL)
+
+    async def resolve(project_id: Any) -> EmbeddingService:
+        service = EmbeddingService(
+            provider="openai",
+            model=BENCH_MODEL,
+            dimensions=BENCH_DIMENSIONS,
+            api_key="benchmark",
+            vector_storage_mode=storage_mode,
+        )
+        service._embeddings_client = client
+        return service
+
+    search_module.get_embedding_service_for_project = resolve
+
+
+async def run_search_type(
+    search_type: str,
+    corpus: Any,
+    project_id: uuid.UUID,
+    cutoffs: List[int],
+    warmup: int,
+) -> Dict[str, Any]:
+    from benchmarks.reporting import latency_summary, recall_at_k
+    from rag_service.services.search import get_search_service
+
+    service = get_search_service()
+    search = getattr(service, f"{search_type}_search")
+    limit = max(cutoffs)
+
+    for query in corpus.queries[:warmup]:
+        await search(query=query.text, project_id=project_id, limit=limit)
+
+    latencies: List[float] = []
+    recalls: Dict[int, List[float]] = {k: [] for k in cutoffs}
+    errors = 0
+    for query in corpus.queries:
+        relevant = [chunk_id(project_id, index) for index in query.relevant]
+        started = time.perf_counter()
+        try:
+            response = await search(query=query.text, project_id=project_id, limit=limit)
+        except Exception as e:
+            errors += 1
+            print(f"  {search_type} query {query.query_id} failed: {e}")
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        retrieved = [result.document_id for result in response.results]
+        for k in cutoffs:
+            recalls[k].append(recall_at_k(retrieved, relevant, k))
+
+    return {
+        "search_type": search_type,
+        "latency_ms": latency_summary(latencies),
+        "recall": {
+            f"recall@{k}": round(sum(values) / len(values), 4) if values else 0.0
+            for k, values in recalls.items()
+        },
+        "errors": errors,
+    }
+
+
+async def main() -> None:
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # Benchmarks should not spam per-query debug logs
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.reporting import write_results
+    from rag_service.database import close_database
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    cutoffs = sorted({int(k) for k in args.k.split(",") if k})
+    search_types = [s for s in args.search_types.split(",") if s]
+    unknown = set(search_types) - set(SEARCH_TYPES)
+    if unknown:
+        raise SystemExit(f"Unknown search types: {', '.join(sorted(unknown))}")
+
+    install_fake_embeddings(args.storage_mode)
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for size in sizes:
+            print(f"corpus size {size}")
+            corpus = generate_corpus(
+                size,
+                num_queries=args.queries,
+                relevant_per_query=args.relevant_per_query,
+                seed=args.seed,
+            )
+            project_id = bench_project_id(size, args.seed)
+            await ensure_embedding_config(project_id, args.storage_mode)
+            load_stats = await load_corpus(corpus, project_id, args.batch_size, args.reuse)
+
+            for search_type in search_types:
+                row = await run_search_type(search_type, corpus, project_id, cutoffs, args.warmup)
+                row.update({"corpus_size": size, "storage_mode": args.storage_mode, **load_stats})
+                results.append(row)
+                print(
+                    f"  {search_type:8s} p50={row['latency_ms']['p50']}ms "
+                    f"p95={row['latency_ms']['p95']}ms {row['recall']}"
+                )
+    finally:
+        await close_database()
+
+    path = write_results(
+        Path(args.output),
+        benchmark="search",
+        config={
+            "sizes": sizes,
+            "queries": args.queries,
+            "relevant_per_query": args.relevant_per_query,
+            "cutoffs": cutoffs,
+            "search_types": search_types,
+            "storage_mode": args.storage_mode,
+            "seed": args.seed,
+            "embedding": {"model": BENCH_MODEL, "dimensions": BENCH_DIMENSIONS},
+        },
+        results=results,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""add quantized vector storage
+
+Revision ID: 43097dc45148
+Revises: 32097dc45147
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '43097dc45148'
+down_revision = '32097dc45147'
+branch_labels = None
+depends_on = None
+
+_QUANTIZED_INDEXES = {
+    'halfvec': (
+        'idx_rag_file_documents_embedding_halfvec',
+        '((embedding::halfvec(1536)) halfvec_cosine_ops)',
+    ),
+    'binary': (
+        'idx_rag_file_documents_embedding_binary',
+        '((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)',
+    ),
+}
+
+
+def upgrade() -> None:
+    op.add_column(
+        'rag_embedding_configs',
+        sa.Column('vector_storage_mode', sa.String(length=20), server_default='full', nullable=False),
+    )
+    op.add_column(
+        'rag_embedding_configs',
+        sa.Column('rescore_multiplier', sa.Integer(), server_default='4', nullable=False),
+    )
+
+    # Quantized HNSW expression indexes (pgvector >= 0.7). Only the compact
+    # representation lives in the index; full-precision vectors stay in the heap
+    # and are read solely for rescoring the candidate set. They are built only
+    # for modes a config uses (none when the column is first added; later mode
+    # switches enqueue build_legacy_quantized_index_task), and CONCURRENTLY so
+    # writes to the large shared table are not blocked during the build.
+    modes = set(
+        op.get_bind().execute(
+            sa.text("SELECT DISTINCT vector_storage_mode FROM rag_embedding_configs")
+        ).scalars()
+    )
+    with op.get_context().autocommit_block():
+        for mode, (name, expression) in _QUANTIZED_INDEXES.items():
+            if mode in modes:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                    f"ON rag_file_documents USING hnsw {expression}"
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(list(_QUANTIZED_INDEXES.values())):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.drop_column('rag_embedding_configs', 'rescore_multiplier')
+    op.drop_column('rag_embedding_configs', 'vector_storage_mode')
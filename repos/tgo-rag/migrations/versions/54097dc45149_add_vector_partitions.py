@@ -0,0 +1,30 @@
+"""add per-model vector partitions
+
+Revision ID: 54097dc45149
+Revises: 43097dc45148
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '54097dc45149'
+down_revision = '43097dc45148'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL keeps existing projects on the legacy shared rag_file_documents table;
+    # partition tables (rag_vec_*) are created on demand by the vector store service.
+    op.add_column('rag_embedding_configs', sa.Column('vector_table', sa.String(length=63), nullable=True))
+    op.add_column('rag_embedding_configs', sa.Column('migration_status', sa.String(length=20), nullable=True))
+    op.add_column('rag_embedding_configs', sa.Column('migration_error', sa.String(length=1000), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('rag_embedding_configs', 'migration_error')
+    op.drop_column('rag_embedding_configs', 'migration_status')
+    op.drop_column('rag_embedding_configs', 'vector_table')
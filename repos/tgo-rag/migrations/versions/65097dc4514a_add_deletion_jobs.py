@@ -0,0 +1,48 @@
+"""add background deletion jobs
+
+Revision ID: 65097dc4514a
+Revises: 54097dc45149
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '65097dc4514a'
+down_revision = '54097dc45149'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rag_deletion_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('target_type', sa.String(length=20), nullable=False),
+        sa.Column('target_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), server_default='pending', nullable=False),
+        sa.Column('total_documents', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('deleted_documents', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('deleted_files', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('deleted_pages', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('deleted_qa_pairs', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_rag_deletion_jobs_project_status', 'rag_deletion_jobs', ['project_id', 'status'])
+    op.create_index('ix_rag_deletion_jobs_target', 'rag_deletion_jobs', ['target_type', 'target_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rag_deletion_jobs_target', table_name='rag_deletion_jobs')
+    op.drop_index('ix_rag_deletion_jobs_project_status', table_name='rag_deletion_jobs')
+    op.drop_table('rag_deletion_jobs')
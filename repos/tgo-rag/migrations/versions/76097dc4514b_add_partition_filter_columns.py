@@ -0,0 +1,50 @@
+"""add filter columns to vector partitions
+
+Revision ID: 76097dc4514b
+Revises: 65097dc4514a
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '76097dc4514b'
+down_revision = '65097dc4514a'
+branch_labels = None
+depends_on = None
+
+
+def _partition_tables() -> list[str]:
+    # rag_vec_* tables are created on demand by the vector store service
+    return list(
+        op.get_bind().execute(
+            sa.text(
+                "SELECT tablename FROM pg_tables "
+                "WHERE schemaname = current_schema() AND tablename LIKE 'rag\\_vec\\_%'"
+            )
+        ).scalars()
+    )
+
+
+def upgrade() -> None:
+    # Search filters on content_type/language use real columns, which existing
+    # partitions lack; copy them from the documents the rows belong to
+    for table_name in _partition_tables():
+        op.execute(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS content_type VARCHAR(50)")
+        op.execute(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS language VARCHAR(10)")
+        op.execute(
+            f"""
+            UPDATE {table_name} AS p
+            SET content_type = d.content_type, language = d.language
+            FROM rag_file_documents AS d
+            WHERE d.id = p.id
+            """
+        )
+
+
+def downgrade() -> None:
+    for table_name in _partition_tables():
+        op.execute(f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS language")
+        op.execute(f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS content_type")
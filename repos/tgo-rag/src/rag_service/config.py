@@ -128,7 +128,62 @@ class Settings(BaseSettings):
     # Hybrid search settings
     rrf_k: int = Field(default=60, description="RRF fusion constant k")
     candidate_multiplier: int = Field(default=5, description="Candidate pool multiplier for hybrid search")
-    
+
+    # Rerank settings (local, CPU-only, applied after RRF fusion)
+    search_rerank_backend: str = Field(
+        default="none", description="Reranker after hybrid fusion: 'none', 'bm25' or 'onnx'"
+    )
+    search_rerank_candidates: int = Field(default=50, description="Fused candidates passed to the reranker")
+    search_rerank_budget_ms: int = Field(
+        default=150, description="Rerank time budget; the fused order is kept when exceeded"
+    )
+    search_rerank_weight: float = Field(
+        default=0.7, description="Weight of the rerank score against the normalized RRF score (0-1)"
+    )
+    search_rerank_max_chars: int = Field(default=2000, description="Characters of each chunk given to the reranker")
+    search_rerank_model_path: Optional[str] = Field(
+        default=None, description="ONNX cross-encoder model file (onnx backend)"
+    )
+    search_rerank_tokenizer_path: Optional[str] = Field(
+        default=None, description="tokenizer.json of the cross-encoder (onnx backend)"
+    )
+    search_rerank_max_length: int = Field(default=256, description="Cross-encoder max sequence length in tokens")
+    search_rerank_batch_size: int = Field(default=16, description="Query/passage pairs per cross-encoder run")
+    search_rerank_threads: int = Field(default=1, description="ONNX Runtime intra-op threads for reranking")
+
+    # Vector store cache settings
+    vector_store_cache_max_size: int = Field(
+        default=256, description="Maximum number of cached per-project vector stores"
+    )
+    vector_store_cache_idle_seconds: int = Field(
+        default=1800, description="Evict cached vector stores unused for this many seconds (0 disables)"
+    )
+
+    # Document parser pool settings
+    document_parser_isolation: bool = Field(
+        default=True, description="Parse and chunk documents in isolated worker processes"
+    )
+    document_parser_workers: int = Field(default=2, description="Parser worker processes per Celery worker process")
+    document_parser_timeout_seconds: int = Field(
+        default=300, description="Kill a parser worker that spends longer than this on one document (0 disables)"
+    )
+    document_parser_memory_limit_mb: int = Field(
+        default=2048, description="Address space limit per parser worker in MB (0 disables)"
+    )
+    document_parser_max_tasks_per_worker: int = Field(
+        default=100, description="Replace a parser worker after this many documents (0 disables)"
+    )
+
+    # Bulk deletion settings
+    bulk_delete_batch_size: int = Field(default=1000, description="Rows removed per purge batch")
+    bulk_delete_batch_pause_ms: int = Field(
+        default=100, description="Pause between purge batches to limit lock time and WAL rate"
+    )
+    bulk_delete_max_attempts: int = Field(default=5, description="Purge attempts before a deletion job stays failed")
+    bulk_delete_stall_minutes: int = Field(
+        default=15, description="Re-enqueue deletion jobs without progress for this many minutes"
+    )
+
     # QA generation settings
     default_is_qa_mode: bool = Field(
         default=False,
@@ -18,7 +18,7 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from .config import get_settings
 from .database import close_database, database_health_check, init_database
 from .logging_config import get_logger, init_logging_from_settings, set_request_context, clear_request_context
-from .routers import collections, files, health, monitoring, embedding_config, websites, qa
+from .routers import collections, deletions, files, health, monitoring, embedding_config, websites, qa
 from .schemas.common import ErrorResponse
 from .startup_banner import (
     print_startup_banner,
@@ -256,6 +256,14 @@ def setup_routers(app: FastAPI) -> None:
         prefix=f"{api_v1_prefix}/files",
         tags=["Files"]
     )
+
+    # Background deletion job endpoints
+    app.include_router(
+        deletions.router,
+        prefix=f"{api_v1_prefix}/deletions",
+        tags=["Deletions"],
+    )
+
     # Embedding configuration endpoints (no auth)
     app.include_router(
         embedding_config.router,
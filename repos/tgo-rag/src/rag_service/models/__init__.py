@@ -4,6 +4,7 @@ Database models for RAG service.
 
 from .base import Base
 from .collections import Collection, CollectionType
+from .deletion_jobs import DeletionJob
 from .documents import FileDocument
 from .embedding_config import EmbeddingConfig
 from .files import File
@@ -16,6 +17,7 @@ __all__ = [
     "Base",
     "Collection",
     "CollectionType",
+    "DeletionJob",
     "EmbeddingConfig",
     "File",
     "FileDocument",
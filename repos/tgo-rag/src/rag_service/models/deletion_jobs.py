@@ -0,0 +1,65 @@
+"""
+Background bulk-deletion job model.
+
+Table: rag_deletion_jobs
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, TimestampMixin, UUIDMixin
+
+
+class DeletionJob(Base, UUIDMixin, TimestampMixin):
+    """Tracks the background purge of a soft-deleted collection or file.
+
+    Notes:
+    - The target is soft-deleted when the job is created, so searches and
+      listings exclude it immediately; the purge task then removes document,
+      vector, QA, page and file rows in bounded set-based batches.
+    - Counters are updated after every batch and double as progress reporting.
+    - Purging is idempotent: a stalled job can simply be re-enqueued.
+    """
+
+    __tablename__ = "rag_deletion_jobs"
+
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        doc="Project that owns the deleted target",
+    )
+
+    # collection | file
+    target_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    target_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+    # pending | running | completed | failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", server_default="pending")
+
+    # Progress counters
+    total_documents: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    deleted_documents: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    deleted_files: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    deleted_pages: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    deleted_qa_pairs: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_rag_deletion_jobs_project_status", "project_id", "status"),
+        Index("ix_rag_deletion_jobs_target", "target_type", "target_id"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<DeletionJob(id={self.id}, target={self.target_type}:{self.target_id}, "
+            f"status={self.status}, deleted_documents={self.deleted_documents}/{self.total_documents})>"
+        )
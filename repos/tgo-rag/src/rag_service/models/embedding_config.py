@@ -18,9 +18,16 @@ class EmbeddingConfig(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
     """Embedding configuration stored per project (project_id is not FK).
 
     Notes:
-    - For phase 1, dimensions are enforced to 1536 at the API layer for
-      compatibility with existing vector tables.
+    - Vectors live in a partition table per (model, dimensions) recorded in
+      ``vector_table``; NULL means the legacy shared ``rag_file_documents``
+      table (1536 dimensions).
+    - Changing model/dimensions creates an inactive target config that a
+      re-embed job backfills and then activates (``migration_status``).
     - Only one active configuration per project is allowed (unique partial index).
+    - ``vector_storage_mode`` selects how candidates are generated at query time:
+      ``full`` searches float32 vectors directly, ``halfvec`` and ``binary``
+      generate candidates from quantized index expressions and rescore them
+      against the full-precision vectors.
     """
 
     __tablename__ = "rag_embedding_configs"
@@ -40,10 +47,32 @@ class EmbeddingConfig(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
     dimensions: Mapped[int] = mapped_column(Integer, nullable=False, default=1536)
     batch_size: Mapped[int] = mapped_column(Integer, nullable=False, default=10)
 
+    # Quantized candidate generation (full | halfvec | binary)
+    vector_storage_mode: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="full",
+        server_default="full",
+    )
+    rescore_multiplier: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=4,
+        server_default="4",
+    )
+
     # Provider credentials/endpoint
     api_key: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     base_url: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
 
+    # Vector partition routing (NULL = legacy shared table)
+    vector_table: Mapped[Optional[str]] = mapped_column(String(63), nullable=True)
+
+    # Online re-embed migration state for inactive target configs
+    # (pending | running | completed | failed | superseded)
+    migration_status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    migration_error: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
+
     # Activation flag
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
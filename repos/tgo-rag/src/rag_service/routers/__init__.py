@@ -2,10 +2,11 @@
 FastAPI routers for the RAG service.
 """
 
-from . import collections, files, health, monitoring, embedding_config, websites, qa
+from . import collections, deletions, files, health, monitoring, embedding_config, websites, qa
 
 __all__ = [
     "collections",
+    "deletions",
     "files",
     "health",
     "monitoring",
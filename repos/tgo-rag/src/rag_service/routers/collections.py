@@ -3,12 +3,11 @@ Collections management endpoints.
 """
 
 import hashlib
-import os
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, delete, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -29,6 +28,7 @@ from ..schemas.collections import (
     CollectionUpdateRequest,
 )
 from ..schemas.common import ErrorResponse
+from ..schemas.deletion_jobs import DeletionJobResponse
 from ..schemas.common import PaginationMetadata
 from ..schemas.search import SearchResponse
 from ..schemas.websites import (
@@ -36,6 +36,7 @@ from ..schemas.websites import (
     WebsitePageListResponse,
     WebsitePageResponse,
 )
+from ..services.bulk_deletion import enqueue_deletion_job, schedule_collection_deletion
 from ..services.search import get_search_service
 
 router = APIRouter()
@@ -633,8 +634,10 @@ async def update_collection(
 
 @router.delete(
     "/{collection_id}",
-    status_code=204,
+    status_code=202,
+    response_model=DeletionJobResponse,
     responses={
+        204: {"description": "Collection soft deleted (hard_delete=false)"},
         404: {"model": ErrorResponse, "description": "Collection not found or not accessible"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
@@ -648,12 +651,14 @@ async def delete_collection(
     """
     Delete a specific collection by its UUID.
 
-    By default, performs a hard delete (permanent removal):
-    - For website collections: deletes all WebsitePages, Files, FileDocuments, and physical files
-    - For other collections: deletes all Files, FileDocuments, and physical files
-    - Permanently removes the collection from the database
+    By default, performs a hard delete (permanent removal). The collection and
+    its files are soft deleted immediately, so they disappear from listings and
+    search results, and a background job then purges all WebsitePages, Files,
+    FileDocuments, QA pairs and physical files in batches. Returns 202 with the
+    deletion job; poll ``GET /v1/deletions/{job_id}`` for progress.
 
-    If hard_delete=False, performs a soft delete (sets deleted_at timestamp).
+    If hard_delete=False, performs a soft delete (sets deleted_at timestamp)
+    and returns 204.
 
     Collection must belong to the specified project.
     """
@@ -672,74 +677,18 @@ async def delete_collection(
     if not collection:
         raise HTTPException(status_code=404, detail="Collection not found or not accessible")
 
-    if hard_delete:
-        # Hard delete: permanently remove all associated resources
-        storage_paths_to_delete = []
-
-        # For website collections, delete WebsitePages first
-        if collection.collection_type == CollectionType.website:
-            # Get all pages in this collection
-            pages_query = select(WebsitePage).where(
-                WebsitePage.collection_id == collection_id
-            )
-            pages_result = await db.execute(pages_query)
-            pages = list(pages_result.scalars().all())
-
-            # Collect file IDs from pages
-            file_ids = [page.file_id for page in pages if page.file_id]
-
-            # Delete all pages
-            await db.execute(
-                delete(WebsitePage).where(WebsitePage.collection_id == collection_id)
-            )
-            logger.info(f"Deleted {len(pages)} WebsitePage records for collection {collection_id}")
-        else:
-            # For non-website collections, get file IDs directly
-            files_query = select(FileModel.id).where(
-                FileModel.collection_id == collection_id
-            )
-            files_result = await db.execute(files_query)
-            file_ids = [row[0] for row in files_result.fetchall()]
-
-        # Delete FileDocuments and Files
-        if file_ids:
-            # Get storage paths before deletion
-            paths_query = select(FileModel.storage_path).where(
-                FileModel.id.in_(file_ids)
-            )
-            paths_result = await db.execute(paths_query)
-            storage_paths_to_delete = [row[0] for row in paths_result.fetchall() if row[0]]
-
-            # Delete FileDocuments
-            await db.execute(
-                delete(FileDocument).where(FileDocument.file_id.in_(file_ids))
-            )
-            logger.info(f"Deleted FileDocument records for {len(file_ids)} files in collection {collection_id}")
-
-            # Delete Files
-            await db.execute(
-                delete(FileModel).where(FileModel.id.in_(file_ids))
-            )
-            logger.info(f"Deleted {len(file_ids)} File records for collection {collection_id}")
-
-        # Delete the collection itself
-        await db.delete(collection)
-        logger.info(f"Hard deleted collection {collection_id}")
-
-        await db.commit()
-
-        # Delete physical files after successful DB commit
-        for storage_path in storage_paths_to_delete:
-            if storage_path and os.path.exists(storage_path):
-                try:
-                    os.remove(storage_path)
-                    logger.debug(f"Deleted physical file: {storage_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete physical file {storage_path}: {e}")
-    else:
+    if not hard_delete:
         # Soft delete the collection
         collection.soft_delete()
         await db.commit()
+        return Response(status_code=204)
+
+    job = await schedule_collection_deletion(db, collection)
+    await db.commit()
+    await db.refresh(job)
+    enqueue_deletion_job(job.id)
+
+    return DeletionJobResponse.from_job(job)
 
 
 @router.get(
@@ -909,7 +858,8 @@ async def search_collection_documents(
             collection_id=collection_id,
             limit=search_request.limit,
             min_score=search_request.min_score,
-            filters=search_request.filters
+            filters=search_request.filters,
+            rerank=search_request.rerank
         )
 
     return search_response
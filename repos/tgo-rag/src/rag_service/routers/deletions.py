@@ -0,0 +1,79 @@
+"""
+Background deletion job endpoints.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db_session_dependency
+from ..logging_config import get_logger
+from ..models import DeletionJob
+from ..schemas.common import ErrorResponse
+from ..schemas.deletion_jobs import DeletionJobListResponse, DeletionJobResponse
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+@router.get(
+    "",
+    response_model=DeletionJobListResponse,
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation error - invalid query parameters"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def list_deletion_jobs(
+    project_id: UUID = Query(..., description="Project ID"),
+    status: Optional[str] = Query(None, description="Filter by status: pending, running, completed or failed"),
+    limit: int = Query(20, ge=1, le=100, description="Number of jobs to return"),
+    db: AsyncSession = Depends(get_db_session_dependency),
+):
+    """
+    List deletion jobs of a project, newest first.
+    """
+    query = select(DeletionJob).where(DeletionJob.project_id == project_id)
+    if status:
+        query = query.where(DeletionJob.status == status)
+    query = query.order_by(DeletionJob.created_at.desc()).limit(limit)
+
+    result = await db.execute(query)
+    jobs = result.scalars().all()
+
+    return DeletionJobListResponse(data=[DeletionJobResponse.from_job(job) for job in jobs])
+
+
+@router.get(
+    "/{job_id}",
+    response_model=DeletionJobResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Deletion job not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def get_deletion_job(
+    job_id: UUID,
+    project_id: UUID = Query(..., description="Project ID"),
+    db: AsyncSession = Depends(get_db_session_dependency),
+):
+    """
+    Get the progress of a background collection or file deletion.
+    """
+    result = await db.execute(
+        select(DeletionJob).where(
+            and_(
+                DeletionJob.id == job_id,
+                DeletionJob.project_id == project_id,
+            )
+        )
+    )
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+
+    return DeletionJobResponse.from_job(job)
@@ -2,7 +2,7 @@
 Embedding configuration endpoints (no authentication required).
 """
 
-from typing import List
+from typing import List, Set
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -12,6 +12,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db_session_dependency
 from ..logging_config import get_logger
 from ..models.embedding_config import EmbeddingConfig
+from ..services.vector_store import get_vector_store_service
+from ..services.vector_partitions import partition_table_name, validate_dimensions
 from ..schemas.embedding_config import (
     EmbeddingConfigBatchSyncRequest,
     EmbeddingConfigBatchSyncResponse,
@@ -23,6 +25,18 @@ router = APIRouter()
 logger = get_logger(__name__)
 
 
+def _apply_config(rec: EmbeddingConfig, cfg: EmbeddingConfigCreate) -> None:
+    """Copy request fields (except activation/routing state) onto a config row."""
+    rec.provider = cfg.provider
+    rec.model = cfg.model
+    rec.dimensions = cfg.dimensions
+    rec.batch_size = cfg.batch_size
+    rec.api_key = cfg.api_key
+    rec.base_url = cfg.base_url
+    rec.vector_storage_mode = cfg.vector_storage_mode
+    rec.rescore_multiplier = cfg.rescore_multiplier
+
+
 @router.post(
     "/batch-sync",
     response_model=EmbeddingConfigBatchSyncResponse,
@@ -35,54 +49,79 @@ async def batch_sync_embedding_configs(
     """Batch upsert embedding configs.
 
     Behavior per item:
-    - Enforce dimensions == 1536 (phase 1 compatibility)
-    - Upsert by (project_id, is_active=True): update if exists, else insert new
+    - Validate dimensions against the supported partition range
+    - Same model and dimensions: update the active configuration in place
+    - Changed model or dimensions: store an inactive target configuration and
+      run an online re-embed job that activates it once backfilled
+    - No active configuration: insert one routed to its (model, dimensions) partition
+    - Quantized storage mode on a config still routed to the legacy table:
+      enqueue a concurrent build of that mode's index
     - Continue on errors; return summary
     """
     success_count = 0
     errors: List[dict] = []
+    migrations: List[dict] = []
+    # Quantized modes now used by projects on the legacy table
+    legacy_quantized_modes: Set[str] = set()
 
     for cfg in request.configs:
-        # Validate dimensions (phase 1 constraint)
-        if cfg.dimensions != 1536:
+        try:
+            validate_dimensions(cfg.dimensions)
+        except ValueError as e:
             errors.append({
                 "project_id": str(cfg.project_id),
-                "message": "Invalid dimensions: only 1536 is supported in phase 1",
+                "message": str(e),
             })
             continue
 
-        # Validate provider/model minimally (provider already validated by schema)
         try:
             # Use a SAVEPOINT per item to isolate failures
             async with db.begin_nested():
-                # Always target the active configuration for upsert
                 result = await db.execute(
                     select(EmbeddingConfig).where(
                         EmbeddingConfig.project_id == cfg.project_id,
-                        EmbeddingConfig.is_active.is_(True),
+                        EmbeddingConfig.deleted_at.is_(None),
                     )
                 )
-                existing: EmbeddingConfig | None = result.scalar_one_or_none()
-
-                if existing:
-                    existing.provider = cfg.provider
-                    existing.model = cfg.model
-                    existing.dimensions = cfg.dimensions
-                    existing.batch_size = cfg.batch_size
-                    existing.api_key = cfg.api_key
-                    existing.base_url = cfg.base_url
-                    existing.is_active = True  # enforce active for this endpoint
+                configs = result.scalars().all()
+                existing = next((c for c in configs if c.is_active), None)
+
+                if existing and (existing.model, existing.dimensions) == (cfg.model, cfg.dimensions):
+                    _apply_config(existing, cfg)
+                    if existing.vector_table is None and cfg.vector_storage_mode != "full":
+                        legacy_quantized_modes.add(cfg.vector_storage_mode)
+                elif existing:
+                    target = next(
+                        (
+                            c for c in configs
+                            if not c.is_active and c.migration_status in ("pending", "running", "failed")
+                        ),
+                        None,
+                    )
+                    if target is not None and target.migration_status == "running" and (
+                        (target.model, target.dimensions) != (cfg.model, cfg.dimensions)
+                    ):
+                        raise ValueError("An embedding migration is already running for this project")
+                    if target is None:
+                        target = EmbeddingConfig(project_id=cfg.project_id, is_active=False)
+                        db.add(target)
+                    _apply_config(target, cfg)
+                    target.vector_table = partition_table_name(cfg.model, cfg.dimensions)
+                    if target.migration_status != "running":
+                        target.migration_status = "pending"
+                        target.migration_error = None
+                        await db.flush()
+                        migrations.append({
+                            "project_id": str(cfg.project_id),
+                            "config_id": str(target.id),
+                        })
                 else:
                     new_rec = EmbeddingConfig(
                         project_id=cfg.project_id,
-                        provider=cfg.provider,
-                        model=cfg.model,
-                        dimensions=cfg.dimensions,
-                        batch_size=cfg.batch_size,
-                        api_key=cfg.api_key,
-                        base_url=cfg.base_url,
+                        vector_table=partition_table_name(cfg.model, cfg.dimensions),
                         is_active=True,
                     )
+                    _apply_config(new_rec, cfg)
                     db.add(new_rec)
 
                 # Flush to validate constraints immediately
@@ -102,6 +141,33 @@ async def batch_sync_embedding_configs(
             # The nested transaction is rolled back; outer transaction remains usable
             continue
 
+    # Commit before enqueueing so workers see the target configs
+    await db.commit()
+
+    vector_store_service = get_vector_store_service()
+    for cfg in request.configs:
+        vector_store_service.invalidate_project_stores(str(cfg.project_id))
+
+    from ..tasks.vector_migration import build_legacy_quantized_index_task, reembed_project_task
+    for migration in migrations:
+        try:
+            reembed_project_task.delay(migration["project_id"], migration["config_id"])
+        except Exception as e:
+            logger.error(
+                "Failed to enqueue re-embed migration",
+                project_id=migration["project_id"],
+                error=str(e),
+            )
+    for storage_mode in sorted(legacy_quantized_modes):
+        try:
+            build_legacy_quantized_index_task.delay(storage_mode)
+        except Exception as e:
+            logger.error(
+                "Failed to enqueue legacy quantized index build",
+                storage_mode=storage_mode,
+                error=str(e),
+            )
+
     failed_count = len(errors)
     logger.info(
         "Batch sync completed",
@@ -113,6 +179,7 @@ async def batch_sync_embedding_configs(
         success_count=success_count,
         failed_count=failed_count,
         errors=errors,
+        migrations=migrations,
     )
 
 
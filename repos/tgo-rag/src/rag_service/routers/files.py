@@ -27,6 +27,8 @@ from ..schemas.files import (
     BatchUploadSummary
 )
 from ..schemas.common import ErrorResponse
+from ..schemas.deletion_jobs import DeletionJobResponse
+from ..services.bulk_deletion import enqueue_deletion_job, schedule_file_deletion
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -275,7 +277,8 @@ async def get_file(
 
 @router.delete(
     "/{file_id}",
-    status_code=204,
+    status_code=202,
+    response_model=DeletionJobResponse,
     responses={
         404: {"model": ErrorResponse, "description": "File not found or not accessible"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
@@ -287,16 +290,17 @@ async def delete_file(
     db: AsyncSession = Depends(get_db_session_dependency),
 ):
     """
-    Delete a specific file by its UUID. This will permanently delete:
+    Delete a specific file by its UUID. The file is soft deleted immediately
+    and a background job then permanently deletes:
     - The file record from the database
     - All associated document chunks (FileDocument records)
     - The physical file from storage
-    
+
+    Returns 202 with the deletion job; poll ``GET /v1/deletions/{job_id}``
+    for progress.
+
     File must belong to the specified project.
     """
-    from sqlalchemy import delete
-    from ..models import FileDocument
-    
     query = select(FileModel).where(
         and_(
             FileModel.id == file_id,
@@ -310,30 +314,13 @@ async def delete_file(
     
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
-    
-    # Store storage path for later deletion
-    storage_path = file_record.storage_path
-    
-    # Delete associated FileDocument records first (physical delete)
-    await db.execute(
-        delete(FileDocument).where(FileDocument.file_id == file_id)
-    )
-    logger.info(f"Deleted FileDocument records for file {file_id}")
-    
-    # Delete the file record (physical delete)
-    await db.delete(file_record)
-    logger.info(f"Deleted file record {file_id}")
-    
+
+    job = await schedule_file_deletion(db, file_record)
     await db.commit()
-    
-    # Delete physical file from storage (after successful DB commit)
-    if storage_path and os.path.exists(storage_path):
-        try:
-            os.remove(storage_path)
-            logger.info(f"Deleted physical file from storage: {storage_path}")
-        except Exception as e:
-            # Log error but don't fail the request since DB records are already deleted
-            logger.warning(f"Failed to delete physical file {storage_path}: {e}")
+    await db.refresh(job)
+    enqueue_deletion_job(job.id)
+
+    return DeletionJobResponse.from_job(job)
 
 
 @router.get(
@@ -10,6 +10,7 @@ from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
 from ..config import get_settings
 from ..schemas.common import MetricsResponse
+from ..services.vector_store import get_vector_store_service
 
 router = APIRouter()
 
@@ -64,6 +65,7 @@ async def json_metrics():
         "search_queries_total": 456,
         "errors_total": 12,
         "uptime_seconds": time.time() - 1000,  # Placeholder
+        "vector_store_cache": get_vector_store_service().get_cache_stats(),
     }
     
     return MetricsResponse(
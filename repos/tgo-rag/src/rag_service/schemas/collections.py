@@ -325,6 +325,10 @@ class CollectionSearchRequest(BaseModel):
         description="Search mode: 'hybrid' (default), 'embedding', or 'fulltext'",
         examples=["hybrid"]
     )
+    rerank: Optional[bool] = Field(
+        default=None,
+        description="Hybrid mode only: set to false to skip the configured local reranker"
+    )
 
 
 class CollectionListResponse(BaseModel):
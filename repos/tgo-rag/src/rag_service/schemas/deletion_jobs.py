@@ -0,0 +1,61 @@
+"""
+Pydantic schemas for background deletion jobs.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class DeletionJobResponse(BaseModel):
+    """Progress of a background purge of a deleted collection or file."""
+
+    id: UUID = Field(..., description="Deletion job ID")
+    project_id: UUID = Field(..., description="Project ID")
+    target_type: str = Field(..., description="Deleted target type: collection or file")
+    target_id: UUID = Field(..., description="Deleted collection or file ID")
+    status: str = Field(..., description="Job status: pending, running, completed or failed")
+    total_documents: int = Field(..., description="Document chunks to purge (known once the job starts)")
+    deleted_documents: int = Field(..., description="Document chunks purged so far")
+    deleted_files: int = Field(..., description="File records purged so far")
+    deleted_pages: int = Field(..., description="Website pages purged so far")
+    deleted_qa_pairs: int = Field(..., description="QA pairs purged so far")
+    progress: float = Field(..., description="Fraction of document chunks purged (0-1)")
+    error_message: Optional[str] = Field(None, description="Last error, if the job failed")
+    started_at: Optional[datetime] = Field(None, description="When purging started")
+    completed_at: Optional[datetime] = Field(None, description="When purging finished")
+    created_at: datetime = Field(..., description="When the target was deleted")
+
+    @classmethod
+    def from_job(cls, job) -> "DeletionJobResponse":
+        if job.status == "completed":
+            progress = 1.0
+        elif job.total_documents:
+            progress = min(1.0, job.deleted_documents / job.total_documents)
+        else:
+            progress = 0.0
+        return cls(
+            id=job.id,
+            project_id=job.project_id,
+            target_type=job.target_type,
+            target_id=job.target_id,
+            status=job.status,
+            total_documents=job.total_documents,
+            deleted_documents=job.deleted_documents,
+            deleted_files=job.deleted_files,
+            deleted_pages=job.deleted_pages,
+            deleted_qa_pairs=job.deleted_qa_pairs,
+            progress=round(progress, 4),
+            error_message=job.error_message,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+            created_at=job.created_at,
+        )
+
+
+class DeletionJobListResponse(BaseModel):
+    """List of deletion jobs for a project."""
+
+    data: List[DeletionJobResponse] = Field(..., description="Deletion jobs, newest first")
@@ -3,7 +3,7 @@ Pydantic schemas for project-level embedding configuration.
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -15,11 +15,24 @@ class EmbeddingConfigCreate(BaseModel):
     project_id: UUID = Field(..., description="Upstream project ID (not validated against rag_projects)")
     provider: str = Field(..., description="Embedding provider (any string, stored as-is)")
     model: str = Field(..., description="Embedding model name")
-    dimensions: int = Field(1536, description="Embedding dimensions; must be 1536 in phase 1")
+    dimensions: int = Field(
+        1536,
+        description="Embedding dimensions (1-2048); vectors are stored in a per-(model, dimensions) partition",
+    )
     batch_size: int = Field(10, description="Batch size for embedding generation")
     api_key: Optional[str] = Field(None, description="Provider API key (stored as plain text)")
     base_url: Optional[str] = Field(None, description="Provider base URL (for Qwen3 or custom endpoints)")
     is_active: bool = Field(True, description="Whether this config is active; batch sync targets active config")
+    vector_storage_mode: Literal["full", "halfvec", "binary"] = Field(
+        "full",
+        description="Candidate generation precision: full float32, half-precision or binary-quantized with exact rescoring",
+    )
+    rescore_multiplier: int = Field(
+        4,
+        ge=1,
+        le=50,
+        description="Quantized candidates fetched per requested result before full-precision rescoring",
+    )
 
 
 class EmbeddingConfigBatchSyncRequest(BaseModel):
@@ -34,6 +47,10 @@ class EmbeddingConfigBatchSyncResponse(BaseModel):
     success_count: int = Field(..., description="Number of successfully processed configurations")
     failed_count: int = Field(..., description="Number of configurations that failed to process")
     errors: List[dict] = Field(default_factory=list, description="List of error details per failed item")
+    migrations: List[dict] = Field(
+        default_factory=list,
+        description="Re-embed migrations enqueued for projects whose model or dimensions changed",
+    )
 
 
 class EmbeddingConfigResponse(BaseModel):
@@ -47,6 +64,9 @@ class EmbeddingConfigResponse(BaseModel):
     batch_size: int
     base_url: Optional[str] = None
     is_active: bool
+    vector_storage_mode: str = "full"
+    rescore_multiplier: int = 4
+    vector_table: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
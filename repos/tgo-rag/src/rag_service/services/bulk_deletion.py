@@ -0,0 +1,115 @@
+"""
+Soft-delete-then-purge scheduling for collections and files.
+
+Deleting a large collection synchronously holds row locks for minutes and
+produces a burst of WAL. Instead, the request path only soft-deletes the
+target (so listings and searches stop returning it) and records a
+``DeletionJob``; the ``purge_deletion_job_task`` Celery task then removes the
+rows in bounded, set-based batches.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..logging_config import get_logger
+from ..models import Collection, DeletionJob, File
+
+logger = get_logger(__name__)
+
+TARGET_COLLECTION = "collection"
+TARGET_FILE = "file"
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+async def _active_job(db: AsyncSession, target_type: str, target_id: UUID) -> Optional[DeletionJob]:
+    result = await db.execute(
+        select(DeletionJob).where(
+            and_(
+                DeletionJob.target_type == target_type,
+                DeletionJob.target_id == target_id,
+                DeletionJob.status.in_(ACTIVE_STATUSES),
+            )
+        )
+    )
+    return result.scalars().first()
+
+
+async def schedule_collection_deletion(db: AsyncSession, collection: Collection) -> DeletionJob:
+    """
+    Soft-delete a collection and its files and record a purge job.
+
+    The caller commits the session and then calls ``enqueue_deletion_job``.
+
+    Args:
+        db: Database session
+        collection: Collection to delete
+
+    Returns:
+        The (new or already active) deletion job
+    """
+    existing = await _active_job(db, TARGET_COLLECTION, collection.id)
+    if existing is not None:
+        return existing
+
+    collection.soft_delete()
+    # Files are few compared to chunks; one statement hides them from file listings
+    await db.execute(
+        update(File)
+        .where(and_(File.collection_id == collection.id, File.deleted_at.is_(None)))
+        .values(deleted_at=func.now())
+    )
+
+    job = DeletionJob(
+        project_id=collection.project_id,
+        target_type=TARGET_COLLECTION,
+        target_id=collection.id,
+        status="pending",
+    )
+    db.add(job)
+    await db.flush()
+    logger.info(f"Scheduled purge of collection {collection.id} (job {job.id})")
+    return job
+
+
+async def schedule_file_deletion(db: AsyncSession, file_record: File) -> DeletionJob:
+    """
+    Soft-delete a file and record a purge job.
+
+    The caller commits the session and then calls ``enqueue_deletion_job``.
+
+    Args:
+        db: Database session
+        file_record: File to delete
+
+    Returns:
+        The (new or already active) deletion job
+    """
+    existing = await _active_job(db, TARGET_FILE, file_record.id)
+    if existing is not None:
+        return existing
+
+    file_record.soft_delete()
+    job = DeletionJob(
+        project_id=file_record.project_id,
+        target_type=TARGET_FILE,
+        target_id=file_record.id,
+        status="pending",
+    )
+    db.add(job)
+    await db.flush()
+    logger.info(f"Scheduled purge of file {file_record.id} (job {job.id})")
+    return job
+
+
+def enqueue_deletion_job(job_id: UUID) -> None:
+    """Enqueue the purge task; the stalled-job sweeper retries if this fails."""
+    from ..tasks.bulk_deletion import purge_deletion_job_task
+
+    try:
+        purge_deletion_job_task.delay(str(job_id))
+    except Exception as e:
+        logger.error(f"Failed to enqueue deletion job {job_id}: {e}")
@@ -77,6 +77,7 @@ class OpenAIEmbeddingClient(BaseEmbeddingClient):
         self.model = model
         self.dimensions = dimensions
         self.batch_size = batch_size
+        self.base_url = base_url
 
         # Compatibility mode: if base_url provided, try to pass through to LangChain; otherwise
         # fall back to using the official OpenAI SDK directly.
@@ -281,6 +282,9 @@ class EmbeddingService:
         batch_size: Optional[int] = None,
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
+        vector_storage_mode: str = "full",
+        rescore_multiplier: int = 4,
+        vector_table: Optional[str] = None,
     ):
         """Initialize the embedding service.
 
@@ -291,6 +295,9 @@ class EmbeddingService:
             batch_size: Override embedding batch size
             api_key: Override provider API key
             base_url: Override provider base URL (for Qwen3 or openai_compatible)
+            vector_storage_mode: Candidate generation precision (full, halfvec, binary)
+            rescore_multiplier: Quantized candidates per result to rescore at full precision
+            vector_table: Vector partition table; None routes to the legacy shared table
         """
         self.settings = get_settings()
         self._embeddings_client: Optional[BaseEmbeddingClient] = None
@@ -301,6 +308,9 @@ class EmbeddingService:
         self._override_api_key = api_key
         self._override_base_url = base_url
         self._batch_size = batch_size if batch_size is not None else self.settings.embedding_batch_size
+        self.vector_storage_mode = vector_storage_mode
+        self.rescore_multiplier = rescore_multiplier
+        self.vector_table = vector_table
         # Effective provider
         effective_provider = self._override_provider or self.settings.embedding_provider.lower()
         self._provider = EmbeddingProvider(effective_provider)
@@ -522,6 +532,16 @@ async def get_embedding_service_for_project(project_id) -> EmbeddingService:
     if rec is None:
         raise ValueError(f"No active embedding configuration found for project {project_id}")
 
+    return build_embedding_service(rec)
+
+
+def build_embedding_service(rec) -> EmbeddingService:
+    """Construct an EmbeddingService from an EmbeddingConfig row.
+
+    Used for the active project config and for inactive target configs that
+    are being backfilled by a re-embed migration.
+    """
+    project_id = rec.project_id
     provider = (rec.provider or "").lower()
     if provider == EmbeddingProvider.OPENAI.value:
         if not rec.api_key:
@@ -533,6 +553,9 @@ async def get_embedding_service_for_project(project_id) -> EmbeddingService:
             batch_size=rec.batch_size,
             api_key=rec.api_key,
             base_url=rec.base_url,
+            vector_storage_mode=rec.vector_storage_mode,
+            rescore_multiplier=rec.rescore_multiplier,
+            vector_table=rec.vector_table,
         )
     elif provider == EmbeddingProvider.QWEN3.value:
         if not rec.api_key:
@@ -546,6 +569,9 @@ async def get_embedding_service_for_project(project_id) -> EmbeddingService:
             batch_size=rec.batch_size,
             api_key=rec.api_key,
             base_url=rec.base_url,
+            vector_storage_mode=rec.vector_storage_mode,
+            rescore_multiplier=rec.rescore_multiplier,
+            vector_table=rec.vector_table,
         )
     elif provider == EmbeddingProvider.OPENAI_COMPATIBLE.value:
         if not rec.api_key:
@@ -559,6 +585,9 @@ async def get_embedding_service_for_project(project_id) -> EmbeddingService:
             batch_size=rec.batch_size,
             api_key=rec.api_key,
             base_url=rec.base_url,
+            vector_storage_mode=rec.vector_storage_mode,
+            rescore_multiplier=rec.rescore_multiplier,
+            vector_table=rec.vector_table,
         )
 
     else:
@@ -569,4 +598,7 @@ async def get_embedding_service_for_project(project_id) -> EmbeddingService:
             batch_size=rec.batch_size,
             api_key=rec.api_key,
             base_url=rec.base_url,
+            vector_storage_mode=rec.vector_storage_mode,
+            rescore_multiplier=rec.rescore_multiplier,
+            vector_table=rec.vector_table,
         )
@@ -0,0 +1,245 @@
+"""
+Local rerank stage for hybrid search.
+
+RRF fusion only sees ranks, so the top of the fused list is often a mix of
+near-duplicates and loosely related chunks, and callers compensate by asking
+for more results. A reranker rescores the fused candidates against the query
+so that a small ``limit`` already contains the best chunks.
+
+Backends (selected with ``search_rerank_backend``), all CPU-only:
+- bm25: BM25 computed over the candidate set itself, no model needed
+- onnx: small cross-encoder (e.g. ms-marco-MiniLM / bge-reranker) exported to
+  ONNX, run with onnxruntime and a HuggingFace ``tokenizer.json``
+
+Reranking runs in a worker thread under a strict time budget. A reranker that
+misses the budget or fails leaves the fused order untouched.
+"""
+
+import asyncio
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Sequence
+
+from ..config import get_settings
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]+")
+
+
+class RerankBudgetExceeded(Exception):
+    """The reranker ran out of its time budget."""
+
+
+class Reranker:
+    """Base class for local rerankers."""
+
+    name = "base"
+
+    def score(self, query: str, passages: Sequence[str], deadline: float) -> List[float]:
+        """
+        Score each passage against the query; higher is more relevant.
+
+        Args:
+            query: Search query
+            passages: Candidate passages
+            deadline: ``time.monotonic()`` value to give up at
+
+        Raises:
+            RerankBudgetExceeded: The deadline passed before all passages were scored
+        """
+        raise NotImplementedError
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercased words plus CJK unigrams and bigrams (CJK has no spaces)."""
+    text = text.lower()
+    tokens = _WORD_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class BM25Reranker(Reranker):
+    """BM25 with the candidate set as the corpus."""
+
+    name = "bm25"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, passages: Sequence[str], deadline: float) -> List[float]:
+        query_terms = set(_tokenize(query))
+        if not query_terms or not passages:
+            return [0.0] * len(passages)
+
+        term_counts = [Counter(_tokenize(passage)) for passage in passages]
+        lengths = [sum(counts.values()) for counts in term_counts]
+        avg_length = (sum(lengths) / len(lengths)) or 1.0
+        n = len(passages)
+        idf = {}
+        for term in query_terms:
+            df = sum(1 for counts in term_counts if term in counts)
+            idf[term] = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+        scores = []
+        for counts, length in zip(term_counts, lengths):
+            if time.monotonic() > deadline:
+                raise RerankBudgetExceeded
+            total = 0.0
+            norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+            for term in query_terms:
+                tf = counts.get(term)
+                if tf:
+                    total += idf[term] * tf * (self.k1 + 1.0) / (tf + norm)
+            scores.append(total)
+        return scores
+
+
+class OnnxCrossEncoderReranker(Reranker):
+    """
+    Cross-encoder reranker running an ONNX model on CPU.
+
+    Requires the optional ``onnxruntime`` and ``tokenizers`` packages. The
+    model must take ``input_ids`` and ``attention_mask`` (and optionally
+    ``token_type_ids``) and return relevance logits.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: str,
+        max_length: int = 256,
+        batch_size: int = 16,
+        threads: int = 1,
+    ):
+        try:
+            import numpy as np
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                "The onnx reranker requires 'onnxruntime' and 'tokenizers' (pip install onnxruntime tokenizers)"
+            ) from e
+
+        self._np = np
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, threads)
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+        self.batch_size = max(1, batch_size)
+        # InferenceSession.run is thread-safe, but one run at a time keeps the
+        # CPU cost of a search predictable
+        self._lock = threading.Lock()
+
+    def score(self, query: str, passages: Sequence[str], deadline: float) -> List[float]:
+        np = self._np
+        scores: List[float] = []
+        for start in range(0, len(passages), self.batch_size):
+            if time.monotonic() > deadline:
+                raise RerankBudgetExceeded
+            batch = passages[start:start + self.batch_size]
+            encodings = self._tokenizer.encode_batch([(query, passage) for passage in batch])
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            }
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            with self._lock:
+                logits = self._session.run(None, feeds)[0]
+            logits = np.asarray(logits, dtype=np.float32)
+            # Single-logit models score directly; two-class models use the "relevant" logit
+            column = logits[:, -1] if logits.ndim == 2 else logits
+            scores.extend(float(value) for value in column)
+        return scores
+
+
+_reranker: Optional[Reranker] = None
+_reranker_backend: Optional[str] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[Reranker]:
+    """
+    Get the configured reranker, or None when reranking is disabled.
+
+    A backend that cannot be loaded is logged once and treated as disabled.
+    """
+    global _reranker, _reranker_backend
+    settings = get_settings()
+    backend = (settings.search_rerank_backend or "none").lower()
+    if backend == _reranker_backend:
+        return _reranker
+
+    with _reranker_lock:
+        if backend == _reranker_backend:
+            return _reranker
+        reranker: Optional[Reranker] = None
+        try:
+            if backend == "bm25":
+                reranker = BM25Reranker()
+            elif backend == "onnx":
+                if not settings.search_rerank_model_path or not settings.search_rerank_tokenizer_path:
+                    raise RuntimeError("search_rerank_model_path and search_rerank_tokenizer_path must be set")
+                reranker = OnnxCrossEncoderReranker(
+                    model_path=settings.search_rerank_model_path,
+                    tokenizer_path=settings.search_rerank_tokenizer_path,
+                    max_length=settings.search_rerank_max_length,
+                    batch_size=settings.search_rerank_batch_size,
+                    threads=settings.search_rerank_threads,
+                )
+            elif backend != "none":
+                raise RuntimeError(f"Unknown rerank backend: {backend}")
+        except Exception as e:
+            logger.error(f"Reranker '{backend}' unavailable, reranking disabled: {e}")
+            reranker = None
+        _reranker, _reranker_backend = reranker, backend
+        return _reranker
+
+
+def reset_reranker() -> None:
+    """Reset the global reranker instance. Useful for testing."""
+    global _reranker, _reranker_backend
+    with _reranker_lock:
+        _reranker, _reranker_backend = None, None
+
+
+async def rerank_scores(
+    reranker: Reranker,
+    query: str,
+    passages: Sequence[str],
+    budget_ms: int,
+) -> Optional[List[float]]:
+    """
+    Score passages off the event loop within ``budget_ms``.
+
+    Returns:
+        One score per passage, or None if the budget was exceeded or the
+        reranker failed
+    """
+    budget = max(0, budget_ms) / 1000.0
+    deadline = time.monotonic() + budget
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, reranker.score, query, list(passages), deadline)
+    try:
+        # Small grace period: the reranker checks the deadline between batches
+        return await asyncio.wait_for(future, timeout=budget + 0.05)
+    except (asyncio.TimeoutError, RerankBudgetExceeded):
+        logger.warning(f"Reranker '{reranker.name}' exceeded {budget_ms}ms budget; keeping fused order")
+    except Exception as e:
+        logger.error(f"Reranker '{reranker.name}' failed; keeping fused order: {e}")
+    return None
@@ -13,14 +13,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import get_settings
 from ..database import get_db_session
 from ..logging_config import get_logger
-from ..models import FileDocument
+from ..models import Collection, FileDocument
 from ..schemas.search import SearchMetadata, SearchResult, SearchResponse
-from .vector_store import get_vector_store_service
+from .vector_store import STORAGE_MODE_FULL, get_vector_store_service
 from .embedding import get_embedding_service_for_project
 from .query_processor import get_query_processor
+from .reranker import Reranker, get_reranker, rerank_scores
 
 logger = get_logger(__name__)
 
+# Upper bound on how far semantic search widens k to replace soft-deleted chunks
+SEMANTIC_OVERFETCH_MAX_FACTOR = 8
+
+
+def _exclude_deleted(query: Any, file_model: Any) -> Any:
+    """Hide chunks of soft-deleted files and collections awaiting purge."""
+    return query.outerjoin(
+        Collection, FileDocument.collection_id == Collection.id
+    ).where(
+        and_(
+            or_(file_model.id.is_(None), file_model.deleted_at.is_(None)),
+            or_(Collection.id.is_(None), Collection.deleted_at.is_(None)),
+        )
+    )
+
 
 class SearchService:
     """Service for performing hybrid search operations."""
@@ -70,40 +86,70 @@ class SearchService:
             
             # Resolve project-scoped embedding service and perform per-project similarity search
             embedding_service = await get_embedding_service_for_project(project_id)
-            vector_results = await self.vector_store_service.similarity_search_for_project(
-                query=query,
-                project_key=str(project_id),
-                embeddings_client=embedding_service.embeddings_client,
-                k=limit,
-                filter_dict=vector_filters if vector_filters else None,
-                score_threshold=min_score,
-            )
+            # Chunks of soft-deleted files stay in the vector tables until purged;
+            # the quantized query skips them, the PGVector store cannot, so widen
+            # k until enough live chunks are found or the store runs dry
+            fetch_k = limit
+            while True:
+                if embedding_service.vector_storage_mode != STORAGE_MODE_FULL:
+                    vector_results = await self.vector_store_service.quantized_similarity_search_for_project(
+                        query=query,
+                        embeddings_client=embedding_service.embeddings_client,
+                        storage_mode=embedding_service.vector_storage_mode,
+                        k=fetch_k,
+                        filter_dict=vector_filters if vector_filters else None,
+                        score_threshold=min_score,
+                        rescore_multiplier=embedding_service.rescore_multiplier,
+                        table_name=embedding_service.vector_table,
+                        exclude_deleted=True,
+                    )
+                else:
+                    vector_results = await self.vector_store_service.similarity_search_for_project(
+                        query=query,
+                        project_key=str(project_id),
+                        embeddings_client=embedding_service.embeddings_client,
+                        k=fetch_k,
+                        filter_dict=vector_filters if vector_filters else None,
+                        score_threshold=min_score,
+                        table_name=embedding_service.vector_table,
+                    )
+
+                # Get full document info from database with project filtering
+                document_ids = [UUID(doc.id) for doc, _ in vector_results if doc.id]
+                document_infos = await self._get_documents_info(document_ids, project_id)
+
+                # Convert vector results to search results
+                search_results = []
+                for doc, score in vector_results:
+                    document_info = document_infos.get(UUID(doc.id)) if doc.id else None
+                    if not document_info:
+                        continue
+                    search_results.append(SearchResult(
+                        document_id=UUID(doc.id),
+                        file_id=document_info["file_id"],
+                        collection_id=document_info.get("collection_id"),
+                        relevance_score=score,
+                        content_preview=self._create_content_preview(doc.page_content),
+                        document_title=document_info.get("document_title"),
+                        content_type=document_info.get("content_type", "paragraph"),
+                        chunk_index=document_info.get("chunk_index"),
+                        page_number=document_info.get("page_number"),
+                        section_title=document_info.get("section_title"),
+                        tags=document_info.get("tags"),
+                        metadata=document_info.get("metadata", {}),
+                        created_at=document_info["created_at"],
+                    ))
+                    if len(search_results) == limit:
+                        break
+
+                if (
+                    len(search_results) >= limit
+                    or len(vector_results) < fetch_k
+                    or fetch_k >= limit * SEMANTIC_OVERFETCH_MAX_FACTOR
+                ):
+                    break
+                fetch_k *= 2
 
-            # Convert vector results to search results
-            search_results = []
-            for doc, score in vector_results:
-                document_id = doc.id
-                if document_id:
-                    # Get full document info from database with project filtering
-                    document_info = await self._get_document_info(UUID(document_id), project_id)
-                    if document_info:
-                        search_result = SearchResult(
-                            document_id=UUID(document_id),
-                            file_id=document_info["file_id"],
-                            collection_id=document_info.get("collection_id"),
-                            relevance_score=score,
-                            content_preview=self._create_content_preview(doc.page_content),
-                            document_title=document_info.get("document_title"),
-                            content_type=document_info.get("content_type", "paragraph"),
-                            chunk_index=document_info.get("chunk_index"),
-                            page_number=document_info.get("page_number"),
-                            section_title=document_info.get("section_title"),
-                            tags=document_info.get("tags"),
-                            metadata=document_info.get("metadata", {}),
-                            created_at=document_info["created_at"],
-                        )
-                        search_results.append(search_result)
-            
             # Create search metadata
             search_time_ms = int((time.time() - start_time) * 1000)
             search_metadata = SearchMetadata(
@@ -194,6 +240,8 @@ class SearchService:
                         )
                     )
 
+                base_query = _exclude_deleted(base_query, FileModel)
+
                 # Apply content_type filter
                 if filters and "content_type" in filters:
                     content_types = filters["content_type"]
@@ -268,10 +316,14 @@ class SearchService:
         collection_id: Optional[UUID] = None,
         limit: int = 20,
         min_score: float = 0.0,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        rerank: Optional[bool] = None
     ) -> SearchResponse:
         """
         Perform hybrid search with RRF fusion, optional reranking, and traceability metadata.
+
+        ``rerank=False`` skips the configured reranker for this call; ``None``
+        or ``True`` use it when ``search_rerank_backend`` is enabled.
         """
         start_time = time.time()
         try:
@@ -339,14 +391,24 @@ class SearchService:
             
             # Sort by accumulated RRF score
             sorted_docs = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+            # 2. Optional local rerank of the fused head
+            rerank_scores_by_id: Dict[UUID, float] = {}
+            blended_scores_by_id: Dict[UUID, float] = {}
+            if sorted_docs and rerank is not False:
+                reranker = get_reranker()
+                if reranker is not None:
+                    sorted_docs, rerank_scores_by_id, blended_scores_by_id = await self._rerank(
+                        reranker, query, sorted_docs, limit
+                    )
             
             # 3. Take top results with normalized scores and traceability metadata
             final_docs = []
             if sorted_docs:
                 # Normalize scores to 0-1 range (top result = 1.0 if we had a range)
                 # But RRF scores are summations, so we normalize relative to the max found
-                max_rrf = sorted_docs[0][1]
-                min_rrf = sorted_docs[-1][1] if len(sorted_docs) > 1 else 0
+                max_rrf = max(score for _, score in sorted_docs)
+                min_rrf = min(score for _, score in sorted_docs) if len(sorted_docs) > 1 else 0
                 rrf_range = max_rrf - min_rrf if max_rrf != min_rrf else 1.0
                 
                 for doc_id, rrf_score in sorted_docs[:limit]:
@@ -367,7 +429,13 @@ class SearchService:
                     doc.metadata["semantic_rank"] = min(info["semantic"]) if info["semantic"] else None
                     doc.metadata["keyword_rank"] = min(info["keyword"]) if info["keyword"] else None
                     
-                    doc.relevance_score = round(normalized_score, 4)
+                    if doc_id in blended_scores_by_id:
+                        # Raw reranker output, and the normalized rerank/RRF blend used for ordering
+                        doc.metadata["rerank_score"] = round(rerank_scores_by_id[doc_id], 4)
+                        doc.metadata["blended_score"] = round(blended_scores_by_id[doc_id], 4)
+                        doc.relevance_score = round(blended_scores_by_id[doc_id], 4)
+                    else:
+                        doc.relevance_score = round(normalized_score, 4)
                     final_docs.append(doc)
 
             # Create search metadata
@@ -378,7 +446,7 @@ class SearchService:
                 returned_results=len(final_docs),
                 search_time_ms=search_time_ms,
                 filters_applied=filters,
-                search_type="hybrid_rrf"
+                search_type="hybrid_rrf_rerank" if blended_scores_by_id else "hybrid_rrf"
             )
 
             return SearchResponse(
@@ -391,34 +459,98 @@ class SearchService:
             raise
     
 
-    async def _get_document_info(self, document_id: UUID, project_id: UUID) -> Optional[Dict[str, Any]]:
+    async def _rerank(
+        self,
+        reranker: Reranker,
+        query: str,
+        fused: List[Tuple[UUID, float]],
+        limit: int,
+    ) -> Tuple[List[Tuple[UUID, float]], Dict[UUID, float], Dict[UUID, float]]:
+        """
+        Rerank the head of the fused list with a local reranker.
+
+        The head (``search_rerank_candidates``, at least ``limit``) is
+        reordered by ``weight * rerank + (1 - weight) * rrf``, both min-max
+        normalized over the head; the tail keeps its fused order.
+
+        Returns:
+            (reordered fused list, raw reranker score per reranked document,
+            blended score per reranked document); the input order and empty
+            dicts if the budget was exceeded
+        """
+        head_size = max(limit, self.settings.search_rerank_candidates)
+        head, tail = fused[:head_size], fused[head_size:]
+        doc_ids = [doc_id for doc_id, _ in head]
+
+        # Previews are truncated; the reranker needs the chunk text
+        async with get_db_session() as db:
+            result = await db.execute(
+                select(FileDocument.id, FileDocument.content).where(FileDocument.id.in_(doc_ids))
+            )
+            contents = {row[0]: row[1] or "" for row in result.all()}
+        max_chars = self.settings.search_rerank_max_chars
+        passages = [contents.get(doc_id, "")[:max_chars] for doc_id in doc_ids]
+
+        started = time.monotonic()
+        raw_scores = await rerank_scores(reranker, query, passages, self.settings.search_rerank_budget_ms)
+        if raw_scores is None:
+            return fused, {}, {}
+
+        def _normalize(values: List[float]) -> List[float]:
+            low, high = min(values), max(values)
+            if high == low:
+                return [1.0] * len(values)
+            return [(v - low) / (high - low) for v in values]
+
+        weight = min(1.0, max(0.0, self.settings.search_rerank_weight))
+        rerank_norm = _normalize(raw_scores)
+        rrf_norm = _normalize([score for _, score in head])
+        blended = {
+            doc_id: weight * r + (1.0 - weight) * f
+            for doc_id, r, f in zip(doc_ids, rerank_norm, rrf_norm)
+        }
+        head = sorted(head, key=lambda item: blended[item[0]], reverse=True)
+        logger.debug(
+            f"Reranked {len(head)} candidates with {reranker.name} "
+            f"in {(time.monotonic() - started) * 1000:.1f}ms"
+        )
+        return head + tail, dict(zip(doc_ids, raw_scores)), blended
+
+    async def _get_documents_info(
+        self, document_ids: List[UUID], project_id: UUID
+    ) -> Dict[UUID, Dict[str, Any]]:
         """
-        Get document information from database with project filtering.
+        Get document information for a page of results in one query.
+
+        Chunks of soft-deleted files and collections are left out.
 
         Args:
-            document_id: Document UUID
+            document_ids: Document UUIDs
             project_id: Project ID for multi-tenant isolation
 
         Returns:
-            Document information dictionary or None if not found
+            Document information dictionaries keyed by document ID
         """
+        if not document_ids:
+            return {}
+
         from ..models import File  # Import locally to avoid circular imports if any
-        
+
         async with get_db_session() as db:
             query = select(FileDocument, File).outerjoin(
                 File, FileDocument.file_id == File.id
             ).where(
                 and_(
-                    FileDocument.id == document_id,
+                    FileDocument.id.in_(document_ids),
                     FileDocument.project_id == project_id
                 )
             )
+            query = _exclude_deleted(query, File)
             result = await db.execute(query)
-            row = result.first()
-            
-            if row:
-                document, file = row
-                return {
+
+            infos: Dict[UUID, Dict[str, Any]] = {}
+            for document, file in result.all():
+                infos[document.id] = {
                     "file_id": document.file_id,
                     "collection_id": document.collection_id,
                     "document_title": document.document_title,
@@ -434,8 +566,7 @@ class SearchService:
                         "file_size": file.file_size if file else None,
                     }
                 }
-            
-            return None
+            return infos
 
     def _create_content_preview(self, content: Optional[str], length: int = 200) -> str:
         """
@@ -0,0 +1,171 @@
+"""
+Dimension-aware vector partitions.
+
+Each (embedding model, dimensions) pair gets its own vector table so projects
+can use any dimension their model supports. Partition rows share primary keys
+with ``rag_file_documents`` (which keeps content, metadata and the full-text
+index) and are removed automatically when the document row is deleted. The
+filterable document columns (``content_type``, ``language``) are copied onto
+the partition rows when they are embedded.
+"""
+
+import hashlib
+import re
+from typing import List, Optional
+
+from ..models import FileDocument
+
+LEGACY_TABLE_NAME = FileDocument.table_name
+LEGACY_VECTOR_SIZE = 1536
+
+PARTITION_PREFIX = "rag_vec_"
+MIN_VECTOR_DIMENSIONS = 1
+MAX_VECTOR_DIMENSIONS = 2048
+
+# pgvector index limits per type
+HNSW_VECTOR_MAX_DIMENSIONS = 2000
+HNSW_HALFVEC_MAX_DIMENSIONS = 4000
+
+# Columns copied into each partition row; content_type and language are taken
+# from the matching rag_file_documents row so search filters work on partitions
+PARTITION_METADATA_COLUMNS = ["file_id", "collection_id", "project_id", "content_type", "language"]
+
+# Quantized HNSW expression indexes on the legacy table, by storage mode. They
+# are built concurrently and only once a config routed to the legacy table
+# uses the mode; partitions create theirs with the (empty) table.
+LEGACY_QUANTIZED_INDEXES = {
+    "halfvec": (
+        "idx_rag_file_documents_embedding_halfvec",
+        f"((embedding::halfvec({LEGACY_VECTOR_SIZE})) halfvec_cosine_ops)",
+    ),
+    "binary": (
+        "idx_rag_file_documents_embedding_binary",
+        f"((binary_quantize(embedding)::bit({LEGACY_VECTOR_SIZE})) bit_hamming_ops)",
+    ),
+}
+
+_TABLE_NAME_RE = re.compile(r"^rag_vec_[a-z0-9_]{1,48}$")
+
+
+def partition_table_name(model: str, dimensions: int) -> str:
+    """
+    Build the vector table name for an embedding model and dimension count.
+
+    The readable slug is truncated, so a short hash of the full model name is
+    appended to keep distinct models apart.
+
+    Args:
+        model: Embedding model name (e.g., text-embedding-v4)
+        dimensions: Embedding vector dimensions
+
+    Returns:
+        Postgres-safe table name (at most 45 characters)
+    """
+    slug = re.sub(r"[^a-z0-9]+", "_", (model or "").lower()).strip("_")[:24] or "model"
+    digest = hashlib.sha1((model or "").encode("utf-8")).hexdigest()[:6]
+    return f"{PARTITION_PREFIX}{slug}_{digest}_{int(dimensions)}"
+
+
+def resolve_table_name(table_name: str | None) -> str:
+    """
+    Resolve and validate a vector table name before it is used in SQL.
+
+    Args:
+        table_name: Partition table name from EmbeddingConfig.vector_table
+
+    Returns:
+        The validated table name, or the legacy table name if None
+
+    Raises:
+        ValueError: If the name is not a legacy or partition table name
+    """
+    if not table_name or table_name == LEGACY_TABLE_NAME:
+        return LEGACY_TABLE_NAME
+    if not _TABLE_NAME_RE.match(table_name):
+        raise ValueError(f"Invalid vector partition table name: {table_name}")
+    return table_name
+
+
+def validate_dimensions(dimensions: int) -> None:
+    """
+    Ensure the dimension count can be stored in a partition.
+
+    Raises:
+        ValueError: If dimensions are out of the supported range
+    """
+    if not MIN_VECTOR_DIMENSIONS <= dimensions <= MAX_VECTOR_DIMENSIONS:
+        raise ValueError(
+            f"Invalid dimensions: must be between {MIN_VECTOR_DIMENSIONS} and {MAX_VECTOR_DIMENSIONS}"
+        )
+
+
+def partition_ddl(table_name: str, dimensions: int) -> List[str]:
+    """
+    Build idempotent DDL statements that create a partition and its indexes.
+
+    Full-precision HNSW is only created when pgvector supports it for the
+    dimension count; the half-precision and binary expression indexes back the
+    quantized candidate generation modes.
+
+    Args:
+        table_name: Validated partition table name
+        dimensions: Embedding vector dimensions
+
+    Returns:
+        List of SQL statements to run in order
+    """
+    table_name = resolve_table_name(table_name)
+    validate_dimensions(dimensions)
+    d = int(dimensions)
+    statements = [
+        f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id UUID PRIMARY KEY REFERENCES {LEGACY_TABLE_NAME}(id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            embedding vector({d}) NOT NULL,
+            file_id UUID,
+            collection_id UUID,
+            project_id UUID NOT NULL,
+            content_type VARCHAR(50),
+            language VARCHAR(10),
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS {table_name}_project_id ON {table_name} (project_id)",
+        f"CREATE INDEX IF NOT EXISTS {table_name}_collection_id ON {table_name} (collection_id)",
+        f"CREATE INDEX IF NOT EXISTS {table_name}_file_id ON {table_name} (file_id)",
+    ]
+    if d <= HNSW_VECTOR_MAX_DIMENSIONS:
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_hnsw "
+            f"ON {table_name} USING hnsw (embedding vector_cosine_ops)"
+        )
+    if d <= HNSW_HALFVEC_MAX_DIMENSIONS:
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_hnsw_half "
+            f"ON {table_name} USING hnsw ((embedding::halfvec({d})) halfvec_cosine_ops)"
+        )
+    statements.append(
+        f"CREATE INDEX IF NOT EXISTS {table_name}_hnsw_bit "
+        f"ON {table_name} USING hnsw ((binary_quantize(embedding)::bit({d})) bit_hamming_ops)"
+    )
+    return statements
+
+
+def legacy_quantized_index_ddl(storage_mode: str) -> Optional[str]:
+    """
+    Build the statement creating the legacy table's index for a storage mode.
+
+    The statement uses CONCURRENTLY, so it must run outside a transaction.
+
+    Returns:
+        SQL statement, or None if the mode needs no quantized index
+    """
+    index = LEGACY_QUANTIZED_INDEXES.get(storage_mode)
+    if index is None:
+        return None
+    name, expression = index
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON {LEGACY_TABLE_NAME} USING hnsw {expression}"
+    )
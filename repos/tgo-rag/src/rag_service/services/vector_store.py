@@ -2,6 +2,7 @@
 Vector store service using langchain-postgres for vector operations.
 """
 
+import hashlib
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
@@ -13,21 +14,114 @@ from langchain_postgres.v2.hybrid_search_config import (
     HybridSearchConfig,
     reciprocal_rank_fusion,
 )
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, text
 
 from ..config import get_settings
 from ..database import get_db_session
 from ..logging_config import get_logger
 from ..models import FileDocument
 from .embedding import get_embedding_service
+from .vector_store_cache import VectorStoreCache
+from .vector_partitions import (
+    LEGACY_TABLE_NAME,
+    LEGACY_VECTOR_SIZE,
+    PARTITION_METADATA_COLUMNS,
+    partition_ddl,
+    resolve_table_name,
+)
 
 logger = get_logger(__name__)
 
-TABLE_NAME = FileDocument.table_name
+TABLE_NAME = LEGACY_TABLE_NAME
 ID_COLUMN = "id"
 CONTENT_COLUMN = "content"
 METADATA_COLUMNS = ["file_id", "collection_id", "project_id"]
-VECTOR_SIZE = 1536
+VECTOR_SIZE = LEGACY_VECTOR_SIZE
+
+# Vector storage modes (see EmbeddingConfig.vector_storage_mode)
+STORAGE_MODE_FULL = "full"
+STORAGE_MODE_HALFVEC = "halfvec"
+STORAGE_MODE_BINARY = "binary"
+
+
+def _quantized_candidate_order(storage_mode: str, vector_size: int) -> Optional[str]:
+    """Return the ORDER BY expression for quantized candidate generation.
+
+    The expressions must match the expression indexes in
+    ``LEGACY_QUANTIZED_INDEXES`` and ``partition_ddl`` exactly, otherwise the
+    planner falls back to a sequential scan.
+    """
+    if storage_mode == STORAGE_MODE_HALFVEC:
+        return (
+            f"embedding::halfvec({vector_size}) "
+            f"<=> CAST(:query_vector AS halfvec({vector_size}))"
+        )
+    if storage_mode == STORAGE_MODE_BINARY:
+        return (
+            f"binary_quantize(embedding)::bit({vector_size}) "
+            f"<~> binary_quantize(CAST(:query_vector AS vector({vector_size})))"
+        )
+    return None
+
+
+# Metadata filters that map onto real columns of both the legacy documents
+# table and the partitions (PARTITION_METADATA_COLUMNS)
+_QUANTIZED_FILTER_COLUMNS = ("project_id", "collection_id", "file_id", "content_type", "language")
+_UUID_FILTER_COLUMNS = frozenset({"project_id", "collection_id", "file_id"})
+
+# pgvector release that added hnsw.iterative_scan
+_ITERATIVE_SCAN_MIN_VERSION = (0, 8, 0)
+
+
+def _not_deleted_conditions(table_name: str) -> List[str]:
+    """Conditions hiding chunks of soft-deleted files and collections awaiting purge."""
+    return [
+        f"NOT EXISTS (SELECT 1 FROM rag_files f WHERE f.id = {table_name}.file_id "
+        "AND f.deleted_at IS NOT NULL)",
+        f"NOT EXISTS (SELECT 1 FROM rag_collections c WHERE c.id = {table_name}.collection_id "
+        "AND c.deleted_at IS NOT NULL)",
+    ]
+
+
+def _quantized_filter_conditions(
+    filter_dict: Optional[Dict[str, Any]],
+    filter_columns: Tuple[str, ...] | List[str],
+) -> Tuple[List[str], Dict[str, Any]]:
+    """Build WHERE conditions and bound parameters for quantized search filters.
+
+    Parameters are cast to the column type (never the column to text), so the
+    project/collection/file btree indexes stay usable.
+    """
+    conditions = ["embedding IS NOT NULL"]
+    params: Dict[str, Any] = {}
+    for column in filter_columns:
+        value = (filter_dict or {}).get(column)
+        if value is None:
+            continue
+        is_uuid = column in _UUID_FILTER_COLUMNS
+        if isinstance(value, (list, tuple)):
+            values = [UUID(str(v)) if is_uuid else str(v) for v in value]
+            cast = "uuid[]" if is_uuid else "text[]"
+            conditions.append(f"{column} = ANY(CAST(:{column} AS {cast}))")
+            params[column] = values
+        elif is_uuid:
+            conditions.append(f"{column} = CAST(:{column} AS uuid)")
+            params[column] = UUID(str(value))
+        else:
+            conditions.append(f"{column} = :{column}")
+            params[column] = str(value)
+    return conditions, params
+
+
+def _supports_iterative_scan(extversion: Optional[str]) -> bool:
+    """Whether an installed pgvector version has ``hnsw.iterative_scan``."""
+    if not extversion:
+        return False
+    parts = []
+    for part in extversion.split(".")[:3]:
+        digits = "".join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts + [0] * (3 - len(parts))) >= _ITERATIVE_SCAN_MIN_VERSION
 
 
 class VectorStoreService:
@@ -39,10 +133,17 @@ class VectorStoreService:
         self.embedding_service = get_embedding_service()
         # Legacy single-store (global) instance
         self._vector_store: Optional[PGVectorStore] = None
-        # Per-project vector store cache keyed by project key (e.g., project_id)
-        self._vector_stores: dict[str, PGVectorStore] = {}
+        # Per-project vector store cache keyed by (project key, config version)
+        self._vector_stores: VectorStoreCache[PGVectorStore] = VectorStoreCache(
+            max_size=self.settings.vector_store_cache_max_size,
+            idle_ttl_seconds=self.settings.vector_store_cache_idle_seconds,
+        )
+        # Partition tables already ensured by this process
+        self._initialized_tables: set[str] = {TABLE_NAME}
         self._pg_engine: Optional[PGEngine] = None
         self._hybrid_search_config = None
+        # pgvector >= 0.8 (hnsw.iterative_scan); resolved on first quantized search
+        self._iterative_scan: Optional[bool] = None
 
     def _create_hybrid_search_config(self) -> HybridSearchConfig:
         """
@@ -103,12 +204,46 @@ class VectorStoreService:
             )
         return self._vector_store
 
-    async def get_vector_store_for_project(self, project_key: str, embeddings_client: Any) -> PGVectorStore:
+    async def ensure_vector_partition(self, table_name: str, vector_size: int) -> None:
+        """Create a vector partition table and its indexes if missing.
+
+        DDL runs under a transaction-scoped advisory lock so concurrent workers
+        creating the same partition do not race on the catalog.
+        """
+        table_name = resolve_table_name(table_name)
+        if table_name in self._initialized_tables:
+            return
+
+        async with get_db_session() as db:
+            await db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:name))"),
+                {"name": table_name},
+            )
+            for statement in partition_ddl(table_name, vector_size):
+                await db.execute(text(statement))
+
+        self._initialized_tables.add(table_name)
+        logger.info(f"Ensured vector partition {table_name} ({vector_size} dimensions)")
+
+    async def get_vector_store_for_project(
+        self,
+        project_key: str,
+        embeddings_client: Any,
+        table_name: Optional[str] = None,
+    ) -> PGVectorStore:
         """Get or create a PGVectorStore instance bound to a specific project/config.
 
-        A separate store object is cached per project key so that the appropriate
-        embedding client (provider/model/api key) is used for that project.
+        A separate store object is cached per project key and vector table so
+        that the appropriate embedding client (provider/model/api key) and
+        dimension-specific partition are used for that project.
+
+        Args:
+            project_key: Project identifier (e.g., project_id as string)
+            embeddings_client: Embedding client configured for the project
+            table_name: Vector partition table; None routes to the legacy table
         """
+        table_name = resolve_table_name(table_name)
+
         # Initialize shared PGEngine and hybrid config once
         if self._pg_engine is None:
             sync_db_url = self.settings.database_url
@@ -126,20 +261,60 @@ class VectorStoreService:
             except ProgrammingError as e:
                 print(f"Table already exists. Skipping creation.{str(e)}")
 
-        # Create per-project store if missing
-        if project_key not in self._vector_stores:
-            self._vector_stores[project_key] = await PGVectorStore.create(
+        is_legacy = table_name == TABLE_NAME
+        if not is_legacy:
+            await self.ensure_vector_partition(table_name, embeddings_client.get_dimensions())
+
+        # Create per-project store if missing (or if the config version changed)
+        return await self._vector_stores.get_or_create(
+            project_key,
+            self._config_version(embeddings_client, table_name),
+            lambda: PGVectorStore.create(
                 engine=self._pg_engine,
                 embedding_service=embeddings_client,
                 id_column=ID_COLUMN,
-                metadata_columns=METADATA_COLUMNS,
+                metadata_columns=METADATA_COLUMNS if is_legacy else PARTITION_METADATA_COLUMNS,
                 content_column=CONTENT_COLUMN,
-                table_name=TABLE_NAME,
+                table_name=table_name,
                 distance_strategy=DistanceStrategy.COSINE_DISTANCE,
-                hybrid_search_config=self._hybrid_search_config,
-            )
+                # Keyword search runs against rag_file_documents, partitions have no TSV column
+                hybrid_search_config=self._hybrid_search_config if is_legacy else None,
+            ),
+        )
+
+    @staticmethod
+    def _config_version(embeddings_client: Any, table_name: str) -> str:
+        """Fingerprint the embedding client settings and vector table.
 
-        return self._vector_stores[project_key]
+        Any change to provider, model, dimensions, endpoint or credentials yields
+        a new version, so the cache never serves a store bound to a stale client.
+        """
+        parts = [
+            type(embeddings_client).__name__,
+            str(getattr(embeddings_client, "model", "")),
+            str(getattr(embeddings_client, "dimensions", "")),
+            str(getattr(embeddings_client, "base_url", "") or ""),
+            str(getattr(embeddings_client, "api_key", "") or ""),
+            table_name,
+        ]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def invalidate_project_stores(self, project_key: Optional[str] = None) -> int:
+        """Drop cached vector stores for a project (or all projects).
+
+        Call after a project's embedding configuration changes or is activated.
+
+        Returns:
+            Number of cached stores removed
+        """
+        removed = self._vector_stores.invalidate(project_key)
+        if removed:
+            logger.info(f"Invalidated {removed} cached vector store(s) for {project_key or 'all projects'}")
+        return removed
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return vector store cache statistics."""
+        return self._vector_stores.stats()
 
 
     async def add_documents_batch_for_project(
@@ -147,18 +322,23 @@ class VectorStoreService:
         documents: List[Tuple[UUID, str, Optional[Dict[str, Any]]]],
         project_key: str,
         embedding_client: Any,
+        table_name: Optional[str] = None,
     ) -> List[str]:
         """Add multiple documents using the project-scoped embedding client.
 
         This mirrors add_documents_batch but binds to a per-project vector store
-        created with the given embedding client.
+        created with the given embedding client and routed to the project's
+        vector partition (``table_name``; None means the legacy table).
         """
         if not documents:
             return []
 
         try:
             # Create/retrieve per-project vector store bound to the embedding client
-            vector_store = await self.get_vector_store_for_project(project_key, embedding_client)
+            vector_store = await self.get_vector_store_for_project(
+                project_key, embedding_client, table_name
+            )
+            is_legacy = resolve_table_name(table_name) == TABLE_NAME
 
             # Get batch size from settings, with a maximum of 10 for Qwen3 compatibility
             max_batch_size = min(self.settings.embedding_batch_size, 10)
@@ -187,6 +367,8 @@ class VectorStoreService:
                         "content_length": len(content),
                     })
                     metadatas.append(doc_metadata)
+                if not is_legacy:
+                    await self._copy_document_columns(document_ids, metadatas)
 
                 try:
                     vector_ids = await loop.run_in_executor(
@@ -212,6 +394,26 @@ class VectorStoreService:
 
 
 
+    @staticmethod
+    async def _copy_document_columns(
+        document_ids: List[UUID],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Copy the filterable rag_file_documents columns into partition row metadata."""
+        async with get_db_session() as db:
+            rows = (
+                await db.execute(
+                    select(FileDocument.id, FileDocument.content_type, FileDocument.language).where(
+                        FileDocument.id.in_([UUID(str(doc_id)) for doc_id in document_ids])
+                    )
+                )
+            ).all()
+        columns = {row.id: row for row in rows}
+        for doc_id, metadata in zip(document_ids, metadatas):
+            row = columns.get(UUID(str(doc_id)))
+            metadata["content_type"] = row.content_type if row else None
+            metadata["language"] = row.language if row else None
+
     async def add_document_embedding(
         self,
         document_id: UUID,
@@ -449,6 +651,7 @@ class VectorStoreService:
         k: int = 10,
         filter_dict: Optional[Dict[str, Any]] = None,
         score_threshold: Optional[float] = None,
+        table_name: Optional[str] = None,
     ) -> list[tuple[Document, float]]:
         """
         Perform similarity search using a vector store bound to the project's
@@ -461,13 +664,16 @@ class VectorStoreService:
             k: Number of results to return
             filter_dict: Optional metadata filters
             score_threshold: Minimum similarity score threshold
+            table_name: Vector partition table; None routes to the legacy table
 
         Returns:
             List of (Document, score) tuples
         """
         try:
             # Use per-project vector store bound to the provided embedding client
-            vector_store = await self.get_vector_store_for_project(project_key, embeddings_client)
+            vector_store = await self.get_vector_store_for_project(
+                project_key, embeddings_client, table_name
+            )
             # Run synchronous operation in thread pool
             import asyncio
             loop = asyncio.get_event_loop()
@@ -502,6 +708,151 @@ class VectorStoreService:
             logger.error(f"Similarity search (per-project) failed: {str(e)}")
             raise
 
+    async def quantized_similarity_search_for_project(
+        self,
+        query: str,
+        embeddings_client: Any,
+        storage_mode: str,
+        k: int = 10,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+        rescore_multiplier: int = 4,
+        table_name: Optional[str] = None,
+        exclude_deleted: bool = False,
+    ) -> list[tuple[Document, float]]:
+        """
+        Perform similarity search using quantized candidate generation.
+
+        Candidates are fetched through the half-precision or binary-quantized
+        expression index and then rescored with exact cosine distance against
+        the full-precision vectors, so only ``k * rescore_multiplier`` rows are
+        read at full precision.
+
+        Args:
+            query: Search query text
+            embeddings_client: Embedding client configured for the project
+            storage_mode: Quantization mode (``halfvec`` or ``binary``)
+            k: Number of results to return
+            filter_dict: Optional metadata filters (column equality only)
+            score_threshold: Minimum similarity score threshold
+            rescore_multiplier: Candidates fetched per requested result
+            table_name: Vector partition table; None routes to the legacy table
+            exclude_deleted: Skip chunks of soft-deleted files and collections
+
+        Returns:
+            List of (Document, score) tuples
+        """
+        table_name = resolve_table_name(table_name)
+        is_legacy = table_name == TABLE_NAME
+        vector_size = VECTOR_SIZE if is_legacy else int(embeddings_client.get_dimensions())
+        candidate_order = _quantized_candidate_order(storage_mode, vector_size)
+        if candidate_order is None:
+            raise ValueError(f"Unsupported vector storage mode: {storage_mode}")
+
+        try:
+            query_vector = await embeddings_client.aembed_query(query)
+            candidate_limit = max(k, k * max(1, rescore_multiplier))
+
+            conditions, params = _quantized_filter_conditions(filter_dict, _QUANTIZED_FILTER_COLUMNS)
+            if exclude_deleted:
+                conditions.extend(_not_deleted_conditions(table_name))
+            params.update({
+                "query_vector": "[" + ",".join(str(float(x)) for x in query_vector) + "]",
+                "candidate_limit": candidate_limit,
+                "k": k,
+            })
+            where = " AND ".join(conditions)
+            distance = f"embedding <=> CAST(:query_vector AS vector({vector_size}))"
+
+            stmt = text(
+                f"""
+                SELECT id, content, file_id, collection_id, project_id, {distance} AS distance
+                FROM (
+                    SELECT id, content, file_id, collection_id, project_id, embedding
+                    FROM {table_name}
+                    WHERE {where}
+                    ORDER BY {candidate_order}
+                    LIMIT :candidate_limit
+                ) AS candidates
+                ORDER BY distance
+                LIMIT :k
+                """
+            )
+            # Exact scan of the filtered rows; the planner drives it from the
+            # project/collection/file indexes
+            exact_stmt = text(
+                f"""
+                SELECT id, content, file_id, collection_id, project_id, {distance} AS distance
+                FROM {table_name}
+                WHERE {where}
+                ORDER BY distance
+                LIMIT :k
+                """
+            )
+
+            async with get_db_session() as db:
+                # HNSW only returns ef_search rows per scan; widen it to cover the pool
+                await db.execute(
+                    text(f"SET LOCAL hnsw.ef_search = {max(40, min(candidate_limit, 1000))}")
+                )
+                # The filters are applied after the index scan on a table shared by
+                # all projects; iterative scans keep walking the graph until enough
+                # rows pass them instead of stopping at ef_search
+                if await self._iterative_scan_available(db):
+                    await db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+                rows = (await db.execute(stmt, params)).all()
+                if len(rows) < k:
+                    # Short page: the filtered rows are few or sparse in the graph,
+                    # so an exact search over them is both cheap and complete
+                    exact_rows = (await db.execute(exact_stmt, params)).all()
+                    if len(exact_rows) > len(rows):
+                        logger.debug(
+                            f"Quantized ({storage_mode}) search returned {len(rows)}/{k} rows, "
+                            f"used exact search ({len(exact_rows)} rows)"
+                        )
+                        rows = exact_rows
+
+            new_results = []
+            for row in rows:
+                similarity = max(0.0, min(1.0, 1.0 - float(row.distance)))
+                if score_threshold is not None and score_threshold > 0:
+                    if similarity < score_threshold:
+                        continue
+                doc = Document(
+                    id=str(row.id),
+                    page_content=row.content,
+                    metadata={
+                        "file_id": str(row.file_id) if row.file_id else None,
+                        "collection_id": str(row.collection_id) if row.collection_id else None,
+                        "project_id": str(row.project_id),
+                    },
+                )
+                new_results.append((doc, similarity))
+
+            new_results.sort(key=lambda x: x[1], reverse=True)
+
+            logger.debug(
+                f"Quantized ({storage_mode}) search rescored {candidate_limit} candidates, "
+                f"returned {len(new_results)} results"
+            )
+            return new_results
+        except Exception as e:
+            logger.error(f"Quantized similarity search ({storage_mode}) failed: {str(e)}")
+            raise
+
+    async def _iterative_scan_available(self, db: Any) -> bool:
+        """Check (once per process) whether pgvector supports iterative index scans."""
+        if self._iterative_scan is None:
+            try:
+                extversion = (
+                    await db.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'"))
+                ).scalar()
+            except Exception as e:
+                logger.warning(f"Could not read pgvector version: {e}")
+                return False
+            self._iterative_scan = _supports_iterative_scan(extversion)
+        return self._iterative_scan
+
     async def delete_document_embedding(self, document_id: UUID) -> bool:
         """
         Delete a document embedding from the vector store.
@@ -0,0 +1,192 @@
+"""
+Bounded LRU cache for per-project vector store instances.
+
+Entries are keyed by (project key, config version) so a changed embedding
+configuration produces a new store instead of silently reusing the old client.
+The cache is safe for concurrent coroutines: simultaneous misses for the same
+key share a single creation, and invalidation during creation prevents the
+stale instance from being inserted.
+
+No asyncio.Lock is held across calls because the owning service is a process
+singleton reused by Celery tasks that each run their own event loop.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass
+class _CacheEntry(Generic[T]):
+    value: T
+    last_used: float
+
+
+class VectorStoreCache(Generic[T]):
+    """LRU cache with a maximum size, idle eviction and explicit invalidation."""
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        idle_ttl_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached stores (least recently used evicted first)
+            idle_ttl_seconds: Evict entries unused for this long; 0 disables idle eviction
+            clock: Monotonic time source (injectable for tests)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _CacheEntry[T]]" = OrderedDict()
+        self._pending: Dict[CacheKey, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    async def get_or_create(
+        self,
+        project_key: str,
+        version: str,
+        factory: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Return the cached store for (project_key, version), creating it on a miss.
+
+        Args:
+            project_key: Project identifier
+            version: Fingerprint of the embedding configuration and vector table
+            factory: Coroutine factory that builds a new store
+
+        Returns:
+            Cached or newly created store
+        """
+        key = (project_key, version)
+        self.evict_idle()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = self._clock()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(key)
+        if pending is not None and not pending.done() and pending.get_loop() is loop:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future: asyncio.Future = loop.create_future()
+        self._pending[key] = future
+        generation = self._generation(project_key)
+        try:
+            value = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when no other waiter exists
+            future.exception()
+            raise
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+        if self._generation(project_key) == generation:
+            self._insert(key, value)
+        future.set_result(value)
+        return value
+
+    def _generation(self, project_key: str) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(project_key, 0)
+
+    def _insert(self, key: CacheKey, value: T) -> None:
+        project_key = key[0]
+        # A new version supersedes every other version of the same project
+        for stale in [k for k in self._entries if k[0] == project_key and k != key]:
+            del self._entries[stale]
+            self.evictions += 1
+
+        self._entries[key] = _CacheEntry(value=value, last_used=self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def evict_idle(self) -> int:
+        """
+        Drop entries that have not been used within the idle TTL.
+
+        Returns:
+            Number of evicted entries
+        """
+        if not self.idle_ttl_seconds:
+            return 0
+        cutoff = self._clock() - self.idle_ttl_seconds
+        evicted = 0
+        # Entries are in LRU order, so stop at the first recently used one
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.last_used > cutoff:
+                break
+            del self._entries[key]
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def invalidate(self, project_key: Optional[str] = None) -> int:
+        """
+        Invalidate cached stores for one project, or all projects.
+
+        Stores being created concurrently for the project are not cached.
+
+        Args:
+            project_key: Project to invalidate; None clears the whole cache
+
+        Returns:
+            Number of removed entries
+        """
+        if project_key is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._epoch += 1
+            return removed
+
+        self._generations[project_key] = self._generations.get(project_key, 0) + 1
+        stale = [k for k in self._entries if k[0] == project_key]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics for monitoring."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -2,9 +2,11 @@
 Celery tasks for async processing.
 """
 
+from .bulk_deletion import purge_deletion_job_task, resume_deletion_jobs
 from .celery_app import celery_app
 from .document_processing import process_file_task
 from .qa_processing import process_qa_pair_task, process_qa_pairs_batch_task
+from .vector_migration import reembed_project_task
 from .website_crawling import crawl_page_task
 
 __all__ = [
@@ -13,4 +15,7 @@ __all__ = [
     "crawl_page_task",
     "process_qa_pair_task",
     "process_qa_pairs_batch_task",
+    "reembed_project_task",
+    "purge_deletion_job_task",
+    "resume_deletion_jobs",
 ]
@@ -0,0 +1,248 @@
+"""
+Background purge of soft-deleted collections and files.
+
+``purge_deletion_job_task`` removes everything that belonged to a deleted
+target in bounded batches of ``DELETE ... WHERE id IN (SELECT id ... LIMIT n)``
+so no single statement holds locks on, or writes WAL for, a whole collection.
+Each batch commits together with the job's progress counters.
+
+Order of removal: document chunks (vector partition rows follow through their
+ON DELETE CASCADE foreign key), QA pairs, website pages, files (then their
+stored blobs), and finally the collection row. Every step is idempotent, so an
+interrupted job is simply run again; ``resume_deletion_jobs`` re-enqueues jobs
+that stopped making progress.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.sql.elements import ColumnElement
+
+from .celery_app import celery_app
+from ..config import get_settings
+from ..database import get_db_session, reset_db_state
+from ..logging_config import get_logger
+from ..models import Collection, DeletionJob, File, FileDocument, QAPair, WebsitePage
+from ..services.bulk_deletion import TARGET_COLLECTION, TARGET_FILE
+
+logger = get_logger(__name__)
+
+
+async def _claim_job(job_id: UUID, max_attempts: int) -> Optional[DeletionJob]:
+    """Mark a job running; returns None if it is finished or out of attempts."""
+    async with get_db_session() as db:
+        result = await db.execute(
+            update(DeletionJob)
+            .where(
+                and_(
+                    DeletionJob.id == job_id,
+                    DeletionJob.status.in_(("pending", "running", "failed")),
+                    DeletionJob.attempts < max_attempts,
+                )
+            )
+            .values(
+                status="running",
+                attempts=DeletionJob.attempts + 1,
+                started_at=func.coalesce(DeletionJob.started_at, func.now()),
+                error_message=None,
+            )
+            .returning(DeletionJob)
+        )
+        return result.scalars().first()
+
+
+async def _add_progress(job_id: UUID, db: Any, **counters: int) -> None:
+    values = {name: getattr(DeletionJob, name) + count for name, count in counters.items() if count}
+    if values:
+        await db.execute(update(DeletionJob).where(DeletionJob.id == job_id).values(**values))
+
+
+async def _purge_in_batches(
+    job_id: UUID,
+    model: Any,
+    condition: ColumnElement,
+    counter: str,
+    batch_size: int,
+    pause_seconds: float,
+    returning: Optional[Any] = None,
+) -> List[Any]:
+    """
+    Delete matching rows batch by batch, committing progress with each batch.
+
+    Returns:
+        Values of the ``returning`` column for all deleted rows (empty if None)
+    """
+    returned: List[Any] = []
+    while True:
+        batch_ids = select(model.id).where(condition).limit(batch_size)
+        stmt = delete(model).where(model.id.in_(batch_ids))
+        stmt = stmt.returning(returning if returning is not None else model.id)
+        async with get_db_session() as db:
+            rows = (await db.execute(stmt)).scalars().all()
+            await _add_progress(job_id, db, **{counter: len(rows)})
+        if returning is not None:
+            returned.extend(rows)
+        if len(rows) < batch_size:
+            return returned
+        if pause_seconds:
+            await asyncio.sleep(pause_seconds)
+
+
+def _remove_stored_files(paths: List[Optional[str]]) -> None:
+    for storage_path in paths:
+        if storage_path and os.path.exists(storage_path):
+            try:
+                os.remove(storage_path)
+            except OSError as e:
+                logger.warning(f"Failed to delete physical file {storage_path}: {e}")
+
+
+async def _set_job_result(job_id: UUID, status: str, error: Optional[str] = None) -> None:
+    async with get_db_session() as db:
+        values: Dict[str, Any] = {"status": status, "error_message": error}
+        if status == "completed":
+            values["completed_at"] = func.now()
+        await db.execute(update(DeletionJob).where(DeletionJob.id == job_id).values(**values))
+
+
+async def purge_deletion_job_async(job_id: UUID) -> Dict[str, Any]:
+    """
+    Purge the rows of a soft-deleted collection or file.
+
+    Args:
+        job_id: DeletionJob to run
+
+    Returns:
+        Dict with purge result
+    """
+    settings = get_settings()
+    batch_size = max(1, settings.bulk_delete_batch_size)
+    pause = max(0, settings.bulk_delete_batch_pause_ms) / 1000.0
+
+    job = await _claim_job(job_id, settings.bulk_delete_max_attempts)
+    if job is None:
+        return {"success": False, "job_id": str(job_id), "error": "Job not found, finished or out of attempts"}
+
+    target_id = job.target_id
+    if job.target_type == TARGET_COLLECTION:
+        document_condition = FileDocument.collection_id == target_id
+        file_condition = File.collection_id == target_id
+    elif job.target_type == TARGET_FILE:
+        document_condition = FileDocument.file_id == target_id
+        file_condition = File.id == target_id
+    else:
+        await _set_job_result(job_id, "failed", f"Unknown target type: {job.target_type}")
+        return {"success": False, "job_id": str(job_id), "error": f"Unknown target type: {job.target_type}"}
+
+    try:
+        async with get_db_session() as db:
+            remaining = (
+                await db.execute(select(func.count()).select_from(FileDocument).where(document_condition))
+            ).scalar_one()
+            await db.execute(
+                update(DeletionJob)
+                .where(DeletionJob.id == job_id)
+                .values(total_documents=DeletionJob.deleted_documents + remaining)
+            )
+
+        await _purge_in_batches(job_id, FileDocument, document_condition, "deleted_documents", batch_size, pause)
+
+        if job.target_type == TARGET_COLLECTION:
+            await _purge_in_batches(
+                job_id, QAPair, QAPair.collection_id == target_id, "deleted_qa_pairs", batch_size, pause
+            )
+            await _purge_in_batches(
+                job_id, WebsitePage, WebsitePage.collection_id == target_id, "deleted_pages", batch_size, pause
+            )
+
+        # Blobs are removed batch by batch, after the rows that reference them are gone
+        storage_paths = await _purge_in_batches(
+            job_id, File, file_condition, "deleted_files", batch_size, pause, returning=File.storage_path
+        )
+        _remove_stored_files(storage_paths)
+
+        if job.target_type == TARGET_COLLECTION:
+            async with get_db_session() as db:
+                await db.execute(delete(Collection).where(Collection.id == target_id))
+
+        await _set_job_result(job_id, "completed")
+    except Exception as e:
+        logger.error(f"Deletion job {job_id} failed: {e}")
+        await _set_job_result(job_id, "failed", str(e)[:2000])
+        return {"success": False, "job_id": str(job_id), "error": str(e)}
+
+    logger.info(
+        "Deletion job completed",
+        job_id=str(job_id),
+        target_type=job.target_type,
+        target_id=str(target_id),
+    )
+    return {"success": True, "job_id": str(job_id), "target_type": job.target_type, "target_id": str(target_id)}
+
+
+async def resume_deletion_jobs_async() -> Dict[str, Any]:
+    """Re-enqueue deletion jobs that stalled or failed with attempts left."""
+    settings = get_settings()
+    stalled_before = datetime.now(timezone.utc) - timedelta(minutes=settings.bulk_delete_stall_minutes)
+
+    async with get_db_session() as db:
+        result = await db.execute(
+            select(DeletionJob.id).where(
+                and_(
+                    DeletionJob.attempts < settings.bulk_delete_max_attempts,
+                    DeletionJob.updated_at < stalled_before,
+                    DeletionJob.status.in_(("pending", "running", "failed")),
+                )
+            )
+        )
+        job_ids = list(result.scalars().all())
+
+    for job_id in job_ids:
+        purge_deletion_job_task.delay(str(job_id))
+    if job_ids:
+        logger.info(f"Re-enqueued {len(job_ids)} stalled deletion jobs")
+    return {"resumed": len(job_ids)}
+
+
+def _run(coro: Any) -> Any:
+    reset_db_state()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        # Clean up database connections before closing the loop
+        reset_db_state()
+        loop.close()
+
+
+@celery_app.task(bind=True, name="purge_deletion_job_task", acks_late=True, time_limit=6 * 3600, soft_time_limit=6 * 3600 - 300)
+def purge_deletion_job_task(self, job_id: str) -> Dict[str, Any]:
+    """
+    Celery task for purging a soft-deleted collection or file.
+
+    Args:
+        job_id: UUID string of the DeletionJob
+
+    Returns:
+        Purge result dictionary
+    """
+    try:
+        return _run(purge_deletion_job_async(UUID(job_id)))
+    except Exception as e:
+        logger.error(f"Deletion purge task failed: {e}")
+        return {"success": False, "job_id": job_id, "error": str(e)}
+
+
+@celery_app.task(name="resume_deletion_jobs")
+def resume_deletion_jobs() -> Dict[str, Any]:
+    """Periodic sweeper for stalled deletion jobs."""
+    try:
+        return _run(resume_deletion_jobs_async())
+    except Exception as e:
+        logger.error(f"Deletion job sweeper failed: {e}")
+        return {"resumed": 0, "error": str(e)}
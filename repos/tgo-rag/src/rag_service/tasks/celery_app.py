@@ -24,6 +24,8 @@ celery_app = Celery(
         "src.rag_service.tasks.maintenance",
         "src.rag_service.tasks.website_crawling",
         "src.rag_service.tasks.qa_processing",
+        "src.rag_service.tasks.vector_migration",
+        "src.rag_service.tasks.bulk_deletion",
     ]
 )
 
@@ -51,6 +53,9 @@ celery_app.conf.task_routes = {
     "crawl_page_task": {"queue": "celery"},  # Single page crawl task
     "process_qa_pair_task": {"queue": "celery"},  # Default queue for QA tasks
     "process_qa_pairs_batch_task": {"queue": "celery"},
+    "reembed_project_task": {"queue": "celery"},
+    "purge_deletion_job_task": {"queue": "celery"},
+    "resume_deletion_jobs": {"queue": "celery"},
 }
 
 # Task rate limits
@@ -74,6 +79,10 @@ celery_app.conf.beat_schedule = {
         "task": "src.rag_service.tasks.maintenance.cleanup_failed_tasks",
         "schedule": 3600.0,  # Every hour
     },
+    "resume-deletion-jobs": {
+        "task": "resume_deletion_jobs",
+        "schedule": 600.0,  # Every 10 minutes
+    },
 }
 
 
@@ -150,6 +150,7 @@ async def _add_embeddings_to_vector_store(
             documents=documents,
             project_key=str(project_id),
             embedding_client=embedding_service.embeddings_client,
+            table_name=embedding_service.vector_table,
         )
 
         # If any vector IDs are empty placeholders, treat as a batch failure
@@ -10,6 +10,7 @@ Key Components:
 - Support for PDF, Text, Markdown, Word, HTML, and other file formats
 - Fallback mechanisms for unsupported content types
 - Comprehensive error handling for loading failures
+- Isolated parsing in the document parser process pool
 
 Supported File Types:
 - PDF: PDFMinerParser for reliable PDF text extraction
@@ -28,6 +29,7 @@ from langchain_community.document_loaders.parsers.txt import TextParser
 from langchain_community.document_loaders.generic import GenericLoader
 
 from ..logging_config import get_logger
+from .document_parser_pool import run_isolated
 from .document_processing_errors import DocumentProcessingError, ProcessingStep
 from .document_processing_types import (
     DocumentLoader as DocumentLoaderProtocol,
@@ -96,6 +98,53 @@ def get_document_loader(file_path: str, content_type: str, file_id: str) -> Unio
         ) from e
 
 
+def load_document_content(file_path: str, content_type: str, file_id: str) -> List[Any]:
+    """
+    Create the loader for a file and load its documents.
+
+    Runs inside a parser worker process when isolation is enabled, so it
+    must stay a module-level function with picklable arguments and result.
+
+    Args:
+        file_path: Path to the file to be loaded
+        content_type: MIME type of the file
+        file_id: File ID for error reporting and logging
+
+    Returns:
+        Loaded Document objects
+    """
+    loader = get_document_loader(file_path, content_type, file_id)
+    return loader.load()
+
+
+async def load_documents(file_path: str, content_type: str, file_id: str) -> List[Any]:
+    """
+    Load a file's documents without blocking the event loop.
+
+    Parsing runs in the isolated parser pool, bounded by its per-document
+    timeout and memory limit.
+
+    Args:
+        file_path: Path to the file to be loaded
+        content_type: MIME type of the file
+        file_id: File ID for error reporting and logging
+
+    Returns:
+        Loaded Document objects
+
+    Raises:
+        DocumentProcessingError: If loading fails, times out or crashes the parser
+    """
+    return await run_isolated(
+        load_document_content,
+        file_path,
+        content_type,
+        file_id,
+        file_id=file_id,
+        step=ProcessingStep.EXTRACTING_CONTENT,
+    )
+
+
 def _get_word_document_loader(file_path: str, content_type: str, file_id: str) -> Any:
     """
     Get appropriate loader for Word documents.
@@ -0,0 +1,342 @@
+"""
+Isolated process pool for CPU-heavy document parsing and chunking.
+
+PDF/DOCX parsing and text splitting are pure-Python CPU work. Run on the
+default thread pool they hold the GIL and starve every other coroutine in the
+Celery worker's event loop, so one large PDF stalls embedding calls for other
+files. This module runs that work in a bounded set of long-lived worker
+processes instead.
+
+Key Components:
+- DocumentParserPool: bounded pool of worker processes with per-call timeouts
+- get_document_parser_pool: lazily created per-process singleton
+- run_isolated: async helper used by the loading and chunking stages
+
+Features:
+- Per-document timeout: a worker that does not answer in time is killed
+- Memory limit: RLIMIT_AS in the worker turns runaway parses into errors
+- Crash isolation: a crashed or killed worker fails only its own document
+- Recycling: workers are replaced after a fixed number of documents
+
+Workers are plain subprocesses connected by pipes rather than
+``multiprocessing`` children, because Celery's prefork pool processes are
+daemonic and may not start ``multiprocessing`` children. The pool is
+synchronous and thread-safe, so it works across the fresh event loops each
+Celery task creates.
+"""
+
+import asyncio
+import atexit
+import functools
+import os
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .document_processing_errors import DocumentProcessingError, ProcessingStep
+
+logger = get_logger(__name__)
+
+_WORKER_MODULE = __name__.rsplit(".", 1)[0] + ".document_parser_worker"
+
+
+class DocumentParserTimeoutError(DocumentProcessingError):
+    """The worker did not finish the document within the timeout."""
+
+
+class DocumentParserCrashedError(DocumentProcessingError):
+    """The worker process died while handling the document."""
+
+
+class DocumentParserMemoryError(DocumentProcessingError):
+    """The worker exceeded its memory limit while handling the document."""
+
+
+class _ParserWorker:
+    """One worker subprocess and its request/response pipes."""
+
+    def __init__(self, memory_limit_mb: int):
+        request_read, request_write = os.pipe()
+        response_read, response_write = os.pipe()
+        env = dict(os.environ)
+        # Children must resolve the same module names as this process
+        env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+        try:
+            self.process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    _WORKER_MODULE,
+                    "--request-fd",
+                    str(request_read),
+                    "--response-fd",
+                    str(response_write),
+                    "--memory-limit-mb",
+                    str(memory_limit_mb),
+                ],
+                pass_fds=(request_read, response_write),
+                stdin=subprocess.DEVNULL,
+                env=env,
+            )
+        except Exception:
+            for fd in (request_read, request_write, response_read, response_write):
+                os.close(fd)
+            raise
+        os.close(request_read)
+        os.close(response_write)
+        self._requests = Connection(request_write, readable=False)
+        self._responses = Connection(response_read, writable=False)
+        self.tasks_done = 0
+        self.retired = False
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def call(self, module_name: str, function_name: str, args: tuple, kwargs: dict, timeout: Optional[float]) -> Any:
+        """
+        Run one request and return the worker's reply tuple.
+
+        Raises:
+            TimeoutError: No reply within ``timeout`` seconds
+            EOFError: The worker died before replying
+        """
+        try:
+            self._requests.send((module_name, function_name, args, kwargs))
+        except (BrokenPipeError, ConnectionResetError, OSError) as e:
+            raise EOFError(f"worker {self.pid} is not accepting requests: {e}") from e
+        if not self._responses.poll(timeout):
+            raise TimeoutError
+        reply = self._responses.recv()
+        self.tasks_done += 1
+        return reply
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def exit_code(self, wait: float = 1.0) -> Optional[int]:
+        try:
+            return self.process.wait(timeout=wait)
+        except subprocess.TimeoutExpired:
+            return None
+
+    def close(self, kill: bool = False) -> None:
+        """Stop the worker; closing the request pipe makes an idle worker exit."""
+        for conn in (self._requests, self._responses):
+            try:
+                conn.close()
+            except OSError:
+                pass
+        if kill and self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class DocumentParserPool:
+    """
+    Bounded pool of isolated parser processes.
+
+    ``run`` blocks the calling thread; use ``run_isolated`` from async code.
+    At most ``max_workers`` documents are processed at once, further callers
+    wait for a free slot.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout_seconds: float = 300.0,
+        memory_limit_mb: int = 2048,
+        max_tasks_per_worker: int = 100,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._idle: List[_ParserWorker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats: Dict[str, int] = {
+            "tasks": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "memory_errors": 0,
+            "workers_started": 0,
+            "workers_recycled": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _checkout(self) -> _ParserWorker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Document parser pool is closed")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.close()
+            self._stats["workers_started"] += 1
+        worker = _ParserWorker(self.memory_limit_mb)
+        logger.debug(f"Started document parser worker {worker.pid}")
+        return worker
+
+    def _checkin(self, worker: _ParserWorker) -> None:
+        recycle = worker.retired or (
+            self.max_tasks_per_worker > 0 and worker.tasks_done >= self.max_tasks_per_worker
+        )
+        with self._lock:
+            if not recycle and not self._closed:
+                self._idle.append(worker)
+                return
+            if recycle:
+                self._stats["workers_recycled"] += 1
+        worker.close()
+
+    def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        file_id: str,
+        step: ProcessingStep,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run ``func(*args, **kwargs)`` in a worker process.
+
+        ``func`` must be a module-level function importable by name. Its
+        arguments and result are pickled across the pipe.
+
+        Args:
+            func: Function to run
+            file_id: File ID for error reporting
+            step: Processing step for error reporting
+            timeout: Seconds before the worker is killed (default: pool timeout)
+
+        Returns:
+            The function's return value
+
+        Raises:
+            DocumentParserTimeoutError: The call exceeded the timeout
+            DocumentParserCrashedError: The worker died during the call
+            DocumentParserMemoryError: The worker hit its memory limit
+            DocumentProcessingError: The function raised
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        with self._slots:
+            worker = self._checkout()
+            self._count("tasks")
+            started = time.monotonic()
+            try:
+                reply = worker.call(func.__module__, func.__qualname__, args, kwargs, timeout or None)
+            except TimeoutError:
+                worker.close(kill=True)
+                self._count("timeouts")
+                logger.warning(f"Parser worker {worker.pid} timed out after {timeout}s on file {file_id}; killed")
+                raise DocumentParserTimeoutError(
+                    f"Document processing timed out after {timeout}s",
+                    file_id,
+                    step,
+                ) from None
+            except EOFError:
+                code = worker.exit_code()
+                worker.close(kill=True)
+                self._count("crashes")
+                logger.error(f"Parser worker {worker.pid} crashed on file {file_id} (exit code {code})")
+                raise DocumentParserCrashedError(
+                    f"Document parser process crashed (exit code {code})",
+                    file_id,
+                    step,
+                ) from None
+            except BaseException:
+                # Interrupted mid-call: the worker state is unknown
+                worker.close(kill=True)
+                raise
+
+            if reply[0] == "ok":
+                self._checkin(worker)
+                logger.debug(
+                    f"{func.__qualname__} for file {file_id} finished in worker {worker.pid} "
+                    f"in {time.monotonic() - started:.2f}s"
+                )
+                return reply[1]
+
+            _, kind, message, retire = reply
+            worker.retired = retire
+            self._checkin(worker)
+            if kind == "memory":
+                self._count("memory_errors")
+                raise DocumentParserMemoryError(f"Document processing {message}", file_id, step)
+            self._count("errors")
+            raise DocumentProcessingError(message, file_id, step)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "idle_workers": len(self._idle), "max_workers": self.max_workers}
+
+    def close(self) -> None:
+        """Stop idle workers; workers still in use stop when their call returns."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+_pool: Optional[DocumentParserPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_document_parser_pool() -> DocumentParserPool:
+    """Get the parser pool of this process, creating it on first use."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A forked child must not share the parent's worker pipes
+        if _pool is None or _pool_pid != os.getpid():
+            settings = get_settings()
+            _pool = DocumentParserPool(
+                max_workers=settings.document_parser_workers,
+                timeout_seconds=settings.document_parser_timeout_seconds,
+                memory_limit_mb=settings.document_parser_memory_limit_mb,
+                max_tasks_per_worker=settings.document_parser_max_tasks_per_worker,
+            )
+            _pool_pid = os.getpid()
+            atexit.register(_pool.close)
+        return _pool
+
+
+async def run_isolated(
+    func: Callable[..., Any],
+    *args: Any,
+    file_id: str,
+    step: ProcessingStep,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a CPU-heavy function for one document without blocking the event loop.
+
+    Uses the isolated process pool when ``document_parser_isolation`` is
+    enabled, otherwise the default thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    if not get_settings().document_parser_isolation:
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    pool = get_document_parser_pool()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(pool.run, func, *args, file_id=file_id, step=step, **kwargs),
+    )
@@ -0,0 +1,95 @@
+"""
+Document parser worker process.
+
+Entry point of the isolated worker processes managed by
+``document_parser_pool.DocumentParserPool``. A worker reads pickled
+``(module, function, args, kwargs)`` requests from a pipe, runs the function
+and writes back ``("ok", result)`` or ``("error", kind, message, retire)``.
+
+The worker is deliberately dumb: timeouts and crash recovery live in the
+parent, which kills and replaces a worker that stops answering. The address
+space limit is applied here so a runaway parser fails with MemoryError (or is
+killed) without touching the Celery worker that owns the pool.
+
+This module is started with ``python -m`` and is not imported by the package.
+"""
+
+import argparse
+import importlib
+import sys
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, Tuple
+
+
+def _apply_memory_limit(limit_mb: int) -> None:
+    """Cap the address space of this process (POSIX only)."""
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = limit_mb * 1024 * 1024
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _resolve(module_name: str, function_name: str, cache: Dict[Tuple[str, str], Callable[..., Any]]) -> Callable[..., Any]:
+    key = (module_name, function_name)
+    if key not in cache:
+        target: Any = importlib.import_module(module_name)
+        for part in function_name.split("."):
+            target = getattr(target, part)
+        cache[key] = target
+    return cache[key]
+
+
+def serve(requests: Connection, responses: Connection, memory_limit_mb: int) -> int:
+    """Serve requests until the parent closes the pipe."""
+    _apply_memory_limit(memory_limit_mb)
+    functions: Dict[Tuple[str, str], Callable[..., Any]] = {}
+
+    while True:
+        try:
+            module_name, function_name, args, kwargs = requests.recv()
+        except EOFError:
+            return 0
+
+        try:
+            func = _resolve(module_name, function_name, functions)
+            result = func(*args, **kwargs)
+            responses.send(("ok", result))
+        except MemoryError:
+            # Heap state is suspect after MemoryError: report and retire
+            responses.send(("error", "memory", f"exceeded memory limit of {memory_limit_mb} MB", True))
+            return 1
+        except Exception as e:  # noqa: BLE001 - every failure is reported to the parent
+            message = getattr(e, "message", None) or str(e) or type(e).__name__
+            try:
+                responses.send(("error", type(e).__name__, message, False))
+            except Exception:
+                # Unpicklable payloads and the like: fall back to the traceback text
+                responses.send(("error", type(e).__name__, traceback.format_exc(limit=5), False))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Isolated document parser worker")
+    parser.add_argument("--request-fd", type=int, required=True)
+    parser.add_argument("--response-fd", type=int, required=True)
+    parser.add_argument("--memory-limit-mb", type=int, default=0)
+    args = parser.parse_args()
+
+    requests = Connection(args.request_fd, writable=False)
+    responses = Connection(args.response_fd, readable=False)
+    try:
+        return serve(requests, responses, args.memory_limit_mb)
+    finally:
+        requests.close()
+        responses.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
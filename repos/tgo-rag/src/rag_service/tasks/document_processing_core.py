@@ -31,9 +31,10 @@ from uuid import UUID
 from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from .document_loaders import get_document_loader
+from .document_loaders import load_documents
 from .document_chunking import chunk_documents, get_chunking_stats, validate_chunks
 from .document_embedding import generate_embeddings, get_embedding_service_info
+from .document_parser_pool import run_isolated
 from .document_processing_errors import (
     DocumentProcessingError,
     ProcessingStep,
@@ -251,7 +252,6 @@ async def _generate_qa_pairs(
     logger.info(f"Starting QA generation for file {file_id} with {total_chunks} chunks")
     
     qa_inputs = []
-    import asyncio
     
     for i, chunk in enumerate(chunks):
         qa_inputs.append((i, chunk))
@@ -361,10 +361,8 @@ async def _load_document_content(file_info: Any, file_id: str) -> List[Any]:
         file_path = file_info.storage_path
         content_type = file_info.content_type
 
-        # Primary: parser-based loader (fast path)
-        loader = get_document_loader(file_path, content_type, file_id)
-        loop = asyncio.get_event_loop()
-        documents = await loop.run_in_executor(None, loader.load)
+        # Primary: parser-based loader, run in the isolated parser pool
+        documents = await load_documents(file_path, content_type, file_id)
 
         def _is_effective(docs: List[Any]) -> bool:
             try:
@@ -410,8 +408,17 @@ async def _load_document_content(file_info: Any, file_id: str) -> List[Any]:
 async def _chunk_documents(documents: List[Any], file_id: str, file_uuid: UUID, collection_id: UUID, project_id: UUID) -> List[Dict[str, Any]]:
     """Chunk documents into optimal sizes."""
     try:
-        # Chunk documents
-        chunks = chunk_documents(documents, file_id, file_uuid, collection_id, project_id)
+        # Chunk documents (CPU-bound text splitting, kept off the event loop)
+        chunks = await run_isolated(
+            chunk_documents,
+            documents,
+            file_id,
+            file_uuid,
+            collection_id,
+            project_id,
+            file_id=file_id,
+            step=ProcessingStep.CHUNKING_DOCUMENTS,
+        )
         
         # Validate chunks
         validate_chunks(chunks, file_id)
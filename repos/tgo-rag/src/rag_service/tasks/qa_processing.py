@@ -146,6 +146,7 @@ async def process_qa_pair_async(
             documents=documents,
             project_key=str(project_id),
             embedding_client=embedding_service.embeddings_client,
+            table_name=embedding_service.vector_table,
         )
         
         # Update QA pair status
@@ -248,7 +249,8 @@ async def delete_qa_pair_document_async(
         try:
             vector_store = await vector_store_service.get_vector_store_for_project(
                 str(project_id),
-                embedding_service.embeddings_client
+                embedding_service.embeddings_client,
+                embedding_service.vector_table,
             )
             # Delete by document ID
             await asyncio.get_event_loop().run_in_executor(
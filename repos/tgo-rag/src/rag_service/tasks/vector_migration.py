@@ -0,0 +1,373 @@
+"""
+Online re-embed migration between embedding models.
+
+When a project's embedding model or dimensions change, the batch-sync endpoint
+stores the new settings as an inactive *target* config and enqueues
+``reembed_project_task``. The task backfills the target vector partition while
+the old config keeps serving searches, catches up on documents written during
+the backfill, switches the active config in a single transaction, catches up
+once more on writes that were still routed to the old config and finally
+drops the project's vectors from the previous table.
+
+Projects still routed to the legacy table that switch to a quantized storage
+mode get the mode's expression index built by
+``build_legacy_quantized_index_task``.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+
+from .celery_app import celery_app
+from .. import database
+from ..database import get_db_session, reset_db_state
+from ..logging_config import get_logger
+from ..models import EmbeddingConfig, FileDocument
+from ..services.embedding import build_embedding_service
+from ..services.vector_partitions import (
+    LEGACY_QUANTIZED_INDEXES,
+    LEGACY_TABLE_NAME,
+    legacy_quantized_index_ddl,
+    resolve_table_name,
+)
+from ..services.vector_store import get_vector_store_service
+
+logger = get_logger(__name__)
+
+REEMBED_PAGE_SIZE = 200
+# Catch-up passes before activation; each one only covers documents written
+# during the previous pass, so this converges quickly unless ingestion is heavy
+MAX_CATCH_UP_PASSES = 5
+
+
+async def _load_config(config_id: UUID) -> Optional[EmbeddingConfig]:
+    async with get_db_session() as db:
+        result = await db.execute(select(EmbeddingConfig).where(EmbeddingConfig.id == config_id))
+        return result.scalar_one_or_none()
+
+
+async def _set_migration_status(config_id: UUID, status: str, error: Optional[str] = None) -> None:
+    async with get_db_session() as db:
+        result = await db.execute(select(EmbeddingConfig).where(EmbeddingConfig.id == config_id))
+        rec = result.scalar_one_or_none()
+        if rec is not None:
+            rec.migration_status = status
+            rec.migration_error = error[:1000] if error else None
+
+
+async def _backfill(
+    project_id: UUID,
+    target_table: str,
+    embedding_service: Any,
+    only_missing: bool,
+) -> int:
+    """
+    Embed a project's documents into the target partition using keyset pages.
+
+    Args:
+        project_id: Project being migrated
+        target_table: Target vector partition table
+        embedding_service: EmbeddingService built from the target config
+        only_missing: Skip documents that already have a row in the target table
+
+    Returns:
+        Number of documents embedded
+    """
+    vector_store_service = get_vector_store_service()
+    processed = 0
+    last_id: Optional[UUID] = None
+
+    while True:
+        async with get_db_session() as db:
+            if only_missing:
+                params: Dict[str, Any] = {"project_id": project_id, "limit": REEMBED_PAGE_SIZE}
+                cursor_clause = ""
+                if last_id is not None:
+                    cursor_clause = "AND d.id > :last_id"
+                    params["last_id"] = last_id
+                rows = (
+                    await db.execute(
+                        text(
+                            f"""
+                            SELECT d.id, d.content, d.file_id, d.collection_id
+                            FROM {LEGACY_TABLE_NAME} d
+                            LEFT JOIN {target_table} v ON v.id = d.id
+                            WHERE d.project_id = :project_id AND v.id IS NULL {cursor_clause}
+                            ORDER BY d.id
+                            LIMIT :limit
+                            """
+                        ),
+                        params,
+                    )
+                ).all()
+            else:
+                query = (
+                    select(
+                        FileDocument.id,
+                        FileDocument.content,
+                        FileDocument.file_id,
+                        FileDocument.collection_id,
+                    )
+                    .where(FileDocument.project_id == project_id)
+                    .order_by(FileDocument.id)
+                    .limit(REEMBED_PAGE_SIZE)
+                )
+                if last_id is not None:
+                    query = query.where(FileDocument.id > last_id)
+                rows = (await db.execute(query)).all()
+
+        if not rows:
+            return processed
+
+        documents = [
+            (
+                row.id,
+                row.content,
+                {
+                    "project_id": project_id,
+                    "file_id": row.file_id,
+                    "collection_id": row.collection_id,
+                },
+            )
+            for row in rows
+            if row.content
+        ]
+        vector_ids = await vector_store_service.add_documents_batch_for_project(
+            documents=documents,
+            # Separate cache key so the target store does not evict the active one
+            project_key=f"{project_id}:migration",
+            embedding_client=embedding_service.embeddings_client,
+            table_name=target_table,
+        )
+        failed = sum(1 for vid in vector_ids if not vid)
+        if failed:
+            raise RuntimeError(f"{failed} of {len(documents)} documents failed to embed")
+
+        processed += len(documents)
+        last_id = rows[-1].id
+        logger.info(
+            "Re-embed progress",
+            project_id=str(project_id),
+            target_table=target_table,
+            processed=processed,
+        )
+
+
+async def _activate_target(target_id: UUID, project_id: UUID) -> Optional[str]:
+    """
+    Swap the active config to the target in one transaction.
+
+    Returns:
+        The previous vector table, or None if there was no active config
+    """
+    async with get_db_session() as db:
+        result = await db.execute(
+            select(EmbeddingConfig)
+            .where(EmbeddingConfig.project_id == project_id)
+            .with_for_update()
+        )
+        configs = result.scalars().all()
+        previous = next((c for c in configs if c.is_active), None)
+        target = next((c for c in configs if c.id == target_id), None)
+        if target is None:
+            raise RuntimeError(f"Target embedding config {target_id} disappeared")
+
+        previous_table: Optional[str] = None
+        if previous is not None and previous.id != target.id:
+            previous_table = resolve_table_name(previous.vector_table)
+            previous.is_active = False
+            previous.migration_status = "superseded"
+            # Release the partial unique index before activating the target
+            await db.flush()
+
+        target.is_active = True
+        target.migration_status = "completed"
+        target.migration_error = None
+        return previous_table
+
+
+async def _drop_previous_vectors(project_id: UUID, previous_table: str, target_table: str) -> None:
+    """Remove the project's vectors from the table it migrated away from."""
+    if previous_table == target_table:
+        return
+    async with get_db_session() as db:
+        if previous_table == LEGACY_TABLE_NAME:
+            # The legacy table also holds document content; only clear the vectors
+            await db.execute(
+                text(
+                    f"UPDATE {LEGACY_TABLE_NAME} SET embedding = NULL "
+                    "WHERE project_id = :project_id AND embedding IS NOT NULL"
+                ),
+                {"project_id": project_id},
+            )
+        else:
+            await db.execute(
+                text(f"DELETE FROM {previous_table} WHERE project_id = :project_id"),
+                {"project_id": project_id},
+            )
+
+
+async def reembed_project_async(project_id: UUID, config_id: UUID) -> Dict[str, Any]:
+    """
+    Run an online re-embed migration for a project.
+
+    Args:
+        project_id: Project being migrated
+        config_id: Inactive target EmbeddingConfig to backfill and activate
+
+    Returns:
+        Dict with migration result
+    """
+    rec = await _load_config(config_id)
+    if rec is None or rec.project_id != project_id:
+        return {"success": False, "error": f"Target embedding config {config_id} not found"}
+    if rec.is_active or rec.migration_status not in ("pending", "failed"):
+        return {"success": False, "error": f"Config {config_id} is not awaiting migration"}
+
+    target_table = resolve_table_name(rec.vector_table)
+    await _set_migration_status(config_id, "running")
+
+    try:
+        embedding_service = build_embedding_service(rec)
+        backfilled = await _backfill(project_id, target_table, embedding_service, only_missing=False)
+        # Documents embedded by the old config while the backfill was running;
+        # the target must be complete before searches are switched to it
+        caught_up = 0
+        for _ in range(MAX_CATCH_UP_PASSES):
+            embedded = await _backfill(project_id, target_table, embedding_service, only_missing=True)
+            caught_up += embedded
+            if embedded == 0:
+                break
+        previous_table = await _activate_target(config_id, project_id)
+        get_vector_store_service().invalidate_project_stores(str(project_id))
+        get_vector_store_service().invalidate_project_stores(f"{project_id}:migration")
+        # Writers that resolved the old config just before the switch
+        caught_up += await _backfill(project_id, target_table, embedding_service, only_missing=True)
+        if previous_table is not None:
+            await _drop_previous_vectors(project_id, previous_table, target_table)
+    except Exception as e:
+        logger.error(f"Re-embed migration failed for project {project_id}: {e}")
+        await _set_migration_status(config_id, "failed", str(e))
+        return {"success": False, "project_id": str(project_id), "error": str(e)}
+
+    logger.info(
+        "Re-embed migration completed",
+        project_id=str(project_id),
+        target_table=target_table,
+        backfilled=backfilled,
+        caught_up=caught_up,
+    )
+    return {
+        "success": True,
+        "project_id": str(project_id),
+        "target_table": target_table,
+        "backfilled": backfilled,
+        "caught_up": caught_up,
+    }
+
+
+@celery_app.task(bind=True, name="reembed_project_task", acks_late=True, time_limit=6 * 3600, soft_time_limit=6 * 3600 - 300)
+def reembed_project_task(self, project_id: str, config_id: str) -> Dict[str, Any]:
+    """
+    Celery task for re-embedding a project into a new vector partition.
+
+    Args:
+        project_id: UUID string of the project
+        config_id: UUID string of the inactive target embedding config
+
+    Returns:
+        Migration result dictionary
+    """
+    try:
+        reset_db_state()
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        try:
+            return loop.run_until_complete(
+                reembed_project_async(UUID(project_id), UUID(config_id))
+            )
+        finally:
+            # Clean up database connections before closing the loop
+            reset_db_state()
+            loop.close()
+
+    except Exception as e:
+        logger.error(f"Re-embed task failed: {e}")
+        return {
+            "success": False,
+            "project_id": project_id,
+            "error": str(e),
+        }
+
+
+async def build_legacy_quantized_index_async(storage_mode: str) -> Dict[str, Any]:
+    """
+    Build the legacy table's quantized index for a storage mode.
+
+    The index is built concurrently so writes to rag_file_documents keep
+    flowing; an index left invalid by an interrupted build is dropped and
+    rebuilt, since CREATE INDEX IF NOT EXISTS would keep it.
+    """
+    statement = legacy_quantized_index_ddl(storage_mode)
+    if statement is None:
+        return {"success": True, "storage_mode": storage_mode, "built": False}
+    index_name = LEGACY_QUANTIZED_INDEXES[storage_mode][0]
+
+    engine = database.engine or database.create_database_engine()
+    async with engine.connect() as conn:
+        # CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        valid = (
+            await conn.execute(
+                text(
+                    "SELECT i.indisvalid FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+                ),
+                {"name": index_name},
+            )
+        ).scalar()
+        if valid:
+            return {"success": True, "storage_mode": storage_mode, "built": False}
+        if valid is False:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+        await conn.execute(text(statement))
+
+    logger.info(f"Built {index_name} for {storage_mode} storage on {LEGACY_TABLE_NAME}")
+    return {"success": True, "storage_mode": storage_mode, "built": True}
+
+
+@celery_app.task(name="build_legacy_quantized_index_task", acks_late=True, time_limit=6 * 3600, soft_time_limit=6 * 3600 - 300)
+def build_legacy_quantized_index_task(storage_mode: str) -> Dict[str, Any]:
+    """
+    Celery task for building a quantized index on the legacy vector table.
+
+    Args:
+        storage_mode: Quantized storage mode (``halfvec`` or ``binary``)
+
+    Returns:
+        Build result dictionary
+    """
+    try:
+        reset_db_state()
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        try:
+            return loop.run_until_complete(build_legacy_quantized_index_async(storage_mode))
+        finally:
+            # Clean up database connections before closing the loop
+            reset_db_state()
+            loop.close()
+
+    except Exception as e:
+        logger.error(f"Legacy quantized index build failed: {e}")
+        return {
+            "success": False,
+            "storage_mode": storage_mode,
+            "error": str(e),
+        }
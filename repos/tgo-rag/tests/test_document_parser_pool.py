@@ -0,0 +1,127 @@
+"""
+Tests for the isolated document parser pool.
+
+The helpers below run inside the worker subprocesses, which import them by
+module name, so they must stay module-level.
+"""
+
+import os
+import time
+
+import pytest
+
+from src.rag_service.tasks.document_parser_pool import (
+    DocumentParserCrashedError,
+    DocumentParserMemoryError,
+    DocumentParserPool,
+    DocumentParserTimeoutError,
+)
+from src.rag_service.tasks.document_processing_errors import (
+    DocumentProcessingError,
+    ProcessingStep,
+)
+
+STEP = ProcessingStep.CHUNKING_DOCUMENTS
+
+
+def split_words(text, *, lower=False):
+    words = text.split()
+    return {"words": [w.lower() for w in words] if lower else words, "count": len(words)}
+
+
+def worker_pid():
+    return os.getpid()
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def crash(code):
+    os._exit(code)
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def exhaust_memory():
+    raise MemoryError
+
+
+@pytest.fixture
+def pool():
+    pool = DocumentParserPool(max_workers=1, timeout_seconds=30, memory_limit_mb=0, max_tasks_per_worker=0)
+    yield pool
+    pool.close()
+
+
+def test_result_round_trip_reuses_worker(pool):
+    result = pool.run(split_words, "Hello Parser Pool", lower=True, file_id="f1", step=STEP)
+    first_pid = pool.run(worker_pid, file_id="f1", step=STEP)
+    second_pid = pool.run(worker_pid, file_id="f1", step=STEP)
+
+    assert result == {"words": ["hello", "parser", "pool"], "count": 3}
+    assert first_pid == second_pid != os.getpid()
+    assert pool.stats()["workers_started"] == 1
+
+
+def test_function_error_keeps_worker(pool):
+    pid = pool.run(worker_pid, file_id="f1", step=STEP)
+
+    with pytest.raises(DocumentProcessingError) as exc_info:
+        pool.run(fail, "bad table", file_id="f2", step=STEP)
+
+    assert "bad table" in str(exc_info.value)
+    assert pool.run(worker_pid, file_id="f3", step=STEP) == pid
+    assert pool.stats()["errors"] == 1
+
+
+def test_timeout_kills_and_replaces_worker(pool):
+    pid = pool.run(worker_pid, file_id="f1", step=STEP)
+
+    with pytest.raises(DocumentParserTimeoutError):
+        pool.run(sleep_for, 30, file_id="slow", step=STEP, timeout=0.5)
+
+    new_pid = pool.run(worker_pid, file_id="f2", step=STEP)
+    assert new_pid != pid
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["workers_started"] == 2
+
+
+def test_crash_fails_only_its_document(pool):
+    pid = pool.run(worker_pid, file_id="f1", step=STEP)
+
+    with pytest.raises(DocumentParserCrashedError) as exc_info:
+        pool.run(crash, 7, file_id="broken", step=STEP)
+
+    assert "exit code 7" in str(exc_info.value)
+    assert pool.run(split_words, "still works", file_id="f2", step=STEP)["count"] == 2
+    assert pool.run(worker_pid, file_id="f3", step=STEP) != pid
+    assert pool.stats()["crashes"] == 1
+
+
+def test_memory_error_retires_worker(pool):
+    pid = pool.run(worker_pid, file_id="f1", step=STEP)
+
+    with pytest.raises(DocumentParserMemoryError):
+        pool.run(exhaust_memory, file_id="huge", step=STEP)
+
+    assert pool.run(worker_pid, file_id="f2", step=STEP) != pid
+    stats = pool.stats()
+    assert stats["memory_errors"] == 1
+    assert stats["workers_recycled"] == 1
+
+
+def test_workers_recycled_after_max_tasks():
+    pool = DocumentParserPool(max_workers=1, timeout_seconds=30, memory_limit_mb=0, max_tasks_per_worker=2)
+    try:
+        pids = [pool.run(worker_pid, file_id=f"f{i}", step=STEP) for i in range(5)]
+    finally:
+        pool.close()
+
+    assert pids[0] == pids[1] != pids[2]
+    assert pids[2] == pids[3] != pids[4]
+    assert pool.stats()["workers_recycled"] == 2
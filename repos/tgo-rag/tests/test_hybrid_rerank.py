@@ -0,0 +1,123 @@
+"""
+Tests for the scores hybrid search reports after local reranking.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, List, Optional
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.rag_service.schemas.search import SearchMetadata, SearchResponse, SearchResult
+from src.rag_service.services import search as search_module
+from src.rag_service.services.search import SearchService
+
+
+def _response(document_ids: List[UUID]) -> SearchResponse:
+    results = [
+        SearchResult(
+            document_id=document_id,
+            relevance_score=0.5,
+            content_preview="chunk",
+            content_type="paragraph",
+            created_at=datetime.now(timezone.utc),
+        )
+        for document_id in document_ids
+    ]
+    return SearchResponse(
+        results=results,
+        search_metadata=SearchMetadata(
+            query="q",
+            total_results=len(results),
+            returned_results=len(results),
+            search_time_ms=0,
+            search_type="semantic",
+        ),
+    )
+
+
+class _Rows:
+    def __init__(self, rows: List[Any]):
+        self._rows = rows
+
+    def all(self) -> List[Any]:
+        return self._rows
+
+
+class _ContentSession:
+    def __init__(self, document_ids: List[UUID]):
+        self.document_ids = document_ids
+
+    async def execute(self, stmt: Any) -> _Rows:
+        return _Rows([(document_id, f"content {document_id}") for document_id in self.document_ids])
+
+
+def _service(monkeypatch, document_ids: List[UUID], raw_scores: Optional[List[float]]) -> SearchService:
+    service = SearchService.__new__(SearchService)
+    service.settings = SimpleNamespace(
+        candidate_multiplier=1,
+        rrf_k=60,
+        search_rerank_candidates=10,
+        search_rerank_max_chars=100,
+        search_rerank_budget_ms=100,
+        search_rerank_weight=1.0,
+    )
+
+    async def semantic_search(**kwargs):
+        return _response(document_ids)
+
+    async def keyword_search(**kwargs):
+        return _response([])
+
+    async def expand_query(query):
+        return [query]
+
+    async def fake_rerank_scores(reranker, query, passages, budget_ms):
+        assert len(passages) == len(document_ids)
+        return raw_scores
+
+    @asynccontextmanager
+    async def fake_get_db_session():
+        yield _ContentSession(document_ids)
+
+    service.semantic_search = semantic_search
+    service.keyword_search = keyword_search
+    monkeypatch.setattr(search_module, "get_query_processor", lambda: SimpleNamespace(expand_query=expand_query))
+    monkeypatch.setattr(search_module, "get_reranker", lambda: SimpleNamespace(name="fake"))
+    monkeypatch.setattr(search_module, "rerank_scores", fake_rerank_scores)
+    monkeypatch.setattr(search_module, "get_db_session", fake_get_db_session)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_rerank_score_is_the_raw_reranker_output(monkeypatch):
+    document_ids = [uuid4() for _ in range(3)]
+    # Cross-encoder logits: unbounded and reversing the fused order
+    raw_scores = [-4.25, 1.5, 7.75]
+    service = _service(monkeypatch, document_ids, raw_scores)
+
+    response = await service.hybrid_search("refund policy", uuid4(), limit=3)
+
+    assert response.search_metadata.search_type == "hybrid_rrf_rerank"
+    assert [r.document_id for r in response.results] == document_ids[::-1]
+    by_id = {r.document_id: r for r in response.results}
+    for document_id, raw in zip(document_ids, raw_scores):
+        assert by_id[document_id].metadata["rerank_score"] == raw
+    # With weight 1.0 the blend is the min-max normalized rerank score
+    assert [r.metadata["blended_score"] for r in response.results] == [1.0, 0.4792, 0.0]
+    assert [r.relevance_score for r in response.results] == [1.0, 0.4792, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_keeps_fused_scores(monkeypatch):
+    document_ids = [uuid4() for _ in range(3)]
+    service = _service(monkeypatch, document_ids, None)
+
+    response = await service.hybrid_search("refund policy", uuid4(), limit=3)
+
+    assert response.search_metadata.search_type == "hybrid_rrf"
+    assert [r.document_id for r in response.results] == document_ids
+    assert all("rerank_score" not in r.metadata for r in response.results)
+    assert all("blended_score" not in r.metadata for r in response.results)
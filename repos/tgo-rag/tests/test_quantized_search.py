@@ -0,0 +1,210 @@
+"""
+Tests for quantized candidate search: typed filters, partition filters and
+short-page fallback.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from uuid import uuid4
+
+import pytest
+
+from src.rag_service.services import vector_store as vector_store_module
+from src.rag_service.services.vector_partitions import (
+    LEGACY_VECTOR_SIZE,
+    PARTITION_METADATA_COLUMNS,
+    legacy_quantized_index_ddl,
+    partition_ddl,
+)
+from src.rag_service.services.vector_store import (
+    VectorStoreService,
+    _quantized_candidate_order,
+    _quantized_filter_conditions,
+    _supports_iterative_scan,
+)
+
+
+def _row(distance: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(),
+        content="chunk",
+        file_id=uuid4(),
+        collection_id=None,
+        project_id=uuid4(),
+        distance=distance,
+    )
+
+
+class _Result:
+    def __init__(self, rows: List[Any]):
+        self._rows = rows
+
+    def all(self) -> List[Any]:
+        return self._rows
+
+    def scalar(self) -> Any:
+        return self._rows[0] if self._rows else None
+
+
+class _FakeSession:
+    """Answers the ANN query with ``ann_rows`` and the exact query with ``exact_rows``."""
+
+    def __init__(self, ann_rows: List[Any], exact_rows: List[Any], extversion: str = "0.8.0"):
+        self.ann_rows = ann_rows
+        self.exact_rows = exact_rows
+        self.extversion = extversion
+        self.statements: List[str] = []
+        self.params: List[Dict[str, Any]] = []
+
+    async def execute(self, stmt: Any, params: Dict[str, Any] = None) -> _Result:
+        sql = str(stmt)
+        self.statements.append(sql)
+        self.params.append(params or {})
+        if "pg_extension" in sql:
+            return _Result([self.extversion])
+        if "AS candidates" in sql:
+            return _Result(self.ann_rows)
+        if "ORDER BY distance" in sql:
+            return _Result(self.exact_rows)
+        return _Result([])
+
+
+class _FakeEmbeddings:
+    async def aembed_query(self, query: str) -> List[float]:
+        return [0.1, 0.2, 0.3]
+
+    def get_dimensions(self) -> int:
+        return 3
+
+
+def _service() -> VectorStoreService:
+    service = VectorStoreService.__new__(VectorStoreService)
+    service._iterative_scan = None
+    return service
+
+
+def _patch_session(monkeypatch: pytest.MonkeyPatch, session: _FakeSession) -> None:
+    @asynccontextmanager
+    async def fake_get_db_session():
+        yield session
+
+    monkeypatch.setattr(vector_store_module, "get_db_session", fake_get_db_session)
+
+
+def test_filters_bind_typed_parameters():
+    project_id = uuid4()
+    collection_ids = [uuid4(), uuid4()]
+
+    conditions, params = _quantized_filter_conditions(
+        {
+            "project_id": str(project_id),
+            "collection_id": [str(c) for c in collection_ids],
+            "content_type": "paragraph",
+        },
+        ("project_id", "collection_id", "file_id", "content_type"),
+    )
+
+    assert not any("::text" in condition for condition in conditions)
+    assert "project_id = CAST(:project_id AS uuid)" in conditions
+    assert "collection_id = ANY(CAST(:collection_id AS uuid[]))" in conditions
+    assert "content_type = :content_type" in conditions
+    assert params["project_id"] == project_id
+    assert params["collection_id"] == collection_ids
+    assert "file_id" not in params
+
+
+def test_iterative_scan_version_check():
+    assert _supports_iterative_scan("0.8.0")
+    assert _supports_iterative_scan("0.10.1")
+    assert not _supports_iterative_scan("0.7.4")
+    assert not _supports_iterative_scan(None)
+
+
+@pytest.mark.asyncio
+async def test_short_ann_page_falls_back_to_exact_search(monkeypatch):
+    session = _FakeSession(ann_rows=[_row(0.1)], exact_rows=[_row(0.1), _row(0.2), _row(0.3)])
+    _patch_session(monkeypatch, session)
+
+    results = await _service().quantized_similarity_search_for_project(
+        query="pricing",
+        embeddings_client=_FakeEmbeddings(),
+        storage_mode="halfvec",
+        k=3,
+        filter_dict={"project_id": str(uuid4())},
+        table_name="rag_vec_test_abc123_3",
+    )
+
+    assert len(results) == 3
+    assert [round(score, 2) for _, score in results] == [0.9, 0.8, 0.7]
+    assert any("hnsw.iterative_scan" in sql for sql in session.statements)
+
+
+@pytest.mark.asyncio
+async def test_full_ann_page_skips_exact_search_and_old_pgvector(monkeypatch):
+    session = _FakeSession(
+        ann_rows=[_row(0.1), _row(0.2)], exact_rows=[], extversion="0.7.4"
+    )
+    _patch_session(monkeypatch, session)
+
+    results = await _service().quantized_similarity_search_for_project(
+        query="pricing",
+        embeddings_client=_FakeEmbeddings(),
+        storage_mode="binary",
+        k=2,
+        filter_dict={"project_id": str(uuid4())},
+        table_name="rag_vec_test_abc123_3",
+    )
+
+    assert len(results) == 2
+    assert not any("hnsw.iterative_scan" in sql for sql in session.statements)
+    assert sum("AS candidates" not in sql and "ORDER BY distance" in sql for sql in session.statements) == 0
+
+
+def test_partitions_carry_the_filter_columns():
+    create_table = partition_ddl("rag_vec_test_abc123_3", 3)[0]
+
+    for column in ("content_type", "language"):
+        assert column in PARTITION_METADATA_COLUMNS
+        assert f"{column} VARCHAR" in create_table
+
+
+@pytest.mark.asyncio
+async def test_partition_search_applies_content_type_and_language_filters(monkeypatch):
+    session = _FakeSession(ann_rows=[_row(0.1)], exact_rows=[])
+    _patch_session(monkeypatch, session)
+
+    await _service().quantized_similarity_search_for_project(
+        query="pricing",
+        embeddings_client=_FakeEmbeddings(),
+        storage_mode="halfvec",
+        k=1,
+        filter_dict={"project_id": str(uuid4()), "content_type": "table", "language": "en"},
+        table_name="rag_vec_test_abc123_3",
+    )
+
+    ann = next(i for i, sql in enumerate(session.statements) if "AS candidates" in sql)
+    assert "FROM rag_vec_test_abc123_3" in session.statements[ann]
+    assert "content_type = :content_type" in session.statements[ann]
+    assert "language = :language" in session.statements[ann]
+    assert session.params[ann]["content_type"] == "table"
+    assert session.params[ann]["language"] == "en"
+
+
+@pytest.mark.parametrize(
+    "storage_mode, indexed_expression",
+    [
+        ("halfvec", f"embedding::halfvec({LEGACY_VECTOR_SIZE})"),
+        ("binary", f"binary_quantize(embedding)::bit({LEGACY_VECTOR_SIZE})"),
+    ],
+)
+def test_legacy_quantized_index_matches_candidate_order(storage_mode, indexed_expression):
+    ddl = legacy_quantized_index_ddl(storage_mode)
+
+    assert ddl.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS")
+    assert f"(({indexed_expression})" in ddl
+    assert _quantized_candidate_order(storage_mode, LEGACY_VECTOR_SIZE).startswith(indexed_expression)
+
+
+def test_full_storage_needs_no_legacy_quantized_index():
+    assert legacy_quantized_index_ddl("full") is None
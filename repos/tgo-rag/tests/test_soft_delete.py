@@ -0,0 +1,222 @@
+"""
+Tests for soft-deleted content in search and the asynchronous delete endpoints.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.rag_service.routers import collections as collections_router
+from src.rag_service.routers import files as files_router
+from src.rag_service.services import search as search_module
+from src.rag_service.services.search import SEMANTIC_OVERFETCH_MAX_FACTOR, SearchService
+from src.rag_service.services.vector_store import STORAGE_MODE_FULL, _not_deleted_conditions
+
+
+class _FakeVectorStore:
+    """Returns the first ``k`` of ``chunks`` and records every requested ``k``."""
+
+    def __init__(self, chunks: List[UUID]):
+        self.chunks = chunks
+        self.requested: List[int] = []
+        self.quantized_kwargs: Dict[str, Any] = {}
+
+    async def similarity_search_for_project(self, query, project_key, embeddings_client, k, **kwargs):
+        self.requested.append(k)
+        return [
+            (SimpleNamespace(id=str(chunk_id), page_content="chunk"), 1.0 - i / 100)
+            for i, chunk_id in enumerate(self.chunks[:k])
+        ]
+
+    async def quantized_similarity_search_for_project(self, query, embeddings_client, storage_mode, k, **kwargs):
+        self.quantized_kwargs = kwargs
+        return await self.similarity_search_for_project(query, None, embeddings_client, k)
+
+
+def _service(store: _FakeVectorStore, live: set, monkeypatch, storage_mode: str = STORAGE_MODE_FULL) -> SearchService:
+    service = SearchService.__new__(SearchService)
+    service.vector_store_service = store
+    lookups: List[List[UUID]] = []
+
+    async def get_documents_info(document_ids, project_id):
+        lookups.append(list(document_ids))
+        return {
+            document_id: {
+                "file_id": uuid4(),
+                "created_at": datetime.now(timezone.utc),
+                "metadata": {},
+            }
+            for document_id in document_ids
+            if document_id in live
+        }
+
+    async def get_embedding_service(project_id):
+        return SimpleNamespace(
+            vector_storage_mode=storage_mode,
+            embeddings_client=None,
+            rescore_multiplier=4,
+            vector_table=None,
+        )
+
+    service._get_documents_info = get_documents_info
+    service.lookups = lookups
+    monkeypatch.setattr(search_module, "get_embedding_service_for_project", get_embedding_service)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_refills_slots_taken_by_deleted_chunks(monkeypatch):
+    chunks = [uuid4() for _ in range(20)]
+    # The best five chunks belong to a file that is awaiting purge
+    live = set(chunks[5:])
+    store = _FakeVectorStore(chunks)
+    service = _service(store, live, monkeypatch)
+
+    response = await service.semantic_search("pricing", uuid4(), limit=4)
+
+    assert [r.document_id for r in response.results] == chunks[5:9]
+    assert store.requested == [4, 8, 16]
+    # One batched lookup per round instead of one query per chunk
+    assert len(service.lookups) == 3
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_stops_when_store_runs_dry_or_cap_reached(monkeypatch):
+    chunks = [uuid4() for _ in range(6)]
+    store = _FakeVectorStore(chunks)
+    service = _service(store, {chunks[0]}, monkeypatch)
+
+    response = await service.semantic_search("pricing", uuid4(), limit=4)
+
+    assert len(response.results) == 1
+    assert store.requested == [4, 8]
+
+    store = _FakeVectorStore([uuid4() for _ in range(1000)])
+    service = _service(store, set(), monkeypatch)
+
+    response = await service.semantic_search("pricing", uuid4(), limit=2)
+
+    assert response.results == []
+    assert store.requested[-1] == 2 * SEMANTIC_OVERFETCH_MAX_FACTOR
+
+
+@pytest.mark.asyncio
+async def test_quantized_search_excludes_deleted_in_query(monkeypatch):
+    chunks = [uuid4() for _ in range(3)]
+    store = _FakeVectorStore(chunks)
+    service = _service(store, set(chunks), monkeypatch, storage_mode="halfvec")
+
+    response = await service.semantic_search("pricing", uuid4(), limit=3)
+
+    assert len(response.results) == 3
+    assert store.quantized_kwargs["exclude_deleted"] is True
+    assert store.requested == [3]
+
+
+def test_not_deleted_conditions_reference_the_vector_table():
+    conditions = _not_deleted_conditions("rag_vec_test_abc123_3")
+
+    assert any("rag_files" in c and "rag_vec_test_abc123_3.file_id" in c for c in conditions)
+    assert any("rag_collections" in c and "rag_vec_test_abc123_3.collection_id" in c for c in conditions)
+
+
+class _Result:
+    def __init__(self, value: Any):
+        self.value = value
+
+    def scalar_one_or_none(self) -> Any:
+        return self.value
+
+
+class _FakeSession:
+    def __init__(self, found: Any):
+        self.found = found
+        self.commits = 0
+
+    async def execute(self, stmt: Any) -> _Result:
+        return _Result(self.found)
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def refresh(self, obj: Any) -> None:
+        pass
+
+
+def _job(target_type: str, target_id: UUID) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(),
+        project_id=uuid4(),
+        target_type=target_type,
+        target_id=target_id,
+        status="pending",
+        total_documents=0,
+        deleted_documents=0,
+        deleted_files=0,
+        deleted_pages=0,
+        deleted_qa_pairs=0,
+        error_message=None,
+        started_at=None,
+        completed_at=None,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _route_status(router, path: str, method: str) -> int:
+    for route in router.routes:
+        if route.path == path and method in route.methods:
+            return route.status_code
+    raise AssertionError(f"{method} {path} not found")
+
+
+@pytest.mark.asyncio
+async def test_delete_file_returns_scheduled_job(monkeypatch):
+    file_record = SimpleNamespace(id=uuid4())
+    job = _job("file", file_record.id)
+    enqueued: List[UUID] = []
+
+    async def schedule(db, record):
+        assert record is file_record
+        return job
+
+    monkeypatch.setattr(files_router, "schedule_file_deletion", schedule)
+    monkeypatch.setattr(files_router, "enqueue_deletion_job", enqueued.append)
+    session = _FakeSession(file_record)
+
+    response = await files_router.delete_file(file_record.id, project_id=uuid4(), db=session)
+
+    assert _route_status(files_router.router, "/{file_id}", "DELETE") == 202
+    assert response.id == job.id and response.status == "pending"
+    assert enqueued == [job.id]
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_collection_hard_returns_job_and_soft_returns_204(monkeypatch):
+    collection = SimpleNamespace(id=uuid4(), soft_deleted=False)
+    collection.soft_delete = lambda: setattr(collection, "soft_deleted", True)
+    job = _job("collection", collection.id)
+    enqueued: List[UUID] = []
+
+    async def schedule(db, record):
+        return job
+
+    monkeypatch.setattr(collections_router, "schedule_collection_deletion", schedule)
+    monkeypatch.setattr(collections_router, "enqueue_deletion_job", enqueued.append)
+
+    response = await collections_router.delete_collection(
+        collection.id, project_id=uuid4(), hard_delete=True, db=_FakeSession(collection)
+    )
+    assert _route_status(collections_router.router, "/{collection_id}", "DELETE") == 202
+    assert response.target_id == collection.id
+    assert enqueued == [job.id]
+
+    response = await collections_router.delete_collection(
+        collection.id, project_id=uuid4(), hard_delete=False, db=_FakeSession(collection)
+    )
+    assert response.status_code == 204
+    assert collection.soft_deleted
+    assert enqueued == [job.id]
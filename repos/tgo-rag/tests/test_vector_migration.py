@@ -0,0 +1,97 @@
+"""
+Tests for the online re-embed migration ordering.
+"""
+
+from types import SimpleNamespace
+from typing import List
+from uuid import uuid4
+
+import pytest
+
+from src.rag_service.tasks import vector_migration
+
+
+class _Recorder:
+    def __init__(self, backfill_counts: List[int]):
+        self.events: List[str] = []
+        self.backfill_counts = list(backfill_counts)
+
+    async def backfill(self, project_id, target_table, embedding_service, only_missing):
+        count = self.backfill_counts.pop(0) if self.backfill_counts else 0
+        self.events.append(f"{'catch_up' if only_missing else 'backfill'}:{count}")
+        return count
+
+    async def activate(self, target_id, project_id):
+        self.events.append("activate")
+        return "rag_vec_old_abc123_1536"
+
+    async def drop(self, project_id, previous_table, target_table):
+        self.events.append(f"drop:{previous_table}")
+
+    async def set_status(self, config_id, status, error=None):
+        self.events.append(f"status:{status}")
+
+
+@pytest.fixture
+def recorder_factory(monkeypatch):
+    def make(backfill_counts: List[int]) -> _Recorder:
+        recorder = _Recorder(backfill_counts)
+        project_id = uuid4()
+
+        async def load_config(config_id):
+            return SimpleNamespace(
+                project_id=project_id,
+                is_active=False,
+                migration_status="pending",
+                vector_table="rag_vec_new_def456_1024",
+            )
+
+        monkeypatch.setattr(vector_migration, "_load_config", load_config)
+        monkeypatch.setattr(vector_migration, "_set_migration_status", recorder.set_status)
+        monkeypatch.setattr(vector_migration, "_backfill", recorder.backfill)
+        monkeypatch.setattr(vector_migration, "_activate_target", recorder.activate)
+        monkeypatch.setattr(vector_migration, "_drop_previous_vectors", recorder.drop)
+        monkeypatch.setattr(vector_migration, "build_embedding_service", lambda rec: SimpleNamespace())
+        monkeypatch.setattr(
+            vector_migration,
+            "get_vector_store_service",
+            lambda: SimpleNamespace(invalidate_project_stores=lambda key=None: 0),
+        )
+        recorder.project_id = project_id
+        return recorder
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_catch_up_completes_before_activation(recorder_factory):
+    recorder = recorder_factory([10, 3, 1, 0, 2])
+
+    result = await vector_migration.reembed_project_async(recorder.project_id, uuid4())
+
+    assert result["success"] is True
+    assert recorder.events == [
+        "status:running",
+        "backfill:10",
+        "catch_up:3",
+        "catch_up:1",
+        "catch_up:0",
+        "activate",
+        "catch_up:2",
+        "drop:rag_vec_old_abc123_1536",
+    ]
+    assert result["backfilled"] == 10
+    assert result["caught_up"] == 6
+
+
+@pytest.mark.asyncio
+async def test_catch_up_passes_are_bounded(recorder_factory):
+    busy = [5] + [1] * (vector_migration.MAX_CATCH_UP_PASSES + 5)
+    recorder = recorder_factory(busy)
+
+    await vector_migration.reembed_project_async(recorder.project_id, uuid4())
+
+    activate_at = recorder.events.index("activate")
+    catch_ups_before = [e for e in recorder.events[:activate_at] if e.startswith("catch_up")]
+    assert len(catch_ups_before) == vector_migration.MAX_CATCH_UP_PASSES
+    assert recorder.events[activate_at + 1].startswith("catch_up")
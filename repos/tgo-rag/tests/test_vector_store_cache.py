@@ -0,0 +1,197 @@
+"""
+Tests for the per-project vector store cache under concurrent searches.
+"""
+
+import asyncio
+from typing import Dict, List, Tuple
+
+import pytest
+
+from src.rag_service.services.vector_store_cache import VectorStoreCache
+
+
+class _Factory:
+    """Builds ``(project, version, n)`` stores, optionally waiting for a release."""
+
+    def __init__(self):
+        self.created: List[Tuple[str, str]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.fail_next = False
+
+    def __call__(self, project_key: str, version: str):
+        async def build():
+            self.created.append((project_key, version))
+            await self.release.wait()
+            if self.fail_next:
+                self.fail_next = False
+                raise RuntimeError("connection refused")
+            return (project_key, version, len(self.created))
+
+        return build
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_creation():
+    cache: VectorStoreCache = VectorStoreCache(max_size=4)
+    factory = _Factory()
+    factory.release.clear()
+
+    searches = [
+        asyncio.create_task(cache.get_or_create("p1", "v1", factory("p1", "v1")))
+        for _ in range(20)
+    ]
+    await asyncio.sleep(0)
+    factory.release.set()
+    stores = await asyncio.gather(*searches)
+
+    assert factory.created == [("p1", "v1")]
+    assert len(set(stores)) == 1
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_config_switch_during_concurrent_searches():
+    """Searches racing a config change never get a store for the wrong version."""
+    cache: VectorStoreCache = VectorStoreCache(max_size=4)
+    factory = _Factory()
+    factory.release.clear()
+
+    old_searches = [
+        asyncio.create_task(cache.get_or_create("p1", "v1", factory("p1", "v1")))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+
+    # The config endpoint stores the new version and invalidates the project
+    cache.invalidate("p1")
+    new_searches = [
+        asyncio.create_task(cache.get_or_create("p1", "v2", factory("p1", "v2")))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+    factory.release.set()
+
+    old_stores = await asyncio.gather(*old_searches)
+    new_stores = await asyncio.gather(*new_searches)
+
+    assert {store[1] for store in old_stores} == {"v1"}
+    assert {store[1] for store in new_stores} == {"v2"}
+    # The store built before the invalidation is served to its waiters but not cached
+    assert ("p1", "v1") not in cache
+    assert ("p1", "v2") in cache
+    assert await cache.get_or_create("p1", "v2", factory("p1", "v2")) == new_stores[0]
+    assert factory.created.count(("p1", "v2")) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_all_during_creation_and_other_projects_untouched():
+    cache: VectorStoreCache = VectorStoreCache(max_size=4)
+    factory = _Factory()
+    await cache.get_or_create("p2", "v1", factory("p2", "v1"))
+
+    factory.release.clear()
+    pending = asyncio.create_task(cache.get_or_create("p1", "v1", factory("p1", "v1")))
+    await asyncio.sleep(0)
+    cache.invalidate("p1")
+    factory.release.set()
+    await pending
+
+    assert ("p1", "v1") not in cache
+    assert ("p2", "v1") in cache
+
+    factory.release.clear()
+    pending = asyncio.create_task(cache.get_or_create("p1", "v1", factory("p1", "v1")))
+    await asyncio.sleep(0)
+    cache.invalidate()
+    factory.release.set()
+    await pending
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_new_version_supersedes_old_one():
+    cache: VectorStoreCache = VectorStoreCache(max_size=4)
+    factory = _Factory()
+
+    await cache.get_or_create("p1", "v1", factory("p1", "v1"))
+    await cache.get_or_create("p1", "v2", factory("p1", "v2"))
+
+    assert ("p1", "v1") not in cache
+    assert ("p1", "v2") in cache
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_creation_reaches_all_waiters_and_is_retried():
+    cache: VectorStoreCache = VectorStoreCache(max_size=4)
+    factory = _Factory()
+    factory.release.clear()
+    factory.fail_next = True
+
+    searches = [
+        asyncio.create_task(cache.get_or_create("p1", "v1", factory("p1", "v1")))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    factory.release.set()
+    results = await asyncio.gather(*searches, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(cache) == 0
+    store = await cache.get_or_create("p1", "v1", factory("p1", "v1"))
+    assert store[1] == "v1"
+    assert factory.created == [("p1", "v1"), ("p1", "v1")]
+
+
+@pytest.mark.asyncio
+async def test_lru_bound_and_idle_eviction():
+    clock = _Clock()
+    cache: VectorStoreCache = VectorStoreCache(max_size=2, idle_ttl_seconds=60, clock=clock)
+    factory = _Factory()
+
+    await cache.get_or_create("p1", "v1", factory("p1", "v1"))
+    await cache.get_or_create("p2", "v1", factory("p2", "v1"))
+    await cache.get_or_create("p1", "v1", factory("p1", "v1"))  # p1 most recently used
+    await cache.get_or_create("p3", "v1", factory("p3", "v1"))
+
+    assert ("p2", "v1") not in cache
+    assert ("p1", "v1") in cache and ("p3", "v1") in cache
+
+    clock.now = 61
+    assert cache.evict_idle() == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_searches_across_projects_during_repeated_switches():
+    cache: VectorStoreCache = VectorStoreCache(max_size=8)
+    factory = _Factory()
+    versions: Dict[str, str] = {f"p{i}": "v0" for i in range(4)}
+
+    async def search(project: str) -> None:
+        version = versions[project]
+        store = await cache.get_or_create(project, version, factory(project, version))
+        assert store[:2] == (project, version)
+
+    for round_no in range(1, 6):
+        tasks = [asyncio.create_task(search(project)) for project in versions for _ in range(5)]
+        await asyncio.sleep(0)
+        switched = f"p{round_no % 4}"
+        versions[switched] = f"v{round_no}"
+        cache.invalidate(switched)
+        tasks += [asyncio.create_task(search(switched)) for _ in range(5)]
+        await asyncio.gather(*tasks)
+
+    for project, version in versions.items():
+        assert (project, version) in cache
+    assert len(cache) == len(versions)